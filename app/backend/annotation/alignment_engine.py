@@ -4,8 +4,14 @@ import tempfile
 from typing import List, Dict, Any
 
 from Bio.Align import PairwiseAligner, substitution_matrices
-from backend.logger import logger
+from backend.config import ALIGNER_TIMEOUT_SECONDS
+from backend.logger import get_logger
+from backend.metrics import ALIGNER_SECONDS
 from backend.models.models import AlignmentMethod, NumberingScheme
+from backend.msa.large_input import FAST, FAST_ARGUMENTS, plan_alignment
+from backend.msa.numbered_alignment import align_numbered
+
+logger = get_logger(__name__)
 
 
 class AlignmentEngine:
@@ -54,34 +60,39 @@ class AlignmentEngine:
             raise ValueError(f"Unsupported substitution matrix: {matrix}")
 
         try:
-            if method == AlignmentMethod.PAIRWISE_GLOBAL:
-                return self._pairwise_global_alignment(
-                    sequences, gap_open, gap_extend, matrix
-                )
-            elif method == AlignmentMethod.PAIRWISE_LOCAL:
-                return self._pairwise_local_alignment(
-                    sequences, gap_open, gap_extend, matrix
-                )
-            elif method in [
-                AlignmentMethod.MUSCLE,
-                AlignmentMethod.MAFFT,
-                AlignmentMethod.CLUSTALO,
-            ]:
-                return self._external_msa_alignment(
-                    sequences, method, gap_open, gap_extend, matrix
-                )
-            elif method == AlignmentMethod.CUSTOM_ANTIBODY:
-                return self._antibody_aware_alignment(
-                    sequences, numbering_scheme, gap_open, gap_extend, matrix
-                )
-            else:
-                raise ValueError(f"Unsupported alignment method: {method}")
+            with ALIGNER_SECONDS.labels(method=method.value).time():
+                if method == AlignmentMethod.PAIRWISE_GLOBAL:
+                    return self._pairwise_global_alignment(
+                        sequences, gap_open, gap_extend, matrix
+                    )
+                elif method == AlignmentMethod.PAIRWISE_LOCAL:
+                    return self._pairwise_local_alignment(
+                        sequences, gap_open, gap_extend, matrix
+                    )
+                elif method in [
+                    AlignmentMethod.MUSCLE,
+                    AlignmentMethod.MAFFT,
+                    AlignmentMethod.CLUSTALO,
+                ]:
+                    return self._external_msa_alignment(
+                        sequences, method, gap_open, gap_extend, matrix
+                    )
+                elif method == AlignmentMethod.CUSTOM_ANTIBODY:
+                    return self._antibody_aware_alignment(
+                        sequences,
+                        numbering_scheme,
+                        gap_open,
+                        gap_extend,
+                        matrix,
+                    )
+                else:
+                    raise ValueError(f"Unsupported alignment method: {method}")
 
         except ValueError as e:
             # Re-raise validation errors
             raise e
         except Exception as e:
-            logger.error(f"Alignment failed: {e}")
+            logger.error("Alignment failed: %s", e)
             raise RuntimeError(f"Alignment failed: {e}")
 
     def _pairwise_global_alignment(
@@ -196,7 +207,10 @@ class AlignmentEngine:
         gap_extend: float,
         matrix: str,
     ) -> Dict[str, Any]:
-        """Perform MSA using external tools"""
+        """Perform MSA using external tools, fast settings for large inputs"""
+        # The raw tool output is returned, so the input is never chunked
+        plan = plan_alignment(sequences, method, chunking=False)
+        fast = plan.strategy == FAST and method in FAST_ARGUMENTS
 
         # Create temporary FASTA file
         with tempfile.NamedTemporaryFile(
@@ -216,11 +230,13 @@ class AlignmentEngine:
             if method == AlignmentMethod.MUSCLE:
                 cmd = [
                     "muscle",
-                    "-align",
+                    "-super5" if fast else "-align",
                     temp_fasta_path,
                     "-output",
                     temp_output_path,
                 ]
+            elif method == AlignmentMethod.MAFFT and fast:
+                cmd = FAST_ARGUMENTS[method] + [temp_fasta_path]
             elif method == AlignmentMethod.MAFFT:
                 cmd = [
                     "mafft",
@@ -243,7 +259,10 @@ class AlignmentEngine:
 
             # Run external tool
             result = subprocess.run(
-                cmd, capture_output=True, text=True, timeout=300
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=ALIGNER_TIMEOUT_SECONDS,
             )
 
             if result.returncode != 0:
@@ -272,6 +291,7 @@ class AlignmentEngine:
                     len(aligned_sequences[0]) if aligned_sequences else 0
                 ),
                 "sequences": len(aligned_sequences),
+                "alignment_plan": plan.as_metadata(),
             }
 
         finally:
@@ -292,20 +312,24 @@ class AlignmentEngine:
         """
         Perform antibody-aware alignment using numbered positions
 
-        This is a simplified version. In practice, you would:
-        1. Number sequences with ANARCI
-        2. Align based on consensus-numbered positions
-        3. Optionally align CDRs separately
+        Sequences are numbered with ANARCI in one batch and placed into the
+        union of their numbered positions (see ``msa.numbered_alignment``),
+        so gap penalties and the substitution matrix are not used.
         """
-
-        # For now, fall back to MUSCLE alignment
-        # In a full implementation, you would integrate with ANARCI numbering
-        logger.warning(
-            "Antibody-aware alignment not fully implemented, using MUSCLE fallback"
-        )
-        return self._external_msa_alignment(
-            sequences, AlignmentMethod.MUSCLE, gap_open, gap_extend, matrix
+        result = align_numbered(sequences, numbering_scheme.value)
+        aligned_sequences = result.aligned
+        alignment_content = "".join(
+            f">sequence_{i + 1}\n{seq}\n"
+            for i, seq in enumerate(aligned_sequences)
         )
+        return {
+            "method": AlignmentMethod.CUSTOM_ANTIBODY.value,
+            "alignment": alignment_content,
+            "identity": self._calculate_msa_identity(aligned_sequences),
+            "length": len(aligned_sequences[0]) if aligned_sequences else 0,
+            "sequences": len(aligned_sequences),
+            "unnumbered": result.unnumbered,
+        }
 
     def _parse_alignment_string(self, alignment_str: str) -> tuple[str, str]:
         """Parse Biopython alignment string to extract sequences"""
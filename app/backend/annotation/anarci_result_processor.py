@@ -1,15 +1,25 @@
 import itertools
 import logging
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 from anarci import run_anarci
 
 from backend.annotation.antibody_region_annotator import (
     AntibodyRegionAnnotator,
 )
+from backend.annotation.germline_index import get_germline_index
+from backend.annotation.scheme_numbering import (
+    anarci_scheme,
+    run_anarci_schemes,
+)
 from .isotype_hmmer import detect_isotype_with_hmmer
+from backend.config import GERMLINE_ASSIGNMENT
+from backend.metrics import ANARCI_SECONDS
+from backend.profiling import profiled, stage
 from backend.utils.types import Chain, Domain
 
+ALLOWED_SPECIES = ["human", "mouse", "rat"]
+
 
 class AnarciResultObject:
     def __init__(self, biologic_name: str, chains: List[Chain]) -> None:
@@ -23,12 +33,28 @@ class AnarciResultObject:
 class AnarciResultProcessor:
     def __init__(
         self,
-        input_dict: Dict[str, Dict[str, str]],
+        input_dict: Optional[Dict[str, Dict[str, str]]] = None,
         numbering_scheme: str = "imgt",
+        germline_assignment: str = GERMLINE_ASSIGNMENT,
+        additional_schemes: Sequence[str] = (),
     ) -> None:
         self.original_scheme = numbering_scheme
         self.numbering_scheme = numbering_scheme
-        self.results = self._process_results(input_dict)
+        # Schemes whose regions are added to each variable domain as
+        # ``scheme_regions``, numbered from the same ANARCI alignment
+        self.additional_schemes = [
+            scheme
+            for scheme in additional_schemes
+            if scheme != numbering_scheme
+        ]
+        # The germline index compares IMGT numberings; other schemes keep
+        # ANARCI's own germline assignment
+        self.germline_index = (
+            get_germline_index()
+            if germline_assignment == "index" and numbering_scheme == "imgt"
+            else None
+        )
+        self.results = self._process_results(input_dict or {})
 
     def _detect_constant_region(
         self, sequence: str, start_pos: int = 0
@@ -43,7 +69,8 @@ class AnarciResultProcessor:
         Returns:
             Dictionary with constant region information or None if not found
         """
-        isotype = detect_isotype_with_hmmer(sequence)
+        with stage("hmmer_isotype"):
+            isotype = detect_isotype_with_hmmer(sequence)
         if not isotype:
             return None
 
@@ -59,31 +86,151 @@ class AnarciResultProcessor:
         # If CGG, use Kabat for ANARCI, but keep track of original scheme
         anarci_scheme = "kabat" if scheme == "cgg" else scheme
         try:
-            return (
-                run_anarci(anarci_input, scheme=anarci_scheme, **kwargs),
-                scheme,
-            )
+            with stage("anarci"), ANARCI_SECONDS.labels(
+                scheme=anarci_scheme
+            ).time():
+                numbered = run_anarci(
+                    anarci_input, scheme=anarci_scheme, **kwargs
+                )
+            return numbered, scheme
         except Exception as e:
             if anarci_scheme != "imgt":
                 logging.warning(
                     f"ANARCI failed with scheme '{anarci_scheme}' ({e}), retrying with 'imgt'."
                 )
-                return (
-                    run_anarci(anarci_input, scheme="imgt", **kwargs),
-                    "imgt",
-                )
+                with stage("anarci"), ANARCI_SECONDS.labels(
+                    scheme="imgt"
+                ).time():
+                    numbered = run_anarci(
+                        anarci_input, scheme="imgt", **kwargs
+                    )
+                return numbered, "imgt"
             else:
                 raise
 
+    def _run_anarci_schemes(self, anarci_input, scheme, **kwargs):
+        """
+        Number in the primary and additional schemes with one hmmscan run
+
+        Falls back to IMGT like ``_run_anarci_with_fallback`` when the
+        primary scheme cannot be numbered, and also returns the numbered
+        domains of each additional scheme that could be numbered.
+        """
+        primary = anarci_scheme(scheme)
+        schemes = [primary]
+        schemes += [anarci_scheme(extra) for extra in self.additional_schemes]
+        with stage("anarci"), ANARCI_SECONDS.labels(scheme=primary).time():
+            outputs = run_anarci_schemes(
+                anarci_input, schemes + ["imgt"], **kwargs
+            )
+        if primary in outputs:
+            numbered, used_scheme = outputs[primary], scheme
+        elif "imgt" in outputs:
+            logging.warning(
+                f"ANARCI failed with scheme '{primary}', using 'imgt'."
+            )
+            numbered, used_scheme = outputs["imgt"], "imgt"
+        else:
+            raise ValueError(f"ANARCI could not number {anarci_input[0][0]}")
+        extra_numbered = {
+            extra: outputs[anarci_scheme(extra)][1][0]
+            for extra in self.additional_schemes
+            if anarci_scheme(extra) in outputs
+        }
+        return numbered, used_scheme, extra_numbered
+
+    @staticmethod
+    def _absolute_regions(regions: Dict[str, Any], domain_start: int):
+        """Shift region coordinates to positions in the chain sequence"""
+        absolute_regions = {}
+        for region_name, region in regions.items():
+            # region.start/stop may be ints or like [pos, ' ']; normalize to int
+            def to_int(pos):
+                if isinstance(pos, (list, tuple)):
+                    return int(pos[0])
+                return int(pos)
+
+            start_rel = to_int(region.start)
+            stop_rel = to_int(region.stop)
+            # Fix: AntibodyRegionAnnotator now returns 0-indexed indices
+            # domain_start is 0-based index into raw_sequence
+            # We add domain_start to convert to absolute 0-based positions
+            start_abs = domain_start + start_rel
+            stop_abs = domain_start + stop_rel
+            absolute_regions[region_name] = type(region)(
+                name=region.name,
+                start=start_abs,
+                stop=stop_abs,
+                sequence=region.sequence,
+            )
+        return absolute_regions
+
+    def _scheme_regions(
+        self,
+        domain: Domain,
+        domain_index: int,
+        domain_start: int,
+        extra_numbered: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Regions of a domain in each additional scheme"""
+        scheme_regions = {}
+        for scheme, numbered in extra_numbered.items():
+            if not numbered or domain_index >= len(numbered):
+                continue
+            renumbered = Domain(
+                sequence=domain.sequence,
+                numbering=numbered[domain_index],
+                alignment_details=domain.alignment_details,
+                hit_table=None,
+                isotype=domain.isotype,
+                germlines=None,
+                species=domain.species,
+            )
+            AntibodyRegionAnnotator.annotate_domain(renumbered, scheme=scheme)
+            scheme_regions[scheme] = self._absolute_regions(
+                renumbered.regions, domain_start
+            )
+        return scheme_regions
+
+    @profiled("anarci_processing")
     def _process_results(
         self, input_dict: Dict[str, Dict[str, str]]
     ) -> List[AnarciResultObject]:
-        result_objects = []
+        return list(self.iter_results(input_dict))
+
+    def iter_results(
+        self, input_dict: Dict[str, Dict[str, str]]
+    ) -> Iterator[AnarciResultObject]:
+        """
+        Annotate biologics one at a time, yielding each as it is finished.
+
+        Only the biologic being processed is held in memory, so callers can
+        stream results without waiting for the whole input.
+        """
         for biologic_name, chains_dict in input_dict.items():
-            # We'll create one chain per input sequence, regardless of how many domains ANARCI finds
-            chains = []
-            for chain_name, chain_seq in chains_dict.items():
-                anarci_input = [(chain_name, chain_seq)]
+            yield self._process_biologic(biologic_name, chains_dict)
+
+    def _process_biologic(
+        self, biologic_name: str, chains_dict: Dict[str, str]
+    ) -> AnarciResultObject:
+        # We'll create one chain per input sequence, regardless of how many domains ANARCI finds
+        chains = []
+        variable_domains = []
+        for chain_name, chain_seq in chains_dict.items():
+            anarci_input = [(chain_name, chain_seq)]
+            extra_numbered = {}
+            if self.additional_schemes:
+                (
+                    (sequences, numbered, alignment_details, hit_tables),
+                    used_scheme,
+                    extra_numbered,
+                ) = self._run_anarci_schemes(
+                    anarci_input,
+                    scheme=self.numbering_scheme,
+                    allowed_species=ALLOWED_SPECIES,
+                    assign_germline=self.germline_index is None,
+                )
+            else:
                 (
                     sequences,
                     numbered,
@@ -92,217 +239,224 @@ class AnarciResultProcessor:
                 ), used_scheme = self._run_anarci_with_fallback(
                     anarci_input,
                     scheme=self.numbering_scheme,
-                    allowed_species=["human", "mouse", "rat"],
-                    assign_germline=True,
+                    allowed_species=ALLOWED_SPECIES,
+                    assign_germline=self.germline_index is None,
                 )
 
-                # Process one sequence at a time (ANARCI processes one sequence per call)
-                seq_name, raw_sequence = sequences[0]
-                seq_numbered = numbered[0]
-                seq_aligns = alignment_details[0]
-                seq_hits = hit_tables[0]
+            # Process one sequence at a time (ANARCI processes one sequence per call)
+            seq_name, raw_sequence = sequences[0]
+            seq_numbered = numbered[0]
+            seq_aligns = alignment_details[0]
+            seq_hits = hit_tables[0]
+
+            # Process hit tables for germline info
+            hit_table_header = (
+                seq_hits[0] if seq_hits and len(seq_hits) > 0 else []
+            )
+            hit_table_rows = (
+                seq_hits[1:] if seq_hits and len(seq_hits) > 1 else []
+            )
+            best_hits_by_chain = {}
 
-                # Process hit tables for germline info
-                hit_table_header = (
-                    seq_hits[0] if seq_hits and len(seq_hits) > 0 else []
+            if hit_table_header and hit_table_rows:
+                id_idx = (
+                    hit_table_header.index("id")
+                    if "id" in hit_table_header
+                    else None
                 )
-                hit_table_rows = (
-                    seq_hits[1:] if seq_hits and len(seq_hits) > 1 else []
+                bitscore_idx = (
+                    hit_table_header.index("bitscore")
+                    if "bitscore" in hit_table_header
+                    else None
                 )
-                best_hits_by_chain = {}
-
-                if hit_table_header and hit_table_rows:
-                    id_idx = (
-                        hit_table_header.index("id")
-                        if "id" in hit_table_header
-                        else None
-                    )
-                    bitscore_idx = (
-                        hit_table_header.index("bitscore")
-                        if "bitscore" in hit_table_header
+                for key, group in itertools.groupby(
+                    sorted(hit_table_rows, key=lambda row: row[id_idx]),
+                    key=lambda row: (
+                        row[id_idx].split("_")[0]
+                        + "_"
+                        + row[id_idx].split("_")[1]
+                        if id_idx is not None
                         else None
-                    )
-                    for key, group in itertools.groupby(
-                        sorted(hit_table_rows, key=lambda row: row[id_idx]),
+                    ),
+                ):
+                    best_row = max(
+                        list(group),
                         key=lambda row: (
-                            row[id_idx].split("_")[0]
-                            + "_"
-                            + row[id_idx].split("_")[1]
-                            if id_idx is not None
-                            else None
+                            row[bitscore_idx]
+                            if bitscore_idx is not None
+                            else 0
                         ),
-                    ):
-                        best_row = max(
-                            list(group),
-                            key=lambda row: (
-                                row[bitscore_idx]
-                                if bitscore_idx is not None
-                                else 0
-                            ),
-                        )
-                        best_hits_by_chain[key] = best_row
+                    )
+                    best_hits_by_chain[key] = best_row
 
-                # Create domains list for this chain
-                domains = []
+            # Create domains list for this chain
+            domains = []
 
-                # Sort domains by their position in the sequence
-                domain_positions = []
-                for dom_idx, (numbered_domain, domain_alignment) in enumerate(
-                    zip(seq_numbered, seq_aligns)
-                ):
-                    if not domain_alignment:
-                        continue
+            # Sort domains by their position in the sequence
+            domain_positions = []
+            for dom_idx, (numbered_domain, domain_alignment) in enumerate(
+                zip(seq_numbered, seq_aligns)
+            ):
+                if not domain_alignment:
+                    continue
 
-                    domain_start = domain_alignment.get("query_start", 0)
-                    domain_end = domain_alignment.get("query_end", 0)
-                    domain_positions.append(
-                        (dom_idx, domain_start, domain_end)
-                    )
+                domain_start = domain_alignment.get("query_start", 0)
+                domain_end = domain_alignment.get("query_end", 0)
+                domain_positions.append((dom_idx, domain_start, domain_end))
 
-                # Sort domains by their start position to maintain sequence order
-                domain_positions.sort(key=lambda x: x[1])
+            # Sort domains by their start position to maintain sequence order
+            domain_positions.sort(key=lambda x: x[1])
 
-                # Process domains in sequence order
-                prev_domain_end = 0
-                for dom_idx, domain_start, domain_end in domain_positions:
-                    numbered_domain = seq_numbered[dom_idx]
-                    domain_alignment = seq_aligns[dom_idx]
+            # Process domains in sequence order
+            prev_domain_end = 0
+            for dom_idx, domain_start, domain_end in domain_positions:
+                numbered_domain = seq_numbered[dom_idx]
+                domain_alignment = seq_aligns[dom_idx]
 
-                    chain_type = (
-                        domain_alignment.get("chain_type")
-                        if isinstance(domain_alignment, dict)
-                        else None
-                    )
-                    species = (
-                        domain_alignment.get("species")
-                        if isinstance(domain_alignment, dict)
-                        else None
+                chain_type = (
+                    domain_alignment.get("chain_type")
+                    if isinstance(domain_alignment, dict)
+                    else None
+                )
+                species = (
+                    domain_alignment.get("species")
+                    if isinstance(domain_alignment, dict)
+                    else None
+                )
+
+                # Get germline info
+                best_hit = None
+                if chain_type and species:
+                    key = f"{species}_{chain_type}"
+                    best_hit = best_hits_by_chain.get(key)
+
+                # Create the domain object
+                domain = Domain(
+                    sequence=raw_sequence[domain_start:domain_end],
+                    numbering=numbered_domain,
+                    alignment_details=domain_alignment,
+                    hit_table=best_hit,
+                    isotype=chain_type,
+                    species=species,
+                    germlines=domain_alignment.get("germlines"),
+                )
+
+                # Add linker information if there's a gap between domains
+                if prev_domain_end > 0 and domain_start > prev_domain_end:
+                    linker_seq = raw_sequence[prev_domain_end:domain_start]
+                    # Create a linker domain
+                    linker_domain = Domain(
+                        sequence=linker_seq,
+                        numbering=None,  # Linkers don't get numbered
+                        alignment_details={
+                            "domain_type": "LINKER",
+                            "sequence": linker_seq,
+                            "start": prev_domain_end + 1,
+                            "end": domain_start,
+                        },
+                        hit_table=None,
+                        isotype=None,
+                        species=species,  # Use same species as variable domain
+                        germlines=None,
                     )
+                    linker_domain.domain_type = "LINKER"
+                    # Add linker region directly to the domain
+                    linker_domain.regions = {
+                        "LINKER": {
+                            "name": "LINKER",
+                            "start": prev_domain_end,
+                            "stop": domain_start,
+                            "sequence": linker_seq,
+                            "domain_type": "LINKER",
+                        }
+                    }
+                    domains.append(linker_domain)
 
-                    # Get germline info
-                    best_hit = None
-                    if chain_type and species:
-                        key = f"{species}_{chain_type}"
-                        best_hit = best_hits_by_chain.get(key)
-
-                    # Create the domain object
-                    domain = Domain(
-                        sequence=raw_sequence[domain_start:domain_end],
-                        numbering=numbered_domain,
-                        alignment_details=domain_alignment,
-                        hit_table=best_hit,
-                        isotype=chain_type,
-                        species=species,
-                        germlines=domain_alignment.get("germlines"),
+                # Attach annotation scheme and annotate regions
+                domain.domain_type = "V"  # Mark as variable domain
+                domain.annotation_scheme = used_scheme
+                with stage("region_annotation"):
+                    AntibodyRegionAnnotator.annotate_domain(
+                        domain, scheme=used_scheme
                     )
+                # Shift region coordinates to absolute positions within the original sequence
+                if hasattr(domain, "regions") and domain.regions:
+                    domain.regions = self._absolute_regions(
+                        domain.regions, domain_start
+                    )
+                if extra_numbered:
+                    with stage("region_annotation"):
+                        domain.scheme_regions = self._scheme_regions(
+                            domain, dom_idx, domain_start, extra_numbered
+                        )
+                domains.append(domain)
+                variable_domains.append(domain)
 
-                    # Add linker information if there's a gap between domains
-                    if prev_domain_end > 0 and domain_start > prev_domain_end:
-                        linker_seq = raw_sequence[prev_domain_end:domain_start]
-                        # Create a linker domain
-                        linker_domain = Domain(
-                            sequence=linker_seq,
-                            numbering=None,  # Linkers don't get numbered
-                            alignment_details={
-                                "domain_type": "LINKER",
-                                "sequence": linker_seq,
-                                "start": prev_domain_end + 1,
-                                "end": domain_start,
-                            },
+                # Check for constant region after variable domain
+                if domain_end < len(raw_sequence):
+                    remaining_seq = raw_sequence[domain_end:]
+                    constant_info = self._detect_constant_region(
+                        remaining_seq, domain_end
+                    )
+                    if constant_info:
+                        # Create a new domain for the constant region
+                        constant_domain = Domain(
+                            sequence=constant_info["sequence"],
+                            numbering=None,  # Constant regions don't get numbered like variable regions
+                            alignment_details={"domain_type": "C"},
                             hit_table=None,
-                            isotype=None,
+                            isotype=constant_info["isotype"],
                             species=species,  # Use same species as variable domain
                             germlines=None,
                         )
-                        linker_domain.domain_type = "LINKER"
-                        # Add linker region directly to the domain
-                        linker_domain.regions = {
-                            "LINKER": {
-                                "name": "LINKER",
-                                "start": prev_domain_end,
-                                "stop": domain_start,
-                                "sequence": linker_seq,
-                                "domain_type": "LINKER",
+                        constant_domain.domain_type = "C"
+                        constant_domain.constant_region_info = constant_info
+                        # Add constant region directly to the domain
+                        constant_domain.regions = {
+                            "CONSTANT": {
+                                "name": "CONSTANT",
+                                "start": constant_info["start"],
+                                "stop": constant_info["end"],
+                                "sequence": constant_info["sequence"],
+                                "domain_type": "C",
+                                "isotype": constant_info["isotype"],
                             }
                         }
-                        domains.append(linker_domain)
-
-                    # Attach annotation scheme and annotate regions
-                    domain.domain_type = "V"  # Mark as variable domain
-                    domain.annotation_scheme = used_scheme
-                    AntibodyRegionAnnotator.annotate_domain(
-                        domain, scheme=used_scheme
-                    )
-                    # Shift region coordinates to absolute positions within the original sequence
-                    if hasattr(domain, "regions") and domain.regions:
-                        absolute_regions = {}
-                        for region_name, region in domain.regions.items():
-                            # region.start/stop may be ints or like [pos, ' ']; normalize to int
-                            def to_int(pos):
-                                if isinstance(pos, (list, tuple)):
-                                    return int(pos[0])
-                                return int(pos)
-
-                            start_rel = to_int(region.start)
-                            stop_rel = to_int(region.stop)
-                            # Fix: AntibodyRegionAnnotator now returns 0-indexed indices
-                            # domain_start is 0-based index into raw_sequence
-                            # We add domain_start to convert to absolute 0-based positions
-                            start_abs = domain_start + start_rel
-                            stop_abs = domain_start + stop_rel
-                            absolute_regions[region_name] = type(region)(
-                                name=region.name,
-                                start=start_abs,
-                                stop=stop_abs,
-                                sequence=region.sequence,
-                            )
-                        domain.regions = absolute_regions
-                    domains.append(domain)
-
-                    # Check for constant region after variable domain
-                    if domain_end < len(raw_sequence):
-                        remaining_seq = raw_sequence[domain_end:]
-                        constant_info = self._detect_constant_region(
-                            remaining_seq, domain_end
-                        )
-                        if constant_info:
-                            # Create a new domain for the constant region
-                            constant_domain = Domain(
-                                sequence=constant_info["sequence"],
-                                numbering=None,  # Constant regions don't get numbered like variable regions
-                                alignment_details={"domain_type": "C"},
-                                hit_table=None,
-                                isotype=constant_info["isotype"],
-                                species=species,  # Use same species as variable domain
-                                germlines=None,
-                            )
-                            constant_domain.domain_type = "C"
-                            constant_domain.constant_region_info = (
-                                constant_info
-                            )
-                            # Add constant region directly to the domain
-                            constant_domain.regions = {
-                                "CONSTANT": {
-                                    "name": "CONSTANT",
-                                    "start": constant_info["start"],
-                                    "stop": constant_info["end"],
-                                    "sequence": constant_info["sequence"],
-                                    "domain_type": "C",
-                                    "isotype": constant_info["isotype"],
-                                }
-                            }
-                            domains.append(constant_domain)
-                            prev_domain_end = constant_info["end"]
-                        else:
-                            prev_domain_end = domain_end
+                        domains.append(constant_domain)
+                        prev_domain_end = constant_info["end"]
                     else:
                         prev_domain_end = domain_end
+                else:
+                    prev_domain_end = domain_end
+
+            # Create a single chain containing all domains
+            chains.append(Chain(chain_name, raw_sequence, domains))
 
-                # Create a single chain containing all domains
-                chains.append(Chain(chain_name, raw_sequence, domains))
+        if self.germline_index is not None:
+            self._assign_germlines(variable_domains)
+        return AnarciResultObject(biologic_name, chains)
 
-            result_objects.append(AnarciResultObject(biologic_name, chains))
-        return result_objects
+    def _assign_germlines(self, domains: List[Domain]) -> None:
+        """Assign germlines of IMGT-numbered domains from the index"""
+        numbered = [
+            domain
+            for domain in domains
+            if domain.numbering and domain.annotation_scheme == "imgt"
+        ]
+        with stage("germline_assignment"):
+            assignments = self.germline_index.assign_batch(
+                [
+                    (
+                        domain.alignment_details.get("chain_type"),
+                        domain.numbering[0],
+                        None,
+                    )
+                    for domain in numbered
+                ],
+                allowed_species=ALLOWED_SPECIES,
+            )
+        for domain, assignment in zip(numbered, assignments):
+            domain.germlines = assignment
 
     def get_result_by_biologic_name(
         self, biologic_name: str
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Literal, Any
 
 from backend.logger import logger as log
-from backend.annotation.region_utils import RegionIndexHelper
+from backend.annotation.region_utils import CompiledRegions
 from backend.numbering.cgg import CGG_REGIONS
 from backend.numbering.chothia import CHOTHIA_REGIONS
 from backend.numbering.imgt import IMGT_REGIONS
@@ -41,10 +42,18 @@ SCHEME_MAP = {
     "imgt": IMGT_REGIONS,
     "kabat": KABAT_REGIONS,
     "chothia": CHOTHIA_REGIONS,
+    # Martin renumbers the Chothia frameworks but keeps its CDR positions
+    "martin": CHOTHIA_REGIONS,
     "cgg": CGG_REGIONS,
 }
 
 
+@lru_cache(maxsize=None)
+def compiled_regions(scheme: str, chain_type: str) -> CompiledRegions:
+    """Region boundaries of a scheme and chain type, compiled on first use"""
+    return CompiledRegions(SCHEME_MAP[scheme][chain_type])
+
+
 def get_chain_type(domain: Domain) -> str:
     # Use chain_type from alignment_details if available
     if domain.alignment_details:
@@ -58,29 +67,23 @@ class AntibodyRegionAnnotator:
     @staticmethod
     def annotate_domain(
         domain: Domain,
-        scheme: Literal["imgt", "kabat", "chothia", "cgg"] = "cgg",
+        scheme: Literal["imgt", "kabat", "chothia", "martin", "cgg"] = "cgg",
     ) -> Domain:
         chain_type = get_chain_type(domain)
-        region_defs = SCHEME_MAP[scheme]
-        region_map = region_defs[chain_type]
+        boundaries = compiled_regions(scheme, chain_type)
         if not domain.numbering:
             domain.regions = {}
             return domain
         numbering = domain.numbering[0]  # Use only the residue numbering
-        pos_to_idx = RegionIndexHelper.build_pos_to_idx(numbering)
         regions: Dict[str, AntibodyRegion] = {}
-        for region, (start, stop) in region_map.items():
-            start_idx, stop_idx = RegionIndexHelper.find_region_indices(
-                pos_to_idx, start, stop
-            )
+        for region, start_idx, stop_idx, seq in boundaries.find_regions(
+            numbering
+        ):
             if start_idx is None or stop_idx is None:
                 log.warning(
-                    f"Region {region} has invalid start and stop indices"
+                    "Region %s has invalid start and stop indices", region
                 )
                 continue
-            seq = RegionIndexHelper.extract_region_sequence(
-                numbering, start_idx, stop_idx
-            )
             regions[region] = AntibodyRegion(region, start_idx, stop_idx, seq)
         domain.regions = regions
         return domain
@@ -88,7 +91,7 @@ class AntibodyRegionAnnotator:
     @staticmethod
     def annotate_chain_domains(
         chain: Chain,
-        scheme: Literal["imgt", "kabat", "chothia", "cgg"] = "imgt",
+        scheme: Literal["imgt", "kabat", "chothia", "martin", "cgg"] = "imgt",
     ) -> Chain:
         # chain_type = get_chain_type(chain)
         for domain in chain.domains:
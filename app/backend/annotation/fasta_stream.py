@@ -0,0 +1,514 @@
+import codecs
+import zlib
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from fastapi import UploadFile
+
+from backend.config import (
+    MAX_DECOMPRESSED_BYTES,
+    MAX_UPLOAD_BYTES,
+    UPLOAD_CHUNK_SIZE,
+)
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for zstd-compressed uploads
+    zstandard = None
+
+SEQUENCE_FILE_EXTENSIONS = (
+    ".fasta",
+    ".fa",
+    ".faa",
+    ".fna",
+    ".txt",
+    ".fastq",
+    ".fq",
+)
+COMPRESSED_FILE_EXTENSIONS = (".gz", ".bgz", ".zst")
+
+UNSUPPORTED_FILE_MESSAGE = (
+    "File must be FASTA format or FASTQ, optionally gzip, bgzip or zstd "
+    "compressed"
+)
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size"""
+
+    def __init__(self, max_bytes: int, what: str = "Upload"):
+        super().__init__(f"{what} exceeds maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def is_supported_upload(filename: str) -> bool:
+    """Whether a file name looks like (possibly compressed) FASTA/FASTQ"""
+    name = filename.lower()
+    for extension in COMPRESSED_FILE_EXTENSIONS:
+        if name.endswith(extension):
+            name = name[: -len(extension)]
+            break
+    return name.endswith(SEQUENCE_FILE_EXTENSIONS)
+
+
+class FastaStreamParser:
+    """
+    Incremental FASTA parser fed with text chunks.
+
+    Chunks may split lines or records anywhere; only complete records are
+    yielded, so memory use is bounded by the largest single record rather
+    than by the size of the input. Records match what ``SeqIO.parse`` would
+    produce: text before the first header is ignored, spaces and carriage
+    returns are stripped from sequences, and the record ID is the first
+    word of the header.
+    """
+
+    def __init__(self):
+        self._partial_line = ""
+        self._title: Optional[str] = None
+        self._lines: List[str] = []
+
+    def feed(self, chunk: str) -> Iterator[SeqRecord]:
+        """Consume a chunk of text and yield the records it completes"""
+        lines = (self._partial_line + chunk).split("\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            record = self._consume_line(line)
+            if record is not None:
+                yield record
+
+    def close(self) -> Iterator[SeqRecord]:
+        """Flush the final record once the input is exhausted"""
+        if self._partial_line:
+            record = self._consume_line(self._partial_line)
+            self._partial_line = ""
+            if record is not None:
+                yield record
+        if self._title is not None:
+            yield self._build_record()
+            self._title = None
+
+    def _consume_line(self, line: str) -> Optional[SeqRecord]:
+        if line.startswith(">"):
+            record = self._build_record() if self._title is not None else None
+            self._title = line[1:].rstrip()
+            return record
+        if self._title is not None:
+            self._lines.append(line.rstrip())
+        return None
+
+    def _build_record(self) -> SeqRecord:
+        sequence = "".join(self._lines).replace(" ", "").replace("\r", "")
+        self._lines = []
+        title = self._title
+        record_id = title.split(None, 1)[0] if title else ""
+        return SeqRecord(
+            Seq(sequence), id=record_id, name=record_id, description=title
+        )
+
+
+class FastqStreamParser:
+    """
+    Incremental parser for four-line FASTQ records fed with text chunks.
+
+    Only the sequence is kept; quality strings are checked for length and
+    then dropped. Blank lines between records are ignored.
+    """
+
+    def __init__(self):
+        self._partial_line = ""
+        self._lines: List[str] = []
+
+    def feed(self, chunk: str) -> Iterator[SeqRecord]:
+        """Consume a chunk of text and yield the records it completes"""
+        lines = (self._partial_line + chunk).split("\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            record = self._consume_line(line)
+            if record is not None:
+                yield record
+
+    def close(self) -> Iterator[SeqRecord]:
+        """Flush the final record once the input is exhausted"""
+        if self._partial_line:
+            record = self._consume_line(self._partial_line)
+            self._partial_line = ""
+            if record is not None:
+                yield record
+        if self._lines:
+            raise ValueError(
+                f"Truncated FASTQ record: {self._lines[0][:50]!r}"
+            )
+
+    def _consume_line(self, line: str) -> Optional[SeqRecord]:
+        line = line.rstrip("\r")
+        if not self._lines and not line.strip():
+            return None
+        self._lines.append(line)
+        if len(self._lines) < 4:
+            return None
+        return self._build_record()
+
+    def _build_record(self) -> SeqRecord:
+        header, sequence, separator, quality = self._lines
+        self._lines = []
+        if not header.startswith("@"):
+            raise ValueError(
+                f"FASTQ header must start with '@': {header[:50]!r}"
+            )
+        if not separator.startswith("+"):
+            raise ValueError(
+                f"FASTQ separator must start with '+': {separator[:50]!r}"
+            )
+        sequence = sequence.strip()
+        title = header[1:].rstrip()
+        record_id = title.split(None, 1)[0] if title else ""
+        if len(quality.strip()) != len(sequence):
+            raise ValueError(
+                f"FASTQ sequence and quality lengths differ for {record_id!r}"
+            )
+        return SeqRecord(
+            Seq(sequence), id=record_id, name=record_id, description=title
+        )
+
+
+class SequenceStreamParser:
+    """
+    Incremental parser that detects FASTA or FASTQ from the input.
+
+    Input whose first non-blank character is ``@`` is parsed as FASTQ,
+    anything else as FASTA.
+    """
+
+    def __init__(self):
+        self._parser = None
+        self._pending = ""
+
+    def feed(self, chunk: str) -> Iterator[SeqRecord]:
+        """Consume a chunk of text and yield the records it completes"""
+        if self._parser is None:
+            self._pending += chunk
+            stripped = self._pending.lstrip()
+            if not stripped:
+                return
+            if stripped[0] == "@":
+                self._parser = FastqStreamParser()
+            else:
+                self._parser = FastaStreamParser()
+            chunk, self._pending = self._pending, ""
+        yield from self._parser.feed(chunk)
+
+    def close(self) -> Iterator[SeqRecord]:
+        """Flush the final record once the input is exhausted"""
+        if self._parser is not None:
+            yield from self._parser.close()
+
+
+def iter_sequence_records(chunks: Iterable[str]) -> Iterator[SeqRecord]:
+    """Parse FASTA or FASTQ records from an iterable of text chunks"""
+    parser = SequenceStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def iter_fasta_records(chunks: Iterable[str]) -> Iterator[SeqRecord]:
+    """Parse FASTA records from an iterable of text chunks"""
+    parser = FastaStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+class StreamDecompressor(ABC):
+    """
+    Streaming decompressor fed with chunks of an upload.
+
+    Output is produced in pieces of at most ``MAX_OUTPUT`` bytes so a
+    small, highly compressed chunk cannot expand all at once.
+    """
+
+    MAX_OUTPUT = 4 * 1024 * 1024
+
+    @abstractmethod
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        """Decompress a chunk of input and yield the output pieces"""
+
+    @abstractmethod
+    def close(self) -> Iterator[bytes]:
+        """Yield any remaining output once the input is exhausted
+
+        Raises:
+            ValueError: If the input ended in the middle of a member
+        """
+
+
+class GzipStreamDecompressor(StreamDecompressor):
+    """
+    Decompresses gzip and bgzip (multi-member gzip) streams.
+
+    bgzip files are concatenated gzip members, so a fresh decompressor is
+    started whenever the current one reaches the end of its member.
+    """
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._in_member = False
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        has_more = True
+        while data or has_more:
+            if data:
+                self._in_member = True
+            out = self._decompressor.decompress(data, self.MAX_OUTPUT)
+            if self._decompressor.eof:
+                data, has_more = self._decompressor.unused_data, False
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                self._in_member = False
+            else:
+                # A full output buffer may leave output pending inside zlib
+                data = self._decompressor.unconsumed_tail
+                has_more = len(out) == self.MAX_OUTPUT
+            if out:
+                yield out
+
+    def close(self) -> Iterator[bytes]:
+        if self._in_member:
+            raise ValueError("Compressed upload is truncated")
+        return iter(())
+
+
+class _NeedInput(Exception):
+    """Raised by ``_FeedableSource`` when the fed input is used up"""
+
+
+class _FeedableSource:
+    """
+    File-like source for a zstd stream reader that is fed chunk by chunk.
+
+    Reads walk the current chunk through a memoryview, so no input is
+    copied, and raise ``_NeedInput`` once it is used up until the next
+    chunk is fed or the source is closed.
+    """
+
+    def __init__(self):
+        self._data = memoryview(b"")
+        self._offset = 0
+        self._closed = False
+
+    def feed(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._offset = 0
+
+    def close(self) -> None:
+        self._closed = True
+
+    def read(self, size: int) -> memoryview:
+        if self._offset >= len(self._data):
+            if self._closed:
+                return memoryview(b"")
+            raise _NeedInput()
+        piece = self._data[self._offset : self._offset + size]
+        self._offset += len(piece)
+        return piece
+
+
+class _ZstdFrameScanner:
+    """
+    Follows zstd frame and block headers to tell whether the input seen so
+    far ends between frames.
+
+    The zstd stream reader stops silently at the end of its input, so this
+    is how a truncated upload is detected. Block contents are skipped
+    without being looked at; the decompressor validates them.
+    """
+
+    ZSTD_FRAME_MAGIC = 0xFD2FB528
+    SKIPPABLE_MAGIC_MASK = 0xFFFFFFF0
+    SKIPPABLE_MAGIC = 0x184D2A50
+
+    def __init__(self):
+        self._expect_magic()
+        self._skip = 0
+        self._checksum = False
+
+    @property
+    def in_frame(self) -> bool:
+        return bool(
+            self._header or self._skip or self._on_header != self._on_magic
+        )
+
+    def feed(self, data: bytes) -> None:
+        pos, size = 0, len(data)
+        while pos < size:
+            if self._skip:
+                step = min(self._skip, size - pos)
+                self._skip -= step
+                pos += step
+                continue
+            take = self._header_size - len(self._header)
+            self._header += data[pos : pos + take]
+            pos += take
+            if len(self._header) == self._header_size:
+                header, self._header = self._header, b""
+                self._on_header(header)
+
+    def _expect(self, size: int, on_header) -> None:
+        self._header = b""
+        self._header_size = size
+        self._on_header = on_header
+
+    def _expect_magic(self) -> None:
+        self._expect(4, self._on_magic)
+
+    def _on_magic(self, header: bytes) -> None:
+        magic = int.from_bytes(header, "little")
+        if magic == self.ZSTD_FRAME_MAGIC:
+            self._expect(1, self._on_frame_header)
+        elif magic & self.SKIPPABLE_MAGIC_MASK == self.SKIPPABLE_MAGIC:
+            self._expect(4, self._on_skippable_size)
+        else:
+            raise ValueError("Corrupt zstd stream: unknown frame type")
+
+    def _on_skippable_size(self, header: bytes) -> None:
+        self._skip = int.from_bytes(header, "little")
+        self._expect_magic()
+
+    def _on_frame_header(self, header: bytes) -> None:
+        descriptor = header[0]
+        single_segment = bool(descriptor & 0x20)
+        content_size_bytes = (int(single_segment), 2, 4, 8)[descriptor >> 6]
+        dictionary_id_bytes = (0, 1, 2, 4)[descriptor & 0x03]
+        window_bytes = 0 if single_segment else 1
+        self._checksum = bool(descriptor & 0x04)
+        self._skip = window_bytes + dictionary_id_bytes + content_size_bytes
+        self._expect(3, self._on_block_header)
+
+    def _on_block_header(self, header: bytes) -> None:
+        block = int.from_bytes(header, "little")
+        is_last, block_type, size = block & 1, (block >> 1) & 3, block >> 3
+        # An RLE block stores a single byte however large it expands
+        self._skip = 1 if block_type == 1 else size
+        if is_last:
+            self._skip += 4 if self._checksum else 0
+            self._expect_magic()
+
+
+class ZstdStreamDecompressor(StreamDecompressor):
+    """
+    Decompresses zstd streams made of one or more frames.
+
+    zstd's decompressobj has no output limit, so a stream reader is used
+    instead, reading at most ``MAX_OUTPUT`` bytes per call from a source
+    that is fed the upload chunk by chunk.
+    """
+
+    def __init__(self):
+        self._source = _FeedableSource()
+        self._reader = zstandard.ZstdDecompressor().stream_reader(
+            self._source, read_across_frames=True
+        )
+        self._scanner = _ZstdFrameScanner()
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        self._scanner.feed(data)
+        self._source.feed(data)
+        yield from self._drain()
+
+    def close(self) -> Iterator[bytes]:
+        if self._scanner.in_frame:
+            raise ValueError("Compressed upload is truncated")
+        self._source.close()
+        return self._drain()
+
+    def _drain(self) -> Iterator[bytes]:
+        while True:
+            try:
+                out = self._reader.read1(self.MAX_OUTPUT)
+            except _NeedInput:
+                return
+            except zstandard.ZstdError as e:
+                raise ValueError(f"Corrupt zstd stream: {e}")
+            if not out:
+                return
+            yield out
+
+
+def open_decompressor(head: bytes) -> Optional[StreamDecompressor]:
+    """
+    Pick a decompressor from the magic bytes at the start of a file
+
+    Returns:
+        A StreamDecompressor, or None if the data is not compressed
+
+    Raises:
+        ValueError: If the data is zstd-compressed but ``zstandard`` is
+            not installed
+    """
+    if head.startswith(GZIP_MAGIC):
+        return GzipStreamDecompressor()
+    if head.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError(
+                "zstd-compressed uploads require the 'zstandard' package"
+            )
+        return ZstdStreamDecompressor()
+    return None
+
+
+async def iter_upload_text(
+    file: UploadFile,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    max_decompressed_bytes: int = MAX_DECOMPRESSED_BYTES,
+) -> AsyncIterator[str]:
+    """
+    Read an uploaded file as UTF-8 text in chunks.
+
+    gzip, bgzip and zstd uploads are detected from their magic bytes and
+    decompressed on the fly.
+
+    Raises:
+        UploadTooLargeError: If more than ``max_bytes`` are read, or the
+            decompressed content exceeds ``max_decompressed_bytes``
+        ValueError: If the upload is not valid UTF-8 or is a truncated or
+            corrupt compressed stream
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    decompressor = None
+    total = 0
+    decompressed = 0
+    while True:
+        data = await file.read(chunk_size)
+        if data and not total:
+            decompressor = open_decompressor(data)
+        total += len(data)
+        if total > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        if decompressor is None:
+            if not data:
+                break
+            yield decoder.decode(data)
+            continue
+        pieces = decompressor.feed(data) if data else decompressor.close()
+        try:
+            for piece in pieces:
+                decompressed += len(piece)
+                if decompressed > max_decompressed_bytes:
+                    raise UploadTooLargeError(
+                        max_decompressed_bytes, "Decompressed upload"
+                    )
+                yield decoder.decode(piece)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt gzip stream: {e}")
+        if not data:
+            break
+    yield decoder.decode(b"", final=True)
@@ -0,0 +1,311 @@
+"""
+Germline assignment from a precomputed index of ANARCI's germlines.
+
+ANARCI assigns germlines one sequence at a time by comparing the IMGT state
+sequence of a domain with every germline of its chain type in Python. The
+index loads the V and J germlines once and assigns many domains per call:
+
+* IMGT-numbered domains are compared with all germlines of their chain type
+  in one vectorised comparison over the 128 IMGT positions (matches over
+  non-gap germline positions).
+* Domains known only by sequence (or numbered in another scheme) are looked
+  up in a k-mer index to pick a few candidate germlines, which are then
+  scored exactly with a global alignment.
+
+Assignments have ANARCI's shape, ``{"v_gene": [(species, gene), identity],
+"j_gene": [...]}``, and the J gene is taken from the species of the V gene
+as ANARCI does. They are close to ANARCI's but not identical: the index
+scores the IMGT numbering rather than ANARCI's HMM state vector, breaks
+ties in germline order rather than in the order of ``allowed_species``, and
+still assigns when an allowed species has no germlines of the chain type,
+where ANARCI assigns nothing. It is therefore only used when
+``GERMLINE_ASSIGNMENT`` is set to ``index``.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from Bio.Align import PairwiseAligner
+
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
+
+IMGT_LENGTH = 128
+GAP = ord("-")
+SEGMENTS = ("V", "J")
+
+# Germlines as loaded from ANARCI: segment -> chain type -> species -> gene
+# -> IMGT-aligned sequence of 128 characters
+Germlines = Dict[str, Dict[str, Dict[str, Dict[str, str]]]]
+Assignment = Dict[str, list]
+
+
+class _GermlineTable:
+    """Germlines of one segment and chain type"""
+
+    def __init__(self, germlines: Dict[str, Dict[str, str]], k: int) -> None:
+        self.ids: List[Tuple[str, str]] = []
+        aligned = []
+        for species, genes in germlines.items():
+            for gene, sequence in genes.items():
+                self.ids.append((species, gene))
+                aligned.append(sequence.upper())
+        self.species = np.array([species for species, _ in self.ids])
+        self.matrix = np.frombuffer(
+            "".join(aligned).encode("ascii"), dtype=np.uint8
+        ).reshape(len(aligned), IMGT_LENGTH)
+        self.positions = self.matrix != GAP
+        self.lengths = self.positions.sum(axis=1)
+        self.sequences = [sequence.replace("-", "") for sequence in aligned]
+
+        postings = defaultdict(list)
+        for row, sequence in enumerate(self.sequences):
+            for kmer in {
+                sequence[i : i + k] for i in range(len(sequence) - k + 1)
+            }:
+                postings[kmer].append(row)
+        self.postings = {
+            kmer: np.array(rows, dtype=np.int32)
+            for kmer, rows in postings.items()
+        }
+
+    def species_mask(self, allowed_species: Optional[Sequence[str]]):
+        if allowed_species is None:
+            return np.ones(len(self.ids), dtype=bool)
+        return np.isin(self.species, list(allowed_species))
+
+
+class GermlineIndex:
+    """
+    V and J germlines held in memory for batch germline assignment
+
+    Args:
+        germlines: Germlines by segment, chain type, species and gene;
+            ANARCI's ``all_germlines`` by default
+        k: Length of the k-mers indexed for sequence lookups
+        candidates: Germlines scored exactly per sequence lookup
+        batch_size: Domains compared at once in the vectorised comparison
+    """
+
+    def __init__(
+        self,
+        germlines: Optional[Germlines] = None,
+        k: int = 4,
+        candidates: int = 8,
+        batch_size: int = 256,
+    ) -> None:
+        if germlines is None:
+            from anarci.germlines import all_germlines as germlines
+        self.k = k
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.tables: Dict[Tuple[str, str], _GermlineTable] = {
+            (segment, chain_type): _GermlineTable(by_species, k)
+            for segment in SEGMENTS
+            for chain_type, by_species in germlines.get(segment, {}).items()
+        }
+        self.aligner = PairwiseAligner()
+        self.aligner.mode = "global"
+        self.aligner.match_score = 1.0
+        self.aligner.mismatch_score = 0.0
+        self.aligner.open_gap_score = -1.0
+        self.aligner.extend_gap_score = -0.5
+        # Domains extend beyond either germline segment, so overhangs are free
+        self.aligner.end_gap_score = 0.0
+
+    def assign(
+        self,
+        chain_type: str,
+        numbering: Optional[list] = None,
+        sequence: Optional[str] = None,
+        allowed_species: Optional[Sequence[str]] = None,
+    ) -> Optional[Assignment]:
+        """Germlines of one domain, see ``assign_batch``"""
+        return self.assign_batch(
+            [(chain_type, numbering, sequence)], allowed_species
+        )[0]
+
+    def assign_batch(
+        self,
+        domains: Iterable[Tuple[str, Optional[list], Optional[str]]],
+        allowed_species: Optional[Sequence[str]] = None,
+    ) -> List[Optional[Assignment]]:
+        """
+        Assign the nearest V and J germlines of many domains
+
+        Args:
+            domains: ``(chain_type, numbering, sequence)`` per domain, where
+                ``numbering`` is an IMGT numbering as returned by ANARCI
+                (``[((position, insertion), residue), ...]``) or None to
+                look the domain up by ``sequence``
+            allowed_species: Species to consider, all by default
+
+        Returns:
+            One assignment per domain, or None for chain types without
+            germlines
+        """
+        domains = list(domains)
+        results: List[Optional[Assignment]] = [None] * len(domains)
+        numbered = defaultdict(list)
+        for index, (chain_type, numbering, sequence) in enumerate(domains):
+            if ("V", chain_type) not in self.tables:
+                continue
+            if numbering is not None:
+                numbered[chain_type].append((index, numbering))
+            elif sequence:
+                results[index] = self._assign_sequence(
+                    chain_type, sequence, allowed_species
+                )
+        for chain_type, entries in numbered.items():
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start : start + self.batch_size]
+                assignments = self._assign_numbered(
+                    chain_type,
+                    [numbering for _, numbering in batch],
+                    allowed_species,
+                )
+                for (index, _), assignment in zip(batch, assignments):
+                    results[index] = assignment
+        return results
+
+    def _assign_numbered(
+        self,
+        chain_type: str,
+        numberings: List[list],
+        allowed_species: Optional[Sequence[str]],
+    ) -> List[Assignment]:
+        states = np.full((len(numberings), IMGT_LENGTH), GAP, dtype=np.uint8)
+        for row, numbering in enumerate(numberings):
+            for (position, insertion), residue in numbering:
+                if (
+                    insertion.strip() == ""
+                    and 1 <= position <= IMGT_LENGTH
+                    and residue != "-"
+                ):
+                    states[row, position - 1] = ord(residue.upper())
+
+        v_table = self.tables[("V", chain_type)]
+        v_identity = self._identity(states, v_table)
+        v_identity[:, ~v_table.species_mask(allowed_species)] = -1.0
+        v_best = v_identity.argmax(axis=1)
+
+        j_table = self.tables.get(("J", chain_type))
+        if j_table is not None:
+            j_identity = self._identity(states, j_table)
+            # J genes come from the species of the assigned V gene
+            v_species = v_table.species[v_best]
+            j_identity[v_species[:, None] != j_table.species[None, :]] = -1.0
+            j_best = j_identity.argmax(axis=1)
+
+        assignments = []
+        for row, v_row in enumerate(v_best):
+            assignment = {
+                "v_gene": [v_table.ids[v_row], float(v_identity[row, v_row])],
+                "j_gene": [None, None],
+            }
+            if j_table is not None and j_identity[row, j_best[row]] >= 0:
+                assignment["j_gene"] = [
+                    j_table.ids[j_best[row]],
+                    float(j_identity[row, j_best[row]]),
+                ]
+            assignments.append(assignment)
+        return assignments
+
+    @staticmethod
+    def _identity(states: np.ndarray, table: _GermlineTable) -> np.ndarray:
+        matches = (states[:, None, :] == table.matrix[None, :, :]) & (
+            table.positions[None, :, :]
+        )
+        return matches.sum(axis=2) / np.maximum(table.lengths, 1)
+
+    def _candidates(
+        self,
+        table: _GermlineTable,
+        sequence: str,
+        mask: np.ndarray,
+    ) -> np.ndarray:
+        kmers = {
+            sequence[i : i + self.k] for i in range(len(sequence) - self.k + 1)
+        }
+        hits = [
+            table.postings[kmer] for kmer in kmers if kmer in table.postings
+        ]
+        counts = (
+            np.bincount(np.concatenate(hits), minlength=len(table.ids))
+            if hits
+            else np.zeros(len(table.ids), dtype=np.int64)
+        )
+        counts = np.where(mask, counts, -1)
+        allowed = int(mask.sum())
+        if allowed == 0:
+            return np.array([], dtype=np.int64)
+        top = min(self.candidates, allowed)
+        best = np.argpartition(-counts, top - 1)[:top]
+        # Highest count first, ties in germline order
+        return best[np.lexsort((best, -counts[best]))]
+
+    def _best_by_alignment(
+        self, table: _GermlineTable, sequence: str, rows: np.ndarray
+    ) -> Optional[list]:
+        best = None
+        # Ties go to the first germline
+        for row in sorted(rows):
+            germline = table.sequences[row]
+            alignment = self.aligner.align(germline, sequence)[0]
+            matches = sum(
+                germline[g_start + offset] == sequence[s_start + offset]
+                for (g_start, g_end), (s_start, _) in zip(*alignment.aligned)
+                for offset in range(g_end - g_start)
+            )
+            identity = matches / max(len(germline), 1)
+            if best is None or identity > best[1]:
+                best = [table.ids[row], identity]
+        return best
+
+    def _assign_sequence(
+        self,
+        chain_type: str,
+        sequence: str,
+        allowed_species: Optional[Sequence[str]],
+    ) -> Assignment:
+        sequence = sequence.upper()
+        v_table = self.tables[("V", chain_type)]
+        assignment = {
+            "v_gene": self._best_by_alignment(
+                v_table,
+                sequence,
+                self._candidates(
+                    v_table, sequence, v_table.species_mask(allowed_species)
+                ),
+            )
+            or [None, None],
+            "j_gene": [None, None],
+        }
+        j_table = self.tables.get(("J", chain_type))
+        if j_table is not None and assignment["v_gene"][0] is not None:
+            species = assignment["v_gene"][0][0]
+            assignment["j_gene"] = self._best_by_alignment(
+                j_table,
+                sequence,
+                self._candidates(
+                    j_table, sequence, j_table.species == species
+                ),
+            ) or [None, None]
+        return assignment
+
+
+def shm_rate(assignment: Optional[Assignment]) -> Optional[float]:
+    """Somatic hypermutation rate: the fraction of V germline mismatches"""
+    if not assignment or assignment["v_gene"][1] is None:
+        return None
+    return 1.0 - assignment["v_gene"][1]
+
+
+@lru_cache(maxsize=None)
+def get_germline_index() -> GermlineIndex:
+    """Germline index shared by the process, built on first use"""
+    logger.info("Building germline index")
+    return GermlineIndex()
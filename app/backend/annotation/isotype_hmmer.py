@@ -3,8 +3,10 @@ import subprocess
 from typing import Optional
 
 from backend.config import ISOTYPE_HMM_DIR
+from backend.metrics import HMMER_ISOTYPE_SECONDS
 
 
+@HMMER_ISOTYPE_SECONDS.time()
 def detect_isotype_with_hmmer(
     sequence: str, hmm_dir: str = None
 ) -> Optional[str]:
@@ -1,4 +1,5 @@
-from typing import List, Tuple, Dict, Any
+from bisect import bisect_left
+from typing import List, Tuple, Dict, Any, Optional
 
 
 class RegionIndexHelper:
@@ -49,3 +50,121 @@ class RegionIndexHelper:
                 [numbering[i][1] for i in range(start_idx, stop_idx + 1)]
             )
         return ""
+
+
+class CompiledRegions:
+    """
+    Region boundaries of one scheme and chain type, compiled once
+
+    Boundaries are found with a ``bisect`` each, giving the same indices as
+    ``RegionIndexHelper.find_region_indices``: an exact position if present,
+    otherwise the first position after a start or the last position before
+    a stop. Residue numbers increase along ANARCI numberings but insertion
+    codes need not (IMGT numbers CDR3 as 111A, 112B, 112A, 112), so the
+    bisection is on ``(number, "")`` keys and the few entries sharing a
+    boundary's number are checked one by one.
+
+    ANARCI numbers every position of a scheme, gaps included, so domains
+    differ in their positions only by insertions. The region indices are
+    therefore cached per list of positions, and most domains only need a
+    ``zip`` over their numbering and a slice per region.
+    """
+
+    MAX_LAYOUTS = 4096
+
+    def __init__(self, region_map: Dict[str, Any]) -> None:
+        self.boundaries = [
+            (name, tuple(start), tuple(stop))
+            for name, (start, stop) in region_map.items()
+        ]
+        self._layouts: Dict[tuple, List[tuple]] = {}
+
+    def find_regions(
+        self, numbering: List[Tuple[Any, Any]]
+    ) -> List[Tuple[str, Optional[int], Optional[int], str]]:
+        """``(name, start_idx, stop_idx, sequence)`` of every region"""
+        try:
+            positions, residues = zip(*numbering)
+        except (TypeError, ValueError):
+            return self._find_regions_by_scan(numbering)
+
+        layout = self._layouts.get(positions)
+        if layout is None:
+            layout = [
+                (
+                    name,
+                    self._first_at_or_after(positions, start),
+                    self._last_at_or_before(positions, stop),
+                )
+                for name, start, stop in self.boundaries
+            ]
+            if len(self._layouts) < self.MAX_LAYOUTS:
+                self._layouts[positions] = layout
+        return [
+            (
+                name,
+                start_idx,
+                stop_idx,
+                (
+                    "".join(residues[start_idx : stop_idx + 1])
+                    if start_idx is not None and stop_idx is not None
+                    else ""
+                ),
+            )
+            for name, start_idx, stop_idx in layout
+        ]
+
+    @staticmethod
+    def _numbered_like(
+        positions: Tuple[Any, ...], boundary: Tuple[int, str]
+    ) -> Tuple[int, int]:
+        """Slice of the entries with the boundary's residue number"""
+        lo = bisect_left(positions, (boundary[0], ""))
+        return lo, bisect_left(positions, (boundary[0] + 1, ""), lo)
+
+    @classmethod
+    def _first_at_or_after(
+        cls, positions: Tuple[Any, ...], start: Tuple[int, str]
+    ) -> Optional[int]:
+        lo, hi = cls._numbered_like(positions, start)
+        for i in range(lo, hi):
+            if positions[i] == start:
+                return i
+        for i in range(lo, hi):
+            if positions[i][1] >= start[1]:
+                return i
+        return hi if hi < len(positions) else None
+
+    @classmethod
+    def _last_at_or_before(
+        cls, positions: Tuple[Any, ...], stop: Tuple[int, str]
+    ) -> Optional[int]:
+        lo, hi = cls._numbered_like(positions, stop)
+        for i in range(lo, hi):
+            if positions[i] == stop:
+                return i
+        for i in reversed(range(lo, hi)):
+            if positions[i][1] <= stop[1]:
+                return i
+        return lo - 1 if lo > 0 else None
+
+    def _find_regions_by_scan(
+        self, numbering: List[Tuple[Any, Any]]
+    ) -> List[Tuple[str, Optional[int], Optional[int], str]]:
+        pos_to_idx = RegionIndexHelper.build_pos_to_idx(numbering)
+        regions = []
+        for name, start, stop in self.boundaries:
+            start_idx, stop_idx = RegionIndexHelper.find_region_indices(
+                pos_to_idx, start, stop
+            )
+            regions.append(
+                (
+                    name,
+                    start_idx,
+                    stop_idx,
+                    RegionIndexHelper.extract_region_sequence(
+                        numbering, start_idx, stop_idx
+                    ),
+                )
+            )
+        return regions
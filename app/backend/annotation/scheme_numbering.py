@@ -0,0 +1,96 @@
+"""
+Numbering in several schemes from one ANARCI alignment.
+
+``run_anarci`` aligns every sequence against the HMMs with hmmscan and then
+numbers the alignment states in the requested scheme. The alignment does
+not depend on the scheme, so ``run_anarci_schemes`` runs hmmscan once and
+numbers the stored states in each scheme, returning what ``run_anarci``
+would have returned for every one of them.
+"""
+
+import copy
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from anarci.anarci import (
+    check_for_j,
+    number_sequences_from_alignment,
+    run_hmmer,
+    scheme_short_to_long,
+)
+
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
+
+AnarciOutput = Tuple[list, list, list, list]
+
+
+def anarci_scheme(scheme: str) -> str:
+    """Scheme ANARCI numbers in for one of ours (CGG uses Kabat numbers)"""
+    return "kabat" if scheme == "cgg" else scheme
+
+
+def run_anarci_schemes(
+    sequences: List[Tuple[str, str]],
+    schemes: Iterable[str],
+    allowed_species: Optional[List[str]] = None,
+    assign_germline: bool = False,
+    bit_score_threshold: int = 80,
+) -> Dict[str, AnarciOutput]:
+    """
+    Number sequences in several ANARCI schemes with one hmmscan run
+
+    Args:
+        sequences: ``(name, sequence)`` pairs
+        schemes: ANARCI schemes (imgt, kabat, chothia, martin, aho)
+        allowed_species: Species of the HMMs aligned against and of the
+            germlines assigned
+        assign_germline: Assign germlines once, in the first scheme that
+            could be numbered, and copy them to the other schemes; the
+            assignment depends on the alignment, not the numbering
+
+    Returns:
+        ``run_anarci``'s ``(sequences, numbered, alignment_details,
+        hit_tables)`` for each scheme that could be numbered. A scheme that
+        fails (e.g. Kabat for a TCR chain) is logged and left out.
+    """
+    alignments = run_hmmer(
+        sequences,
+        hmmer_species=allowed_species,
+        bit_score_threshold=bit_score_threshold,
+    )
+    check_for_j(sequences, alignments, "imgt")
+
+    results = {}
+    germline_details = None
+    for scheme in dict.fromkeys(schemes):
+        try:
+            numbered, details, hit_tables = number_sequences_from_alignment(
+                sequences,
+                copy.deepcopy(alignments),
+                scheme=scheme_short_to_long[scheme],
+                assign_germline=assign_germline,
+                allowed_species=allowed_species,
+            )
+        except Exception as e:
+            logger.warning("Numbering in %s failed: %s", scheme, e)
+            continue
+        results[scheme] = (sequences, numbered, details, hit_tables)
+        if assign_germline:
+            germline_details = details
+            assign_germline = False
+
+    if germline_details is not None:
+        for _, _, details, _ in results.values():
+            _copy_germlines(germline_details, details)
+    return results
+
+
+def _copy_germlines(source: list, target: list) -> None:
+    """Copy the germlines of each numbered domain between schemes"""
+    for source_domains, target_domains in zip(source, target):
+        for source_domain, target_domain in zip(
+            source_domains or [], target_domains or []
+        ):
+            if "germlines" in source_domain:
+                target_domain["germlines"] = source_domain["germlines"]
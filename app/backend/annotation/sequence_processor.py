@@ -1,17 +1,67 @@
 from io import StringIO
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, AsyncIterator
 
 from Bio import SeqIO
+from Bio.Data.CodonTable import TranslationError
+from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
+from fastapi import UploadFile
 
-from backend.logger import logger
+from backend.annotation.fasta_stream import (
+    SequenceStreamParser,
+    UploadTooLargeError,
+    iter_sequence_records,
+    iter_upload_text,
+)
+from backend.config import MAX_REPORTED_VALIDATION_ERRORS, MAX_UPLOAD_BYTES
+from backend.logger import get_logger
+from backend.utils.sequence_validation import AMINO_ACIDS, SequenceValidator
+
+logger = get_logger(__name__)
+
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
+
+
+class SequenceStatistics:
+    """Accumulates sequence length statistics one sequence at a time"""
+
+    def __init__(self):
+        self.count = 0
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+        self.total_length = 0
+
+    def add(self, sequence: str):
+        length = len(sequence)
+        self.count += 1
+        self.total_length += length
+        if self.min_length is None or length < self.min_length:
+            self.min_length = length
+        if self.max_length is None or length > self.max_length:
+            self.max_length = length
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as SequenceProcessor.get_sequence_statistics"""
+        if not self.count:
+            return {}
+        return {
+            "total_sequences": self.count,
+            "min_length": self.min_length,
+            "max_length": self.max_length,
+            "avg_length": self.total_length / self.count,
+            "total_length": self.total_length,
+        }
 
 
 class SequenceProcessor:
     """Handles FASTA parsing, validation, and sequence processing"""
 
     def __init__(self):
-        self.valid_amino_acids = set("ACDEFGHIKLMNPQRSTVWY")
+        self.valid_amino_acids = set(AMINO_ACIDS)
+        self.validator = SequenceValidator(AMINO_ACIDS, ignore=" \n")
 
     def parse_fasta(self, fasta_content: str) -> List[SeqRecord]:
         """
@@ -29,15 +79,13 @@ class SequenceProcessor:
         try:
             fasta_io = StringIO(fasta_content)
             records = list(SeqIO.parse(fasta_io, "fasta"))
-            logger.info(
-                f"Parsed {len(records)} sequences from FASTA, {records}"
-            )
+            logger.info("Parsed %d sequences from FASTA", len(records))
             if not records:
                 raise ValueError("No sequences found in FASTA content")
 
             return records
         except Exception as e:
-            logger.error(f"Failed to parse FASTA: {e}")
+            logger.error("Failed to parse FASTA: %s", e)
             raise ValueError(f"Invalid FASTA format: {e}")
 
     def validate_sequence(self, sequence: str) -> Tuple[bool, str]:
@@ -53,13 +101,20 @@ class SequenceProcessor:
         if not sequence:
             return False, "Empty sequence"
 
-        # Convert to uppercase and remove whitespace
-        clean_seq = sequence.upper().replace(" ", "").replace("\n", "")
+        # Uppercase, remove whitespace and find the first invalid residue
+        clean_seq, invalid_pos = self.validator.check(sequence)
+        return self._validation_result(sequence, clean_seq, invalid_pos)
 
-        # Check for invalid characters
-        invalid_chars = set(clean_seq) - self.valid_amino_acids
-        if invalid_chars:
-            return False, f"Invalid amino acids found: {invalid_chars}"
+    def _validation_result(
+        self, sequence: str, clean_seq: str, invalid_pos: int
+    ) -> Tuple[bool, str]:
+        if invalid_pos >= 0:
+            invalid_chars = self.validator.invalid_characters(sequence)
+            return (
+                False,
+                f"Invalid amino acids found: {invalid_chars} "
+                f"(first at position {invalid_pos + 1})",
+            )
 
         # Check minimum length (sequences should be at least 15 AA for HMMER3 compatibility)
         if len(clean_seq) < 15:
@@ -70,6 +125,127 @@ class SequenceProcessor:
 
         return True, ""
 
+    async def iter_upload_records(
+        self,
+        file: Optional[UploadFile],
+        sequences: Optional[str],
+        max_bytes: Optional[int] = None,
+        translate: bool = False,
+    ) -> AsyncIterator[SeqRecord]:
+        """
+        Stream FASTA/FASTQ records from an uploaded file or a pasted string
+
+        The file is read in chunks, decompressed on the fly if it is gzip,
+        bgzip or zstd compressed, and records are yielded as soon as they
+        are complete, so the upload is never held in memory as a whole.
+
+        Args:
+            file: Uploaded FASTA or FASTQ file, takes precedence over
+                ``sequences``
+            sequences: FASTA or FASTQ content submitted as a form field
+            max_bytes: Maximum accepted upload size, MAX_UPLOAD_BYTES if None
+            translate: Treat sequences as nucleotides and translate them
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds ``max_bytes``
+            ValueError: If the content is not UTF-8, is corrupt or holds no
+                records
+        """
+        if max_bytes is None:
+            max_bytes = MAX_UPLOAD_BYTES
+        if file is not None:
+            records = self._iter_records_from_upload(file, max_bytes)
+        else:
+            if len(sequences.encode("utf-8")) > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            records = _aiter(iter_sequence_records([sequences]))
+
+        count = 0
+        async for record in records:
+            count += 1
+            if translate:
+                record.seq = Seq(self.translate_nucleotides(str(record.seq)))
+            yield record
+
+        if not count:
+            raise ValueError("No sequences found in FASTA content")
+        logger.info("Parsed %d sequences from upload", count)
+
+    @staticmethod
+    def translate_nucleotides(sequence: str) -> str:
+        """
+        Translate a nucleotide sequence in the first reading frame
+
+        A trailing partial codon and trailing stop codons are dropped;
+        internal stops are kept as ``*`` so validation reports them.
+
+        Raises:
+            ValueError: If the sequence holds a codon that is not valid
+                nucleotide code, such as one containing a gap
+        """
+        usable = len(sequence) - len(sequence) % 3
+        try:
+            protein = Seq(sequence[:usable]).translate()
+        except TranslationError as e:
+            raise ValueError(f"Cannot translate sequence: {e}")
+        return str(protein).rstrip("*")
+
+    @staticmethod
+    async def _iter_records_from_upload(
+        file: UploadFile, max_bytes: int
+    ) -> AsyncIterator[SeqRecord]:
+        parser = SequenceStreamParser()
+        async for text in iter_upload_text(file, max_bytes):
+            for record in parser.feed(text):
+                yield record
+        for record in parser.close():
+            yield record
+
+    async def iter_valid_upload_records(
+        self,
+        file: Optional[UploadFile],
+        sequences: Optional[str],
+        errors: List[str],
+        max_bytes: Optional[int] = None,
+        translate: bool = False,
+    ) -> AsyncIterator[Tuple[SeqRecord, str]]:
+        """
+        Stream valid ``(record, sequence)`` pairs from an upload
+
+        Invalid records are skipped and described in ``errors``. At most
+        MAX_REPORTED_VALIDATION_ERRORS messages are kept, followed by a
+        summary of how many more were dropped.
+        """
+        error_count = 0
+        index = 0
+        async for record in self.iter_upload_records(
+            file, sequences, max_bytes
+        ):
+            index += 1
+            sequence = str(record.seq)
+            is_valid, error = True, ""
+            if translate:
+                # An untranslatable record is reported like any invalid one
+                try:
+                    sequence = self.translate_nucleotides(sequence)
+                    record.seq = Seq(sequence)
+                except ValueError as e:
+                    is_valid, error = False, str(e)
+            if is_valid:
+                is_valid, error = self.validate_sequence(sequence)
+            if is_valid:
+                yield record, sequence
+                continue
+            error_count += 1
+            if error_count <= MAX_REPORTED_VALIDATION_ERRORS:
+                errors.append(f"Sequence {index}: {error}")
+
+        if error_count > MAX_REPORTED_VALIDATION_ERRORS:
+            errors.append(
+                f"... and {error_count - MAX_REPORTED_VALIDATION_ERRORS} "
+                "more invalid sequences"
+            )
+
     def validate_sequences(
         self, sequences: List[str]
     ) -> Tuple[List[str], List[str]]:
@@ -85,12 +261,20 @@ class SequenceProcessor:
         valid_sequences = []
         error_messages = []
 
-        for i, seq in enumerate(sequences):
-            is_valid, error = self.validate_sequence(seq)
-            if is_valid:
+        clean_seqs, invalid_positions = self.validator.validate_batch(
+            sequences
+        )
+        results = zip(sequences, clean_seqs, invalid_positions.tolist())
+        for i, (seq, clean_seq, invalid_pos) in enumerate(results):
+            # Valid and long enough: skip building a result tuple
+            if invalid_pos < 0 and len(clean_seq) >= 15:
                 valid_sequences.append(seq)
+                continue
+            if not seq:
+                error = "Empty sequence"
             else:
-                error_messages.append(f"Sequence {i + 1}: {error}")
+                _, error = self._validation_result(seq, clean_seq, invalid_pos)
+            error_messages.append(f"Sequence {i + 1}: {error}")
 
         return valid_sequences, error_messages
 
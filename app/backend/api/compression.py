@@ -0,0 +1,189 @@
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.config import (
+    BROTLI_QUALITY,
+    COMPRESSION_MIN_BYTES,
+    GZIP_COMPRESSION_LEVEL,
+)
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used when brotli is missing
+    brotli = None
+
+
+class GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int = GZIP_COMPRESSION_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings = {}
+    for item in value.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" for a request, preferring brotli on ties"""
+    codings = parse_accept_encoding(accept_encoding)
+    wildcard = codings.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, whichever the client prefers.
+
+    Works like Starlette's ``GZipMiddleware``: bodies smaller than
+    ``minimum_size`` and responses that already set ``Content-Encoding``
+    are sent unchanged. Streaming bodies are flushed after every chunk so
+    NDJSON lines reach the client as soon as they are produced. Brotli is
+    only offered when the optional ``brotli`` package is installed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_BYTES,
+        gzip_level: int = GZIP_COMPRESSION_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            encoding = choose_encoding(headers.get("Accept-Encoding", ""))
+            if encoding == "br":
+                compressor = BrotliCompressor(self.brotli_quality)
+            elif encoding == "gzip":
+                compressor = GzipCompressor(self.gzip_level)
+            else:
+                compressor = None
+            if compressor is not None:
+                responder = CompressionResponder(
+                    self.app, compressor, self.minimum_size
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, compressor, minimum_size: int) -> None:
+        self.app = app
+        self.compressor = compressor
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers until the first body chunk decides whether
+            # the response is compressed
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.passthrough:
+            await self._start()
+            await self.send(message)
+            return
+
+        if not self.started:
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+                await self._start()
+                await self.send(message)
+                return
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.compressor.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body)
+                body += self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._start()
+                await self.send({**message, "body": body})
+                return
+            await self._start()
+
+        compressed = self.compressor.compress(body)
+        if more_body:
+            compressed += self.compressor.flush()
+        else:
+            compressed += self.compressor.finish()
+        await self.send({**message, "body": compressed})
+
+    async def _start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self.send(self.initial_message)
@@ -0,0 +1,162 @@
+from typing import Any, Optional
+
+import numpy as np
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from backend.models.models import PSSMFormat
+from backend.msa.pssm_calculator import PSSMCalculator
+from backend.profiling import StageProfiler, stage
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Convert values orjson does not handle natively"""
+    if isinstance(obj, BaseModel):
+        # Shallow: nested models come back through here, so unlike
+        # model_dump() the field values are never copied
+        return dict(obj)
+    if isinstance(obj, np.ndarray):
+        # Non-contiguous or object arrays are rejected by OPT_SERIALIZE_NUMPY
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise content to JSON bytes with orjson"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Pydantic models, NumPy arrays and NumPy scalars are serialised directly.
+    Models are written field by field under their field names, so models
+    with custom serialisers or aliases should be dumped before returning.
+    Return an instance from the endpoint (rather than setting it as
+    ``response_class``) so FastAPI's ``jsonable_encoder`` pass, which walks
+    every value in Python, is skipped as well. Non-finite floats are
+    rendered as ``null``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def profile_requested(request: Request) -> bool:
+    """True if the client asked for a per-stage timing breakdown
+
+    Either the ``profile`` query parameter or an ``X-Profile`` header set to
+    a true value, e.g. ``?profile=true``.
+    """
+    value = request.query_params.get("profile") or request.headers.get(
+        "x-profile", ""
+    )
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def add_profile(content: Any, profile: dict) -> Any:
+    """
+    Return ``content`` with a ``profile`` entry
+
+    The entry goes into the ``data`` dict of ``{"success", "data"}``
+    envelopes and at the top level otherwise; ``content`` is not changed.
+    """
+    if isinstance(content, BaseModel):
+        content = dict(content)
+    data = content.get("data")
+    if isinstance(data, dict):
+        return {**content, "data": {**data, "profile": profile}}
+    return {**content, "profile": profile}
+
+
+def profiled_json_response(
+    content: Any,
+    profiler: Optional[StageProfiler] = None,
+    headers: Optional[dict] = None,
+) -> FastJSONResponse:
+    """
+    FastJSONResponse carrying the stage breakdown of ``profiler``, if any
+
+    Rendering is timed as the ``serialise`` stage, which can only be
+    reported in the ``Server-Timing`` header since the body is complete by
+    then; the header lists every stage.
+    """
+    if profiler is None:
+        return FastJSONResponse(content, headers=headers)
+    content = add_profile(content, profiler.to_dict())
+    with profiler.stage("serialise"):
+        response = FastJSONResponse(content, headers=headers)
+    response.headers["Server-Timing"] = profiler.server_timing()
+    return response
+
+
+def negotiate_pssm_format(
+    request: Request, pssm_format: Optional[PSSMFormat] = None
+) -> PSSMFormat:
+    """
+    Pick the PSSM wire format for a response
+
+    An explicit ``pssm_format`` query parameter wins; otherwise a ``pssm``
+    parameter on any Accept media range is used, e.g.
+    ``Accept: application/json; pssm=compact``.
+    """
+    if pssm_format is not None:
+        return pssm_format
+    for media_range in request.headers.get("accept", "").split(","):
+        for param in media_range.split(";")[1:]:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "pssm":
+                try:
+                    return PSSMFormat(value.strip().strip('"').lower())
+                except ValueError:
+                    pass
+    return PSSMFormat.DICT
+
+
+def compact_pssm_fields(content: Any) -> Any:
+    """
+    Return ``content`` with every ``pssm_data`` dict in compact format
+
+    Dicts on the way to a ``pssm_data`` key are copied rather than changed
+    in place; lists are only searched for nested dicts, so alignment
+    matrices are not walked.
+    """
+    if isinstance(content, BaseModel):
+        content = dict(content)
+    if isinstance(content, dict):
+        compacted = {}
+        for key, value in content.items():
+            if key == "pssm_data" and isinstance(value, dict) and value:
+                compacted[key] = PSSMCalculator.to_compact(value)
+            else:
+                compacted[key] = compact_pssm_fields(value)
+        return compacted
+    if isinstance(content, list) and content:
+        if not isinstance(content[0], (dict, BaseModel)):
+            return content
+        return [compact_pssm_fields(item) for item in content]
+    return content
+
+
+def pssm_json_response(
+    content: Any,
+    request: Request,
+    pssm_format: Optional[PSSMFormat] = None,
+    profiler: Optional[StageProfiler] = None,
+) -> FastJSONResponse:
+    """FastJSONResponse with PSSM data in the negotiated wire format"""
+    if negotiate_pssm_format(request, pssm_format) == PSSMFormat.COMPACT:
+        with stage("compact_pssm"):
+            content = compact_pssm_fields(content)
+    return profiled_json_response(
+        content, profiler, headers={"Vary": "Accept"}
+    )
@@ -4,10 +4,19 @@ from backend.annotation.alignment_engine import AlignmentEngine
 from backend.annotation.annotation_engine import (
     annotate_sequences_with_processor,
 )
-from backend.annotation.sequence_processor import SequenceProcessor
+from backend.annotation.fasta_stream import (
+    UNSUPPORTED_FILE_MESSAGE,
+    UploadTooLargeError,
+    is_supported_upload,
+)
+from backend.annotation.sequence_processor import (
+    SequenceProcessor,
+    SequenceStatistics,
+)
+from backend.api.responses import pssm_json_response
 from backend.data_store import data_store
 from backend.jobs.job_manager import job_manager
-from backend.logger import logger
+from backend.logger import get_logger
 from backend.models.models import (
     AlignmentRequest,
     AnnotationRequest,
@@ -15,9 +24,13 @@ from backend.models.models import (
     AlignmentResult,
     SequenceInput,
     MSACreationRequest,
+    MSAAdditionRequest,
     MSAAnnotationRequest,
+    PSSMFormat,
 )
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -43,57 +56,59 @@ async def health_check():
 async def upload_sequences(
     file: Optional[UploadFile] = File(None),
     sequences: Optional[str] = Form(None),
+    translate: bool = Form(False),
 ):
     try:
-        fasta_content = ""
         if file:
-            if not file.filename.endswith((".fasta", ".fa", ".txt")):
+            if not is_supported_upload(file.filename):
                 raise HTTPException(
-                    status_code=400, detail="File must be FASTA format"
+                    status_code=400, detail=UNSUPPORTED_FILE_MESSAGE
                 )
-            fasta_content = await file.read()
-            fasta_content = fasta_content.decode("utf-8")
-        elif sequences:
-            fasta_content = sequences
-        else:
+        elif not sequences:
             raise HTTPException(
                 status_code=400,
                 detail="Either file or sequences must be provided",
             )
-        try:
-            records = sequence_processor.parse_fasta(fasta_content)
-            sequences_list = [str(record.seq) for record in records]
-        except ValueError as e:
-            raise HTTPException(
-                status_code=400, detail=f"Invalid FASTA format: {e}"
-            )
-        valid_sequences, errors = sequence_processor.validate_sequences(
-            sequences_list
-        )
-        if not valid_sequences:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Sequence validation failed: {'; '.join(errors)}",
-            )
+        errors = []
+        stats = SequenceStatistics()
+        # Records are validated and written to the data store as the upload
+        # is read, so the file is never held in memory as a whole
+        with data_store.open_dataset_writer() as writer:
+            try:
+                records = sequence_processor.iter_valid_upload_records(
+                    file, sequences, errors, translate=translate
+                )
+                async for _, sequence in records:
+                    writer.add(sequence)
+                    stats.add(sequence)
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400, detail=f"Invalid FASTA format: {e}"
+                )
+            if not writer.sequence_count:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Sequence validation failed: {'; '.join(errors)}",
+                )
+            dataset_id = writer.commit()
         if errors:
-            logger.warning(
-                f"Some sequences had validation issues: {'; '.join(errors)}"
-            )
-        dataset_id = data_store.create_dataset(valid_sequences)
-        stats = sequence_processor.get_sequence_statistics(valid_sequences)
+            logger.warning("%d sequences had validation issues", len(errors))
+            logger.debug("Validation issues: %s", errors)
         return APIResponse(
             success=True,
-            message=f"Successfully uploaded {len(valid_sequences)} sequences",
+            message=f"Successfully uploaded {stats.count} sequences",
             data={
                 "dataset_id": dataset_id,
-                "statistics": stats,
+                "statistics": stats.to_dict(),
                 "validation_errors": errors,
             },
         )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Upload failed: {e}")
+        logger.error("Upload failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Upload failed: {e}")
 
 
@@ -120,7 +135,7 @@ async def annotate_sequences(request: AnnotationRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Annotation failed: {e}")
+        logger.error("Annotation failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Annotation failed: {e}")
 
 
@@ -155,7 +170,7 @@ async def align_sequences(request: AlignmentRequest):
             },
         )
     except Exception as e:
-        logger.error(f"Alignment failed: {e}")
+        logger.error("Alignment failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Alignment failed: {e}")
 
 
@@ -173,7 +188,7 @@ async def get_alignment(dataset_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to retrieve alignment: {e}")
+        logger.error("Failed to retrieve alignment: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve alignment: {e}"
         )
@@ -193,7 +208,7 @@ async def get_dataset(dataset_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to retrieve dataset: {e}")
+        logger.error("Failed to retrieve dataset: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve dataset: {e}"
         )
@@ -213,7 +228,7 @@ async def list_datasets():
             },
         )
     except Exception as e:
-        logger.error(f"Failed to list datasets: {e}")
+        logger.error("Failed to list datasets: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to list datasets: {e}"
         )
@@ -231,7 +246,7 @@ async def delete_dataset(dataset_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to delete dataset: {e}")
+        logger.error("Failed to delete dataset: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to delete dataset: {e}"
         )
@@ -244,59 +259,55 @@ async def delete_dataset(dataset_id: str):
 async def upload_msa_sequences(
     file: Optional[UploadFile] = File(None),
     sequences: Optional[str] = Form(None),
+    translate: bool = Form(False),
 ):
     """Upload sequences for MSA analysis"""
     try:
-        fasta_content = ""
         if file:
-            if not file.filename.endswith((".fasta", ".fa", ".txt")):
+            if not is_supported_upload(file.filename):
                 raise HTTPException(
-                    status_code=400, detail="File must be FASTA format"
+                    status_code=400, detail=UNSUPPORTED_FILE_MESSAGE
                 )
-            fasta_content = await file.read()
-            fasta_content = fasta_content.decode("utf-8")
-        elif sequences:
-            fasta_content = sequences
-        else:
+        elif not sequences:
             raise HTTPException(
                 status_code=400,
                 detail="Either file or sequences must be provided",
             )
 
+        errors = []
+        sequence_inputs = []
         try:
-            records = sequence_processor.parse_fasta(fasta_content)
-            sequences_list = [str(record.seq) for record in records]
+            records = sequence_processor.iter_valid_upload_records(
+                file, sequences, errors, translate=translate
+            )
+            async for record, seq in records:
+                sequence_inputs.append(
+                    SequenceInput(
+                        name=record.id
+                        or f"Sequence_{len(sequence_inputs) + 1}",
+                        heavy_chain=seq,  # Assume heavy chain for now
+                    )
+                )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         except ValueError as e:
             raise HTTPException(
                 status_code=400, detail=f"Invalid FASTA format: {e}"
             )
 
-        valid_sequences, errors = sequence_processor.validate_sequences(
-            sequences_list
-        )
-        if not valid_sequences:
+        if not sequence_inputs:
             raise HTTPException(
                 status_code=400,
                 detail=f"Sequence validation failed: {'; '.join(errors)}",
             )
 
         if errors:
-            logger.warning(
-                f"Some sequences had validation issues: {'; '.join(errors)}"
-            )
-
-        # Create SequenceInput objects
-        sequence_inputs = []
-        for i, (record, seq) in enumerate(zip(records, valid_sequences)):
-            seq_input = SequenceInput(
-                name=record.id or f"Sequence_{i + 1}",
-                heavy_chain=seq,  # Assume heavy chain for now
-            )
-            sequence_inputs.append(seq_input)
+            logger.warning("%d sequences had validation issues", len(errors))
+            logger.debug("Validation issues: %s", errors)
 
         return APIResponse(
             success=True,
-            message=f"Successfully uploaded {len(valid_sequences)} sequences for MSA",
+            message=f"Successfully uploaded {len(sequence_inputs)} sequences for MSA",
             data={
                 "sequences": [seq.model_dump() for seq in sequence_inputs],
                 "validation_errors": errors,
@@ -305,12 +316,16 @@ async def upload_msa_sequences(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"MSA upload failed: {e}")
+        logger.error("MSA upload failed: %s", e)
         raise HTTPException(status_code=500, detail=f"MSA upload failed: {e}")
 
 
 @router.post("/msa-viewer/create-msa", response_model=APIResponse)
-async def create_msa(request: MSACreationRequest):
+async def create_msa(
+    request: MSACreationRequest,
+    http_request: Request,
+    pssm_format: Optional[PSSMFormat] = None,
+):
     """Create multiple sequence alignment"""
     try:
         # Determine if we should use background processing
@@ -324,14 +339,18 @@ async def create_msa(request: MSACreationRequest):
         if use_background:
             # Create background job
             job_id = job_manager.create_msa_job(request)
-            return APIResponse(
-                success=True,
-                message=f"MSA job created for {total_sequences} sequences",
-                data={
-                    "job_id": job_id,
-                    "status": "pending",
-                    "use_background": True,
-                },
+            return pssm_json_response(
+                APIResponse(
+                    success=True,
+                    message=f"MSA job created for {total_sequences} sequences",
+                    data={
+                        "job_id": job_id,
+                        "status": "pending",
+                        "use_background": True,
+                    },
+                ),
+                http_request,
+                pssm_format,
             )
         else:
             # Process immediately for small datasets
@@ -355,8 +374,14 @@ async def create_msa(request: MSACreationRequest):
 
             # Create MSA
             msa_result = msa_engine.create_msa(
-                sequences=sequences, method=request.alignment_method
+                sequences=sequences,
+                method=request.alignment_method,
+                numbering_scheme=request.numbering_scheme,
+                cluster_identity=request.cluster_identity,
+                consensus_threshold=request.consensus_threshold,
             )
+            # Stored so sequences can be added to it later
+            job_manager.store_msa_result(msa_result)
 
             # Annotate sequences
             annotation_result = annotation_engine.annotate_msa(
@@ -367,29 +392,52 @@ async def create_msa(request: MSACreationRequest):
             # Extract PSSM data from metadata
             pssm_data = msa_result.metadata.get("pssm_data", {})
 
-            return APIResponse(
-                success=True,
-                message=f"Successfully created MSA for {len(sequences)} sequences with enhanced features",
-                data={
-                    "msa_result": msa_result.model_dump(),
-                    "annotation_result": annotation_result.model_dump(),
-                    "pssm_data": pssm_data,
-                    "consensus": msa_result.consensus,
-                    "conservation_scores": pssm_data.get(
-                        "conservation_scores", []
-                    ),
-                    "quality_scores": pssm_data.get("quality_scores", []),
-                    "use_background": False,
-                },
+            return pssm_json_response(
+                APIResponse(
+                    success=True,
+                    message=f"Successfully created MSA for {len(sequences)} sequences with enhanced features",
+                    data={
+                        "msa_result": msa_result.model_dump(),
+                        "annotation_result": annotation_result.model_dump(),
+                        "pssm_data": pssm_data,
+                        "consensus": msa_result.consensus,
+                        "conservation_scores": pssm_data.get(
+                            "conservation_scores", []
+                        ),
+                        "quality_scores": pssm_data.get("quality_scores", []),
+                        "use_background": False,
+                    },
+                ),
+                http_request,
+                pssm_format,
             )
 
     except Exception as e:
-        logger.error(f"MSA creation failed: {e}")
+        logger.error("MSA creation failed: %s", e)
         raise HTTPException(
             status_code=500, detail=f"MSA creation failed: {e}"
         )
 
 
+@router.post("/msa-viewer/add-sequences", response_model=APIResponse)
+async def add_sequences_to_msa(request: MSAAdditionRequest):
+    """Add sequences to a stored MSA without realigning it"""
+    try:
+        job_id = job_manager.create_msa_addition_job(request)
+        return APIResponse(
+            success=True,
+            message=f"MSA addition job created for MSA {request.msa_id}",
+            data={"job_id": job_id, "status": "pending"},
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="MSA not found")
+    except Exception as e:
+        logger.error("MSA addition failed: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"MSA addition failed: {e}"
+        )
+
+
 @router.post("/msa-viewer/annotate-msa", response_model=APIResponse)
 async def annotate_msa(request: MSAAnnotationRequest):
     """Annotate sequences in MSA"""
@@ -403,50 +451,64 @@ async def annotate_msa(request: MSAAnnotationRequest):
             data={"job_id": job_id, "status": "pending"},
         )
     except Exception as e:
-        logger.error(f"MSA annotation failed: {e}")
+        logger.error("MSA annotation failed: %s", e)
         raise HTTPException(
             status_code=500, detail=f"MSA annotation failed: {e}"
         )
 
 
 @router.get("/msa-viewer/job/{job_id}", response_model=APIResponse)
-async def get_job_status(job_id: str):
+async def get_job_status(
+    job_id: str,
+    http_request: Request,
+    pssm_format: Optional[PSSMFormat] = None,
+):
     """Get status of a background job"""
     try:
         job_status = job_manager.get_job_status(job_id)
         if not job_status:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        return APIResponse(
-            success=True,
-            message="Job status retrieved successfully",
-            data=job_status.model_dump(),
+        return pssm_json_response(
+            APIResponse(
+                success=True,
+                message="Job status retrieved successfully",
+                data=job_status.model_dump(),
+            ),
+            http_request,
+            pssm_format,
         )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get job status: {e}")
+        logger.error("Failed to get job status: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to get job status: {e}"
         )
 
 
 @router.get("/msa-viewer/jobs", response_model=APIResponse)
-async def list_jobs():
+async def list_jobs(
+    http_request: Request, pssm_format: Optional[PSSMFormat] = None
+):
     """List all jobs"""
     try:
         # Get all jobs from job manager
         jobs = []
-        for job_id, job_status in job_manager.jobs.items():
+        for job_status in job_manager.list_jobs():
             jobs.append(job_status.model_dump())
 
-        return APIResponse(
-            success=True,
-            message=f"Retrieved {len(jobs)} jobs",
-            data={"jobs": jobs},
+        return pssm_json_response(
+            APIResponse(
+                success=True,
+                message=f"Retrieved {len(jobs)} jobs",
+                data={"jobs": jobs},
+            ),
+            http_request,
+            pssm_format,
         )
     except Exception as e:
-        logger.error(f"Failed to list jobs: {e}")
+        logger.error("Failed to list jobs: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to list jobs: {e}"
         )
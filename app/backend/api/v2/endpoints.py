@@ -1,13 +1,42 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException, File, Form, UploadFile, Depends
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    File,
+    Form,
+    UploadFile,
+    Depends,
+    Query,
+    Request,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from backend.api.responses import (
+    pssm_json_response,
+    profile_requested,
+    profiled_json_response,
+)
 from backend.database.engine import get_db_session
 
-from backend.models.models import MSACreationRequest, MSAAnnotationRequest
+from backend.models.models import (
+    MSACreationRequest,
+    MSAAnnotationRequest,
+    PSSMFormat,
+)
 from backend.models.models_v2 import AnnotationResult as V2AnnotationResult
+from backend.models.models_v2 import ExportFormat, ExportTable
 from backend.models.requests_v2 import AnnotationRequestV2
-from backend.services import AnnotationService, MSAService, JobService
-from backend.logger import logger
+from backend.services import (
+    AnnotationExportService,
+    AnnotationService,
+    MSAService,
+    JobService,
+)
+from backend.services.annotation_export_service import EXPORT_MEDIA_TYPES
+from backend.logger import get_logger
+from backend.profiling import profiling
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -18,26 +47,71 @@ async def health_check_v2():
 
 
 @router.post("/annotate", response_model=V2AnnotationResult)
-async def annotate_sequences_v2(request: AnnotationRequestV2):
+async def annotate_sequences_v2(
+    request: AnnotationRequestV2, http_request: Request
+):
     try:
         annotation_service = AnnotationService()
-        return annotation_service.process_annotation_request(request)
+        with profiling(profile_requested(http_request)) as profiler:
+            return profiled_json_response(
+                annotation_service.process_annotation_request(request),
+                profiler,
+            )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Annotation failed: {e}")
 
 
+@router.post("/annotate/stream")
+async def annotate_sequences_stream_v2(request: AnnotationRequestV2):
+    """Annotate sequences, streaming one NDJSON line per biologic"""
+    try:
+        annotation_service = AnnotationService()
+        lines = annotation_service.stream_annotation_request(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Annotation failed: {e}")
+    # Sync iterators are run in a threadpool, keeping ANARCI off the loop
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.post("/annotate/export")
+async def export_annotations_v2(
+    request: AnnotationRequestV2,
+    table: ExportTable = ExportTable.REGIONS,
+    export_format: ExportFormat = Query(ExportFormat.ARROW, alias="format"),
+):
+    """Annotate sequences and stream one table as Arrow IPC or Parquet"""
+    try:
+        export_service = AnnotationExportService()
+        chunks = export_service.stream_export(request, table, export_format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Export failed: {e}")
+    extension = "arrows" if export_format == ExportFormat.ARROW else "parquet"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="annotations_{table.value}.{extension}"'
+            )
+        },
+    )
+
+
 @router.post("/msa-viewer/upload")
 async def upload_msa_sequences_v2(
     file: Optional[UploadFile] = File(None),
     sequences: Optional[str] = Form(None),
+    translate: bool = Form(False),
 ):
     """Upload sequences for MSA analysis"""
     try:
         msa_service = MSAService()
         sequence_inputs, errors = await msa_service.process_upload(
-            file, sequences
+            file, sequences, translate=translate
         )
 
         return {
@@ -51,18 +125,28 @@ async def upload_msa_sequences_v2(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"MSA upload failed: {e}")
+        logger.error("MSA upload failed: %s", e)
         raise HTTPException(status_code=500, detail=f"MSA upload failed: {e}")
 
 
 @router.post("/msa-viewer/create-msa")
-async def create_msa_v2(request: MSACreationRequest):
+async def create_msa_v2(
+    request: MSACreationRequest,
+    http_request: Request,
+    pssm_format: Optional[PSSMFormat] = None,
+):
     """Create multiple sequence alignment"""
     try:
         msa_service = MSAService()
-        return msa_service.create_msa(request)
+        with profiling(profile_requested(http_request)) as profiler:
+            return pssm_json_response(
+                msa_service.create_msa(request),
+                http_request,
+                pssm_format,
+                profiler,
+            )
     except Exception as e:
-        logger.error(f"MSA creation failed: {e}")
+        logger.error("MSA creation failed: %s", e)
         raise HTTPException(
             status_code=500, detail=f"MSA creation failed: {e}"
         )
@@ -81,14 +165,18 @@ async def annotate_msa_v2(request: MSAAnnotationRequest):
             "data": {"job_id": job_id, "status": "pending"},
         }
     except Exception as e:
-        logger.error(f"MSA annotation failed: {e}")
+        logger.error("MSA annotation failed: %s", e)
         raise HTTPException(
             status_code=500, detail=f"MSA annotation failed: {e}"
         )
 
 
 @router.get("/msa-viewer/job/{job_id}")
-async def get_job_status_v2(job_id: str):
+async def get_job_status_v2(
+    job_id: str,
+    http_request: Request,
+    pssm_format: Optional[PSSMFormat] = None,
+):
     """Get status of a background job"""
     try:
         job_service = JobService()
@@ -96,34 +184,44 @@ async def get_job_status_v2(job_id: str):
         if not job_status:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        return {
-            "success": True,
-            "message": "Job status retrieved successfully",
-            "data": job_status,
-        }
+        return pssm_json_response(
+            {
+                "success": True,
+                "message": "Job status retrieved successfully",
+                "data": job_status,
+            },
+            http_request,
+            pssm_format,
+        )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get job status: {e}")
+        logger.error("Failed to get job status: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to get job status: {e}"
         )
 
 
 @router.get("/msa-viewer/jobs")
-async def list_jobs_v2():
+async def list_jobs_v2(
+    http_request: Request, pssm_format: Optional[PSSMFormat] = None
+):
     """List all jobs"""
     try:
         job_service = JobService()
         jobs = job_service.list_jobs()
 
-        return {
-            "success": True,
-            "message": f"Retrieved {len(jobs)} jobs",
-            "data": {"jobs": jobs},
-        }
+        return pssm_json_response(
+            {
+                "success": True,
+                "message": f"Retrieved {len(jobs)} jobs",
+                "data": {"jobs": jobs},
+            },
+            http_request,
+            pssm_format,
+        )
     except Exception as e:
-        logger.error(f"Failed to list jobs: {e}")
+        logger.error("Failed to list jobs: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to list jobs: {e}"
         )
@@ -0,0 +1,12 @@
+"""
+Micro-benchmarks for hot paths of the backend.
+
+Run a benchmark from the ``app`` directory, e.g.::
+
+    python -m backend.benchmarks.bench_sequence_validation
+
+``backend.benchmarks.suite`` runs the annotation, alignment and MSA cases
+on synthetic datasets of several sizes and stores the timings as JSON;
+``backend.benchmarks.loadtest`` load-tests the running API, optionally with
+stand-ins for the external tools.
+"""
@@ -0,0 +1,132 @@
+"""
+Benchmark JSON serialisation of a large MSA job status response.
+
+Compares FastAPI's default path (``jsonable_encoder`` then ``json.dumps``
+via ``JSONResponse``) with ``FastJSONResponse`` on the payload returned by
+``/msa-viewer/job/{job_id}`` for a completed MSA of ``--count`` sequences.
+
+Usage (from the ``app`` directory)::
+
+    python -m backend.benchmarks.bench_json_serialisation --count 2000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.api.responses import FastJSONResponse
+from backend.models.models import (
+    AlignmentMethod,
+    APIResponse,
+    MSAJobStatus,
+    MSAResult,
+    MSASequence,
+)
+from backend.msa.pssm_calculator import PSSMCalculator
+from backend.utils.sequence_validation import AMINO_ACIDS
+
+
+def make_aligned_sequences(count: int, length: int, seed: int = 0):
+    """Random sequences mutated from one parent, with sparse gaps"""
+    rng = random.Random(seed)
+    parent = rng.choices(AMINO_ACIDS, k=length)
+    aligned = []
+    for _ in range(count):
+        seq = list(parent)
+        for pos in rng.sample(range(length), length // 10):
+            seq[pos] = rng.choice(AMINO_ACIDS)
+        for pos in rng.sample(range(length), length // 40):
+            seq[pos] = "-"
+        aligned.append("".join(seq))
+    return aligned
+
+
+def make_job_payload(count: int, length: int) -> APIResponse:
+    """Completed MSA job status as returned by the v1 job endpoint"""
+    aligned = make_aligned_sequences(count, length)
+    alignment_matrix = [list(seq) for seq in aligned]
+    sequences = [
+        MSASequence(
+            name=f"seq_{i}_heavy_chain",
+            original_sequence=seq.replace("-", ""),
+            aligned_sequence=seq,
+            start_position=0,
+            end_position=len(seq),
+            gaps=[j for j, char in enumerate(seq) if char == "-"],
+        )
+        for i, seq in enumerate(aligned)
+    ]
+    pssm_data = PSSMCalculator().calculate_pssm(alignment_matrix)
+    msa_result = MSAResult(
+        msa_id="benchmark",
+        sequences=sequences,
+        alignment_matrix=alignment_matrix,
+        consensus=pssm_data["consensus"],
+        alignment_method=AlignmentMethod.PAIRWISE_GLOBAL,
+        created_at=datetime.now().isoformat(),
+        metadata={"num_sequences": count, "pssm_data": pssm_data},
+    )
+    job = MSAJobStatus(
+        job_id="benchmark",
+        status="completed",
+        progress=100.0,
+        message="MSA creation completed successfully",
+        result={"msa_result": msa_result.model_dump(), "job_type": "msa"},
+        created_at=datetime.now().isoformat(),
+    )
+    return APIResponse(
+        success=True,
+        message="Job status retrieved successfully",
+        data=job.model_dump(),
+    )
+
+
+def default_render(content: APIResponse) -> bytes:
+    """FastAPI default: jsonable_encoder, then JSONResponse.render"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def pydantic_render(content: APIResponse) -> bytes:
+    """pydantic-core serialisation of the response model"""
+    return content.model_dump_json().encode()
+
+
+def fast_render(content: APIResponse) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def run(name: str, func: Callable[[Any], bytes], content, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(content)
+        best = min(best, time.perf_counter() - start)
+    size = len(body) / 1024**2
+    print(f"{name:<30} {best * 1000:10.1f} ms  {size:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--length", type=int, default=130)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = make_job_payload(args.count, args.length)
+    print(f"MSA job of {args.count} sequences x {args.length} columns")
+    benchmarks: Dict[str, Callable[[Any], bytes]] = {
+        "jsonable_encoder + json.dumps": default_render,
+        "pydantic model_dump_json": pydantic_render,
+        "FastJSONResponse (orjson)": fast_render,
+    }
+    for name, func in benchmarks.items():
+        run(name, func, content, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark sequence validation: set-based checks vs lookup-table validator.
+
+Usage (from the ``app`` directory)::
+
+    python -m backend.benchmarks.bench_sequence_validation --count 1000000
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from backend.annotation.sequence_processor import SequenceProcessor
+from backend.utils.sequence_validation import AMINO_ACIDS, SequenceValidator
+
+VALID_AMINO_ACIDS = set(AMINO_ACIDS)
+VALID_ISOTYPE_CHARS = set(AMINO_ACIDS + "X")
+
+
+def legacy_processor_validate(sequences: List[str]) -> int:
+    """Previous SequenceProcessor.validate_sequence, per sequence"""
+    valid = 0
+    for sequence in sequences:
+        clean_seq = sequence.upper().replace(" ", "").replace("\n", "")
+        if not set(clean_seq) - VALID_AMINO_ACIDS and len(clean_seq) >= 15:
+            valid += 1
+    return valid
+
+
+def legacy_hmmer_validate(sequences: List[str]) -> int:
+    """Previous HmmerAdapter._validate_sequence character loop"""
+    return sum(
+        all(char.upper() in VALID_ISOTYPE_CHARS for char in sequence)
+        for sequence in sequences
+    )
+
+
+def processor_validate(sequences: List[str]) -> int:
+    """SequenceProcessor.validate_sequence, per sequence"""
+    processor = SequenceProcessor()
+    return sum(processor.validate_sequence(seq)[0] for seq in sequences)
+
+
+def processor_validate_batch(sequences: List[str]) -> int:
+    """SequenceProcessor.validate_sequences over the whole batch"""
+    return len(SequenceProcessor().validate_sequences(sequences)[0])
+
+
+def table_hmmer_validate(sequences: List[str]) -> int:
+    validator = SequenceValidator(AMINO_ACIDS + "X")
+    return int((validator.validate_batch(sequences)[1] < 0).sum())
+
+
+def make_sequences(
+    count: int, length: int, invalid_fraction: float, seed: int = 0
+) -> List[str]:
+    rng = random.Random(seed)
+    sequences = []
+    for _ in range(count):
+        seq = "".join(rng.choices(AMINO_ACIDS, k=length))
+        if rng.random() < invalid_fraction:
+            pos = rng.randrange(length)
+            seq = seq[:pos] + "B" + seq[pos + 1 :]
+        sequences.append(seq)
+    return sequences
+
+
+def run(name: str, func: Callable[[List[str]], int], sequences, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(sequences)
+        best = min(best, time.perf_counter() - start)
+    rate = len(sequences) / best
+    print(f"{name:<28} {best * 1000:10.1f} ms {rate:14,.0f} seq/s  ({result})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--length", type=int, default=120)
+    parser.add_argument("--invalid-fraction", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sequences = make_sequences(args.count, args.length, args.invalid_fraction)
+    print(
+        f"{args.count} sequences of {args.length} residues, "
+        f"{args.invalid_fraction:.0%} invalid"
+    )
+    benchmarks = [
+        ("legacy processor (set)", legacy_processor_validate),
+        ("processor (per sequence)", processor_validate),
+        ("processor (batch)", processor_validate_batch),
+        ("legacy hmmer (generator)", legacy_hmmer_validate),
+        ("table hmmer (batch)", table_hmmer_validate),
+    ]
+    for name, func in benchmarks:
+        run(name, func, sequences, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
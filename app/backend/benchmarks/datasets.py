@@ -0,0 +1,196 @@
+"""
+Synthetic antibody datasets for the benchmark suite.
+
+Variants are generated from seed variable domains by random substitutions,
+so any number of distinct but realistic sequences can be produced. Seeds
+are the full-length chains found in ``data/sequences`` plus a reference
+heavy and light variable domain (the bundled JSON files mostly hold short
+fragments). Heavy chains get a human constant region assembled from the
+exons in the isotype FASTAs, so HMMER isotype detection has real work.
+"""
+
+import json
+import os
+import random
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from backend.config import DATA_DIR
+from backend.utils.sequence_validation import AMINO_ACIDS
+
+SEQUENCES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "data", "sequences"
+)
+ISOTYPE_FASTA_DIR = os.path.join(DATA_DIR, "isotype_fastas")
+
+REFERENCE_HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+REFERENCE_LIGHT = (
+    "DIQMTQSPSSLSASVGDRVTITCRASQDISNYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGSG"
+    "SGTDFTLTISSLQPEDFATYYCQQYNSYPLTFGQGTKVEIK"
+)
+
+# Shorter chains in data/sequences are fragments ANARCI cannot number
+MIN_SEED_LENGTH = 90
+# Membrane exons are left out of assembled constant regions
+MEMBRANE_EXONS = ("M", "M1", "M2")
+
+
+def load_seed_chains(directory: str = SEQUENCES_DIR) -> Dict[str, List[str]]:
+    """Full-length heavy and light chains, data/sequences ones first"""
+    seeds = {"H": [], "L": []}
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(directory, filename)) as handle:
+                record = json.load(handle)
+            for chain in record.get("chains", []):
+                sequence = chain.get("sequence", "")
+                chain_type = "H" if chain.get("chain_type") == "H" else "L"
+                if (
+                    len(sequence) >= MIN_SEED_LENGTH
+                    and sequence not in seeds[chain_type]
+                ):
+                    seeds[chain_type].append(sequence)
+    seeds["H"].append(REFERENCE_HEAVY)
+    seeds["L"].append(REFERENCE_LIGHT)
+    return seeds
+
+
+def load_constant_regions(
+    directory: str = ISOTYPE_FASTA_DIR,
+) -> List[Tuple[str, str]]:
+    """(allele, sequence) per allele, its exons joined in file order"""
+    alleles: "OrderedDict[str, List[str]]" = OrderedDict()
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".fasta"):
+            continue
+        allele, exon, sequence = None, None, []
+        with open(os.path.join(directory, filename)) as handle:
+            for line in list(handle) + [">"]:
+                line = line.strip()
+                if not line.startswith(">"):
+                    sequence.append(line)
+                    continue
+                if allele and exon not in MEMBRANE_EXONS:
+                    alleles.setdefault(allele, []).append("".join(sequence))
+                fields = line[1:].split("|")
+                allele = fields[1] if len(fields) > 4 else None
+                exon = fields[4] if len(fields) > 4 else None
+                sequence = []
+    return [(allele, "".join(exons)) for allele, exons in alleles.items()]
+
+
+def mutate(sequence: str, rate: float, rng: random.Random) -> str:
+    """Substitute a fraction ``rate`` of the residues at random"""
+    residues = list(sequence)
+    for position in rng.sample(
+        range(len(residues)), int(len(residues) * rate)
+    ):
+        residues[position] = rng.choice(AMINO_ACIDS)
+    return "".join(residues)
+
+
+class SyntheticDataset:
+    """
+    Deterministic generator of antibody-like sequences
+
+    Args:
+        seed: Random seed; the same seed always gives the same dataset
+        mutation_rate: Fraction of residues substituted in each variant
+    """
+
+    def __init__(self, seed: int = 0, mutation_rate: float = 0.05):
+        self.seed = seed
+        self.mutation_rate = mutation_rate
+        self.seed_chains = load_seed_chains()
+        self.constant_regions = load_constant_regions()
+
+    def _rng(self, name: str, size: int) -> random.Random:
+        return random.Random(f"{self.seed}:{name}:{size}")
+
+    def variable_domains(self, size: int, chain_type: str = "H") -> List[str]:
+        rng = self._rng(f"variable_{chain_type}", size)
+        seeds = self.seed_chains[chain_type]
+        return [
+            mutate(seeds[i % len(seeds)], self.mutation_rate, rng)
+            for i in range(size)
+        ]
+
+    def constant_domains(self, size: int) -> List[str]:
+        rng = self._rng("constant", size)
+        return [
+            mutate(
+                self.constant_regions[i % len(self.constant_regions)][1],
+                self.mutation_rate,
+                rng,
+            )
+            for i in range(size)
+        ]
+
+    def biologics(self, size: int) -> Dict[str, Dict[str, str]]:
+        """AnarciResultProcessor input of heavy (V + C) and light chains"""
+        heavy = self.variable_domains(size, "H")
+        light = self.variable_domains(size, "L")
+        constant = self.constant_domains(size)
+        return {
+            f"ab_{i}": {
+                "heavy_chain": heavy[i] + constant[i],
+                "light_chain": light[i],
+            }
+            for i in range(size)
+        }
+
+    def named_sequences(self, size: int) -> List[Tuple[str, str]]:
+        """(name, sequence) tuples of heavy variable domains for MSAs"""
+        return [
+            (f"seq_{i}", sequence)
+            for i, sequence in enumerate(self.variable_domains(size, "H"))
+        ]
+
+    def alignment_matrix(self, size: int) -> List[List[str]]:
+        """Aligned-looking matrix: equal-length variants with sparse gaps"""
+        rng = self._rng("alignment", size)
+        sequences = self.variable_domains(size, "H")
+        width = max(len(sequence) for sequence in sequences) + 5
+        rows = []
+        for sequence in sequences:
+            row = list(sequence.ljust(width, "-"))
+            for position in rng.sample(range(len(row)), len(row) // 40):
+                row[position] = "-"
+            rows.append(row)
+        return rows
+
+    def numbered_domains(self, size: int) -> List[List[tuple]]:
+        """
+        IMGT-style numberings as returned by ANARCI
+
+        Positions 1-128 with gaps in CDR1 and CDR2 and CDR3 insertions
+        numbered 111A, 111B, ..., 112B, 112A like ANARCI's IMGT scheme.
+        """
+        rng = self._rng("numbered", size)
+        numberings = []
+        for sequence in self.variable_domains(size, "H"):
+            residues = iter(sequence * 2)
+            gaps = set(rng.sample(range(29, 38), rng.randint(0, 4)))
+            gaps |= set(rng.sample(range(57, 65), rng.randint(0, 3)))
+            inserts = rng.randint(0, 6)
+            numbering = []
+            for position in range(1, 129):
+                if position == 112:
+                    numbering.extend(
+                        ((112, chr(65 + i)), next(residues))
+                        for i in reversed(range(inserts // 2))
+                    )
+                residue = "-" if position in gaps else next(residues)
+                numbering.append(((position, " "), residue))
+                if position == 111:
+                    numbering.extend(
+                        ((111, chr(65 + i)), next(residues))
+                        for i in range(inserts - inserts // 2)
+                    )
+            numberings.append(numbering)
+        return numberings
@@ -0,0 +1,216 @@
+"""
+Deterministic stand-ins for the external tools, for offline load tests.
+
+``fake_tools_installed()`` puts fake ``muscle``, ``mafft``, ``clustalo``
+and ``hmmsearch`` executables first on ``PATH`` and replaces ANARCI's
+``run_anarci`` (whose hmmscan output is too intricate to fake on the
+command line) with an in-process stand-in. Every stand-in sleeps for a
+configurable latency, so the service spends its time the way it does with
+the real tools: blocked on a subprocess or a call into ANARCI. The fake
+executables also pay a Python start-up of a few tens of milliseconds.
+
+Latencies are read from ``FAKE_<TOOL>_LATENCY_MS`` (e.g.
+``FAKE_MUSCLE_LATENCY_MS``) falling back to ``FAKE_TOOL_LATENCY_MS``.
+This module only uses the standard library at import time so the fake
+executables can load it without importing the backend.
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+FAKE_EXECUTABLES = ("muscle", "mafft", "clustalo", "hmmsearch")
+
+# Residues numbered by the stand-in for ANARCI: the IMGT V domain length,
+# so variable-only chains have no remainder for isotype detection
+FAKE_DOMAIN_LENGTH = 128
+
+_EXECUTABLE_TEMPLATE = """#!{python} -S
+import sys
+
+sys.path.insert(0, {module_dir!r})
+from fake_tools import fake_tool_main
+
+sys.exit(fake_tool_main({tool!r}, sys.argv[1:]))
+"""
+
+
+def tool_latency(tool: str) -> float:
+    """Latency of a fake tool in seconds"""
+    value = os.environ.get(
+        f"FAKE_{tool.upper()}_LATENCY_MS",
+        os.environ.get("FAKE_TOOL_LATENCY_MS", "0"),
+    )
+    return float(value) / 1000
+
+
+def read_fasta(path: str) -> List[Tuple[str, str]]:
+    records = []
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if line.startswith(">"):
+                records.append((line[1:], []))
+            elif line and records:
+                records[-1][1].append(line)
+    return [(name, "".join(parts)) for name, parts in records]
+
+
+def fake_alignment(records: List[Tuple[str, str]]) -> str:
+    """FASTA of the records right-padded with gaps to equal length"""
+    width = max((len(sequence) for _, sequence in records), default=0)
+    return "".join(
+        f">{name}\n{sequence.ljust(width, '-')}\n"
+        for name, sequence in records
+    )
+
+
+def _option(argv: List[str], *names: str) -> str:
+    for index, arg in enumerate(argv):
+        if arg in names:
+            return argv[index + 1]
+    raise SystemExit(f"missing option {names[0]}")
+
+
+def fake_tool_main(tool: str, argv: List[str]) -> int:
+    """Entry point of the fake executables"""
+    time.sleep(tool_latency(tool))
+    if tool == "muscle":
+        alignment = fake_alignment(
+            read_fasta(_option(argv, "-align", "-super5"))
+        )
+        with open(_option(argv, "-output"), "w") as handle:
+            handle.write(alignment)
+    elif tool == "clustalo":
+        alignment = fake_alignment(read_fasta(_option(argv, "-i")))
+        with open(_option(argv, "-o"), "w") as handle:
+            handle.write(alignment)
+    elif tool == "mafft":
+        sys.stdout.write(fake_alignment(read_fasta(argv[-1])))
+    elif tool == "hmmsearch":
+        hmm_path, fasta_path = argv[-2], argv[-1]
+        target = os.path.basename(hmm_path).rsplit(".", 1)[0]
+        sequence = "".join(sequence for _, sequence in read_fasta(fasta_path))
+        # Deterministic score, so each sequence always gets one isotype
+        score = zlib.crc32(f"{target}:{sequence}".encode()) % 1000 / 10
+        sys.stdout.write(
+            f"Query:       {target}  [M={len(sequence)}]\n"
+            f"  {10 ** -(score / 10):.1e}  {score:.1f}  0.0"
+            f"  1e-30  {score:.1f}  0.0  1.0  1  query\n"
+        )
+    else:
+        raise SystemExit(f"unknown fake tool {tool}")
+    return 0
+
+
+def fake_run_anarci(sequences, scheme="imgt", **kwargs):
+    """
+    Stand-in for ``anarci.run_anarci`` with the same return shape
+
+    The first ``FAKE_DOMAIN_LENGTH`` residues of each sequence are numbered
+    consecutively as one human V domain; chains named like ``light`` are
+    kappa, all others heavy.
+    """
+    time.sleep(tool_latency("anarci"))
+    numbered, alignment_details, hit_tables = [], [], []
+    header = [
+        "id",
+        "description",
+        "evalue",
+        "bitscore",
+        "bias",
+        "query_start",
+        "query_end",
+    ]
+    for name, sequence in sequences:
+        end = min(len(sequence), FAKE_DOMAIN_LENGTH)
+        chain_type = "K" if "light" in name.lower() else "H"
+        numbering = [
+            ((position + 1, " "), residue)
+            for position, residue in enumerate(sequence[:end])
+        ]
+        numbered.append([(numbering, 0, end - 1)])
+        alignment_details.append(
+            [
+                {
+                    "id": f"human_{chain_type}",
+                    "description": "",
+                    "evalue": 1e-60,
+                    "bitscore": 190.0,
+                    "bias": 0.0,
+                    "query_start": 0,
+                    "query_end": end,
+                    "species": "human",
+                    "chain_type": chain_type,
+                    "scheme": scheme,
+                    "query_name": name,
+                    "germlines": {
+                        "v_gene": [("human", f"IG{chain_type}V1-1*01"), 1.0],
+                        "j_gene": [("human", f"IG{chain_type}J1*01"), 1.0],
+                    },
+                }
+            ]
+        )
+        hit_tables.append(
+            [header, [f"human_{chain_type}", "", 1e-60, 190.0, 0.0, 0, end]]
+        )
+    return list(sequences), numbered, alignment_details, hit_tables
+
+
+def write_fake_executables(directory: str) -> None:
+    """Write the fake executables into ``directory``"""
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    for tool in FAKE_EXECUTABLES:
+        path = os.path.join(directory, tool)
+        with open(path, "w") as handle:
+            handle.write(
+                _EXECUTABLE_TEMPLATE.format(
+                    python=sys.executable, module_dir=module_dir, tool=tool
+                )
+            )
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP)
+
+
+@contextmanager
+def fake_tools_installed(
+    latency_ms: float = 0.0, latencies_ms: Dict[str, float] = None
+) -> Iterator[str]:
+    """
+    Use the stand-ins inside the block, yielding their directory
+
+    Args:
+        latency_ms: Latency of every tool call
+        latencies_ms: Per-tool overrides, e.g. ``{"anarci": 200}``
+    """
+    from backend.annotation import anarci_result_processor
+    from backend.msa import numbered_alignment
+
+    environment = {"FAKE_TOOL_LATENCY_MS": str(latency_ms)}
+    for tool, value in (latencies_ms or {}).items():
+        environment[f"FAKE_{tool.upper()}_LATENCY_MS"] = str(value)
+    environment_before = {name: os.environ.get(name) for name in environment}
+    path_before = os.environ.get("PATH", "")
+    run_anarci_before = anarci_result_processor.run_anarci
+
+    with tempfile.TemporaryDirectory(prefix="fake-tools-") as directory:
+        write_fake_executables(directory)
+        os.environ.update(environment)
+        os.environ["PATH"] = directory + os.pathsep + path_before
+        anarci_result_processor.run_anarci = fake_run_anarci
+        numbered_alignment.run_anarci = fake_run_anarci
+        try:
+            yield directory
+        finally:
+            anarci_result_processor.run_anarci = run_anarci_before
+            numbered_alignment.run_anarci = run_anarci_before
+            os.environ["PATH"] = path_before
+            for name, value in environment_before.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
@@ -0,0 +1,418 @@
+"""
+Load-test harness for the API.
+
+``run`` drives the service with ``--concurrency`` concurrent clients for
+``--duration`` seconds and reports throughput and p50/p95/p99 latency per
+scenario. A separate probe requests ``/health`` every ``--probe-interval``
+seconds; since the health check does no work, its latency rising with load
+means the event loop is being blocked.
+
+``serve --fake-tools`` starts the API with the stand-ins of
+``backend.benchmarks.fake_tools`` instead of MUSCLE/MAFFT/HMMER/ANARCI, so
+load tests need none of them; ``run --spawn`` does that in a subprocess.
+
+Usage (from the ``app`` directory)::
+
+    python -m backend.benchmarks.loadtest run --spawn --latency-ms 50
+    python -m backend.benchmarks.loadtest serve --fake-tools --port 8000
+    python -m backend.benchmarks.loadtest run --url http://localhost:8000 \\
+        --concurrency 32 --duration 60 --output loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.benchmarks.datasets import SyntheticDataset
+
+HEALTH_PROBE = "health (probe)"
+JOB_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class Scenario:
+    """
+    One kind of request
+
+    ``body`` builds the JSON body of the i-th request; ``job`` scenarios
+    poll the returned background job and are timed until it finishes.
+    """
+
+    name: str
+    path: str
+    body: Callable[[int], Dict[str, Any]]
+    job: bool = False
+
+
+def build_scenarios(
+    dataset: SyntheticDataset, batch: int = 1, msa_size: int = 8
+) -> Dict[str, Scenario]:
+    """Scenarios over a pool of synthetic antibodies"""
+    pool = 64
+    biologics = list(dataset.biologics(pool).items())
+    heavy = dataset.variable_domains(pool + max(msa_size, 20), "H")
+
+    def annotate(i: int) -> Dict[str, Any]:
+        return {
+            "sequences": [
+                {"name": name, **chains}
+                for name, chains in (
+                    biologics[(i + j) % pool] for j in range(batch)
+                )
+            ],
+            "numbering_scheme": "imgt",
+        }
+
+    def msa(size: int) -> Callable[[int], Dict[str, Any]]:
+        def body(i: int) -> Dict[str, Any]:
+            start = i % pool
+            return {
+                "sequences": [
+                    {"name": f"seq_{j}", "heavy_chain": sequence}
+                    for j, sequence in enumerate(heavy[start : start + size])
+                ],
+                "alignment_method": "muscle",
+                "numbering_scheme": "imgt",
+            }
+
+        return body
+
+    return {
+        "annotate": Scenario("annotate", "/api/v2/annotate", annotate),
+        "create-msa": Scenario(
+            "create-msa", "/api/v2/msa-viewer/create-msa", msa(msa_size)
+        ),
+        # Above ten sequences MSAs run as background jobs
+        "create-msa-job": Scenario(
+            "create-msa-job",
+            "/api/v2/msa-viewer/create-msa",
+            msa(20),
+            job=True,
+        ),
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted ``values``"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+class Recorder:
+    """Latencies and errors per scenario"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        if ok:
+            self.latencies[name].append(seconds)
+        else:
+            self.errors[name] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[name])
+            report[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "throughput_rps": len(values) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": (values[-1] if values else 0.0) * 1000,
+            }
+        return report
+
+
+async def _wait_for_job(client: httpx.AsyncClient, job_id: str) -> bool:
+    while True:
+        response = await client.get(f"/api/v2/msa-viewer/job/{job_id}")
+        if response.status_code != 200:
+            return False
+        status = response.json()["data"]["status"]
+        if status in ("completed", "failed"):
+            return status == "completed"
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    scenarios: List[Scenario],
+    recorder: Recorder,
+    deadline: float,
+    offset: int,
+) -> None:
+    i = offset
+    while time.monotonic() < deadline:
+        scenario = scenarios[i % len(scenarios)]
+        start = time.perf_counter()
+        try:
+            response = await client.post(scenario.path, json=scenario.body(i))
+            ok = response.status_code == 200
+            if ok and scenario.job:
+                data = response.json()["data"]
+                ok = await _wait_for_job(client, data["job_id"])
+        except httpx.HTTPError:
+            ok = False
+        recorder.record(scenario.name, time.perf_counter() - start, ok)
+        i += 1
+
+
+async def _probe_loop(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    deadline: float,
+    interval: float,
+) -> None:
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            ok = (await client.get("/health")).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        recorder.record(HEALTH_PROBE, time.perf_counter() - start, ok)
+        await asyncio.sleep(interval)
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenarios: List[Scenario],
+    concurrency: int = 8,
+    duration: float = 30.0,
+    probe_interval: float = 0.25,
+) -> Dict[str, Any]:
+    """
+    Run ``concurrency`` clients cycling through ``scenarios``
+
+    Returns the per-scenario report; requests still in flight at the
+    deadline are allowed to finish and are counted.
+    """
+    recorder = Recorder()
+    start = time.monotonic()
+    deadline = start + duration
+    tasks = [
+        _client_loop(client, scenarios, recorder, deadline, offset)
+        for offset in range(concurrency)
+    ]
+    if probe_interval > 0:
+        tasks.insert(
+            0, _probe_loop(client, recorder, deadline, probe_interval)
+        )
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - start
+    return {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "scenarios": recorder.report(elapsed),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['concurrency']} clients for {report['duration_s']:.1f} s",
+        f"{'scenario':<18}{'requests':>9}{'errors':>8}{'req/s':>9}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for name, row in report["scenarios"].items():
+        lines.append(
+            f"{name:<18}{row['requests']:>9}{row['errors']:>8}"
+            f"{row['throughput_rps']:>9.2f}{row['p50_ms']:>10.1f}"
+            f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            f"{row['max_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spawn_server(
+    latency_ms: float, workers: int
+) -> Tuple[subprocess.Popen, str]:
+    """Start ``serve --fake-tools`` in a subprocess and wait until healthy"""
+    port = _free_port()
+    app_dir = os.path.join(os.path.dirname(__file__), "..", "..")
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "backend.benchmarks.loadtest",
+            "serve",
+            "--fake-tools",
+            "--latency-ms",
+            str(latency_ms),
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        cwd=os.path.abspath(app_dir),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Load-test server exited during startup")
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Load-test server did not become healthy")
+
+
+def serve(args) -> None:
+    import uvicorn
+
+    from backend.benchmarks.fake_tools import fake_tools_installed
+
+    if not args.fake_tools:
+        uvicorn.run(
+            "backend.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+        )
+        return
+    with fake_tools_installed(args.latency_ms):
+        if args.workers > 1:
+            # Workers import the app afresh, so the factory installs the
+            # ANARCI stand-in in each; the fake executables are found
+            # through the PATH they inherit
+            uvicorn.run(
+                "backend.benchmarks.loadtest:fake_tools_app",
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                factory=True,
+            )
+        else:
+            from backend.main import app
+
+            uvicorn.run(app, host=args.host, port=args.port)
+
+
+def fake_tools_app():
+    """App factory for multi-worker ``serve --fake-tools``"""
+    from backend.annotation import anarci_result_processor
+    from backend.benchmarks.fake_tools import fake_run_anarci
+    from backend.main import app
+
+    anarci_result_processor.run_anarci = fake_run_anarci
+    return app
+
+
+def run(args) -> Dict[str, Any]:
+    scenarios_by_name = build_scenarios(
+        SyntheticDataset(seed=args.seed), args.batch, args.msa_size
+    )
+    scenarios = [scenarios_by_name[name] for name in args.scenarios]
+    process, url = None, args.url
+    if args.spawn:
+        process, url = _spawn_server(args.latency_ms, args.workers)
+
+    async def drive():
+        limits = httpx.Limits(max_connections=args.concurrency + 1)
+        async with httpx.AsyncClient(
+            base_url=url, timeout=300, limits=limits
+        ) as client:
+            return await run_load(
+                client,
+                scenarios,
+                args.concurrency,
+                args.duration,
+                args.probe_interval,
+            )
+
+    try:
+        report = asyncio.run(drive())
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    report["url"] = url
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Report written to {args.output}")
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Start the API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=1)
+    serve_parser.add_argument(
+        "--fake-tools",
+        action="store_true",
+        help="Replace external tools with deterministic stand-ins",
+    )
+    serve_parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=50.0,
+        help="Latency of each fake tool call",
+    )
+
+    run_parser = commands.add_parser("run", help="Drive load at the API")
+    run_parser.add_argument("--url", default="http://127.0.0.1:8000")
+    run_parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="Start a fake-tools server for the run",
+    )
+    run_parser.add_argument("--latency-ms", type=float, default=50.0)
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--duration", type=float, default=30.0)
+    run_parser.add_argument("--probe-interval", type=float, default=0.25)
+    run_parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=["annotate", "create-msa"],
+        choices=["annotate", "create-msa", "create-msa-job"],
+    )
+    run_parser.add_argument(
+        "--batch", type=int, default=1, help="Antibodies per annotate call"
+    )
+    run_parser.add_argument(
+        "--msa-size", type=int, default=8, help="Sequences per create-msa"
+    )
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="Write the report as JSON")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args)
+    else:
+        return run(args)
+
+
+if __name__ == "__main__":
+    main()
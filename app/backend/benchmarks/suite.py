@@ -0,0 +1,351 @@
+"""
+Benchmark suite for the annotation, alignment and MSA hot paths.
+
+Every case runs on a ``SyntheticDataset`` at each requested size (10, 100,
+1k and 10k by default) and records the best, median and mean of
+``--repeat`` runs. Cases that call ANARCI or HMMER once per sequence are
+limited to 100 sequences unless ``--full`` is given, and are skipped when
+the tool is not installed. Results are written as JSON so runs can be
+compared over time with ``--compare``.
+
+Usage (from the ``app`` directory)::
+
+    python -m backend.benchmarks.suite
+    python -m backend.benchmarks.suite --cases pssm_calculator --sizes 1000
+    python -m backend.benchmarks.suite --compare previous.json
+    python -m backend.benchmarks.suite --cases region_annotation --sizes 100000
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.annotation.alignment_engine import AlignmentEngine
+from backend.annotation.anarci_result_processor import AnarciResultProcessor
+from backend.annotation.antibody_region_annotator import (
+    AntibodyRegionAnnotator,
+)
+from backend.annotation.germline_index import get_germline_index
+from backend.annotation.isotype_hmmer import detect_isotype_with_hmmer
+from backend.benchmarks.datasets import SyntheticDataset
+from backend.models.models import AlignmentMethod
+from backend.msa.guide_tree import guide_tree
+from backend.msa.msa_engine import MSAEngine
+from backend.msa.numbered_alignment import numbered_alignment
+from backend.msa.pssm_calculator import PSSMCalculator
+from backend.utils.types import Domain
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+class BiopythonFallbackMSAEngine(MSAEngine):
+    """MSAEngine that behaves as if MUSCLE were not installed"""
+
+    def _align_muscle(
+        self, sequences: List[str], fast: bool = False
+    ) -> List[str]:
+        raise FileNotFoundError("muscle")
+
+    def _muscle_biopython_wrapper(self, sequences: List[str]) -> List[str]:
+        raise FileNotFoundError("muscle")
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    One benchmarked operation
+
+    ``setup`` builds the input for a size outside the timed region and
+    ``run`` is the timed call.
+    """
+
+    name: str
+    setup: Callable[[SyntheticDataset, int], Any]
+    run: Callable[[Any], Any]
+    max_size: Optional[int] = None
+    requires: Optional[str] = None
+
+
+def _pairwise(method: AlignmentMethod) -> BenchmarkCase:
+    engine = AlignmentEngine()
+
+    def setup(dataset: SyntheticDataset, size: int):
+        domains = dataset.variable_domains(size * 2, "H")
+        return list(zip(domains[::2], domains[1::2]))
+
+    def run(pairs):
+        for pair in pairs:
+            engine.align_sequences(list(pair), method)
+
+    return BenchmarkCase(f"alignment_engine_{method.value}", setup, run)
+
+
+def _numbered_domains(dataset: SyntheticDataset, size: int) -> List[Domain]:
+    return [
+        Domain(
+            sequence="",
+            numbering=(numbering, 0, len(numbering) - 1),
+            alignment_details={"chain_type": "H"},
+            hit_table=None,
+            isotype="H",
+            germlines=None,
+            species="human",
+        )
+        for numbering in dataset.numbered_domains(size)
+    ]
+
+
+def _annotate_regions(domains: List[Domain]) -> None:
+    for domain in domains:
+        AntibodyRegionAnnotator.annotate_domain(domain, scheme="imgt")
+
+
+def _numbered_sequences(dataset: SyntheticDataset, size: int):
+    numberings = dataset.numbered_domains(size)
+    sequences = [
+        "".join(residue for _, residue in numbering if residue != "-")
+        for numbering in numberings
+    ]
+    domains = [
+        (numbering, 0, len(sequence) - 1)
+        for numbering, sequence in zip(numberings, sequences)
+    ]
+    return sequences, domains
+
+
+def _matrix(dataset: SyntheticDataset, size: int):
+    return dataset.alignment_matrix(size)
+
+
+CASES: List[BenchmarkCase] = [
+    BenchmarkCase(
+        "anarci_result_processor",
+        lambda dataset, size: dataset.biologics(size),
+        lambda input_dict: AnarciResultProcessor(
+            input_dict, numbering_scheme="imgt"
+        ),
+        max_size=100,
+        requires="hmmscan",
+    ),
+    BenchmarkCase(
+        "detect_isotype_with_hmmer",
+        lambda dataset, size: dataset.constant_domains(size),
+        lambda sequences: [detect_isotype_with_hmmer(s) for s in sequences],
+        max_size=100,
+        requires="hmmsearch",
+    ),
+    BenchmarkCase(
+        "germline_index_sequences",
+        lambda dataset, size: [
+            ("H", None, domain)
+            for domain in dataset.variable_domains(size, "H")
+        ],
+        lambda domains: get_germline_index().assign_batch(domains),
+    ),
+    BenchmarkCase("region_annotation", _numbered_domains, _annotate_regions),
+    _pairwise(AlignmentMethod.PAIRWISE_GLOBAL),
+    _pairwise(AlignmentMethod.PAIRWISE_LOCAL),
+    BenchmarkCase(
+        "msa_engine_create_msa_biopython",
+        lambda dataset, size: dataset.named_sequences(size),
+        lambda sequences: BiopythonFallbackMSAEngine().create_msa(
+            sequences, AlignmentMethod.PAIRWISE_GLOBAL
+        ),
+        max_size=1000,
+    ),
+    BenchmarkCase(
+        "msa_engine_create_msa_clustered",
+        lambda dataset, size: dataset.named_sequences(size),
+        lambda sequences: BiopythonFallbackMSAEngine().create_msa(
+            sequences, AlignmentMethod.PAIRWISE_GLOBAL, cluster_identity=0.9
+        ),
+        max_size=1000,
+    ),
+    BenchmarkCase(
+        "msa_engine_create_msa_numbered",
+        lambda dataset, size: dataset.named_sequences(size),
+        lambda sequences: MSAEngine().create_msa(
+            sequences, AlignmentMethod.CUSTOM_ANTIBODY
+        ),
+        max_size=1000,
+        requires="hmmscan",
+    ),
+    BenchmarkCase(
+        "numbered_alignment",
+        _numbered_sequences,
+        lambda state: numbered_alignment(*state),
+    ),
+    BenchmarkCase(
+        "guide_tree",
+        lambda dataset, size: [
+            sequence for _, sequence in dataset.named_sequences(size)
+        ],
+        guide_tree,
+    ),
+    BenchmarkCase(
+        "pssm_calculator",
+        _matrix,
+        lambda matrix: PSSMCalculator().calculate_pssm(matrix),
+    ),
+    BenchmarkCase(
+        "generate_consensus",
+        _matrix,
+        lambda matrix: MSAEngine()._generate_consensus(matrix),
+    ),
+]
+
+
+def time_case(
+    case: BenchmarkCase, dataset: SyntheticDataset, size: int, repeat: int
+) -> Dict[str, Any]:
+    """Time ``repeat`` runs of a case at one size"""
+    state = case.setup(dataset, size)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(state)
+        timings.append(time.perf_counter() - start)
+    return {
+        "case": case.name,
+        "size": size,
+        "best_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+        "runs": repeat,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(__file__),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    cases: List[BenchmarkCase],
+    sizes: List[int],
+    repeat: int = 3,
+    seed: int = 0,
+    full: bool = False,
+) -> Dict[str, Any]:
+    """Run cases at every size, returning the JSON-serialisable report"""
+    dataset = SyntheticDataset(seed=seed)
+    results, skipped = [], []
+    for case in cases:
+        for size in sizes:
+            reason = None
+            if case.requires and shutil.which(case.requires) is None:
+                reason = f"{case.requires} not installed"
+            elif case.max_size and size > case.max_size and not full:
+                reason = f"size above {case.max_size} (use --full)"
+            if reason:
+                skipped.append(
+                    {"case": case.name, "size": size, "reason": reason}
+                )
+                continue
+            result = time_case(case, dataset, size, repeat)
+            results.append(result)
+            print(
+                f"{case.name:<36} {size:>6} "
+                f"{result['best_s'] * 1000:12.2f} ms",
+                flush=True,
+            )
+    return {
+        "metadata": {
+            "created_at": datetime.now().isoformat(),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(report: Dict[str, Any], previous: Dict[str, Any]) -> List[str]:
+    """Lines comparing the best times of two reports, case by case"""
+    before = {(r["case"], r["size"]): r for r in previous["results"]}
+    lines = []
+    for result in report["results"]:
+        old = before.get((result["case"], result["size"]))
+        if old is None:
+            continue
+        ratio = result["best_s"] / old["best_s"] if old["best_s"] else 0.0
+        lines.append(
+            f"{result['case']:<36} {result['size']:>6} "
+            f"{old['best_s'] * 1000:12.2f} ms -> "
+            f"{result['best_s'] * 1000:12.2f} ms  x{ratio:.2f}"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=[case.name for case in CASES],
+        help="Cases to run (default: all)",
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--full", action="store_true", help="Ignore per-case size limits"
+    )
+    parser.add_argument(
+        "--output",
+        help="Results file (default: benchmarks/results/<time>-<commit>.json)",
+    )
+    parser.add_argument("--compare", help="Earlier results file to compare")
+    args = parser.parse_args(argv)
+
+    cases = [
+        case for case in CASES if not args.cases or case.name in args.cases
+    ]
+    report = run_suite(cases, args.sizes, args.repeat, args.seed, args.full)
+    for skip in report["skipped"]:
+        print(f"skipped {skip['case']} at {skip['size']}: {skip['reason']}")
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        commit = report["metadata"]["git_commit"] or "unknown"
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit}.json")
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            previous = json.load(handle)
+        print(f"Compared with {args.compare}:")
+        print("\n".join(compare(report, previous)))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -22,9 +22,88 @@ ISOTYPE_HMM_DIR = os.getenv(
     "ISOTYPE_HMM_DIR", os.path.join(DATA_DIR, "isotype_hmms")
 )
 
+# Germline assignment of IMGT-numbered domains: "anarci" lets ANARCI assign
+# germlines itself, "index" opts in to the faster in-memory germline index
+# (annotation.germline_index), whose assignments can differ from ANARCI's.
+# Other numbering schemes always use ANARCI
+GERMLINE_ASSIGNMENT = os.getenv("GERMLINE_ASSIGNMENT", "anarci").lower()
+
 # Environment
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
+# Dataset storage backend: "memory" keeps everything on the Python heap,
+# "mmap" packs sequences to disk and memory-maps them, "sqlite" keeps
+# datasets and results in one database file shared by all workers
+DATA_STORE_BACKEND = os.getenv("DATA_STORE_BACKEND", "memory").lower()
+DATA_STORE_DIR = os.getenv(
+    "DATA_STORE_DIR", os.path.join(DATA_DIR, "datastore")
+)
+DATA_STORE_SQLITE_PATH = os.getenv(
+    "DATA_STORE_SQLITE_PATH", os.path.join(DATA_STORE_DIR, "datastore.db")
+)
+
+# Job status backend: "memory" or "sqlite". Jobs must be shared as well when
+# running several workers, so this follows a sqlite data store by default
+JOB_STORE_BACKEND = os.getenv(
+    "JOB_STORE_BACKEND",
+    "sqlite" if DATA_STORE_BACKEND == "sqlite" else "memory",
+).lower()
+
+# MSAs created while the request waits are kept apart from the job list so
+# sequences can be added to them later: the MAX_STORED_MSAS most recent
+# ones, each for at most STORED_MSA_TTL_SECONDS
+MAX_STORED_MSAS = int(os.getenv("MAX_STORED_MSAS", "100"))
+STORED_MSA_TTL_SECONDS = int(
+    os.getenv("STORED_MSA_TTL_SECONDS", str(24 * 3600))
+)
+
+# Upload limits: files are read in chunks of UPLOAD_CHUNK_SIZE bytes and
+# rejected once they exceed MAX_UPLOAD_BYTES, or once compressed uploads
+# expand beyond MAX_DECOMPRESSED_BYTES
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(1024**3)))
+MAX_DECOMPRESSED_BYTES = int(
+    os.getenv("MAX_DECOMPRESSED_BYTES", str(4 * 1024**3))
+)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024**2)))
+# Upper bound on per-sequence validation messages returned for one upload
+MAX_REPORTED_VALIDATION_ERRORS = int(
+    os.getenv("MAX_REPORTED_VALIDATION_ERRORS", "1000")
+)
+
+# Response compression: bodies of at least COMPRESSION_MIN_BYTES are sent
+# brotli (if the brotli package is installed) or gzip compressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_COMPRESSION_LEVEL = int(os.getenv("GZIP_COMPRESSION_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Rows per record batch (Parquet row group) in columnar annotation exports
+ANNOTATION_EXPORT_BATCH_ROWS = int(
+    os.getenv("ANNOTATION_EXPORT_BATCH_ROWS", "10000")
+)
+
+# Large MSA inputs (see msa/large_input.py): above MSA_FAST_SEQUENCES
+# sequences or MSA_FAST_RESIDUES residues the aligners switch to their fast
+# settings; above MSA_CHUNKED_SEQUENCES or MSA_CHUNKED_RESIDUES the input is
+# aligned in chunks of at most MSA_CHUNK_SIZE sequences on MSA_WORKERS
+# processes (0: one per CPU) and the chunks are merged by profile alignment
+MSA_FAST_SEQUENCES = int(os.getenv("MSA_FAST_SEQUENCES", "2000"))
+MSA_FAST_RESIDUES = int(os.getenv("MSA_FAST_RESIDUES", "1000000"))
+MSA_CHUNKED_SEQUENCES = int(os.getenv("MSA_CHUNKED_SEQUENCES", "20000"))
+MSA_CHUNKED_RESIDUES = int(os.getenv("MSA_CHUNKED_RESIDUES", "10000000"))
+MSA_CHUNK_SIZE = int(os.getenv("MSA_CHUNK_SIZE", "1000"))
+MSA_WORKERS = int(os.getenv("MSA_WORKERS", "0"))
+
+# Seconds an external aligner (MUSCLE, MAFFT, Clustal Omega) may run for an
+# alignment request before it is stopped
+ALIGNER_TIMEOUT_SECONDS = int(os.getenv("ALIGNER_TIMEOUT_SECONDS", "300"))
+
+# Logging: LOG_LEVEL applies to all backend loggers, LOG_LEVELS overrides it
+# per module ("backend.annotation=DEBUG,backend.msa=WARNING") and
+# LOG_FORMAT is "text" or "json" (one object per line)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
 # Database Configuration
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", "5433"))
@@ -1,16 +1,161 @@
+import json
+import mmap
+from array import array
+import os
+import shutil
+import sqlite3
+import threading
 import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
-from backend.logger import logger
+import numpy as np
+
+from backend.config import (
+    DATA_STORE_BACKEND,
+    DATA_STORE_DIR,
+    DATA_STORE_SQLITE_PATH,
+)
+from backend.logger import get_logger
 from backend.models.models import (
     DatasetInfo,
     AlignmentResult,
     AnnotationResult,
 )
 
+logger = get_logger(__name__)
+
+
+class DatasetWriter:
+    """
+    Builds a new dataset one sequence at a time.
+
+    The dataset only becomes visible once :meth:`commit` is called; leaving
+    a ``with`` block without committing discards it. This implementation
+    buffers sequences and hands them to ``create_dataset``; disk-backed
+    stores override it to write sequences out as they arrive.
+    """
+
+    def __init__(
+        self, store: "BaseDataStore", metadata: Optional[Dict[str, Any]]
+    ):
+        self.store = store
+        self.metadata = metadata
+        self.sequence_count = 0
+        self.closed = False
+        self._sequences: List[str] = []
+
+    def add(self, sequence: str) -> None:
+        """Append a sequence to the dataset"""
+        self._sequences.append(sequence)
+        self.sequence_count += 1
+
+    def commit(self) -> str:
+        """Finish the dataset and return its ID"""
+        self.closed = True
+        return self.store.create_dataset(self._sequences, self.metadata)
+
+    def abort(self) -> None:
+        """Discard everything written so far"""
+        self.closed = True
+        self._sequences = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.closed:
+            self.abort()
+
+
+class BaseDataStore(ABC):
+    """
+    Interface for dataset and result storage.
+
+    The API only talks to the module-level ``data_store`` through this
+    interface, so the in-process store can be swapped for one shared between
+    worker processes without touching the endpoints.
+    """
+
+    @abstractmethod
+    def create_dataset(
+        self, sequences: List[str], metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Create a new dataset and return its ID"""
+
+    @abstractmethod
+    def get_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Get dataset by ID"""
+
+    @abstractmethod
+    def update_dataset_status(self, dataset_id: str, status: str) -> bool:
+        """Update dataset status"""
+
+    @abstractmethod
+    def get_sequences(self, dataset_id: str) -> Optional[Sequence]:
+        """Get sequences for a dataset"""
+
+    @abstractmethod
+    def store_alignment_result(
+        self, dataset_id: str, alignment_result: AlignmentResult
+    ) -> bool:
+        """Store alignment result"""
+
+    @abstractmethod
+    def get_alignment_result(
+        self, dataset_id: str
+    ) -> Optional[AlignmentResult]:
+        """Get alignment result for a dataset"""
+
+    @abstractmethod
+    def store_annotation_result(
+        self, dataset_id: str, annotation_result: AnnotationResult
+    ) -> bool:
+        """Store annotation result"""
 
-class DataStore:
+    @abstractmethod
+    def get_annotation_result(
+        self, dataset_id: str
+    ) -> Optional[AnnotationResult]:
+        """Get annotation result for a dataset"""
+
+    @abstractmethod
+    def delete_dataset(self, dataset_id: str) -> bool:
+        """Delete dataset and all associated results"""
+
+    @abstractmethod
+    def list_datasets(self) -> List[DatasetInfo]:
+        """List all datasets"""
+
+    @abstractmethod
+    def get_dataset_statistics(self) -> Dict[str, Any]:
+        """Get overall statistics"""
+
+    def open_dataset_writer(
+        self, metadata: Optional[Dict[str, Any]] = None
+    ) -> DatasetWriter:
+        """Start a dataset that is filled incrementally, e.g. from an upload"""
+        return DatasetWriter(self, metadata)
+
+    def get_dataset_info(self, dataset_id: str) -> Optional[DatasetInfo]:
+        """Get dataset info as DatasetInfo object"""
+        dataset = self.get_dataset(dataset_id)
+        if not dataset:
+            return None
+
+        return DatasetInfo(
+            dataset_id=dataset["dataset_id"],
+            sequence_count=dataset["sequence_count"],
+            created_at=dataset["created_at"],
+            status=dataset["status"],
+        )
+
+
+class DataStore(BaseDataStore):
     """Simple in-memory data store for managing datasets and results"""
 
     def __init__(self):
@@ -43,7 +188,7 @@ class DataStore:
         }
 
         logger.info(
-            f"Created dataset {dataset_id} with {len(sequences)} sequences"
+            "Created dataset %s with %d sequences", dataset_id, len(sequences)
         )
         return dataset_id
 
@@ -51,19 +196,6 @@ class DataStore:
         """Get dataset by ID"""
         return self.datasets.get(dataset_id)
 
-    def get_dataset_info(self, dataset_id: str) -> Optional[DatasetInfo]:
-        """Get dataset info as DatasetInfo object"""
-        dataset = self.get_dataset(dataset_id)
-        if not dataset:
-            return None
-
-        return DatasetInfo(
-            dataset_id=dataset["dataset_id"],
-            sequence_count=dataset["sequence_count"],
-            created_at=dataset["created_at"],
-            status=dataset["status"],
-        )
-
     def update_dataset_status(self, dataset_id: str, status: str) -> bool:
         """Update dataset status"""
         if dataset_id not in self.datasets:
@@ -126,7 +258,7 @@ class DataStore:
         if dataset_id in self.annotations:
             del self.annotations[dataset_id]
 
-        logger.info(f"Deleted dataset {dataset_id}")
+        logger.info("Deleted dataset %s", dataset_id)
         return True
 
     def list_datasets(self) -> List[DatasetInfo]:
@@ -162,5 +294,747 @@ class DataStore:
         }
 
 
+class PackedSequences(Sequence):
+    """
+    Read-only view over a packed sequence file.
+
+    Residues of all sequences are concatenated into a single file and an
+    offsets array marks where each sequence starts, so sequence ``i`` is
+    ``residues[offsets[i]:offsets[i + 1]]``. Both files are memory-mapped;
+    sequences are only decoded when they are accessed.
+    """
+
+    def __init__(self, residues_path: str, offsets_path: str):
+        self._offsets = np.load(offsets_path, mmap_mode="r")
+        self._file = open(residues_path, "rb")
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._residues = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        else:
+            # mmap cannot map an empty file
+            self._residues = b""
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("sequence index out of range")
+        start = int(self._offsets[index])
+        end = int(self._offsets[index + 1])
+        return self._residues[start:end].decode("ascii")
+
+    def close(self):
+        """Release the memory maps and the underlying file handle"""
+        if isinstance(self._residues, mmap.mmap):
+            self._residues.close()
+        self._file.close()
+        self._offsets = np.zeros(1, dtype=np.int64)
+
+
+class PackedSequencesWriter:
+    """Streams sequences into the files read by :class:`PackedSequences`"""
+
+    def __init__(self, residues_path: str, offsets_path: str):
+        self.offsets_path = offsets_path
+        self._residues_file = open(residues_path, "wb")
+        self._offsets = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def add(self, sequence: str) -> None:
+        encoded = sequence.encode("ascii")
+        self._residues_file.write(encoded)
+        self._offsets.append(self._offsets[-1] + len(encoded))
+
+    def close(self) -> None:
+        """Flush residues and write the offsets array"""
+        self._residues_file.close()
+        np.save(self.offsets_path, np.frombuffer(self._offsets, np.int64))
+
+
+class MmapDatasetWriter(DatasetWriter):
+    """Writes residues straight to disk as sequences are added"""
+
+    def __init__(
+        self, store: "MmapDataStore", metadata: Optional[Dict[str, Any]]
+    ):
+        super().__init__(store, metadata)
+        self.dataset_id = str(uuid.uuid4())
+        os.makedirs(store._dataset_dir(self.dataset_id))
+        self._packed = PackedSequencesWriter(
+            store._path(self.dataset_id, store.RESIDUES_FILE),
+            store._path(self.dataset_id, store.OFFSETS_FILE),
+        )
+
+    def add(self, sequence: str) -> None:
+        self._packed.add(sequence)
+        self.sequence_count += 1
+
+    def commit(self) -> str:
+        self.closed = True
+        self._packed.close()
+        # The metadata file is written last and marks the dataset as complete
+        self.store._write_metadata(
+            self.dataset_id,
+            {
+                "dataset_id": self.dataset_id,
+                "sequence_count": self.sequence_count,
+                "created_at": datetime.now().isoformat(),
+                "status": "uploaded",
+                "metadata": self.metadata or {},
+            },
+        )
+        logger.info(
+            "Created dataset %s with %d sequences in %s",
+            self.dataset_id,
+            self.sequence_count,
+            self.store.root_dir,
+        )
+        return self.dataset_id
+
+    def abort(self) -> None:
+        self.closed = True
+        self._packed.close()
+        shutil.rmtree(
+            self.store._dataset_dir(self.dataset_id), ignore_errors=True
+        )
+
+
+class MmapDataStore(BaseDataStore):
+    """
+    Disk-backed data store that keeps sequences off the Python heap.
+
+    Every dataset lives in its own directory under ``root_dir``::
+
+        <dataset_id>/dataset.json     dataset metadata and status
+        <dataset_id>/residues.bin     concatenated residues
+        <dataset_id>/offsets.npy      int64 offsets, one per sequence + 1
+        <dataset_id>/alignment.json   serialised AlignmentResult
+        <dataset_id>/annotation.json  serialised AnnotationResult
+
+    ``get_sequences`` returns a :class:`PackedSequences` view backed by
+    read-only memory maps, so several worker processes pointing at the same
+    ``root_dir`` share the same page-cache pages and see each other's
+    datasets.
+    """
+
+    DATASET_FILE = "dataset.json"
+    RESIDUES_FILE = "residues.bin"
+    OFFSETS_FILE = "offsets.npy"
+    ALIGNMENT_FILE = "alignment.json"
+    ANNOTATION_FILE = "annotation.json"
+    # Most memory-mapped datasets kept open, least recently read dropped
+    MAX_OPEN_VIEWS = 32
+
+    def __init__(self, root_dir: str = DATA_STORE_DIR):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._views: "OrderedDict[str, PackedSequences]" = OrderedDict()
+        self._views_lock = threading.Lock()
+
+    def _dataset_dir(self, dataset_id: str) -> str:
+        # Dataset IDs are UUIDs; reject anything that could escape root_dir
+        if not dataset_id or os.path.basename(dataset_id) != dataset_id:
+            raise ValueError(f"Invalid dataset ID: {dataset_id}")
+        return os.path.join(self.root_dir, dataset_id)
+
+    def _path(self, dataset_id: str, filename: str) -> str:
+        return os.path.join(self._dataset_dir(dataset_id), filename)
+
+    def _exists(self, dataset_id: str) -> bool:
+        try:
+            return os.path.exists(self._path(dataset_id, self.DATASET_FILE))
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _write_atomic(path: str, content: str) -> None:
+        """Write a file via rename so readers never see partial content"""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _read_metadata(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        if not self._exists(dataset_id):
+            return None
+        try:
+            with open(self._path(dataset_id, self.DATASET_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # Deleted by another worker between the check and the read
+            return None
+
+    def _write_metadata(self, dataset_id: str, metadata: Dict[str, Any]):
+        self._write_atomic(
+            self._path(dataset_id, self.DATASET_FILE), json.dumps(metadata)
+        )
+
+    def _get_view(self, dataset_id: str) -> PackedSequences:
+        with self._views_lock:
+            view = self._views.get(dataset_id)
+            if view is not None:
+                self._views.move_to_end(dataset_id)
+                return view
+            view = PackedSequences(
+                self._path(dataset_id, self.RESIDUES_FILE),
+                self._path(dataset_id, self.OFFSETS_FILE),
+            )
+            self._views[dataset_id] = view
+            # Evicted views are not closed, as a caller may still be reading
+            # them; their file and maps are released once garbage collected
+            while len(self._views) > self.MAX_OPEN_VIEWS:
+                self._views.popitem(last=False)
+        return view
+
+    def create_dataset(
+        self, sequences: List[str], metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Pack sequences to disk and create a new dataset"""
+        with self.open_dataset_writer(metadata) as writer:
+            for sequence in sequences:
+                writer.add(sequence)
+            return writer.commit()
+
+    def open_dataset_writer(
+        self, metadata: Optional[Dict[str, Any]] = None
+    ) -> MmapDatasetWriter:
+        """Start a dataset whose residues are written to disk as they arrive"""
+        return MmapDatasetWriter(self, metadata)
+
+    def get_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Get dataset by ID, with sequences as a lazy memory-mapped view"""
+        dataset = self._read_metadata(dataset_id)
+        if dataset is None:
+            return None
+        dataset["sequences"] = self._get_view(dataset_id)
+        return dataset
+
+    def update_dataset_status(self, dataset_id: str, status: str) -> bool:
+        """Update dataset status"""
+        dataset = self._read_metadata(dataset_id)
+        if dataset is None:
+            return False
+
+        dataset["status"] = status
+        self._write_metadata(dataset_id, dataset)
+        return True
+
+    def get_sequences(self, dataset_id: str) -> Optional[PackedSequences]:
+        """Get a lazily sliced view over the sequences of a dataset"""
+        if not self._exists(dataset_id):
+            return None
+        return self._get_view(dataset_id)
+
+    def store_alignment_result(
+        self, dataset_id: str, alignment_result: AlignmentResult
+    ) -> bool:
+        """Serialise alignment result next to the dataset"""
+        if not self._exists(dataset_id):
+            return False
+
+        self._write_atomic(
+            self._path(dataset_id, self.ALIGNMENT_FILE),
+            alignment_result.model_dump_json(),
+        )
+        self.update_dataset_status(dataset_id, "aligned")
+        return True
+
+    def get_alignment_result(
+        self, dataset_id: str
+    ) -> Optional[AlignmentResult]:
+        """Load alignment result for a dataset"""
+        if not self._exists(dataset_id):
+            return None
+        path = self._path(dataset_id, self.ALIGNMENT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return AlignmentResult.model_validate_json(f.read())
+
+    def store_annotation_result(
+        self, dataset_id: str, annotation_result: AnnotationResult
+    ) -> bool:
+        """Serialise annotation result next to the dataset"""
+        if not self._exists(dataset_id):
+            return False
+
+        self._write_atomic(
+            self._path(dataset_id, self.ANNOTATION_FILE),
+            annotation_result.model_dump_json(),
+        )
+        self.update_dataset_status(dataset_id, "annotated")
+        return True
+
+    def get_annotation_result(
+        self, dataset_id: str
+    ) -> Optional[AnnotationResult]:
+        """Load annotation result for a dataset"""
+        if not self._exists(dataset_id):
+            return None
+        path = self._path(dataset_id, self.ANNOTATION_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return AnnotationResult.model_validate_json(f.read())
+
+    def delete_dataset(self, dataset_id: str) -> bool:
+        """Delete dataset directory and all associated results"""
+        # Dropped even if another worker already deleted the files
+        with self._views_lock:
+            view = self._views.pop(dataset_id, None)
+        if view is not None:
+            view.close()
+        if not self._exists(dataset_id):
+            return False
+
+        shutil.rmtree(self._dataset_dir(dataset_id), ignore_errors=True)
+
+        logger.info("Deleted dataset %s", dataset_id)
+        return True
+
+    def _iter_datasets(self):
+        for dataset_id in sorted(os.listdir(self.root_dir)):
+            dataset = self._read_metadata(dataset_id)
+            if dataset is not None:
+                yield dataset
+
+    def list_datasets(self) -> List[DatasetInfo]:
+        """List all datasets found on disk"""
+        return [
+            DatasetInfo(
+                dataset_id=dataset["dataset_id"],
+                sequence_count=dataset["sequence_count"],
+                created_at=dataset["created_at"],
+                status=dataset["status"],
+            )
+            for dataset in self._iter_datasets()
+        ]
+
+    def get_dataset_statistics(self) -> Dict[str, Any]:
+        """Get overall statistics"""
+        datasets = list(self._iter_datasets())
+        status_counts = {}
+        for dataset in datasets:
+            status = dataset["status"]
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+        alignments = annotations = 0
+        for dataset in datasets:
+            dataset_id = dataset["dataset_id"]
+            if os.path.exists(self._path(dataset_id, self.ALIGNMENT_FILE)):
+                alignments += 1
+            if os.path.exists(self._path(dataset_id, self.ANNOTATION_FILE)):
+                annotations += 1
+
+        return {
+            "total_datasets": len(datasets),
+            "total_sequences": sum(d["sequence_count"] for d in datasets),
+            "status_counts": status_counts,
+            "alignments": alignments,
+            "annotations": annotations,
+        }
+
+
+class SQLiteDatabase:
+    """
+    Process-aware SQLite connection shared by the SQLite-backed stores.
+
+    The database runs in WAL mode so readers in one worker are not blocked
+    by a writer in another. Connections are not carried across ``fork()``:
+    if the owning process changes, a fresh connection is opened.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.timeout,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def execute(self, sql: str, params=()) -> List[tuple]:
+        """Run a single statement in autocommit mode and fetch all rows"""
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """Yield a connection inside an immediate (write-locking) transaction"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class SQLiteDatasetWriter(DatasetWriter):
+    """
+    Inserts sequences in batches while an upload is still being read.
+
+    The dataset row is created up front with status ``uploading`` so the
+    sequence rows can reference it; the store skips rows in that status, so
+    the dataset stays hidden until commit. Each batch is its own short
+    transaction so other workers are never blocked for the length of an
+    upload.
+    """
+
+    BATCH_SIZE = 10000
+
+    def __init__(
+        self, store: "SQLiteDataStore", metadata: Optional[Dict[str, Any]]
+    ):
+        super().__init__(store, metadata)
+        self.dataset_id = str(uuid.uuid4())
+        self._batch: List[tuple] = []
+        with store.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO datasets (dataset_id, sequence_count, "
+                "created_at, status, metadata) VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.dataset_id,
+                    0,
+                    datetime.now().isoformat(),
+                    store.UPLOADING,
+                    json.dumps(metadata or {}),
+                ),
+            )
+
+    def add(self, sequence: str) -> None:
+        self._batch.append((self.dataset_id, self.sequence_count, sequence))
+        self.sequence_count += 1
+        if len(self._batch) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self.store.db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO dataset_sequences (dataset_id, idx, sequence) "
+                "VALUES (?, ?, ?)",
+                self._batch,
+            )
+        self._batch = []
+
+    def commit(self) -> str:
+        self.closed = True
+        self._flush()
+        with self.store.db.transaction() as conn:
+            conn.execute(
+                "UPDATE datasets SET sequence_count = ?, status = ? "
+                "WHERE dataset_id = ?",
+                (self.sequence_count, "uploaded", self.dataset_id),
+            )
+        logger.info(
+            "Created dataset %s with %d sequences in %s",
+            self.dataset_id,
+            self.sequence_count,
+            self.store.db_path,
+        )
+        return self.dataset_id
+
+    def abort(self) -> None:
+        self.closed = True
+        self._batch = []
+        self.store.db.execute(
+            "DELETE FROM datasets WHERE dataset_id = ?", (self.dataset_id,)
+        )
+
+
+class SQLiteDataStore(BaseDataStore):
+    """
+    Data store backed by a single SQLite file.
+
+    All uvicorn workers on a node open the same database file, so a dataset
+    uploaded through one worker can be aligned and fetched through any
+    other. Results are stored as the JSON serialisation of their models.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS datasets (
+            dataset_id TEXT PRIMARY KEY,
+            sequence_count INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            status TEXT NOT NULL,
+            metadata TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS dataset_sequences (
+            dataset_id TEXT NOT NULL
+                REFERENCES datasets(dataset_id) ON DELETE CASCADE,
+            idx INTEGER NOT NULL,
+            sequence TEXT NOT NULL,
+            PRIMARY KEY (dataset_id, idx)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS dataset_results (
+            dataset_id TEXT NOT NULL
+                REFERENCES datasets(dataset_id) ON DELETE CASCADE,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (dataset_id, kind)
+        ) WITHOUT ROWID;
+    """
+
+    ALIGNMENT = "alignment"
+    ANNOTATION = "annotation"
+    # Status of datasets an open writer is still filling
+    UPLOADING = "uploading"
+
+    def __init__(self, db_path: str = DATA_STORE_SQLITE_PATH):
+        self.db = SQLiteDatabase(db_path)
+        with self.db.transaction() as conn:
+            for statement in self.SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+
+    @property
+    def db_path(self) -> str:
+        return self.db.db_path
+
+    @staticmethod
+    def _row_to_dataset(row: tuple) -> Dict[str, Any]:
+        dataset_id, sequence_count, created_at, status, metadata = row
+        return {
+            "dataset_id": dataset_id,
+            "sequence_count": sequence_count,
+            "created_at": created_at,
+            "status": status,
+            "metadata": json.loads(metadata),
+        }
+
+    def _read_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT dataset_id, sequence_count, created_at, status, metadata "
+            "FROM datasets WHERE dataset_id = ? AND status != ?",
+            (dataset_id, self.UPLOADING),
+        )
+        return self._row_to_dataset(rows[0]) if rows else None
+
+    def _store_result(self, dataset_id: str, kind: str, payload: str):
+        status = "aligned" if kind == self.ALIGNMENT else "annotated"
+        with self.db.transaction() as conn:
+            updated = conn.execute(
+                "UPDATE datasets SET status = ? WHERE dataset_id = ?",
+                (status, dataset_id),
+            ).rowcount
+            if not updated:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO dataset_results "
+                "(dataset_id, kind, payload) VALUES (?, ?, ?)",
+                (dataset_id, kind, payload),
+            )
+        return True
+
+    def _get_result(self, dataset_id: str, kind: str) -> Optional[str]:
+        rows = self.db.execute(
+            "SELECT payload FROM dataset_results "
+            "WHERE dataset_id = ? AND kind = ?",
+            (dataset_id, kind),
+        )
+        return rows[0][0] if rows else None
+
+    def create_dataset(
+        self, sequences: List[str], metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Create a new dataset"""
+        dataset_id = str(uuid.uuid4())
+
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO datasets (dataset_id, sequence_count, "
+                "created_at, status, metadata) VALUES (?, ?, ?, ?, ?)",
+                (
+                    dataset_id,
+                    len(sequences),
+                    datetime.now().isoformat(),
+                    "uploaded",
+                    json.dumps(metadata or {}),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO dataset_sequences (dataset_id, idx, sequence) "
+                "VALUES (?, ?, ?)",
+                ((dataset_id, i, seq) for i, seq in enumerate(sequences)),
+            )
+
+        logger.info(
+            "Created dataset %s with %d sequences in %s",
+            dataset_id,
+            len(sequences),
+            self.db_path,
+        )
+        return dataset_id
+
+    def open_dataset_writer(
+        self, metadata: Optional[Dict[str, Any]] = None
+    ) -> SQLiteDatasetWriter:
+        """Start a dataset whose sequences are inserted in batches"""
+        return SQLiteDatasetWriter(self, metadata)
+
+    def get_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Get dataset by ID"""
+        dataset = self._read_dataset(dataset_id)
+        if dataset is None:
+            return None
+        dataset["sequences"] = self.get_sequences(dataset_id)
+        return dataset
+
+    def update_dataset_status(self, dataset_id: str, status: str) -> bool:
+        """Update dataset status"""
+        with self.db.transaction() as conn:
+            updated = conn.execute(
+                "UPDATE datasets SET status = ? WHERE dataset_id = ?",
+                (status, dataset_id),
+            ).rowcount
+        return updated > 0
+
+    def get_sequences(self, dataset_id: str) -> Optional[List[str]]:
+        """Get sequences for a dataset"""
+        if self._read_dataset(dataset_id) is None:
+            return None
+        rows = self.db.execute(
+            "SELECT sequence FROM dataset_sequences "
+            "WHERE dataset_id = ? ORDER BY idx",
+            (dataset_id,),
+        )
+        return [row[0] for row in rows]
+
+    def store_alignment_result(
+        self, dataset_id: str, alignment_result: AlignmentResult
+    ) -> bool:
+        """Store alignment result"""
+        return self._store_result(
+            dataset_id, self.ALIGNMENT, alignment_result.model_dump_json()
+        )
+
+    def get_alignment_result(
+        self, dataset_id: str
+    ) -> Optional[AlignmentResult]:
+        """Get alignment result for a dataset"""
+        payload = self._get_result(dataset_id, self.ALIGNMENT)
+        if payload is None:
+            return None
+        return AlignmentResult.model_validate_json(payload)
+
+    def store_annotation_result(
+        self, dataset_id: str, annotation_result: AnnotationResult
+    ) -> bool:
+        """Store annotation result"""
+        return self._store_result(
+            dataset_id, self.ANNOTATION, annotation_result.model_dump_json()
+        )
+
+    def get_annotation_result(
+        self, dataset_id: str
+    ) -> Optional[AnnotationResult]:
+        """Get annotation result for a dataset"""
+        payload = self._get_result(dataset_id, self.ANNOTATION)
+        if payload is None:
+            return None
+        return AnnotationResult.model_validate_json(payload)
+
+    def delete_dataset(self, dataset_id: str) -> bool:
+        """Delete dataset and all associated results"""
+        with self.db.transaction() as conn:
+            deleted = conn.execute(
+                "DELETE FROM datasets WHERE dataset_id = ?", (dataset_id,)
+            ).rowcount
+        if not deleted:
+            return False
+
+        logger.info("Deleted dataset %s", dataset_id)
+        return True
+
+    def list_datasets(self) -> List[DatasetInfo]:
+        """List all datasets"""
+        rows = self.db.execute(
+            "SELECT dataset_id, sequence_count, created_at, status "
+            "FROM datasets WHERE status != ? ORDER BY created_at",
+            (self.UPLOADING,),
+        )
+        return [
+            DatasetInfo(
+                dataset_id=dataset_id,
+                sequence_count=sequence_count,
+                created_at=created_at,
+                status=status,
+            )
+            for dataset_id, sequence_count, created_at, status in rows
+        ]
+
+    def get_dataset_statistics(self) -> Dict[str, Any]:
+        """Get overall statistics"""
+        total_datasets, total_sequences = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(sequence_count), 0) "
+            "FROM datasets WHERE status != ?",
+            (self.UPLOADING,),
+        )[0]
+        status_counts = dict(
+            self.db.execute(
+                "SELECT status, COUNT(*) FROM datasets WHERE status != ? "
+                "GROUP BY status",
+                (self.UPLOADING,),
+            )
+        )
+        result_counts = dict(
+            self.db.execute(
+                "SELECT kind, COUNT(*) FROM dataset_results GROUP BY kind"
+            )
+        )
+
+        return {
+            "total_datasets": total_datasets,
+            "total_sequences": total_sequences,
+            "status_counts": status_counts,
+            "alignments": result_counts.get(self.ALIGNMENT, 0),
+            "annotations": result_counts.get(self.ANNOTATION, 0),
+        }
+
+
+def create_data_store(backend: str = DATA_STORE_BACKEND) -> BaseDataStore:
+    """Create the data store backend selected by configuration"""
+    if backend == "mmap":
+        return MmapDataStore(DATA_STORE_DIR)
+    if backend == "sqlite":
+        return SQLiteDataStore(DATA_STORE_SQLITE_PATH)
+    if backend != "memory":
+        logger.warning(
+            "Unknown data store backend '%s', using in-memory store", backend
+        )
+    return DataStore()
+
+
 # Global data store instance
-data_store = DataStore()
+data_store = create_data_store()
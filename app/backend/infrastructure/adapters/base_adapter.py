@@ -10,7 +10,9 @@ import os
 
 from backend.core.interfaces import AbstractExternalToolAdapter
 from backend.core.exceptions import ExternalToolError
-from backend.logger import logger
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class BaseExternalToolAdapter(AbstractExternalToolAdapter):
@@ -21,7 +23,9 @@ class BaseExternalToolAdapter(AbstractExternalToolAdapter):
         self.executable_path = executable_path or self._find_executable()
         self._validate_tool_installation()
         logger.info(
-            f"Initialized {tool_name} adapter with path: {self.executable_path}"
+            "Initialized %s adapter with path: %s",
+            tool_name,
+            self.executable_path,
         )
 
     @abstractmethod
@@ -49,7 +53,7 @@ class BaseExternalToolAdapter(AbstractExternalToolAdapter):
         try:
             # Build command
             command = self._build_command(**kwargs)
-            logger.debug(f"Executing command: {' '.join(command)}")
+            logger.debug("Executing command: %s", command)
 
             # Execute command
             result = subprocess.run(
@@ -141,7 +145,7 @@ class BaseExternalToolAdapter(AbstractExternalToolAdapter):
 
         except Exception as e:
             logger.warning(
-                f"Could not get version for {self.tool_name}: {str(e)}"
+                "Could not get version for %s: %s", self.tool_name, e
             )
             return None
 
@@ -13,6 +13,10 @@ from ...core.base_classes import AbstractExternalToolAdapter
 from ...core.exceptions import (
     HmmerError,
 )
+from ...utils.sequence_validation import AMINO_ACIDS, SequenceValidator
+
+# Isotype detection also accepts X for unknown residues
+_ISOTYPE_VALIDATOR = SequenceValidator(AMINO_ACIDS + "X")
 
 
 class HmmerAdapter(AbstractExternalToolAdapter):
@@ -107,8 +111,7 @@ class HmmerAdapter(AbstractExternalToolAdapter):
             return False
 
         # Check for valid amino acids
-        valid_chars = set("ACDEFGHIKLMNPQRSTVWYX")
-        if not all(char.upper() in valid_chars for char in sequence):
+        if _ISOTYPE_VALIDATOR.first_invalid_position(sequence) >= 0:
             return False
 
         # Check minimum length for isotype detection
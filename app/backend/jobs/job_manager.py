@@ -1,24 +1,43 @@
 import threading
 import time
 import uuid
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
+from ..config import MAX_STORED_MSAS, STORED_MSA_TTL_SECONDS
+from ..metrics import JOB_RUN_SECONDS, JOB_WAIT_SECONDS
 from ..models.models import (
     MSAJobStatus,
+    MSAAdditionRequest,
     MSACreationRequest,
     MSAAnnotationRequest,
+    MSAResult,
+    SequenceInput,
 )
 from ..msa.msa_annotation import MSAAnnotationEngine
 from ..msa.msa_engine import MSAEngine
+from ..profiling import current_profiler, profiling
+from .job_store import BaseJobStore, create_job_store
 
 
 class JobManager:
-    """Manages background jobs for MSA processing"""
+    """
+    Manages background jobs for MSA processing
 
-    def __init__(self):
+    Jobs run in threads of the process that created them and are tracked in
+    ``jobs``. When a ``job_store`` is given every status change is written
+    through to it, so other worker processes can report on the job too.
+    """
+
+    def __init__(self, job_store: Optional[BaseJobStore] = None):
         self.jobs: Dict[str, MSAJobStatus] = {}
+        # Job that produced each MSA of this process, by MSA id
+        self.msa_jobs: Dict[str, str] = {}
+        # MSAs created outside jobs, oldest first, with the time stored
+        self.msas: "OrderedDict[str, Tuple[float, MSAResult]]" = OrderedDict()
         self.job_lock = threading.Lock()
+        self.job_store = job_store
         self.msa_engine = MSAEngine()
         self.annotation_engine = MSAAnnotationEngine()
 
@@ -36,13 +55,23 @@ class JobManager:
 
         # Create thread before acquiring lock
         thread = threading.Thread(
-            target=self._process_msa_job, args=(job_id, request)
+            target=self._run_job,
+            args=(
+                "msa_creation",
+                self._process_msa_job,
+                job_id,
+                request,
+                time.monotonic(),
+                # Jobs created by a profiled request are profiled too
+                current_profiler() is not None,
+            ),
         )
         thread.daemon = True
 
         # Add job to dictionary under lock
         with self.job_lock:
             self.jobs[job_id] = job_status
+            self._save_job(job_id)
 
         # Start thread after releasing lock
         thread.start()
@@ -63,23 +92,177 @@ class JobManager:
 
         # Create thread before acquiring lock
         thread = threading.Thread(
-            target=self._process_annotation_job, args=(job_id, request)
+            target=self._run_job,
+            args=(
+                "msa_annotation",
+                self._process_annotation_job,
+                job_id,
+                request,
+                time.monotonic(),
+            ),
+        )
+        thread.daemon = True
+
+        # Add job to dictionary under lock
+        with self.job_lock:
+            self.jobs[job_id] = job_status
+            self._save_job(job_id)
+
+        # Start thread after releasing lock
+        thread.start()
+
+        return job_id
+
+    def create_msa_addition_job(self, request: MSAAdditionRequest) -> str:
+        """
+        Create a job adding sequences to a stored MSA
+
+        The MSA is only looked up here; it is loaded by the job's thread.
+
+        Raises:
+            KeyError: If the MSA is neither stored nor held by a job
+        """
+        if not self._has_msa(request.msa_id):
+            raise KeyError(request.msa_id)
+        job_id = str(uuid.uuid4())
+
+        job_status = MSAJobStatus(
+            job_id=job_id,
+            status="pending",
+            progress=0.0,
+            message="Job created",
+            created_at=datetime.now().isoformat(),
+        )
+
+        # Create thread before acquiring lock
+        thread = threading.Thread(
+            target=self._run_job,
+            args=(
+                "msa_addition",
+                self._process_msa_addition_job,
+                job_id,
+                request,
+                time.monotonic(),
+                current_profiler() is not None,
+            ),
         )
         thread.daemon = True
 
         # Add job to dictionary under lock
         with self.job_lock:
             self.jobs[job_id] = job_status
+            self._save_job(job_id)
 
         # Start thread after releasing lock
         thread.start()
 
         return job_id
 
+    def store_msa_result(self, msa_result: MSAResult) -> None:
+        """
+        Keep an MSA created outside a job so sequences can be added to it
+
+        Small MSAs are created while the request waits. They are kept apart
+        from the job list, at most MAX_STORED_MSAS of them for at most
+        STORED_MSA_TTL_SECONDS, and written to the shared store on a
+        background thread so the request does not wait for the write.
+        """
+        with self.job_lock:
+            self.msas[msa_result.msa_id] = (time.monotonic(), msa_result)
+            self.msas.move_to_end(msa_result.msa_id)
+            self._evict_msas()
+        if self.job_store is not None:
+            thread = threading.Thread(
+                target=self.job_store.save_msa, args=(msa_result,)
+            )
+            thread.daemon = True
+            thread.start()
+
+    def get_msa_result(self, msa_id: str) -> Optional[MSAResult]:
+        """Get a stored MSA, or one from the result of the job creating it"""
+        with self.job_lock:
+            self._evict_msas()
+            stored = self.msas.get(msa_id)
+        if stored is not None:
+            return stored[1]
+        if self.job_store is not None:
+            # Stored by another worker process, or before a restart
+            msa_result = self.job_store.get_msa(msa_id)
+            if msa_result is not None:
+                return msa_result
+        job_id = self._msa_job_id(msa_id)
+        job = self.get_job_status(job_id) if job_id is not None else None
+        msa = ((job.result if job else None) or {}).get("msa_result")
+        if msa and msa.get("msa_id") == msa_id:
+            return MSAResult.model_validate(msa)
+        return None
+
+    def _has_msa(self, msa_id: str) -> bool:
+        """Whether an MSA is stored or held by a job, without loading it"""
+        with self.job_lock:
+            self._evict_msas()
+            if msa_id in self.msas:
+                return True
+        if self.job_store is not None and self.job_store.has_msa(msa_id):
+            return True
+        return self._msa_job_id(msa_id) is not None
+
+    def _evict_msas(self):
+        """Drop expired and excess stored MSAs; call with job_lock held"""
+        expired = time.monotonic() - STORED_MSA_TTL_SECONDS
+        while self.msas and (
+            len(self.msas) > MAX_STORED_MSAS
+            or next(iter(self.msas.values()))[0] < expired
+        ):
+            self.msas.popitem(last=False)
+
+    def _msa_job_id(self, msa_id: str) -> Optional[str]:
+        """ID of the job holding an MSA, from this process or the store"""
+        with self.job_lock:
+            job_id = self.msa_jobs.get(msa_id)
+        if job_id is None and self.job_store is not None:
+            # Created by another worker process, or before a restart
+            job_id = self.job_store.get_msa_job(msa_id)
+        return job_id
+
+    def _record_msa(self, msa_id: str, job_id: str):
+        """Index an MSA by the job holding it; call with job_lock held"""
+        self.msa_jobs[msa_id] = job_id
+        if self.job_store is not None:
+            self.job_store.save_msa_job(msa_id, job_id)
+
     def get_job_status(self, job_id: str) -> Optional[MSAJobStatus]:
         """Get status of a job"""
         with self.job_lock:
-            return self.jobs.get(job_id)
+            job = self.jobs.get(job_id)
+        if job is None and self.job_store is not None:
+            # Job may have been created by another worker process
+            job = self.job_store.get_job(job_id)
+        return job
+
+    def list_jobs(self) -> List[MSAJobStatus]:
+        """List jobs of this process and, if shared, of all other workers"""
+        jobs: Dict[str, MSAJobStatus] = {}
+        if self.job_store is not None:
+            jobs.update(
+                (job.job_id, job) for job in self.job_store.list_jobs()
+            )
+        with self.job_lock:
+            jobs.update(self.jobs)
+        return list(jobs.values())
+
+    def count_jobs_by_status(self) -> Dict[str, int]:
+        """Number of jobs in each status, across workers if shared"""
+        if self.job_store is not None:
+            # Every job of this process is written through to the store
+            return self.job_store.count_jobs_by_status()
+        with self.job_lock:
+            return dict(Counter(job.status for job in self.jobs.values()))
+
+    def _save_job(self, job_id: str):
+        """Write a job through to the shared store; call with job_lock held"""
+        if self.job_store is not None and job_id in self.jobs:
+            self.job_store.save_job(self.jobs[job_id])
 
     def _update_job_status(
         self, job_id: str, status: str, progress: float, message: str
@@ -96,6 +279,25 @@ class JobManager:
                 self.jobs[job_id].message = message
                 if status in ["completed", "failed"]:
                     self.jobs[job_id].completed_at = datetime.now().isoformat()
+                self._save_job(job_id)
+
+    @staticmethod
+    def _run_job(
+        job_type: str,
+        process,
+        job_id: str,
+        request,
+        created: float,
+        profile: bool = False,
+    ):
+        """Run a job's processing function, recording wait and run times"""
+        JOB_WAIT_SECONDS.labels(job_type=job_type).observe(
+            time.monotonic() - created
+        )
+        with profiling(profile), JOB_RUN_SECONDS.labels(
+            job_type=job_type
+        ).time():
+            process(job_id, request)
 
     def _process_msa_job(self, job_id: str, request: MSACreationRequest):
         """Process MSA job in background"""
@@ -109,14 +311,7 @@ class JobManager:
             )
 
             # Extract sequences
-            sequences = []
-            for seq_input in request.sequences:
-                chains = seq_input.get_all_chains()
-                for chain_name, sequence in chains.items():
-                    sequences.append(
-                        (f"{seq_input.name}_{chain_name}", sequence)
-                    )
-
+            sequences = self._chain_sequences(request.sequences)
             if not sequences:
                 raise ValueError("No valid sequences provided")
 
@@ -130,7 +325,11 @@ class JobManager:
 
             # Create MSA
             msa_result = self.msa_engine.create_msa(
-                sequences=sequences, method=request.alignment_method
+                sequences=sequences,
+                method=request.alignment_method,
+                numbering_scheme=request.numbering_scheme,
+                cluster_identity=request.cluster_identity,
+                consensus_threshold=request.consensus_threshold,
             )
 
             # Update progress
@@ -150,6 +349,9 @@ class JobManager:
                 "annotation_result": annotation_result.model_dump(),
                 "job_type": "msa_creation",
             }
+            profiler = current_profiler()
+            if profiler is not None:
+                result["profile"] = profiler.to_dict()
 
             # Update job as completed
             with self.job_lock:
@@ -157,10 +359,12 @@ class JobManager:
                     self.jobs[job_id].result = result
                     self.jobs[job_id].status = "completed"
                     self.jobs[job_id].progress = 1.0
-                    self.jobs[job_id].message = (
-                        "MSA creation completed successfully"
-                    )
+                    self.jobs[
+                        job_id
+                    ].message = "MSA creation completed successfully"
                     self.jobs[job_id].completed_at = datetime.now().isoformat()
+                    self._save_job(job_id)
+                    self._record_msa(msa_result.msa_id, job_id)
 
         except Exception as e:
             error_msg = f"MSA job failed: {str(e)}"
@@ -170,8 +374,81 @@ class JobManager:
                     self.jobs[job_id].progress = 0.0
                     self.jobs[job_id].message = error_msg
                     self.jobs[job_id].completed_at = datetime.now().isoformat()
+                    self._save_job(job_id)
             print(f"Error in MSA job {job_id}: {e}")
 
+    def _process_msa_addition_job(
+        self, job_id: str, request: MSAAdditionRequest
+    ):
+        """Process a job adding sequences to an MSA in background"""
+        try:
+            # Update status to running
+            self._update_job_status(
+                job_id, "running", 0.1, "Starting MSA addition..."
+            )
+
+            msa_result = self.get_msa_result(request.msa_id)
+            if msa_result is None:
+                raise ValueError(f"MSA {request.msa_id} not found")
+
+            sequences = self._chain_sequences(request.sequences)
+            if not sequences:
+                raise ValueError("No valid sequences provided")
+
+            self._update_job_status(
+                job_id,
+                "running",
+                0.3,
+                f"Adding {len(sequences)} sequences to "
+                f"{len(msa_result.sequences)} aligned sequences...",
+            )
+            added = self.msa_engine.add_sequences(
+                msa_result, sequences, keep_length=request.keep_length
+            )
+
+            result = {
+                "msa_result": added.model_dump(),
+                "job_type": "msa_addition",
+            }
+            profiler = current_profiler()
+            if profiler is not None:
+                result["profile"] = profiler.to_dict()
+
+            # Update job as completed
+            with self.job_lock:
+                if job_id in self.jobs:
+                    self.jobs[job_id].result = result
+                    self.jobs[job_id].status = "completed"
+                    self.jobs[job_id].progress = 1.0
+                    self.jobs[
+                        job_id
+                    ].message = "MSA addition completed successfully"
+                    self.jobs[job_id].completed_at = datetime.now().isoformat()
+                    self._save_job(job_id)
+                    self._record_msa(added.msa_id, job_id)
+
+        except Exception as e:
+            error_msg = f"MSA addition job failed: {str(e)}"
+            with self.job_lock:
+                if job_id in self.jobs:
+                    self.jobs[job_id].status = "failed"
+                    self.jobs[job_id].progress = 0.0
+                    self.jobs[job_id].message = error_msg
+                    self.jobs[job_id].completed_at = datetime.now().isoformat()
+                    self._save_job(job_id)
+            print(f"Error in MSA addition job {job_id}: {e}")
+
+    @staticmethod
+    def _chain_sequences(
+        sequence_inputs: List[SequenceInput],
+    ) -> List[Tuple[str, str]]:
+        """(name, sequence) of every chain, named <input>_<chain>"""
+        return [
+            (f"{seq_input.name}_{chain_name}", sequence)
+            for seq_input in sequence_inputs
+            for chain_name, sequence in seq_input.get_all_chains().items()
+        ]
+
     def _process_annotation_job(
         self, job_id: str, request: MSAAnnotationRequest
     ):
@@ -214,10 +491,11 @@ class JobManager:
                     self.jobs[job_id].result = result
                     self.jobs[job_id].status = "completed"
                     self.jobs[job_id].progress = 1.0
-                    self.jobs[job_id].message = (
-                        "Annotation completed successfully"
-                    )
+                    self.jobs[
+                        job_id
+                    ].message = "Annotation completed successfully"
                     self.jobs[job_id].completed_at = datetime.now().isoformat()
+                    self._save_job(job_id)
 
         except Exception as e:
             error_msg = f"Annotation job failed: {str(e)}"
@@ -227,29 +505,38 @@ class JobManager:
                     self.jobs[job_id].progress = 0.0
                     self.jobs[job_id].message = error_msg
                     self.jobs[job_id].completed_at = datetime.now().isoformat()
+                    self._save_job(job_id)
             print(f"Error in annotation job {job_id}: {e}")
 
     def cleanup_old_jobs(self, max_age_hours: int = 24):
         """Clean up old completed/failed jobs"""
         cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
 
-        with self.job_lock:
-            jobs_to_remove = []
-            for job_id, job in self.jobs.items():
-                if job.status in ["completed", "failed"]:
-                    try:
-                        job_time = datetime.fromisoformat(
-                            job.created_at
-                        ).timestamp()
-                        if job_time < cutoff_time:
-                            jobs_to_remove.append(job_id)
-                    except Exception:
-                        # If we can't parse the timestamp, remove the job
-                        jobs_to_remove.append(job_id)
+        jobs_to_remove = []
+        for job in self.list_jobs():
+            if job.status in ["completed", "failed"]:
+                try:
+                    job_time = datetime.fromisoformat(
+                        job.created_at
+                    ).timestamp()
+                    if job_time < cutoff_time:
+                        jobs_to_remove.append(job.job_id)
+                except Exception:
+                    # If we can't parse the timestamp, remove the job
+                    jobs_to_remove.append(job.job_id)
 
+        with self.job_lock:
             for job_id in jobs_to_remove:
-                del self.jobs[job_id]
+                self.jobs.pop(job_id, None)
+                if self.job_store is not None:
+                    self.job_store.delete_job(job_id)
+            removed = set(jobs_to_remove)
+            self.msa_jobs = {
+                msa_id: job_id
+                for msa_id, job_id in self.msa_jobs.items()
+                if job_id not in removed
+            }
 
 
 # Global job manager instance
-job_manager = JobManager()
+job_manager = JobManager(job_store=create_job_store())
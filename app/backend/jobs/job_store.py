@@ -0,0 +1,191 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from ..config import (
+    DATA_STORE_SQLITE_PATH,
+    JOB_STORE_BACKEND,
+    MAX_STORED_MSAS,
+    STORED_MSA_TTL_SECONDS,
+)
+from ..data_store import SQLiteDatabase
+from ..logger import get_logger
+from ..models.models import MSAJobStatus, MSAResult
+
+logger = get_logger(__name__)
+
+
+class BaseJobStore(ABC):
+    """Interface for job status storage shared between worker processes"""
+
+    @abstractmethod
+    def save_job(self, job: MSAJobStatus) -> None:
+        """Insert or replace a job"""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[MSAJobStatus]:
+        """Get a job by ID"""
+
+    @abstractmethod
+    def list_jobs(self) -> List[MSAJobStatus]:
+        """List all jobs"""
+
+    @abstractmethod
+    def count_jobs_by_status(self) -> Dict[str, int]:
+        """Number of jobs in each status"""
+
+    @abstractmethod
+    def delete_job(self, job_id: str) -> bool:
+        """Delete a job and the MSAs recorded for it"""
+
+    @abstractmethod
+    def save_msa_job(self, msa_id: str, job_id: str) -> None:
+        """Record the job whose result holds an MSA"""
+
+    @abstractmethod
+    def get_msa_job(self, msa_id: str) -> Optional[str]:
+        """ID of the job whose result holds an MSA"""
+
+    @abstractmethod
+    def save_msa(self, msa: MSAResult) -> None:
+        """Keep an MSA created outside a job, evicting expired ones"""
+
+    @abstractmethod
+    def get_msa(self, msa_id: str) -> Optional[MSAResult]:
+        """Get an MSA kept by ``save_msa`` unless it has expired"""
+
+    @abstractmethod
+    def has_msa(self, msa_id: str) -> bool:
+        """Whether ``save_msa`` keeps an MSA, without loading it"""
+
+
+class SQLiteJobStore(BaseJobStore):
+    """Job store kept in the same SQLite file as the shared data store"""
+
+    # msa_jobs has no foreign key: saving a job replaces its row, which
+    # would cascade to the MSAs recorded for it
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS msa_jobs (
+            msa_id TEXT PRIMARY KEY,
+            job_id TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS msa_jobs_job_id ON msa_jobs (job_id);
+        CREATE TABLE IF NOT EXISTS msas (
+            msa_id TEXT PRIMARY KEY,
+            stored_at REAL NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS msas_stored_at ON msas (stored_at)
+    """
+
+    def __init__(
+        self,
+        db_path: str = DATA_STORE_SQLITE_PATH,
+        max_msas: int = MAX_STORED_MSAS,
+        msa_ttl: float = STORED_MSA_TTL_SECONDS,
+    ):
+        self.db = SQLiteDatabase(db_path)
+        self.max_msas = max_msas
+        self.msa_ttl = msa_ttl
+        for statement in self.SCHEMA.split(";"):
+            self.db.execute(statement)
+
+    def save_job(self, job: MSAJobStatus) -> None:
+        """Insert or replace a job"""
+        self.db.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, created_at, payload) "
+            "VALUES (?, ?, ?)",
+            (job.job_id, job.created_at, job.model_dump_json()),
+        )
+
+    def get_job(self, job_id: str) -> Optional[MSAJobStatus]:
+        """Get a job by ID"""
+        rows = self.db.execute(
+            "SELECT payload FROM jobs WHERE job_id = ?", (job_id,)
+        )
+        return MSAJobStatus.model_validate_json(rows[0][0]) if rows else None
+
+    def list_jobs(self) -> List[MSAJobStatus]:
+        """List all jobs, oldest first"""
+        rows = self.db.execute("SELECT payload FROM jobs ORDER BY created_at")
+        return [MSAJobStatus.model_validate_json(row[0]) for row in rows]
+
+    def count_jobs_by_status(self) -> Dict[str, int]:
+        """Number of jobs in each status, counted without loading payloads"""
+        rows = self.db.execute(
+            "SELECT json_extract(payload, '$.status'), COUNT(*) FROM jobs "
+            "GROUP BY 1"
+        )
+        return dict(rows)
+
+    def delete_job(self, job_id: str) -> bool:
+        """Delete a job and the MSAs recorded for it"""
+        with self.db.transaction() as conn:
+            deleted = conn.execute(
+                "DELETE FROM jobs WHERE job_id = ?", (job_id,)
+            ).rowcount
+            conn.execute("DELETE FROM msa_jobs WHERE job_id = ?", (job_id,))
+        return deleted > 0
+
+    def save_msa_job(self, msa_id: str, job_id: str) -> None:
+        """Record the job whose result holds an MSA"""
+        self.db.execute(
+            "INSERT OR REPLACE INTO msa_jobs (msa_id, job_id) VALUES (?, ?)",
+            (msa_id, job_id),
+        )
+
+    def get_msa_job(self, msa_id: str) -> Optional[str]:
+        """ID of the job whose result holds an MSA"""
+        rows = self.db.execute(
+            "SELECT job_id FROM msa_jobs WHERE msa_id = ?", (msa_id,)
+        )
+        return rows[0][0] if rows else None
+
+    def save_msa(self, msa: MSAResult) -> None:
+        """Keep an MSA, evicting expired ones and all but the most recent"""
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO msas (msa_id, stored_at, payload) "
+                "VALUES (?, ?, ?)",
+                (msa.msa_id, now, msa.model_dump_json()),
+            )
+            conn.execute(
+                "DELETE FROM msas WHERE stored_at < ? OR msa_id NOT IN "
+                "(SELECT msa_id FROM msas ORDER BY stored_at DESC LIMIT ?)",
+                (now - self.msa_ttl, self.max_msas),
+            )
+
+    def get_msa(self, msa_id: str) -> Optional[MSAResult]:
+        """Get an MSA kept by ``save_msa`` unless it has expired"""
+        rows = self.db.execute(
+            "SELECT payload FROM msas WHERE msa_id = ? AND stored_at >= ?",
+            (msa_id, time.time() - self.msa_ttl),
+        )
+        return MSAResult.model_validate_json(rows[0][0]) if rows else None
+
+    def has_msa(self, msa_id: str) -> bool:
+        """Whether ``save_msa`` keeps an MSA, without loading it"""
+        rows = self.db.execute(
+            "SELECT 1 FROM msas WHERE msa_id = ? AND stored_at >= ?",
+            (msa_id, time.time() - self.msa_ttl),
+        )
+        return bool(rows)
+
+
+def create_job_store(
+    backend: str = JOB_STORE_BACKEND,
+) -> Optional[BaseJobStore]:
+    """Create the shared job store selected by configuration, if any"""
+    if backend == "sqlite":
+        return SQLiteJobStore(DATA_STORE_SQLITE_PATH)
+    if backend != "memory":
+        logger.warning(
+            "Unknown job store backend '%s', keeping jobs in memory", backend
+        )
+    return None
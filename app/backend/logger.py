@@ -1,6 +1,28 @@
+"""
+Logging for the backend.
+
+Records of every ``backend.*`` logger are put on a queue by a
+``QueueHandler`` and written by a ``QueueListener`` thread, so request
+threads never wait on stream or file I/O. Levels and the output format come
+from ``LOG_LEVEL``, ``LOG_LEVELS`` and ``LOG_FORMAT`` (see ``config``).
+
+Modules should use ``get_logger(__name__)`` so their level can be set on its
+own, and pass arguments lazily (``logger.debug("Parsed %d", count)``) so a
+disabled message is never formatted.
+"""
+
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from backend.config import LOG_FORMAT, LOG_LEVEL, LOG_LEVELS
 
 if "pytest" in sys.modules:
     LOG_FILE = os.path.join(
@@ -11,17 +33,154 @@ else:
         os.path.dirname(os.path.dirname(__file__)), "app.log"
     )
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+ROOT_LOGGER_NAME = "backend"
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
+
+# Attributes every LogRecord has; anything else was passed in ``extra``
+_RECORD_ATTRIBUTES = set(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including fields passed in ``extra``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Queues records with their arguments merged into the message
+
+    Unlike ``QueueHandler`` the traceback is kept apart in ``exc_text``
+    rather than appended to the message, so the writer's formatter decides
+    how it is rendered.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """
+    Parse per-module levels such as ``backend.msa=DEBUG,backend.api=ERROR``
+
+    Entries without a known level name are ignored.
+    """
+    levels = {}
+    for entry in spec.split(","):
+        name, _, level = entry.partition("=")
+        level = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
 
-# Avoid adding handlers multiple times
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    file_handler = logging.FileHandler(LOG_FILE)
-    formatter = logging.Formatter(
-        "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
+
+_listener: Optional[QueueListener] = None
+_configured_levels: Dict[str, int] = {}
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    levels: Optional[Dict[str, int]] = None,
+    log_format: str = LOG_FORMAT,
+    log_file: Optional[str] = LOG_FILE,
+) -> QueueListener:
+    """
+    (Re)configure the ``backend`` logger and start its writer thread
+
+    Args:
+        level: Level of the ``backend`` logger
+        levels: Levels of individual modules, overriding ``level``
+        log_format: ``text`` or ``json``
+        log_file: File written next to stderr, or None for stderr only
+    """
+    global _listener
+    stop_logging()
+
+    formatter = (
+        JSONFormatter()
+        if log_format == "json"
+        else logging.Formatter(TEXT_FORMAT)
+    )
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level)
+
+    for name in _configured_levels:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    _configured_levels.clear()
+    _configured_levels.update(
+        parse_levels(LOG_LEVELS) if levels is None else levels
     )
-    stream_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
-    logger.addHandler(file_handler)
+    for name, module_level in _configured_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger of a backend module, e.g. ``get_logger(__name__)``"""
+    if name != ROOT_LOGGER_NAME and not name.startswith(
+        ROOT_LOGGER_NAME + "."
+    ):
+        name = f"{ROOT_LOGGER_NAME}.{name}"
+    return logging.getLogger(name)
+
+
+configure_logging()
+atexit.register(stop_logging)
+
+# Shared logger of modules that do not have their own
+logger = get_logger(__name__)
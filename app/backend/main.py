@@ -1,7 +1,16 @@
+from backend.api.compression import CompressionMiddleware
 from backend.api.v1.endpoints import router as api_v1_router
 from backend.api.v2.endpoints import router as api_v2_router
 from backend.api.v2.database_endpoints import router as database_router
-from fastapi import FastAPI
+from backend.data_store import data_store
+from backend.jobs.job_manager import job_manager
+from backend.metrics import (
+    METRICS_CONTENT_TYPE,
+    MetricsMiddleware,
+    register_state_sources,
+    render_metrics,
+)
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Initialize FastAPI app
@@ -20,6 +29,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (MSA and PSSM payloads are very repetitive)
+app.add_middleware(CompressionMiddleware)
+
+# Record per-route request latency (outermost, so compression is included)
+app.add_middleware(MetricsMiddleware)
+register_state_sources(
+    job_manager.count_jobs_by_status, data_store.get_dataset_statistics
+)
+
 # Register v1 API router
 app.include_router(api_v1_router, prefix="/api/v1")
 
@@ -36,6 +54,13 @@ async def health_check():
     return {"status": "healthy", "message": "API is running"}
 
 
+# Prometheus scrape endpoint (see monitoring/prometheus.yml). Collecting
+# reads the job and data stores, so it runs in the threadpool
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,208 @@
+"""
+Prometheus metrics for the API and its hot paths.
+
+Metrics are registered on the default ``prometheus_client`` registry. When
+several uvicorn workers run, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty,
+writable directory so ``/metrics`` aggregates counters and histograms of
+all workers; the job and DataStore gauges are computed at scrape time by
+whichever worker serves the request.
+"""
+
+import os
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Buckets for external tools and whole-request latencies (seconds)
+SLOW_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=SLOW_BUCKETS,
+)
+ANARCI_SECONDS = Histogram(
+    "anarci_numbering_seconds",
+    "Time spent in one ANARCI numbering call",
+    ["scheme"],
+    buckets=SLOW_BUCKETS,
+)
+HMMER_ISOTYPE_SECONDS = Histogram(
+    "hmmer_isotype_seconds",
+    "Time spent detecting a constant region isotype with HMMER",
+    buckets=SLOW_BUCKETS,
+)
+ALIGNER_SECONDS = Histogram(
+    "aligner_seconds",
+    "Time spent aligning sequences, by alignment method",
+    ["method"],
+    buckets=SLOW_BUCKETS,
+)
+PSSM_SECONDS = Histogram(
+    "pssm_calculation_seconds",
+    "Time spent calculating a PSSM",
+    buckets=SLOW_BUCKETS,
+)
+JOB_WAIT_SECONDS = Histogram(
+    "job_wait_seconds",
+    "Time a background job waited between creation and start",
+    ["job_type"],
+    buckets=SLOW_BUCKETS,
+)
+JOB_RUN_SECONDS = Histogram(
+    "job_run_seconds",
+    "Time a background job spent running",
+    ["job_type"],
+    buckets=SLOW_BUCKETS,
+)
+
+
+class StateCollector(Collector):
+    """
+    Gauges read from application state at scrape time
+
+    Reports jobs by status (pending jobs are the queue depth) and DataStore
+    dataset and sequence counts. Sources are passed as callables so this
+    module does not import the job manager or data store.
+    """
+
+    def __init__(
+        self,
+        count_jobs: Optional[Callable[[], Dict[str, int]]] = None,
+        dataset_statistics: Optional[Callable[[], dict]] = None,
+    ):
+        self.count_jobs = count_jobs
+        self.dataset_statistics = dataset_statistics
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        if self.count_jobs is not None:
+            jobs = GaugeMetricFamily(
+                "jobs", "Background jobs by status", labels=["status"]
+            )
+            counts = {"pending": 0, "running": 0, **self.count_jobs()}
+            for status, count in sorted(counts.items()):
+                jobs.add_metric([status], count)
+            yield jobs
+        if self.dataset_statistics is not None:
+            stats = self.dataset_statistics()
+            yield GaugeMetricFamily(
+                "datastore_datasets",
+                "Datasets held by the DataStore",
+                value=stats.get("total_datasets", 0),
+            )
+            yield GaugeMetricFamily(
+                "datastore_sequences",
+                "Sequences held by the DataStore",
+                value=stats.get("total_sequences", 0),
+            )
+
+
+_state_collector = StateCollector()
+REGISTRY.register(_state_collector)
+
+
+def register_state_sources(
+    count_jobs: Callable[[], Dict[str, int]],
+    dataset_statistics: Callable[[], dict],
+) -> None:
+    """Set the callables the scrape-time gauges are read from"""
+    _state_collector.count_jobs = count_jobs
+    _state_collector.dataset_statistics = dataset_statistics
+
+
+def render_metrics() -> bytes:
+    """Metrics in the Prometheus text format, across workers if configured"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_state_collector)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Full path template of the route that handled a request
+
+    Routes of included routers may report their path without the router's
+    prefix (e.g. ``/dataset/{dataset_id}`` for ``/api/v1``), so the prefix
+    is recovered from the request path: it is the part before the suffix
+    the route's pattern matches.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    start = 0
+    while start >= 0:
+        if route.path_regex.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Records request latency per route template
+
+    The route path (e.g. ``/api/v1/dataset/{dataset_id}``) is used as the
+    label rather than the raw URL so label cardinality stays bounded;
+    requests that match no route are recorded as ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"],
+                route=route_template(scope),
+                status=str(status),
+            ).observe(time.perf_counter() - start)
@@ -3,6 +3,10 @@ from typing import List, Optional, Dict, Any
 
 from pydantic import BaseModel, Field, field_validator
 
+from backend.utils.sequence_validation import SequenceValidator
+
+_CHAIN_VALIDATOR = SequenceValidator()
+
 
 class NumberingScheme(str, Enum):
     """Antibody numbering schemes supported by ANARCI"""
@@ -26,6 +30,13 @@ class AlignmentMethod(str, Enum):
     CUSTOM_ANTIBODY = "custom_antibody"
 
 
+class PSSMFormat(str, Enum):
+    """Wire formats for PSSM data in API responses"""
+
+    DICT = "dict"  # one {amino acid: value} dict per column
+    COMPACT = "compact"  # one list of values per column, in amino_acids order
+
+
 class ChainType(str, Enum):
     """Antibody chain types"""
 
@@ -109,9 +120,8 @@ class SequenceInput(BaseModel):
         """Validate that chain sequences are valid amino acid sequences"""
         if v is not None:
             # Basic validation - check for valid amino acids
-            valid_aa = set("ACDEFGHIKLMNPQRSTVWY")
-            invalid_chars = set(v.upper()) - valid_aa
-            if invalid_chars:
+            if _CHAIN_VALIDATOR.first_invalid_position(v) >= 0:
+                invalid_chars = _CHAIN_VALIDATOR.invalid_characters(v)
                 raise ValueError(
                     f"Invalid amino acids in {info.field_name}: {invalid_chars}"
                 )
@@ -296,6 +306,37 @@ class MSACreationRequest(BaseModel):
         default=NumberingScheme.IMGT,
         description="Numbering scheme for annotation",
     )
+    cluster_identity: Optional[float] = Field(
+        default=None,
+        gt=0.0,
+        le=1.0,
+        description=(
+            "Cluster sequences at this identity and align only cluster "
+            "representatives"
+        ),
+    )
+    consensus_threshold: Optional[float] = Field(
+        default=None,
+        gt=0.0,
+        le=1.0,
+        description=(
+            "Use ambiguity codes for consensus residues held by a smaller "
+            "fraction of sequences"
+        ),
+    )
+
+
+class MSAAdditionRequest(BaseModel):
+    """Request model for adding sequences to a stored MSA"""
+
+    msa_id: str = Field(..., description="MSA to add sequences to")
+    sequences: List[SequenceInput] = Field(..., description="Sequences to add")
+    keep_length: bool = Field(
+        default=False,
+        description=(
+            "Leave out inserted residues instead of adding alignment columns"
+        ),
+    )
 
 
 class MSAAnnotationRequest(BaseModel):
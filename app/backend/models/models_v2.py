@@ -11,6 +11,16 @@ class DomainType(str, Enum):
     LINKER = "LINKER"
 
 
+class ExportTable(str, Enum):
+    DOMAINS = "domains"
+    REGIONS = "regions"
+
+
+class ExportFormat(str, Enum):
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+
 class RegionFeature(BaseModel):
     kind: str = Field(..., description="Type of feature, e.g., 'sequence'")
     value: Any = Field(..., description="Feature value")
@@ -29,6 +39,8 @@ class Domain(BaseModel):
     stop: Optional[int] = None
     sequence: Optional[str] = None
     regions: List[Region] = Field(default_factory=list)
+    # Regions in the request's additional_schemes, keyed by scheme
+    scheme_regions: Dict[str, List[Region]] = Field(default_factory=dict)
     isotype: Optional[str] = None
     species: Optional[str] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
@@ -55,6 +67,16 @@ class AnnotationResult(BaseModel):
     species: Dict[str, int] = Field(default_factory=dict)
 
 
+class AnnotationSummary(BaseModel):
+    """Trailing statistics line of a streamed annotation response"""
+
+    numbering_scheme: str
+    total_sequences: int
+    chain_types: Dict[str, int] = Field(default_factory=dict)
+    isotypes: Dict[str, int] = Field(default_factory=dict)
+    species: Dict[str, int] = Field(default_factory=dict)
+
+
 # New models that match the ORM structure
 class LookupTableBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
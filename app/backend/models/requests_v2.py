@@ -1,7 +1,7 @@
 from typing import List
 
 from backend.models.models import NumberingScheme, SequenceInput
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class AnnotationRequestV2(BaseModel):
@@ -9,3 +9,17 @@ class AnnotationRequestV2(BaseModel):
         ..., description="Sequences to annotate"
     )
     numbering_scheme: NumberingScheme = Field(default=NumberingScheme.IMGT)
+    additional_schemes: List[NumberingScheme] = Field(
+        default_factory=list,
+        description=(
+            "Schemes whose regions are added to each variable domain, "
+            "numbered from the same ANARCI alignment"
+        ),
+    )
+
+    @field_validator("additional_schemes")
+    @classmethod
+    def _schemes_with_regions(cls, schemes):
+        if NumberingScheme.AHO in schemes:
+            raise ValueError("AHo has no region definitions")
+        return schemes
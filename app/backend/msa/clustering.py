@@ -0,0 +1,252 @@
+"""
+Redundancy reduction before multiple sequence alignment.
+
+Sequences are clustered greedily, CD-HIT style: visited longest first, each
+joins the first representative it matches at the identity threshold or
+becomes a representative itself. A representative is only aligned to a
+sequence when they share enough k-mers for the threshold to be reachable,
+counted with sparse products against the representatives' k-mer rows.
+Identity is the fraction of the shorter sequence's residues that are
+identical in a BLOSUM62 alignment.
+
+Only representatives go through the aligner. Members are then threaded
+onto their representative's row using the alignment that admitted them,
+with columns added wherever a member carries an insertion.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from Bio.Align import PairwiseAligner, substitution_matrices
+from scipy.sparse import csr_matrix
+
+from .kmer_distance import AMINO_ACIDS, KMER_SIZE, encode, kmer_matrix
+
+DEFAULT_IDENTITY = 0.95
+# Representatives aligned to a sequence at most, most shared k-mers first
+MAX_CANDIDATES = 20
+
+STANDARD_RESIDUES = np.frombuffer((AMINO_ACIDS + "X").encode("ascii"), "S1")
+
+# Aligned blocks as ((rep_start, rep_end), (member_start, member_end))
+Blocks = List[Tuple[Tuple[int, int], Tuple[int, int]]]
+
+
+@dataclass
+class Cluster:
+    """A representative and the sequences it stands for"""
+
+    representative: int
+    # Aligned blocks of each member against the representative
+    members: Dict[int, Blocks] = field(default_factory=dict)
+
+
+def _aligner() -> PairwiseAligner:
+    aligner = PairwiseAligner()
+    aligner.mode = "global"
+    aligner.substitution_matrix = substitution_matrices.load("BLOSUM62")
+    aligner.open_gap_score = -10
+    aligner.extend_gap_score = -0.5
+    return aligner
+
+
+def _align(
+    aligner: PairwiseAligner, representative: str, member: str
+) -> Blocks:
+    alignment = aligner.align(representative, member)[0]
+    return [
+        (tuple(map(int, r)), tuple(map(int, m)))
+        for r, m in zip(*alignment.aligned)
+    ]
+
+
+def _residues(sequence: str) -> np.ndarray:
+    return np.frombuffer(sequence.encode("ascii", "replace"), "S1")
+
+
+def _identity(
+    representative: np.ndarray, member: np.ndarray, blocks: Blocks
+) -> float:
+    identical = sum(
+        int(np.count_nonzero(representative[r0:r1] == member[m0:m1]))
+        for (r0, r1), (m0, m1) in blocks
+    )
+    return identical / len(member)
+
+
+class _RepresentativeKmers:
+    """
+    K-mer rows of the representatives, for counting the k-mers a sequence
+    shares with each of them
+
+    Rows are stacked in CSR blocks of BLOCK_SIZE representatives, so a count
+    is one sparse product per block; only the last, open block is rebuilt
+    when a representative is added.
+    """
+
+    BLOCK_SIZE = 256
+
+    def __init__(self, kmers: csr_matrix):
+        self.kmers = kmers
+        self.blocks: List[csr_matrix] = []
+        self.open_rows: List[int] = []
+        self.query = np.zeros(kmers.shape[1], dtype=kmers.dtype)
+
+    def add(self, index: int) -> None:
+        if len(self.open_rows) == self.BLOCK_SIZE:
+            self.open_rows = []
+        self.open_rows.append(index)
+        block = self.kmers[self.open_rows]
+        if len(self.open_rows) == 1:
+            self.blocks.append(block)
+        else:
+            self.blocks[-1] = block
+
+    def shared(self, own: np.ndarray) -> np.ndarray:
+        """Shared k-mers of each representative with the k-mers ``own``"""
+        self.query[own] = 1
+        counts = np.concatenate([block @ self.query for block in self.blocks])
+        self.query[own] = 0
+        return counts.astype(np.int64)
+
+
+def cluster_sequences(
+    sequences: Sequence[str],
+    identity: float = DEFAULT_IDENTITY,
+    k: int = KMER_SIZE,
+) -> List[Cluster]:
+    """
+    Cluster sequences at an identity threshold
+
+    Args:
+        sequences: Sequences to cluster
+        identity: Least identity, over the shorter sequence, of a member
+            to its representative
+        k: K-mer length of the prefilter
+
+    Returns:
+        Clusters in the order their representatives were found
+    """
+    aligner = _aligner()
+    kmers = kmer_matrix(sequences, k)
+    # Sequences in the aligner's alphabet, non-standard residues as X
+    standard = [
+        STANDARD_RESIDUES[encode(sequence)].tobytes().decode()
+        for sequence in sequences
+    ]
+    residues = [_residues(sequence) for sequence in standard]
+    clusters: List[Cluster] = []
+    by_sequence: Dict[str, int] = {}
+    representative_kmers = _RepresentativeKmers(kmers)
+
+    order = sorted(range(len(sequences)), key=lambda i: -len(sequences[i]))
+    for index in order:
+        sequence = sequences[index]
+        own = kmers.indices[kmers.indptr[index] : kmers.indptr[index + 1]]
+
+        # Identical sequences join without an alignment
+        if sequence in by_sequence:
+            cluster = clusters[by_sequence[sequence]]
+            length = len(sequence)
+            cluster.members[index] = [((0, length), (0, length))]
+            continue
+
+        found = None
+        if sequence and clusters:
+            # Each differing residue destroys at most k of the k-mers
+            needed = len(own) - k * math.floor((1 - identity) * len(sequence))
+            shared = representative_kmers.shared(own)
+            candidates = np.flatnonzero(shared >= needed)
+            candidates = candidates[np.argsort(-shared[candidates])]
+            for candidate in candidates[:MAX_CANDIDATES]:
+                representative = clusters[candidate].representative
+                blocks = _align(
+                    aligner, standard[representative], standard[index]
+                )
+                if (
+                    _identity(
+                        residues[representative], residues[index], blocks
+                    )
+                    >= identity
+                ):
+                    found = candidate
+                    clusters[candidate].members[index] = blocks
+                    break
+
+        if found is None:
+            by_sequence[sequence] = len(clusters)
+            representative_kmers.add(index)
+            clusters.append(Cluster(representative=index))
+
+    return clusters
+
+
+def thread_members(
+    sequences: Sequence[str],
+    clusters: Sequence[Cluster],
+    aligned_representatives: Sequence[str],
+) -> List[str]:
+    """
+    Expand an alignment of representatives to all sequences
+
+    Members take the columns of the representative residues they are
+    aligned to. Residues a member has in place of a gap in its
+    representative go into new columns just before the next representative
+    residue, shared by all members with an insertion at that point.
+
+    Args:
+        sequences: All clustered sequences
+        clusters: Clusters from ``cluster_sequences``
+        aligned_representatives: Aligned row of each cluster's
+            representative, in cluster order
+
+    Returns:
+        Aligned sequences in input order
+    """
+    width = len(aligned_representatives[0]) if aligned_representatives else 0
+    # insertions[s]: new columns before original column s (s == width: at
+    # the end)
+    insertions = np.zeros(width + 1, dtype=np.int64)
+    # Per row: original column (or -1) and insertion slot and rank of each
+    # residue
+    placements = {}
+    for cluster, row in zip(clusters, aligned_representatives):
+        columns = np.flatnonzero(_residues(row) != b"-")
+        columns = np.append(columns, width)
+        placements[cluster.representative] = (columns[:-1], None, None)
+        for member, blocks in cluster.members.items():
+            length = len(sequences[member])
+            column = np.full(length, -1, dtype=np.int64)
+            slot = np.zeros(length, dtype=np.int64)
+            rank = np.zeros(length, dtype=np.int64)
+            inserted = 0
+            for (r0, r1), (m0, m1) in blocks + [
+                ((len(columns) - 1,) * 2, (length, length))
+            ]:
+                run = m0 - inserted
+                if run > 0:
+                    slot[inserted:m0] = columns[r0]
+                    rank[inserted:m0] = np.arange(run)
+                    insertions[columns[r0]] = max(insertions[columns[r0]], run)
+                column[m0:m1] = columns[r0:r1]
+                inserted = m1
+            placements[member] = (column, slot, rank)
+
+    # New index of each original column and of the first column of each
+    # insertion slot
+    before = np.concatenate([[0], np.cumsum(insertions)])
+    new_columns = np.arange(width + 1) + before[1:]
+    slot_starts = new_columns - insertions
+
+    aligned = [""] * len(sequences)
+    for index, (column, slot, rank) in placements.items():
+        positions = new_columns[np.maximum(column, 0)]
+        if slot is not None:
+            outside = column < 0
+            positions[outside] = slot_starts[slot[outside]] + rank[outside]
+        row = np.full(width + int(insertions.sum()), b"-", dtype="S1")
+        row[positions] = _residues(sequences[index])
+        aligned[index] = row.tobytes().decode()
+    return aligned
@@ -0,0 +1,131 @@
+"""
+Consensus sequences from a single count pass over an alignment.
+
+The alignment is encoded once as a matrix of byte codes and counted into a
+(columns x 256) matrix with one ``bincount``. Everything else is read from
+that matrix: the consensus residue of each column, the fraction of rows
+that hold it, ambiguity codes for weak columns and the amino acid counts a
+PSSM is built from (``residue_counts``).
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+GAP = "-"
+GAP_CODE = ord(GAP)
+CODES = 256
+
+# IUPAC codes for columns split between two similar residues; any other
+# column below the threshold becomes X
+AMBIGUITY_CODES = {"B": "DN", "Z": "EQ", "J": "IL"}
+ANY_RESIDUE = "X"
+
+
+@dataclass
+class Consensus:
+    """Consensus residue of each column and how well it is supported"""
+
+    sequence: str
+    # Fraction of all rows holding the consensus residue, 0 for gap columns
+    majority_fraction: List[float]
+
+
+def encode_alignment(rows: Sequence[Sequence[str]]) -> np.ndarray:
+    """
+    Encode aligned rows as a (rows x columns) matrix of byte codes
+
+    Rows may be strings or lists of characters; shorter rows are padded
+    with gaps and non-ASCII characters become "?".
+    """
+    width = max((len(row) for row in rows), default=0)
+    text = "".join("".join(row).ljust(width, GAP) for row in rows)
+    return np.frombuffer(text.encode("ascii", "replace"), np.uint8).reshape(
+        len(rows), width
+    )
+
+
+def count_columns(encoded: np.ndarray) -> np.ndarray:
+    """Count of each byte code (columns) in each alignment column (rows)"""
+    width = encoded.shape[1]
+    flat = encoded.astype(np.int64) + CODES * np.arange(width)
+    return np.bincount(flat.ravel(), minlength=CODES * width).reshape(
+        width, CODES
+    )
+
+
+def residue_counts(counts: np.ndarray, residues: str) -> np.ndarray:
+    """Counts of the given residues, upper and lower case together"""
+    upper = np.frombuffer(residues.upper().encode("ascii"), np.uint8)
+    lower = np.frombuffer(residues.lower().encode("ascii"), np.uint8)
+    return counts[:, upper] + counts[:, lower]
+
+
+def majority(counts: np.ndarray) -> np.ndarray:
+    """
+    Index of the most frequent symbol of each column, -1 for empty columns
+
+    Ties go to the lowest index.
+    """
+    best = counts.argmax(axis=1)
+    best[counts.max(axis=1) == 0] = -1
+    return best
+
+
+def alignment_consensus(
+    encoded: np.ndarray,
+    counts: Optional[np.ndarray] = None,
+    threshold: Optional[float] = None,
+) -> Consensus:
+    """
+    Consensus of an encoded alignment
+
+    Every character other than the gap is counted, so non-standard
+    residues can be the consensus too. Ties go to the residue that occurs
+    first from the top of the column, and columns of gaps only get a gap.
+
+    Args:
+        encoded: Alignment from ``encode_alignment``
+        counts: Its counts from ``count_columns``, if already computed
+        threshold: If set, columns whose consensus residue holds a smaller
+            fraction of rows get an ambiguity code: B, Z or J if the pair
+            of residues it stands for reaches the threshold, X otherwise
+
+    Returns:
+        Consensus with the majority fraction of each column
+    """
+    num_rows = len(encoded)
+    if counts is None:
+        counts = count_columns(encoded)
+    residues = counts.copy()
+    residues[:, GAP_CODE] = 0
+    best = majority(residues)
+    supported = residues.max(axis=1)
+
+    # Break ties by first occurrence
+    tied = np.flatnonzero(
+        (residues == supported[:, np.newaxis]).sum(axis=1) > 1
+    )
+    for column in tied[supported[tied] > 0]:
+        candidates = residues[column] == supported[column]
+        column_codes = encoded[:, column]
+        best[column] = column_codes[np.argmax(candidates[column_codes])]
+
+    symbols = np.where(best >= 0, best, GAP_CODE).astype(np.uint8)
+    fraction = supported / max(num_rows, 1)
+
+    if threshold is not None:
+        weak = (best >= 0) & (fraction < threshold)
+        symbols[weak] = ord(ANY_RESIDUE)
+        for code, pair in AMBIGUITY_CODES.items():
+            members = np.frombuffer((pair + pair.lower()).encode(), np.uint8)
+            paired = counts[:, members].sum(axis=1) / max(num_rows, 1)
+            symbols[
+                weak & np.isin(best, members) & (paired >= threshold)
+            ] = ord(code)
+
+    return Consensus(
+        sequence=symbols.tobytes().decode(),
+        majority_fraction=fraction.tolist(),
+    )
@@ -0,0 +1,207 @@
+"""
+Guide trees for progressive alignment, ordering and chunking.
+
+Trees are built from k-mer distances (see ``kmer_distance``) by UPGMA or
+neighbor joining and returned as scipy linkage matrices: row i joins
+clusters ``Z[i, 0]`` and ``Z[i, 1]`` into cluster ``n + i``, where clusters
+below ``n`` are the sequences themselves.
+
+A full distance matrix is quadratic in memory, so larger inputs are first
+split top-down: each cluster is bisected around two distant sequences
+until clusters are small enough for an exact tree, and the subtrees are
+joined in the order of the splits. This needs one distance row per
+sequence per split level and builds a tree for 50k antibody sequences in
+seconds.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+from scipy.cluster.hierarchy import leaves_list, linkage, to_tree
+from scipy.sparse import csr_matrix
+from scipy.spatial.distance import squareform
+
+from .kmer_distance import KMER_SIZE, distances_between, kmer_matrix
+
+UPGMA = "upgma"
+NEIGHBOR_JOINING = "nj"
+
+# Largest clusters given an exact tree from their full distance matrix
+LEAF_SIZES = {UPGMA: 500, NEIGHBOR_JOINING: 200}
+# Splits leaving less than this fraction on one side are made at the median
+MIN_SPLIT_FRACTION = 0.1
+
+
+def upgma(distances: np.ndarray) -> np.ndarray:
+    """UPGMA tree of a symmetric distance matrix as a linkage matrix"""
+    return linkage(squareform(distances, checks=False), method="average")
+
+
+def neighbor_joining(distances: np.ndarray) -> np.ndarray:
+    """
+    Neighbor-joining tree of a symmetric distance matrix as a linkage matrix
+
+    The tree is rooted at the last join. Heights are the longest path to a
+    leaf below each node, with negative branch lengths taken as zero.
+    """
+    n = len(distances)
+    matrix = np.array(distances, dtype=np.float64)
+    nodes = list(range(n))
+    heights = np.zeros(2 * n - 1)
+    counts = np.ones(2 * n - 1)
+    tree = np.empty((max(n - 1, 0), 4))
+
+    def join(step, first, second, first_branch, second_branch):
+        node = n + step
+        heights[node] = max(
+            heights[first] + max(first_branch, 0.0),
+            heights[second] + max(second_branch, 0.0),
+        )
+        counts[node] = counts[first] + counts[second]
+        tree[step] = (first, second, heights[node], counts[node])
+        return node
+
+    size = n
+    for step in range(n - 2):
+        active = matrix[:size, :size]
+        totals = active.sum(axis=1)
+        q = (size - 2) * active - totals[:, np.newaxis] - totals
+        np.fill_diagonal(q, np.inf)
+        i, j = sorted(divmod(int(q.argmin()), size))
+        branch = 0.5 * active[i, j] + (totals[i] - totals[j]) / (
+            2 * (size - 2)
+        )
+        joined = 0.5 * (active[i] + active[j] - active[i, j])
+        nodes[i] = join(
+            step, nodes[i], nodes[j], branch, active[i, j] - branch
+        )
+        matrix[i, :size] = joined
+        matrix[:size, i] = joined
+        matrix[i, i] = 0
+        # Move the last active node into the slot of the joined one
+        last = size - 1
+        matrix[j, :size] = matrix[last, :size]
+        matrix[:size, j] = matrix[:size, last]
+        matrix[j, j] = 0
+        nodes[j] = nodes[last]
+        size -= 1
+    if n >= 2:
+        half = matrix[0, 1] / 2
+        join(n - 2, nodes[0], nodes[1], half, half)
+    return tree
+
+
+TREE_BUILDERS = {UPGMA: upgma, NEIGHBOR_JOINING: neighbor_joining}
+
+
+def _bisect(kmers: csr_matrix, members: np.ndarray):
+    """Split members around two distant members, and their distance"""
+    start = distances_between(kmers[members[:1]], kmers[members])[0]
+    first = members[start.argmax()]
+    to_first = distances_between(kmers[[first]], kmers[members])[0]
+    farthest = to_first.argmax()
+    second = members[farthest]
+    to_second = distances_between(kmers[[second]], kmers[members])[0]
+
+    closer = to_first - to_second
+    left = closer <= 0
+    smaller = min(left.sum(), len(members) - left.sum())
+    if smaller < MIN_SPLIT_FRACTION * len(members):
+        left = np.zeros(len(members), dtype=bool)
+        left[np.argsort(closer, kind="stable")[: len(members) // 2]] = True
+    return members[left], members[~left], to_first[farthest]
+
+
+def _divisive_tree(
+    kmers: csr_matrix, method: str, leaf_size: int
+) -> np.ndarray:
+    """Tree of sequences too many for one distance matrix"""
+    n = kmers.shape[0]
+    tree = np.empty((n - 1, 4))
+    heights = np.zeros(2 * n - 1)
+    counts = np.ones(2 * n - 1)
+    joined = 0
+
+    def add(first, second, height):
+        nonlocal joined
+        node = n + joined
+        heights[node] = max(height, heights[first], heights[second])
+        counts[node] = counts[first] + counts[second]
+        tree[joined] = (first, second, heights[node], counts[node])
+        joined += 1
+        return node
+
+    def build(members: np.ndarray) -> int:
+        if len(members) == 1:
+            return int(members[0])
+        if len(members) <= leaf_size:
+            subtree = TREE_BUILDERS[method](distances_between(kmers[members]))
+            # Subtree clusters below len(members) are members, the rest
+            # are the nodes added for earlier rows of the subtree
+            nodes = list(members)
+            for first, second, height, _ in subtree:
+                nodes.append(
+                    add(nodes[int(first)], nodes[int(second)], height)
+                )
+            return nodes[-1]
+        left, right, distance = _bisect(kmers, members)
+        return add(build(left), build(right), distance / 2)
+
+    build(np.arange(n))
+    return tree
+
+
+def guide_tree(
+    sequences: Sequence[str],
+    method: str = UPGMA,
+    k: int = KMER_SIZE,
+    leaf_size: int = 0,
+) -> np.ndarray:
+    """
+    Tree of sequences from their k-mer distances
+
+    Args:
+        sequences: Sequences to cluster
+        method: UPGMA or NEIGHBOR_JOINING
+        k: K-mer length
+        leaf_size: Largest input given an exact tree, default per method
+            from LEAF_SIZES
+
+    Returns:
+        scipy linkage matrix with len(sequences) - 1 rows
+    """
+    if method not in TREE_BUILDERS:
+        raise ValueError(f"Unsupported tree method: {method}")
+    if len(sequences) < 2:
+        return np.empty((0, 4))
+    leaf_size = leaf_size or LEAF_SIZES[method]
+    kmers = kmer_matrix(sequences, k)
+    if len(sequences) <= leaf_size:
+        return TREE_BUILDERS[method](distances_between(kmers))
+    return _divisive_tree(kmers, method, leaf_size)
+
+
+def leaf_order(tree: np.ndarray, n: int) -> List[int]:
+    """Sequence indices in the left-to-right order of the tree's leaves"""
+    if n < 2:
+        return list(range(n))
+    return leaves_list(tree).tolist()
+
+
+def subtrees(tree: np.ndarray, n: int, max_size: int) -> List[List[int]]:
+    """
+    Cut a tree into the largest subtrees of at most max_size sequences
+
+    Returns:
+        Sequence indices of each subtree, subtrees and indices in leaf order
+    """
+    if n < 2:
+        return [list(range(n))] if n else []
+    chunks, stack = [], [to_tree(tree)]
+    while stack:
+        node = stack.pop()
+        if node.get_count() <= max_size:
+            chunks.append(node.pre_order())
+        else:
+            stack.extend((node.get_right(), node.get_left()))
+    return chunks
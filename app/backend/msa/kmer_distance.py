@@ -0,0 +1,89 @@
+"""
+Alignment-free k-mer distances between protein sequences.
+
+Each sequence is reduced to the set of its k-mers, held for all sequences
+as one sparse presence matrix (sequences by the 21**k possible k-mers, the
+21st letter standing for any non-standard residue). The distance between
+two sequences is the fraction of the distinct k-mers of the shorter one
+that the other does not share, so blocks of distances come out of one
+sparse matrix product and no pair is ever aligned.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+# Code of residues outside the 20 standard amino acids
+UNKNOWN = len(AMINO_ACIDS)
+ALPHABET_SIZE = len(AMINO_ACIDS) + 1
+
+RESIDUE_CODES = np.full(256, UNKNOWN, dtype=np.int8)
+for _code, _residue in enumerate(AMINO_ACIDS):
+    RESIDUE_CODES[ord(_residue)] = _code
+    RESIDUE_CODES[ord(_residue.lower())] = _code
+
+KMER_SIZE = 3
+
+
+def encode(sequence: str) -> np.ndarray:
+    """Residue codes of a sequence, UNKNOWN for non-standard residues"""
+    return RESIDUE_CODES[
+        np.frombuffer(sequence.encode("ascii", "replace"), np.uint8)
+    ]
+
+
+def kmer_matrix(sequences: Sequence[str], k: int = KMER_SIZE) -> csr_matrix:
+    """Sparse presence (1.0) of each k-mer (columns) in each sequence (rows)"""
+    lengths = np.array([len(sequence) for sequence in sequences], np.int64)
+    codes = encode("".join(sequences)).astype(np.int64)
+    count = max(len(codes) - k + 1, 0)
+
+    kmers = np.zeros(count, dtype=np.int64)
+    for offset in range(k):
+        kmers = kmers * ALPHABET_SIZE + codes[offset : offset + count]
+    # Drop k-mers running across the end of a sequence into the next one
+    rows = np.repeat(np.arange(len(sequences)), lengths)[:count]
+    ends = np.cumsum(lengths)[rows]
+    inside = np.arange(count) + k <= ends
+
+    matrix = csr_matrix(
+        (
+            np.ones(int(inside.sum()), dtype=np.float32),
+            (rows[inside], kmers[inside]),
+        ),
+        shape=(len(sequences), ALPHABET_SIZE**k),
+    )
+    matrix.data[:] = 1
+    return matrix
+
+
+def distances_between(
+    first: csr_matrix, second: Optional[csr_matrix] = None
+) -> np.ndarray:
+    """
+    K-mer distances from every row of one k-mer matrix to every row of another
+
+    Args:
+        first, second: Matrices from ``kmer_matrix``; second defaults to
+            first, giving the symmetric matrix with a zero diagonal
+
+    Returns:
+        Dense (len(first), len(second)) array of distances in [0, 1]
+    """
+    symmetric = second is None
+    if symmetric:
+        second = first
+    shared = (second @ first.T.toarray()).T
+    smaller = np.minimum.outer(first.getnnz(axis=1), second.getnnz(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distances = np.where(smaller > 0, 1 - shared / smaller, 1.0)
+    if symmetric:
+        np.fill_diagonal(distances, 0)
+    return distances
+
+
+def kmer_distances(sequences: Sequence[str], k: int = KMER_SIZE) -> np.ndarray:
+    """Symmetric matrix of k-mer distances between all sequences"""
+    return distances_between(kmer_matrix(sequences, k))
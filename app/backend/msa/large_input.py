@@ -0,0 +1,212 @@
+"""
+Alignment strategies for large inputs.
+
+The default settings of the external aligners (MUSCLE's PPP algorithm,
+MAFFT's iterative refinement) stop being feasible beyond a few thousand
+sequences. ``plan_alignment`` picks one of three strategies from the number
+of sequences and residues:
+
+- standard: the method's usual settings
+- fast: the aligner's settings for large inputs, MUSCLE ``-super5`` and
+  MAFFT PartTree
+- chunked: the input is cut into subtrees of a k-mer guide tree, each
+  chunk is aligned in its own process with the usual settings and the chunk
+  alignments are merged by profile alignment, neighbouring chunks first
+
+The thresholds come from config and are reported with the plan, so a
+result records why it was aligned the way it was.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .guide_tree import guide_tree, subtrees
+from .progressive_alignment import merge_alignments
+from ..config import (
+    MSA_CHUNK_SIZE,
+    MSA_CHUNKED_RESIDUES,
+    MSA_CHUNKED_SEQUENCES,
+    MSA_FAST_RESIDUES,
+    MSA_FAST_SEQUENCES,
+    MSA_WORKERS,
+)
+from ..models.models import AlignmentMethod
+
+STANDARD = "standard"
+FAST = "fast"
+CHUNKED = "chunked"
+
+# Aligner arguments of the fast strategy, replacing the usual algorithm
+# options; methods without an entry keep their settings
+FAST_ARGUMENTS = {
+    AlignmentMethod.MUSCLE: ["muscle", "-super5"],
+    AlignmentMethod.MAFFT: ["mafft", "--retree", "2", "--parttree"],
+    # Pairwise methods hand large jobs to MUSCLE
+    AlignmentMethod.PAIRWISE_GLOBAL: ["muscle", "-super5"],
+    AlignmentMethod.PAIRWISE_LOCAL: ["muscle", "-super5"],
+}
+
+
+@dataclass
+class AlignmentPlan:
+    """How an input is aligned, and why"""
+
+    strategy: str
+    reason: str
+    num_sequences: int
+    num_residues: int
+    thresholds: Dict[str, int] = field(default_factory=dict)
+    # Aligner command of the fast strategy
+    settings: Optional[str] = None
+    chunk_size: Optional[int] = None
+    chunks: Optional[int] = None
+    workers: Optional[int] = None
+
+    def as_metadata(self) -> Dict[str, Any]:
+        """Plan as reported in result metadata, unset fields left out"""
+        return {
+            key: value
+            for key, value in asdict(self).items()
+            if value is not None
+        }
+
+
+def _workers() -> int:
+    return MSA_WORKERS if MSA_WORKERS > 0 else os.cpu_count() or 1
+
+
+def plan_alignment(
+    sequences: Sequence[str], method: AlignmentMethod, chunking: bool = True
+) -> AlignmentPlan:
+    """
+    Choose how to align sequences with a method
+
+    Args:
+        sequences: Sequences to align
+        method: Requested alignment method
+        chunking: Whether the caller can align in chunks; if not, inputs
+            past the chunked thresholds get the fast strategy
+
+    Returns:
+        Plan with the chosen strategy and the thresholds it was chosen by
+    """
+    num_sequences = len(sequences)
+    num_residues = sum(len(sequence) for sequence in sequences)
+    thresholds = {
+        "fast_sequences": MSA_FAST_SEQUENCES,
+        "fast_residues": MSA_FAST_RESIDUES,
+        "chunked_sequences": MSA_CHUNKED_SEQUENCES,
+        "chunked_residues": MSA_CHUNKED_RESIDUES,
+    }
+    plan = AlignmentPlan(
+        strategy=STANDARD,
+        reason="input below the large-input thresholds",
+        num_sequences=num_sequences,
+        num_residues=num_residues,
+        thresholds=thresholds,
+    )
+
+    # Numbering aligns each sequence on its own; no size calls for more
+    if method == AlignmentMethod.CUSTOM_ANTIBODY:
+        plan.reason = "numbered alignment scales linearly"
+        return plan
+
+    if chunking and num_sequences > MSA_CHUNKED_SEQUENCES:
+        plan.strategy = CHUNKED
+        plan.reason = (
+            f"{num_sequences} sequences > chunked_sequences "
+            f"({MSA_CHUNKED_SEQUENCES})"
+        )
+    elif chunking and num_residues > MSA_CHUNKED_RESIDUES:
+        plan.strategy = CHUNKED
+        plan.reason = (
+            f"{num_residues} residues > chunked_residues "
+            f"({MSA_CHUNKED_RESIDUES})"
+        )
+    elif num_sequences > MSA_FAST_SEQUENCES:
+        plan.strategy = FAST
+        plan.reason = (
+            f"{num_sequences} sequences > fast_sequences "
+            f"({MSA_FAST_SEQUENCES})"
+        )
+    elif num_residues > MSA_FAST_RESIDUES:
+        plan.strategy = FAST
+        plan.reason = (
+            f"{num_residues} residues > fast_residues ({MSA_FAST_RESIDUES})"
+        )
+
+    if plan.strategy == FAST and method in FAST_ARGUMENTS:
+        plan.settings = " ".join(FAST_ARGUMENTS[method])
+    elif plan.strategy == CHUNKED:
+        plan.chunk_size = MSA_CHUNK_SIZE
+        plan.workers = _workers()
+    return plan
+
+
+def chunk_sequences(
+    sequences: Sequence[str], chunk_size: int = MSA_CHUNK_SIZE
+) -> List[List[int]]:
+    """
+    Cut sequences into chunks of similar sequences
+
+    Args:
+        sequences: Sequences to divide
+        chunk_size: Most sequences in a chunk
+
+    Returns:
+        Indices of each chunk's sequences, chunks in guide tree leaf order
+    """
+    return subtrees(guide_tree(sequences), len(sequences), chunk_size)
+
+
+def align_chunks(
+    sequences: Sequence[str],
+    chunks: Sequence[Sequence[int]],
+    align_chunk: Callable[[List[str]], List[str]],
+    workers: int = 1,
+) -> List[str]:
+    """
+    Align chunks separately and merge them into one alignment
+
+    Args:
+        sequences: All sequences
+        chunks: Indices of each chunk's sequences, from ``chunk_sequences``
+        align_chunk: Aligns one chunk; must be picklable when workers > 1
+        workers: Processes aligning chunks in parallel
+
+    Returns:
+        Aligned sequences in input order
+    """
+    inputs = [[sequences[index] for index in chunk] for chunk in chunks]
+    if workers > 1 and len(inputs) > 1:
+        # Spawned rather than forked: the server process runs threads
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(inputs)),
+            mp_context=get_context("spawn"),
+        ) as pool:
+            aligned = list(pool.map(align_chunk, inputs))
+    else:
+        aligned = [align_chunk(chunk) for chunk in inputs]
+
+    # Merge neighbouring chunks pairwise so profiles grow evenly
+    blocks = [(list(chunk), rows) for chunk, rows in zip(chunks, aligned)]
+    while len(blocks) > 1:
+        merged = [
+            (
+                blocks[i][0] + blocks[i + 1][0],
+                merge_alignments(blocks[i][1], blocks[i + 1][1]),
+            )
+            for i in range(0, len(blocks) - 1, 2)
+        ]
+        if len(blocks) % 2:
+            merged.append(blocks[-1])
+        blocks = merged
+
+    result = [""] * len(sequences)
+    if blocks:
+        for index, row in zip(*blocks[0]):
+            result[index] = row
+    return result
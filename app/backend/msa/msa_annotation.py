@@ -1,17 +1,21 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 from backend.annotation.annotation_engine import (
     annotate_sequences_with_processor,
 )
 from backend.annotation.sequence_processor import SequenceProcessor
-from backend.logger import logger
+from backend.logger import get_logger
 from backend.models.models import (
+    AnnotationResult,
     MSAResult,
     MSASequence,
     MSAAnnotationResult,
     NumberingScheme,
     SequenceInput,
 )
+from backend.profiling import profiled
+
+logger = get_logger(__name__)
 
 
 class MSAAnnotationEngine:
@@ -20,6 +24,7 @@ class MSAAnnotationEngine:
     def __init__(self):
         self.sequence_processor = SequenceProcessor()
 
+    @profiled("annotate_msa")
     def annotate_msa(
         self,
         msa_result: MSAResult,
@@ -50,87 +55,9 @@ class MSAAnnotationEngine:
                 sequences=sequence_inputs, numbering_scheme=numbering_scheme
             )
 
-            # Map annotations back to MSA sequences
-            annotated_sequences = []
-            all_regions = []
-
-            for i, msa_seq in enumerate(msa_result.sequences):
-                sequence_regions = []
-
-                if i < len(annotation_result.sequences):
-                    # Get annotations for this sequence
-                    seq_info = annotation_result.sequences[i]
-
-                    # Extract regions if they exist
-                    if hasattr(seq_info, "regions") and seq_info.regions:
-                        for (
-                            region_name,
-                            region_data,
-                        ) in seq_info.regions.items():
-                            # Map region positions to aligned sequence positions
-                            aligned_start, aligned_stop = (
-                                self._map_region_to_aligned(
-                                    region_data,
-                                    msa_seq.original_sequence,
-                                    msa_seq.aligned_sequence,
-                                )
-                            )
-
-                            region_info = {
-                                "id": f"{msa_seq.name}_{region_name}",
-                                "name": region_name,
-                                "start": aligned_start,
-                                "stop": aligned_stop,
-                                "sequence": (
-                                    region_data.sequence
-                                    if hasattr(region_data, "sequence")
-                                    else ""
-                                ),
-                                "type": (
-                                    "CDR" if "CDR" in region_name else "FR"
-                                ),
-                                "color": self._get_region_color(region_name),
-                                "original_start": (
-                                    region_data.start
-                                    if hasattr(region_data, "start")
-                                    else 0
-                                ),
-                                "original_stop": (
-                                    region_data.stop
-                                    if hasattr(region_data, "stop")
-                                    else 0
-                                ),
-                            }
-                            sequence_regions.append(region_info)
-                            all_regions.append(region_info)
-
-                # Create enhanced sequence with annotations
-                enhanced_seq = MSASequence(
-                    name=msa_seq.name,
-                    original_sequence=msa_seq.original_sequence,
-                    aligned_sequence=msa_seq.aligned_sequence,
-                    start_position=msa_seq.start_position,
-                    end_position=msa_seq.end_position,
-                    gaps=msa_seq.gaps,
-                    annotations=sequence_regions,
-                )
-                annotated_sequences.append(enhanced_seq)
-
-            # Create region mappings
-            region_mappings = {}
-            for region in all_regions:
-                region_name = region["name"]
-                if region_name not in region_mappings:
-                    region_mappings[region_name] = []
-                region_mappings[region_name].append(
-                    {
-                        "sequence_name": region["id"].split("_")[0],
-                        "start": region["start"],
-                        "stop": region["stop"],
-                        "sequence": region["sequence"],
-                        "color": region["color"],
-                    }
-                )
+            annotated_sequences, region_mappings = self._map_annotations(
+                msa_result, annotation_result
+            )
 
             return MSAAnnotationResult(
                 msa_id=msa_result.msa_id,
@@ -140,9 +67,97 @@ class MSAAnnotationEngine:
             )
 
         except Exception as e:
-            logger.error(f"MSA annotation failed: {e}")
+            logger.error("MSA annotation failed: %s", e)
             raise RuntimeError(f"MSA annotation failed: {e}")
 
+    @profiled("region_mapping")
+    def _map_annotations(
+        self, msa_result: MSAResult, annotation_result: AnnotationResult
+    ) -> Tuple[List[MSASequence], Dict[str, List[Dict[str, Any]]]]:
+        """Map annotated regions onto the aligned MSA sequences"""
+        # Map annotations back to MSA sequences
+        annotated_sequences = []
+        all_regions = []
+
+        for i, msa_seq in enumerate(msa_result.sequences):
+            sequence_regions = []
+
+            if i < len(annotation_result.sequences):
+                # Get annotations for this sequence
+                seq_info = annotation_result.sequences[i]
+
+                # Extract regions if they exist
+                if hasattr(seq_info, "regions") and seq_info.regions:
+                    for (
+                        region_name,
+                        region_data,
+                    ) in seq_info.regions.items():
+                        # Map region positions to aligned sequence positions
+                        (
+                            aligned_start,
+                            aligned_stop,
+                        ) = self._map_region_to_aligned(
+                            region_data,
+                            msa_seq.original_sequence,
+                            msa_seq.aligned_sequence,
+                        )
+
+                        region_info = {
+                            "id": f"{msa_seq.name}_{region_name}",
+                            "name": region_name,
+                            "start": aligned_start,
+                            "stop": aligned_stop,
+                            "sequence": (
+                                region_data.sequence
+                                if hasattr(region_data, "sequence")
+                                else ""
+                            ),
+                            "type": ("CDR" if "CDR" in region_name else "FR"),
+                            "color": self._get_region_color(region_name),
+                            "original_start": (
+                                region_data.start
+                                if hasattr(region_data, "start")
+                                else 0
+                            ),
+                            "original_stop": (
+                                region_data.stop
+                                if hasattr(region_data, "stop")
+                                else 0
+                            ),
+                        }
+                        sequence_regions.append(region_info)
+                        all_regions.append(region_info)
+
+            # Create enhanced sequence with annotations
+            enhanced_seq = MSASequence(
+                name=msa_seq.name,
+                original_sequence=msa_seq.original_sequence,
+                aligned_sequence=msa_seq.aligned_sequence,
+                start_position=msa_seq.start_position,
+                end_position=msa_seq.end_position,
+                gaps=msa_seq.gaps,
+                annotations=sequence_regions,
+            )
+            annotated_sequences.append(enhanced_seq)
+
+        # Create region mappings
+        region_mappings = {}
+        for region in all_regions:
+            region_name = region["name"]
+            if region_name not in region_mappings:
+                region_mappings[region_name] = []
+            region_mappings[region_name].append(
+                {
+                    "sequence_name": region["id"].split("_")[0],
+                    "start": region["start"],
+                    "stop": region["stop"],
+                    "sequence": region["sequence"],
+                    "color": region["color"],
+                }
+            )
+
+        return annotated_sequences, region_mappings
+
     def _map_region_to_aligned(
         self, region_data: Any, original_seq: str, aligned_seq: str
     ) -> tuple[int, int]:
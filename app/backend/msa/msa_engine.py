@@ -3,14 +3,44 @@ import subprocess
 import tempfile
 import uuid
 from datetime import datetime
-from typing import List, Tuple
+from functools import partial
+from typing import List, Optional, Tuple
 
-from Bio import AlignIO, Align
-from Bio.Align import substitution_matrices
+from Bio import AlignIO
 from Bio.Align.Applications import MuscleCommandline
 
+from .clustering import cluster_sequences, thread_members
+from .consensus import alignment_consensus, count_columns, encode_alignment
+from .large_input import (
+    CHUNKED,
+    FAST,
+    FAST_ARGUMENTS,
+    AlignmentPlan,
+    align_chunks,
+    chunk_sequences,
+    plan_alignment,
+)
+from .numbered_alignment import align_numbered
+from .progressive_alignment import add_to_alignment, progressive_alignment
 from .pssm_calculator import PSSMCalculator
-from ..models.models import MSAResult, MSASequence, AlignmentMethod
+from ..metrics import ALIGNER_SECONDS
+from ..models.models import (
+    MSAResult,
+    MSASequence,
+    AlignmentMethod,
+    NumberingScheme,
+)
+from ..profiling import profiled, stage
+
+# Jobs up to this size are aligned in-process by the pairwise methods
+IN_PROCESS_MAX_SEQUENCES = 10
+
+
+def _align_chunk(
+    engine_class: type, method: AlignmentMethod, sequences: List[str]
+) -> List[str]:
+    """Align one chunk of a large input, in a worker process"""
+    return engine_class()._run_aligner(sequences, method)
 
 
 class MSAEngine:
@@ -23,13 +53,18 @@ class MSAEngine:
             AlignmentMethod.CLUSTALO: self._align_clustalo,
             AlignmentMethod.PAIRWISE_GLOBAL: self._align_pairwise_global,
             AlignmentMethod.PAIRWISE_LOCAL: self._align_pairwise_local,
+            AlignmentMethod.CUSTOM_ANTIBODY: self._align_numbered,
         }
         self.pssm_calculator = PSSMCalculator()
 
+    @profiled("create_msa")
     def create_msa(
         self,
         sequences: List[Tuple[str, str]],
         method: AlignmentMethod = AlignmentMethod.MUSCLE,
+        numbering_scheme: NumberingScheme = NumberingScheme.IMGT,
+        cluster_identity: Optional[float] = None,
+        consensus_threshold: Optional[float] = None,
     ) -> MSAResult:
         """
         Create multiple sequence alignment
@@ -37,6 +72,11 @@ class MSAEngine:
         Args:
             sequences: List of (name, sequence) tuples
             method: Alignment method to use
+            numbering_scheme: Scheme the custom antibody method aligns on
+            cluster_identity: If set, cluster sequences at this identity,
+                align only the representatives and thread members onto them
+            consensus_threshold: If set, consensus residues held by a
+                smaller fraction of sequences become ambiguity codes
 
         Returns:
             MSAResult with aligned sequences and metadata
@@ -51,40 +91,68 @@ class MSAEngine:
         names = [seq[0] for seq in sequences]
         seqs = [seq[1] for seq in sequences]
 
-        # Perform alignment
-        aligned_sequences = self.supported_methods[method](seqs)
+        # Reduce redundant sequences to cluster representatives
+        clusters = None
+        to_align = seqs
+        if cluster_identity is not None:
+            with stage("cluster"):
+                clusters = cluster_sequences(seqs, cluster_identity)
+            to_align = [seqs[cluster.representative] for cluster in clusters]
+
+        # Pick settings for the input size, then align
+        plan = plan_alignment(to_align, method)
+        with stage("align"), ALIGNER_SECONDS.labels(
+            method=method.value
+        ).time():
+            if method == AlignmentMethod.CUSTOM_ANTIBODY:
+                aligned_sequences = self._align_numbered(
+                    to_align, numbering_scheme
+                )
+            elif plan.strategy == CHUNKED:
+                aligned_sequences = self._align_chunked(to_align, method, plan)
+            else:
+                aligned_sequences = self._run_aligner(
+                    to_align, method, fast=plan.strategy == FAST
+                )
 
-        # Create alignment matrix
-        alignment_matrix = self._create_alignment_matrix(aligned_sequences)
+        if clusters is not None:
+            with stage("thread_members"):
+                aligned_sequences = thread_members(
+                    seqs, clusters, aligned_sequences
+                )
 
-        # Generate consensus
-        consensus = self._generate_consensus(alignment_matrix)
+        # Create alignment matrix
+        with stage("alignment_matrix"):
+            alignment_matrix = self._create_alignment_matrix(aligned_sequences)
+
+        # Generate consensus from one count of the alignment's characters
+        with stage("consensus"):
+            encoded = encode_alignment(aligned_sequences)
+            column_counts = count_columns(encoded)
+            consensus = alignment_consensus(
+                encoded, column_counts, consensus_threshold
+            )
 
-        # Calculate PSSM
-        pssm_data = self.pssm_calculator.calculate_pssm(alignment_matrix)
+        # Calculate PSSM from the same counts
+        with stage("pssm"):
+            pssm_data = self.pssm_calculator.calculate_pssm(
+                alignment_matrix, column_counts=column_counts
+            )
 
         # Create MSASequence objects
-        msa_sequences = []
-        for i, (name, original_seq, aligned_seq) in enumerate(
-            zip(names, seqs, aligned_sequences)
-        ):
-            gaps = [j for j, char in enumerate(aligned_seq) if char == "-"]
-            msa_seq = MSASequence(
-                name=name,
-                original_sequence=original_seq,
-                aligned_sequence=aligned_seq,
-                start_position=0,
-                end_position=len(aligned_seq),
-                gaps=gaps,
+        msa_sequences = [
+            self._msa_sequence(name, original_seq, aligned_seq)
+            for name, original_seq, aligned_seq in zip(
+                names, seqs, aligned_sequences
             )
-            msa_sequences.append(msa_seq)
+        ]
 
         # Create MSA result
         msa_result = MSAResult(
             msa_id=str(uuid.uuid4()),
             sequences=msa_sequences,
             alignment_matrix=alignment_matrix,
-            consensus=consensus,
+            consensus=consensus.sequence,
             alignment_method=method,
             created_at=datetime.now().isoformat(),
             metadata={
@@ -93,12 +161,164 @@ class MSAEngine:
                     len(aligned_sequences[0]) if aligned_sequences else 0
                 ),
                 "method": method.value,
+                "consensus_fraction": consensus.majority_fraction,
+                "alignment_plan": plan.as_metadata(),
                 "pssm_data": pssm_data,
             },
         )
+        if consensus_threshold is not None:
+            msa_result.metadata["consensus_threshold"] = consensus_threshold
+        if clusters is not None:
+            msa_result.metadata["cluster_identity"] = cluster_identity
+            msa_result.metadata["clusters"] = [
+                {
+                    "representative": cluster.representative,
+                    "members": sorted(cluster.members),
+                }
+                for cluster in clusters
+            ]
 
         return msa_result
 
+    @profiled("add_to_msa")
+    def add_sequences(
+        self,
+        msa_result: MSAResult,
+        sequences: List[Tuple[str, str]],
+        keep_length: bool = False,
+    ) -> MSAResult:
+        """
+        Add sequences to an existing alignment without realigning it
+
+        New sequences are aligned onto the profile of the alignment; its
+        rows only gain gap columns where new sequences carry insertions.
+        The PSSM is updated from the residue counts of the new rows; the
+        consensus is recounted with the alignment's consensus threshold.
+
+        Args:
+            msa_result: Alignment to add to
+            sequences: List of (name, sequence) tuples to add
+            keep_length: Leave out residues that would need new columns,
+                keeping the alignment's columns as they are
+
+        Returns:
+            New MSAResult with the added sequences after the original ones
+        """
+        if not sequences:
+            raise ValueError("No valid sequences provided")
+
+        rows = [row.aligned_sequence for row in msa_result.sequences]
+        with stage("align"):
+            expanded, added, columns = add_to_alignment(
+                rows,
+                [seq[1] for seq in sequences],
+                free_end_gaps=(
+                    msa_result.alignment_method
+                    == AlignmentMethod.PAIRWISE_LOCAL
+                ),
+                keep_length=keep_length,
+            )
+
+        with stage("alignment_matrix"):
+            added_matrix = self._create_alignment_matrix(added)
+            if expanded == rows:
+                msa_sequences = list(msa_result.sequences)
+                alignment_matrix = msa_result.alignment_matrix + added_matrix
+            else:
+                msa_sequences = [
+                    self._msa_sequence(
+                        row.name, row.original_sequence, aligned
+                    )
+                    for row, aligned in zip(msa_result.sequences, expanded)
+                ]
+                alignment_matrix = (
+                    self._create_alignment_matrix(expanded) + added_matrix
+                )
+            msa_sequences += [
+                self._msa_sequence(name, sequence, aligned)
+                for (name, sequence), aligned in zip(sequences, added)
+            ]
+
+        with stage("pssm"):
+            pssm_data = msa_result.metadata.get("pssm_data") or {}
+            if "residue_counts" in pssm_data:
+                pssm_data = self.pssm_calculator.add_to_pssm(
+                    pssm_data, added_matrix, columns
+                )
+            else:
+                # Stored before PSSMs kept their counts
+                pssm_data = self.pssm_calculator.calculate_pssm(
+                    alignment_matrix
+                )
+
+        # Recounted rather than updated: ties and ambiguity codes depend
+        # on every character of a column, not just its amino acid counts
+        with stage("consensus"):
+            consensus = alignment_consensus(
+                encode_alignment(expanded + added),
+                threshold=msa_result.metadata.get("consensus_threshold"),
+            )
+
+        metadata = dict(msa_result.metadata)
+        metadata.update(
+            {
+                "num_sequences": len(msa_sequences),
+                "alignment_length": len(alignment_matrix[0]),
+                "consensus_fraction": consensus.majority_fraction,
+                "pssm_data": pssm_data,
+                "parent_msa_id": msa_result.msa_id,
+                "added_sequences": len(sequences),
+                "keep_length": keep_length,
+            }
+        )
+        return MSAResult(
+            msa_id=str(uuid.uuid4()),
+            sequences=msa_sequences,
+            alignment_matrix=alignment_matrix,
+            consensus=consensus.sequence,
+            alignment_method=msa_result.alignment_method,
+            created_at=datetime.now().isoformat(),
+            metadata=metadata,
+        )
+
+    def _msa_sequence(
+        self, name: str, original_sequence: str, aligned_sequence: str
+    ) -> MSASequence:
+        """MSASequence of an aligned row"""
+        return MSASequence(
+            name=name,
+            original_sequence=original_sequence,
+            aligned_sequence=aligned_sequence,
+            start_position=0,
+            end_position=len(aligned_sequence),
+            gaps=[j for j, char in enumerate(aligned_sequence) if char == "-"],
+        )
+
+    def _run_aligner(
+        self, sequences: List[str], method: AlignmentMethod, fast: bool = False
+    ) -> List[str]:
+        """Align with a method, in its fast settings if it has them"""
+        if fast and method in FAST_ARGUMENTS:
+            return self.supported_methods[method](sequences, fast=True)
+        return self.supported_methods[method](sequences)
+
+    def _align_chunked(
+        self,
+        sequences: List[str],
+        method: AlignmentMethod,
+        plan: AlignmentPlan,
+    ) -> List[str]:
+        """Align guide tree chunks in parallel and merge their profiles"""
+        with stage("chunk"):
+            chunks = chunk_sequences(sequences, plan.chunk_size)
+        plan.chunks = len(chunks)
+        return align_chunks(
+            sequences,
+            chunks,
+            partial(_align_chunk, type(self), method),
+            plan.workers,
+        )
+
     def _create_temp_fasta_file(self, sequences: List[str]) -> str:
         """Create a temporary FASTA file with the given sequences"""
         with tempfile.NamedTemporaryFile(
@@ -117,8 +337,10 @@ class MSAEngine:
                 except FileNotFoundError:
                     pass
 
-    def _align_muscle(self, sequences: List[str]) -> List[str]:
-        """Align sequences using MUSCLE"""
+    def _align_muscle(
+        self, sequences: List[str], fast: bool = False
+    ) -> List[str]:
+        """Align sequences using MUSCLE, with Super5 if fast"""
         if not sequences:
             return []
 
@@ -131,12 +353,18 @@ class MSAEngine:
             temp_out_path = tempfile.mktemp(suffix=".aln")
 
             # Run MUSCLE
-            cmd = ["muscle", "-align", temp_in_path, "-output", temp_out_path]
+            algorithm = "-super5" if fast else "-align"
+            cmd = ["muscle", algorithm, temp_in_path, "-output", temp_out_path]
             subprocess.run(cmd, check=True, capture_output=True, text=True)
 
-            # Read alignment
+            # Read alignment, in input order (Super5 writes it in tree order)
             alignment = AlignIO.read(temp_out_path, "fasta")
-            aligned_sequences = [str(record.seq) for record in alignment]
+            aligned_sequences = [
+                str(record.seq)
+                for record in sorted(
+                    alignment, key=lambda record: int(record.id.split("_")[1])
+                )
+            ]
 
             return aligned_sequences
 
@@ -147,8 +375,10 @@ class MSAEngine:
         finally:
             self._cleanup_temp_files(temp_in_path, temp_out_path)
 
-    def _align_mafft(self, sequences: List[str]) -> List[str]:
-        """Align sequences using MAFFT"""
+    def _align_mafft(
+        self, sequences: List[str], fast: bool = False
+    ) -> List[str]:
+        """Align sequences using MAFFT, with PartTree if fast"""
         temp_in_path = None
 
         try:
@@ -156,7 +386,10 @@ class MSAEngine:
             temp_in_path = self._create_temp_fasta_file(sequences)
 
             # Run MAFFT (outputs to stdout)
-            cmd = ["mafft", "--auto", temp_in_path]
+            if fast:
+                cmd = FAST_ARGUMENTS[AlignmentMethod.MAFFT] + [temp_in_path]
+            else:
+                cmd = ["mafft", "--auto", temp_in_path]
             result = subprocess.run(
                 cmd, check=True, capture_output=True, text=True
             )
@@ -219,36 +452,54 @@ class MSAEngine:
         finally:
             self._cleanup_temp_files(temp_in_path, temp_out_path)
 
-    def _align_pairwise_global(self, sequences: List[str]) -> List[str]:
+    def _align_numbered(
+        self,
+        sequences: List[str],
+        numbering_scheme: NumberingScheme = NumberingScheme.IMGT,
+    ) -> List[str]:
+        """Align sequences on their ANARCI-numbered positions"""
+        return align_numbered(sequences, numbering_scheme.value).aligned
+
+    def _align_pairwise_global(
+        self, sequences: List[str], fast: bool = False
+    ) -> List[str]:
         """Align sequences using Biopython's built-in MSA capabilities as fallback"""
         if len(sequences) < 2:
             return sequences
 
-        # Try external tools first, fall back to Biopython's MSA
+        # Small jobs are cheaper in-process than through a MUSCLE subprocess
+        if len(sequences) <= IN_PROCESS_MAX_SEQUENCES:
+            return self._progressive_alignment(sequences, "global")
+
+        # Try external tools first, fall back to the in-process aligner
         try:
-            return self._align_muscle(sequences)
+            return self._align_muscle(sequences, fast=fast)
         except (
             RuntimeError,
             FileNotFoundError,
             subprocess.CalledProcessError,
         ):
-            # Fall back to Biopython's built-in MSA
             return self._biopython_msa_fallback(sequences, "global")
 
-    def _align_pairwise_local(self, sequences: List[str]) -> List[str]:
+    def _align_pairwise_local(
+        self, sequences: List[str], fast: bool = False
+    ) -> List[str]:
         """Align sequences using Biopython's built-in MSA capabilities as fallback"""
         if len(sequences) < 2:
             return sequences
 
-        # Try external tools first, fall back to Biopython's MSA
+        # Small jobs are cheaper in-process than through a MUSCLE subprocess
+        if len(sequences) <= IN_PROCESS_MAX_SEQUENCES:
+            return self._progressive_alignment(sequences, "local")
+
+        # Try external tools first, fall back to the in-process aligner
         try:
-            return self._align_muscle(sequences)
+            return self._align_muscle(sequences, fast=fast)
         except (
             RuntimeError,
             FileNotFoundError,
             subprocess.CalledProcessError,
         ):
-            # Fall back to Biopython's built-in MSA
             return self._biopython_msa_fallback(sequences, "local")
 
     def _biopython_msa_fallback(
@@ -259,8 +510,8 @@ class MSAEngine:
             return sequences
 
         # For small datasets, use progressive alignment
-        if len(sequences) <= 10:
-            return self._progressive_alignment_biopython(sequences, mode)
+        if len(sequences) <= IN_PROCESS_MAX_SEQUENCES:
+            return self._progressive_alignment(sequences, mode)
         else:
             # For larger datasets, try to use MUSCLE through Biopython's wrapper
             try:
@@ -271,53 +522,19 @@ class MSAEngine:
                 subprocess.CalledProcessError,
             ):
                 # Final fallback to progressive alignment
-                return self._progressive_alignment_biopython(sequences, mode)
+                return self._progressive_alignment(sequences, mode)
 
-    def _progressive_alignment_biopython(
+    def _progressive_alignment(
         self, sequences: List[str], mode: str
     ) -> List[str]:
-        """Use Biopython's progressive alignment approach"""
-        if len(sequences) < 2:
-            return sequences
-
-        # Initialize with first sequence
-        aligned_sequences = [sequences[0]]
-
-        aligner = Align.PairwiseAligner()
-        aligner.mode = mode
-        aligner.substitution_matrix = substitution_matrices.load("BLOSUM62")
-        aligner.open_gap_score = -10
-        aligner.extend_gap_score = -0.5
-
-        # Progressive alignment: align each new sequence with the profile of existing sequences
-        for i in range(1, len(sequences)):
-            current_seq = sequences[i]
-
-            # Align current sequence with the first sequence (as a simple profile)
-            target_seq = aligned_sequences[0]
-
-            alignments = aligner.align(target_seq, current_seq)
-            if alignments:
-                alignment = alignments[0]
-                target, query = alignment.target, alignment.query
-
-                # Ensure both sequences have the same length
-                max_length = max(len(target), len(query))
-                target_padded = target + "-" * (max_length - len(target))
-                query_padded = query + "-" * (max_length - len(query))
-
-                # Update all existing sequences with padding
-                for j in range(len(aligned_sequences)):
-                    seq = aligned_sequences[j]
-                    aligned_sequences[j] = seq + "-" * (max_length - len(seq))
-
-                # Add the new aligned sequence
-                aligned_sequences.append(query_padded)
-
-                # Update the target sequence
-                aligned_sequences[0] = target_padded
+        """
+        Align in-process along a k-mer guide tree
 
-        return aligned_sequences
+        Local mode leaves gaps at the ends of sequences unpenalised.
+        """
+        return progressive_alignment(
+            sequences, free_end_gaps=(mode == "local")
+        )
 
     def _muscle_biopython_wrapper(self, sequences: List[str]) -> List[str]:
         """Use Biopython's MUSCLE wrapper as an additional fallback"""
@@ -363,34 +580,4 @@ class MSAEngine:
 
     def _generate_consensus(self, alignment_matrix: List[List[str]]) -> str:
         """Generate consensus sequence from alignment matrix"""
-        if not alignment_matrix:
-            return ""
-
-        consensus = []
-        num_sequences = len(alignment_matrix)
-
-        # Find the maximum length of any sequence
-        max_length = (
-            max(len(seq) for seq in alignment_matrix)
-            if alignment_matrix
-            else 0
-        )
-
-        for col in range(max_length):
-            # Count amino acids at this position
-            aa_counts = {}
-            for row in range(num_sequences):
-                if col < len(alignment_matrix[row]):
-                    aa = alignment_matrix[row][col]
-                    if aa != "-":  # Skip gaps
-                        aa_counts[aa] = aa_counts.get(aa, 0) + 1
-
-            if aa_counts:
-                # Find most common amino acid
-                most_common = max(aa_counts.items(), key=lambda x: x[1])
-                consensus.append(most_common[0])
-            else:
-                # All gaps at this position
-                consensus.append("-")
-
-        return "".join(consensus)
+        return alignment_consensus(encode_alignment(alignment_matrix)).sequence
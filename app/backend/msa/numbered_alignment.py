@@ -0,0 +1,186 @@
+"""
+Antibody-aware MSA built from numbered positions.
+
+A numbering scheme already places every residue of a variable domain at a
+scheme position, so domains numbered in the same scheme are aligned by
+construction: the columns of the MSA are the union of the positions
+observed, in scheme order, and each residue goes into the column of its
+position. No progressive or iterative aligner is involved, the cost is
+linear in the number of residues and CDRs line up consistently.
+
+Residues before the numbered domain (e.g. a leader) are right-aligned in
+columns ahead of it and residues after it (a constant region or a second
+domain) are left-aligned in columns after it. Sequences ANARCI cannot
+number are placed, unaligned, in those trailing columns.
+"""
+
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from anarci import run_anarci
+
+from backend.annotation.anarci_result_processor import ALLOWED_SPECIES
+from backend.annotation.scheme_numbering import anarci_scheme
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Sequences numbered per ANARCI call, bounding the hmmscan output held at once
+NUMBERING_BATCH_SIZE = 1000
+
+Position = Tuple[int, str]
+# ANARCI's numbered domain: ([((number, insertion), residue), ...], start, end)
+NumberedDomain = Tuple[list, int, int]
+
+
+@dataclass
+class NumberedAlignment:
+    """
+    Sequences aligned on their numbered positions
+
+    ``columns`` holds the position of each column, or None for the flanking
+    columns before and after the numbered domains. ``unnumbered`` lists the
+    indices of sequences without a numbered domain.
+    """
+
+    aligned: List[str]
+    columns: List[Optional[Position]]
+    unnumbered: List[int]
+
+
+def number_sequences(
+    sequences: Sequence[str],
+    scheme: str = "imgt",
+    batch_size: int = NUMBERING_BATCH_SIZE,
+) -> List[Optional[NumberedDomain]]:
+    """First numbered domain of each sequence, None where ANARCI found none"""
+    scheme = anarci_scheme(scheme)
+    domains = []
+    for start in range(0, len(sequences), batch_size):
+        batch = [
+            (f"seq_{start + offset}", sequence)
+            for offset, sequence in enumerate(
+                sequences[start : start + batch_size]
+            )
+        ]
+        _, numbered, _, _ = run_anarci(
+            batch, scheme=scheme, allowed_species=ALLOWED_SPECIES
+        )
+        domains.extend(hits[0] if hits else None for hits in numbered)
+    return domains
+
+
+def column_order(layouts: Iterable[Sequence[Position]]) -> List[Position]:
+    """
+    Positions of all layouts in one order consistent with each of them
+
+    Positions are ordered as they follow each other in the layouts, which
+    keeps orders particular to a scheme (IMGT numbers the insertions at 33,
+    61 and 112 in descending order), and by number and insertion otherwise.
+    """
+    successors: Dict[Position, set] = defaultdict(set)
+    predecessors: Dict[Position, int] = defaultdict(int)
+    positions = set()
+    for layout in layouts:
+        positions.update(layout)
+        for before, after in zip(layout, layout[1:]):
+            if after not in successors[before]:
+                successors[before].add(after)
+                predecessors[after] += 1
+
+    ready = [position for position in positions if not predecessors[position]]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        position = heapq.heappop(ready)
+        order.append(position)
+        for after in successors[position]:
+            predecessors[after] -= 1
+            if not predecessors[after]:
+                heapq.heappush(ready, after)
+    if len(order) < len(positions):
+        logger.warning("Numbered positions are ordered inconsistently")
+        order += sorted(positions.difference(order))
+    return order
+
+
+def numbered_alignment(
+    sequences: Sequence[str], domains: Sequence[Optional[NumberedDomain]]
+) -> NumberedAlignment:
+    """
+    Align sequences on the positions of their numbered domains
+
+    Args:
+        sequences: Full sequences
+        domains: Numbered domain of each sequence as returned by ANARCI,
+            or None for sequences to leave unaligned
+    """
+    rows = []
+    unnumbered = []
+    for index, (sequence, domain) in enumerate(zip(sequences, domains)):
+        if domain is None:
+            unnumbered.append(index)
+            rows.append(("", None, (), sequence))
+            continue
+        numbering, start, end = domain
+        numbered = [
+            (position, residue)
+            for position, residue in numbering
+            if residue != "-"
+        ]
+        layout = tuple(position for position, _ in numbered)
+        residues = [residue for _, residue in numbered]
+        rows.append((sequence[:start], layout, residues, sequence[end + 1 :]))
+
+    layouts = {layout for _, layout, _, _ in rows if layout is not None}
+    columns = column_order(layouts)
+    column_of = {position: column for column, position in enumerate(columns)}
+    width = len(columns)
+
+    # Gaps ahead of each residue and after the last one, per layout
+    templates = {}
+    for layout in layouts:
+        indices = [column_of[position] for position in layout]
+        gaps = [
+            "-" * (index - previous - 1)
+            for previous, index in zip([-1] + indices, indices)
+        ]
+        tail = "-" * (width - 1 - indices[-1]) if indices else "-" * width
+        templates[layout] = (gaps, tail)
+
+    prefix_width = max((len(prefix) for prefix, _, _, _ in rows), default=0)
+    suffix_width = max((len(suffix) for _, _, _, suffix in rows), default=0)
+    aligned = []
+    for prefix, layout, residues, suffix in rows:
+        if layout is None:
+            domain = "-" * width
+        else:
+            gaps, tail = templates[layout]
+            domain = "".join(chain.from_iterable(zip(gaps, residues))) + tail
+        aligned.append(
+            prefix.rjust(prefix_width, "-")
+            + domain
+            + suffix.ljust(suffix_width, "-")
+        )
+
+    if unnumbered:
+        logger.warning(
+            "%d of %d sequences could not be numbered and are left unaligned",
+            len(unnumbered),
+            len(sequences),
+        )
+    return NumberedAlignment(
+        aligned=aligned,
+        columns=[None] * prefix_width + columns + [None] * suffix_width,
+        unnumbered=unnumbered,
+    )
+
+
+def align_numbered(
+    sequences: Sequence[str], scheme: str = "imgt"
+) -> NumberedAlignment:
+    """Number sequences with ANARCI and align them on their positions"""
+    return numbered_alignment(sequences, number_sequences(sequences, scheme))
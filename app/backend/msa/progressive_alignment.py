@@ -0,0 +1,440 @@
+"""
+In-process progressive multiple sequence alignment.
+
+Sequences are merged in the order of a k-mer guide tree (see
+``guide_tree``). Each merge aligns the profiles of two groups with affine
+gap dynamic programming, scoring columns by the expected BLOSUM62 score of
+their residue frequencies. The recurrences are evaluated a row at a time
+with NumPy; horizontal gaps use a running maximum so no cell is visited in
+Python.
+
+A group is held as a matrix of indices into its members' sequences, -1 for
+gaps, so merging inserts gap columns by indexing rather than by rebuilding
+strings and the original residues are only looked up once at the end.
+Finished alignments are merged the same way (``merge_alignments``), which
+is how chunks of a large input are joined, and new sequences are aligned
+onto a fixed alignment's profile (``add_to_alignment``).
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from Bio.Align import substitution_matrices
+
+from .guide_tree import guide_tree
+from .kmer_distance import ALPHABET_SIZE, AMINO_ACIDS, RESIDUE_CODES, encode
+
+GAP_OPEN = -10.0
+GAP_EXTEND = -0.5
+
+# Allowed difference between a stored DP score and its recomputed source
+TOLERANCE = 1e-6
+
+
+def _substitution_matrix(name: str = "BLOSUM62") -> np.ndarray:
+    matrix = substitution_matrices.load(name)
+    residues = AMINO_ACIDS + "X"
+    return np.array(
+        [[matrix[a][b] for b in residues] for a in residues], dtype=np.float64
+    )
+
+
+SUBSTITUTION_MATRIX = _substitution_matrix()
+
+
+class _Group:
+    """Aligned members of a subtree"""
+
+    def __init__(
+        self, members: List[int], positions: np.ndarray, symbols: np.ndarray
+    ):
+        self.members = members
+        # positions[row, column]: residue index in the member, -1 for a gap
+        self.positions = positions
+        # symbols[row, column]: residue code, ALPHABET_SIZE for a gap
+        self.symbols = symbols
+
+    def profile(self) -> np.ndarray:
+        """Residue frequencies of each column, gaps excluded"""
+        return _profile(self.symbols)
+
+
+def _profile(symbols: np.ndarray) -> np.ndarray:
+    rows, width = symbols.shape
+    flat = symbols + (ALPHABET_SIZE + 1) * np.arange(width)
+    counts = np.bincount(
+        flat.ravel(), minlength=(ALPHABET_SIZE + 1) * width
+    ).reshape(width, ALPHABET_SIZE + 1)
+    return counts[:, :ALPHABET_SIZE] / rows
+
+
+def align_profiles(
+    first: np.ndarray,
+    second: np.ndarray,
+    gap_open: float = GAP_OPEN,
+    gap_extend: float = GAP_EXTEND,
+    free_end_gaps: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Globally align two profiles
+
+    Args:
+        first, second: Residue frequencies, one row per column
+        gap_open: Score of the first column of a gap
+        gap_extend: Score of every further column of a gap
+        free_end_gaps: Do not penalise gaps at either end
+
+    Returns:
+        Column of each profile at every column of the alignment, -1 where
+        the profile has a gap
+    """
+    n, m = len(first), len(second)
+    scores = first @ SUBSTITUTION_MATRIX @ second.T
+    # match: last columns aligned, down: first profile against a gap,
+    # best: best of match, down and right (second profile against a gap),
+    # closed: best of match and down, which is all a right gap opens from
+    match = np.full((n + 1, m + 1), -np.inf)
+    down = np.full((n + 1, m + 1), -np.inf)
+    best = np.empty((n + 1, m + 1))
+    closed = np.empty((n + 1, m + 1))
+
+    columns = np.arange(m + 1)
+    if free_end_gaps:
+        edge_row = np.zeros(m + 1)
+        edge_column = np.zeros(n + 1)
+    else:
+        edge_row = np.where(
+            columns > 0, gap_open + gap_extend * (columns - 1), 0.0
+        )
+        rows = np.arange(n + 1)
+        edge_column = np.where(
+            rows > 0, gap_open + gap_extend * (rows - 1), 0.0
+        )
+    best[0] = edge_row
+    closed[0] = -np.inf
+    closed[0, 0] = 0.0
+    down[:, 0] = edge_column
+    down[0, 0] = -np.inf
+
+    for i in range(1, n + 1):
+        match[i, 1:] = best[i - 1, :-1] + scores[i - 1]
+        down[i, 1:] = np.maximum(
+            best[i - 1, 1:] + gap_open, down[i - 1, 1:] + gap_extend
+        )
+        closed[i] = np.maximum(match[i], down[i])
+        # right[j] = max over k < j of closed[k] + open + extend * (j - k - 1)
+        running = np.maximum.accumulate(closed[i] - gap_extend * columns)
+        right = np.full(m + 1, -np.inf)
+        right[1:] = (
+            running[:-1] + gap_open - gap_extend + gap_extend * columns[1:]
+        )
+        best[i] = np.maximum(closed[i], right)
+
+    i, j = n, m
+    tail_first, tail_second = [], []
+    if free_end_gaps:
+        last_row, last_column = best[n].argmax(), best[:, m].argmax()
+        if best[n, last_row] >= best[last_column, m]:
+            tail_second = list(range(m - 1, last_row - 1, -1))
+            j = last_row
+        else:
+            tail_first = list(range(n - 1, last_column - 1, -1))
+            i = last_column
+
+    path_first = [-1] * len(tail_second) + tail_first
+    path_second = tail_second + [-1] * len(tail_first)
+    state = "best"
+    while i > 0 and j > 0:
+        if state == "best":
+            state = (
+                "right" if best[i, j] > closed[i, j] + TOLERANCE else "closed"
+            )
+        if state == "closed":
+            state = (
+                "match" if match[i, j] >= closed[i, j] - TOLERANCE else "down"
+            )
+        if state == "match":
+            path_first.append(i - 1)
+            path_second.append(j - 1)
+            i, j = i - 1, j - 1
+            state = "best"
+        elif state == "down":
+            path_first.append(i - 1)
+            path_second.append(-1)
+            extended = down[i - 1, j] + gap_extend
+            state = (
+                "down"
+                if i > 1 and abs(extended - down[i, j]) <= TOLERANCE
+                else "best"
+            )
+            i -= 1
+        else:
+            start = j - 1
+            while start > 0 and (
+                abs(
+                    closed[i, start]
+                    + gap_open
+                    + gap_extend * (j - start - 1)
+                    - best[i, j]
+                )
+                > TOLERANCE
+            ):
+                start -= 1
+            path_first.extend([-1] * (j - start))
+            path_second.extend(range(j - 1, start - 1, -1))
+            j = start
+            state = "closed"
+    path_first.extend(range(i - 1, -1, -1))
+    path_second.extend([-1] * i)
+    path_first.extend([-1] * j)
+    path_second.extend(range(j - 1, -1, -1))
+    return (
+        np.array(path_first[::-1], dtype=np.int64),
+        np.array(path_second[::-1], dtype=np.int64),
+    )
+
+
+def _take_columns(
+    matrix: np.ndarray, columns: np.ndarray, gap: int
+) -> np.ndarray:
+    """Columns of a matrix, filled with gap where the column index is -1"""
+    taken = np.full((len(matrix), len(columns)), gap, dtype=matrix.dtype)
+    kept = columns >= 0
+    taken[:, kept] = matrix[:, columns[kept]]
+    return taken
+
+
+def _merge(
+    first: _Group,
+    second: _Group,
+    columns_first: np.ndarray,
+    columns_second: np.ndarray,
+) -> _Group:
+    """Join two groups on aligned column indices"""
+    positions = np.vstack(
+        [
+            _take_columns(first.positions, columns_first, -1),
+            _take_columns(second.positions, columns_second, -1),
+        ]
+    )
+    symbols = np.vstack(
+        [
+            _take_columns(first.symbols, columns_first, ALPHABET_SIZE),
+            _take_columns(second.symbols, columns_second, ALPHABET_SIZE),
+        ]
+    )
+    return _Group(first.members + second.members, positions, symbols)
+
+
+def progressive_alignment(
+    sequences: Sequence[str],
+    gap_open: float = GAP_OPEN,
+    gap_extend: float = GAP_EXTEND,
+    free_end_gaps: bool = False,
+) -> List[str]:
+    """
+    Align sequences progressively along a k-mer guide tree
+
+    Args:
+        sequences: Sequences to align
+        gap_open: Score of the first column of a gap
+        gap_extend: Score of every further column of a gap
+        free_end_gaps: Do not penalise gaps at the ends of profiles
+
+    Returns:
+        Aligned sequences in input order
+    """
+    if len(sequences) < 2:
+        return list(sequences)
+
+    groups = {
+        index: _Group(
+            [index],
+            np.arange(len(sequence))[np.newaxis, :],
+            encode(sequence).astype(np.int64)[np.newaxis, :],
+        )
+        for index, sequence in enumerate(sequences)
+    }
+    tree = guide_tree(sequences)
+    for step, (left, right, _, _) in enumerate(tree):
+        first, second = groups.pop(int(left)), groups.pop(int(right))
+        columns_first, columns_second = align_profiles(
+            first.profile(),
+            second.profile(),
+            gap_open,
+            gap_extend,
+            free_end_gaps,
+        )
+        groups[len(sequences) + step] = _merge(
+            first, second, columns_first, columns_second
+        )
+
+    (root,) = groups.values()
+    return _rows(root, sequences)
+
+
+def _rows(group: _Group, sequences: Sequence[str]) -> List[str]:
+    """Aligned rows of a group's members, in member order"""
+    aligned = [""] * len(sequences)
+    for row, member in enumerate(group.members):
+        # Gap positions (-1) pick the "-" appended after the residues
+        residues = np.frombuffer(
+            (sequences[member] + "-").encode("ascii"), dtype="S1"
+        )
+        aligned[member] = residues[group.positions[row]].tobytes().decode()
+    return aligned
+
+
+def _characters(rows: Sequence[str]) -> np.ndarray:
+    """Aligned rows as a matrix of ASCII codes"""
+    width = len(rows[0]) if rows else 0
+    return np.frombuffer(
+        "".join(rows).encode("ascii", "replace"), dtype=np.uint8
+    ).reshape(len(rows), width)
+
+
+def _group_from_rows(rows: Sequence[str], first_member: int) -> _Group:
+    """Group of already aligned rows, members numbered from first_member"""
+    characters = _characters(rows)
+    residue = characters != ord("-")
+    positions = np.where(residue, np.cumsum(residue, axis=1) - 1, -1)
+    symbols = np.where(
+        residue, RESIDUE_CODES[characters].astype(np.int64), ALPHABET_SIZE
+    )
+    return _Group(
+        list(range(first_member, first_member + len(rows))), positions, symbols
+    )
+
+
+def merge_alignments(
+    first: Sequence[str],
+    second: Sequence[str],
+    gap_open: float = GAP_OPEN,
+    gap_extend: float = GAP_EXTEND,
+    free_end_gaps: bool = False,
+) -> List[str]:
+    """
+    Align two alignments to each other by their profiles
+
+    Columns within either alignment are kept; only whole gap columns are
+    inserted.
+
+    Args:
+        first, second: Aligned rows, all of one length within each
+        gap_open: Score of the first column of a gap
+        gap_extend: Score of every further column of a gap
+        free_end_gaps: Do not penalise gaps at the ends of profiles
+
+    Returns:
+        Rows of first followed by rows of second, in one alignment
+    """
+    if not first or not second:
+        return list(first) + list(second)
+    first_group = _group_from_rows(first, 0)
+    second_group = _group_from_rows(second, len(first))
+    columns_first, columns_second = align_profiles(
+        first_group.profile(),
+        second_group.profile(),
+        gap_open,
+        gap_extend,
+        free_end_gaps,
+    )
+    merged = _merge(first_group, second_group, columns_first, columns_second)
+    sequences = [row.replace("-", "") for row in list(first) + list(second)]
+    return _rows(merged, sequences)
+
+
+def add_to_alignment(
+    rows: Sequence[str],
+    sequences: Sequence[str],
+    gap_open: float = GAP_OPEN,
+    gap_extend: float = GAP_EXTEND,
+    free_end_gaps: bool = False,
+    keep_length: bool = False,
+) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    Align sequences onto an alignment without realigning it
+
+    Each sequence is aligned on its own to the profile of the alignment.
+    Residues a sequence has between two columns of the alignment go into
+    new columns, shared by all sequences inserting at that point, or are
+    left out with keep_length (like MAFFT's ``--keeplength``).
+
+    Args:
+        rows: Aligned rows, all of one length
+        sequences: Sequences to add
+        gap_open: Score of the first column of a gap
+        gap_extend: Score of every further column of a gap
+        free_end_gaps: Do not penalise gaps at the ends of sequences
+        keep_length: Leave out inserted residues instead of adding columns
+
+    Returns:
+        The original rows and the added rows, both in the columns of the
+        new alignment, and the new column of each original column
+    """
+    characters = _characters(rows)
+    width = characters.shape[1]
+    residue = characters != ord("-")
+    profile = _profile(
+        np.where(residue, RESIDUE_CODES[characters], ALPHABET_SIZE)
+    )
+    one_hot = np.eye(ALPHABET_SIZE)
+
+    # insertions[s]: new columns before original column s (s == width: at
+    # the end); per sequence the column or insertion slot and rank of
+    # each residue
+    insertions = np.zeros(width + 1, dtype=np.int64)
+    placements = []
+    for sequence in sequences:
+        columns_profile, columns_sequence = align_profiles(
+            profile,
+            one_hot[encode(sequence)],
+            gap_open,
+            gap_extend,
+            free_end_gaps,
+        )
+        column = np.full(len(sequence), -1, dtype=np.int64)
+        slot = np.zeros(len(sequence), dtype=np.int64)
+        rank = np.zeros(len(sequence), dtype=np.int64)
+        next_column, run = 0, 0
+        for in_profile, in_sequence in zip(
+            columns_profile.tolist(), columns_sequence.tolist()
+        ):
+            if in_profile >= 0:
+                next_column, run = in_profile + 1, 0
+                if in_sequence >= 0:
+                    column[in_sequence] = in_profile
+            else:
+                slot[in_sequence] = next_column
+                rank[in_sequence] = run
+                run += 1
+                if not keep_length:
+                    insertions[next_column] = max(insertions[next_column], run)
+        placements.append((column, slot, rank))
+
+    before = np.concatenate([[0], np.cumsum(insertions)])
+    new_columns = np.arange(width + 1) + before[1:]
+    slot_starts = new_columns - insertions
+    new_width = width + int(insertions.sum())
+
+    if new_width == width:
+        expanded = list(rows)
+    else:
+        layout = np.full((len(rows), new_width), ord("-"), dtype=np.uint8)
+        layout[:, new_columns[:width]] = characters
+        expanded = [row.tobytes().decode() for row in layout]
+
+    added = []
+    for sequence, (column, slot, rank) in zip(sequences, placements):
+        positions = new_columns[np.maximum(column, 0)]
+        inserted = column < 0
+        positions[inserted] = slot_starts[slot[inserted]] + rank[inserted]
+        residues = np.frombuffer(
+            sequence.encode("ascii", "replace"), dtype="S1"
+        )
+        if keep_length:
+            positions, residues = positions[~inserted], residues[~inserted]
+        row = np.full(new_width, b"-", dtype="S1")
+        row[positions] = residues
+        added.append(row.tobytes().decode())
+    return expanded, added, new_columns[:width]
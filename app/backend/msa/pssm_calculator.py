@@ -1,9 +1,16 @@
 import logging
-from collections import Counter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 
 import numpy as np
 
+from .consensus import (
+    count_columns,
+    encode_alignment,
+    majority,
+    residue_counts,
+)
+from ..metrics import PSSM_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,11 +46,13 @@ class PSSMCalculator:
             "Y": 0.032,
         }
 
+    @PSSM_SECONDS.time()
     def calculate_pssm(
         self,
         alignment_matrix: List[List[str]],
         pseudocount: float = 1.0,
         background_freq: float = 0.05,
+        column_counts: Optional[np.ndarray] = None,
     ) -> Dict[str, Any]:
         """
         Calculate Position-Specific Scoring Matrix from alignment
@@ -52,6 +61,8 @@ class PSSMCalculator:
             alignment_matrix: 2D array of aligned sequences
             pseudocount: Pseudocount for smoothing
             background_freq: Background frequency for rare amino acids
+            column_counts: Character counts of the alignment from
+                ``consensus.count_columns``, if already computed
 
         Returns:
             Dictionary containing PSSM data
@@ -59,12 +70,38 @@ class PSSMCalculator:
         if not alignment_matrix or not alignment_matrix[0]:
             return self._empty_pssm()
 
-        num_sequences = len(alignment_matrix)
-        alignment_length = len(alignment_matrix[0])
+        if column_counts is None:
+            counts = self.count_residues(alignment_matrix)
+        else:
+            counts = residue_counts(column_counts, "".join(self.amino_acids))
+        return self.pssm_from_counts(
+            counts, len(alignment_matrix), pseudocount
+        )
+
+    def pssm_from_counts(
+        self,
+        residue_counts: np.ndarray,
+        num_sequences: int,
+        pseudocount: float = 1.0,
+    ) -> Dict[str, Any]:
+        """
+        Calculate PSSM data from amino acid counts
+
+        Args:
+            residue_counts: Count of each amino acid (columns, ordered like
+                ``amino_acids``) at each alignment position (rows)
+            num_sequences: Number of aligned sequences
+            pseudocount: Pseudocount for smoothing
+
+        Returns:
+            Dictionary containing PSSM data, including the counts so the
+            PSSM can be updated when sequences are added
+        """
+        alignment_length = len(residue_counts)
 
         # Calculate position-specific frequencies
-        position_frequencies = self._calculate_position_frequencies(
-            alignment_matrix, pseudocount, background_freq
+        position_frequencies = self._frequencies_from_counts(
+            residue_counts, pseudocount
         )
 
         # Calculate position-specific scores
@@ -76,7 +113,7 @@ class PSSMCalculator:
         )
 
         # Calculate consensus sequence
-        consensus = self._calculate_consensus(position_frequencies)
+        consensus = self._calculate_consensus(residue_counts)
 
         return {
             "position_frequencies": position_frequencies,
@@ -87,41 +124,63 @@ class PSSMCalculator:
             "alignment_length": alignment_length,
             "num_sequences": num_sequences,
             "background_frequencies": self.background_frequencies,
+            "residue_counts": np.asarray(residue_counts).tolist(),
+            "pseudocount": pseudocount,
         }
 
-    def _calculate_position_frequencies(
+    def add_to_pssm(
         self,
-        alignment_matrix: List[List[str]],
-        pseudocount: float,
-        background_freq: float,
-    ) -> List[Dict[str, float]]:
-        """Calculate amino acid frequencies at each position"""
-        alignment_length = len(alignment_matrix[0])
-        position_frequencies = []
-
-        for pos in range(alignment_length):
-            # Count amino acids at this position
-            aa_counts = Counter()
-            total_count = 0
-
-            for seq_idx in range(len(alignment_matrix)):
-                if pos < len(alignment_matrix[seq_idx]):
-                    aa = alignment_matrix[seq_idx][pos].upper()
-                    if aa in self.amino_acids:
-                        aa_counts[aa] += 1
-                        total_count += 1
-
-            # Calculate frequencies with pseudocount
-            frequencies = {}
-            for aa in self.amino_acids:
-                count = aa_counts.get(aa, 0) + pseudocount
-                frequencies[aa] = count / (
-                    total_count + pseudocount * len(self.amino_acids)
-                )
+        pssm_data: Dict[str, Any],
+        added_matrix: List[List[str]],
+        columns: Sequence[int],
+    ) -> Dict[str, Any]:
+        """
+        Update PSSM data with rows added to its alignment
+
+        Only the added rows are counted; the counts of the original rows
+        are taken from ``pssm_data``.
+
+        Args:
+            pssm_data: PSSM data of the original alignment, from
+                ``calculate_pssm``
+            added_matrix: Added rows, in the columns of the new alignment
+            columns: Column of the new alignment that each original column
+                became; the other new columns only hold added residues
 
-            position_frequencies.append(frequencies)
+        Returns:
+            PSSM data of the alignment with the rows added
+        """
+        width = len(added_matrix[0]) if added_matrix else len(columns)
+        counts = np.zeros((width, len(self.amino_acids)), dtype=np.int64)
+        if len(columns):
+            counts[np.asarray(columns)] = pssm_data["residue_counts"]
+        if added_matrix:
+            counts += self.count_residues(added_matrix)
+        return self.pssm_from_counts(
+            counts,
+            pssm_data["num_sequences"] + len(added_matrix),
+            pssm_data.get("pseudocount", 1.0),
+        )
 
-        return position_frequencies
+    def count_residues(self, alignment_matrix: List[List[str]]) -> np.ndarray:
+        """Count of each amino acid at each position, case-insensitive"""
+        return residue_counts(
+            count_columns(encode_alignment(alignment_matrix)),
+            "".join(self.amino_acids),
+        )
+
+    def _frequencies_from_counts(
+        self, residue_counts: np.ndarray, pseudocount: float
+    ) -> List[Dict[str, float]]:
+        """Amino acid frequencies with pseudocounts from counts"""
+        totals = np.asarray(residue_counts).sum(axis=1, keepdims=True)
+        frequencies = (np.asarray(residue_counts) + pseudocount) / (
+            totals + pseudocount * len(self.amino_acids)
+        )
+        return [
+            dict(zip(self.amino_acids, column))
+            for column in frequencies.tolist()
+        ]
 
     def _calculate_position_scores(
         self, position_frequencies: List[Dict[str, float]]
@@ -191,18 +250,11 @@ class PSSMCalculator:
 
         return conservation_scores
 
-    def _calculate_consensus(
-        self, position_frequencies: List[Dict[str, float]]
-    ) -> str:
-        """Calculate consensus sequence from position frequencies"""
-        consensus = []
-
-        for pos_freq in position_frequencies:
-            # Find amino acid with highest frequency
-            best_aa = max(pos_freq.items(), key=lambda x: x[1])[0]
-            consensus.append(best_aa)
-
-        return "".join(consensus)
+    def _calculate_consensus(self, residue_counts: np.ndarray) -> str:
+        """Most frequent amino acid of each position, "-" if it has none"""
+        best = majority(np.asarray(residue_counts))
+        amino_acids = np.array(self.amino_acids + ["-"])
+        return "".join(amino_acids[best].tolist())
 
     def _empty_pssm(self) -> Dict[str, Any]:
         """Return empty PSSM structure"""
@@ -215,8 +267,37 @@ class PSSMCalculator:
             "alignment_length": 0,
             "num_sequences": 0,
             "background_frequencies": self.background_frequencies,
+            "residue_counts": [],
+            "pseudocount": 1.0,
         }
 
+    @staticmethod
+    def to_compact(pssm_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert PSSM data to the compact wire format
+
+        Per-column frequency and score dicts become lists of values ordered
+        like ``amino_acids``, and so do the background frequencies, which
+        avoids repeating the 20 amino acid keys for every column.
+        """
+        if pssm_data.get("format") == "compact":
+            return pssm_data
+        amino_acids = pssm_data["amino_acids"]
+
+        def as_rows(columns: List[Dict[str, float]]) -> List[List[float]]:
+            return [[column[aa] for aa in amino_acids] for column in columns]
+
+        compact = dict(pssm_data)
+        compact["format"] = "compact"
+        compact["position_frequencies"] = as_rows(
+            pssm_data["position_frequencies"]
+        )
+        compact["position_scores"] = as_rows(pssm_data["position_scores"])
+        compact["background_frequencies"] = [
+            pssm_data["background_frequencies"][aa] for aa in amino_acids
+        ]
+        return compact
+
     def get_position_summary(
         self, pssm_data: Dict[str, Any], position: int
     ) -> Dict[str, Any]:
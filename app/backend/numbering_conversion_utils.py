@@ -1,4 +1,6 @@
-from typing import List, Tuple, Literal
+from typing import Dict, Iterable, List, Literal, Sequence, Tuple
+
+import numpy as np
 
 # This is a simplified mapping for demonstration. Real mapping should be based on published tables.
 # For a production system, use a comprehensive mapping table or a library like abnumber.
@@ -34,53 +36,203 @@ IMGT_TO_CHOTHIA_LIGHT.update(
 )
 
 
-# For demonstration, only a partial mapping is provided. Real mapping is more complex.
+# Positions are encoded as integers, position * INSERTION_SLOTS plus the
+# insertion code: 0 for none, 1-26 for A-Z and 26 more per repeated letter
+# (AA = 27), so whole repertoires can be converted as integer arrays
+INSERTION_SLOTS = 128
+MAX_POSITION = 256
+
+NumberedResidue = Tuple[Tuple[int, str], str]
+
+
+def insertion_code(insertion: str) -> int:
+    insertion = insertion.strip()
+    if not insertion:
+        return 0
+    return 26 * (len(insertion) - 1) + ord(insertion[0].upper()) - 64
+
+
+def insertion_from_code(code: int) -> str:
+    if code == 0:
+        return " "
+    repeat, letter = divmod(code - 1, 26)
+    return chr(65 + letter) * (repeat + 1)
+
+
+_INSERTIONS = [insertion_from_code(code) for code in range(INSERTION_SLOTS)]
+_CODES = {insertion: code for code, insertion in enumerate(_INSERTIONS)}
+_CODES[""] = 0
+
+
+def encode_position(position: int, insertion: str = " ") -> int:
+    return position * INSERTION_SLOTS + insertion_code(insertion)
+
+
+def position_keys(positions: Iterable[Tuple[int, str]]) -> List[int]:
+    """Integer keys of ``(position, insertion)`` pairs, as a list"""
+    codes = _CODES
+    return [
+        position * INSERTION_SLOTS
+        + (
+            codes[insertion]
+            if insertion in codes
+            else insertion_code(insertion)
+        )
+        for position, insertion in positions
+    ]
+
+
+def encode_positions(positions: Iterable[Tuple[int, str]]) -> np.ndarray:
+    """Integer keys of ``(position, insertion)`` pairs"""
+    return np.array(position_keys(positions), dtype=np.int64)
+
+
+def encode_numbering(
+    numbering: Sequence[NumberedResidue],
+) -> Tuple[np.ndarray, List[str]]:
+    """Integer position keys and residues of a numbering"""
+    if not numbering:
+        return np.zeros(0, dtype=np.int64), []
+    positions, residues = zip(*numbering)
+    return encode_positions(positions), list(residues)
+
+
+def decode_numbering(
+    keys: np.ndarray, residues: Sequence[str]
+) -> List[NumberedResidue]:
+    positions, codes = np.divmod(keys, INSERTION_SLOTS)
+    return list(
+        zip(
+            zip(
+                positions.tolist(),
+                map(_INSERTIONS.__getitem__, codes.tolist()),
+            ),
+            residues,
+        )
+    )
+
+
+def encode_repertoire(
+    numberings: Sequence[Sequence[NumberedResidue]],
+) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """
+    Keys and residues of many numberings, concatenated
+
+    Returns the keys, the residues and the ``len(numberings) + 1`` offsets
+    at which each numbering starts and the last one ends.
+    """
+    keys = encode_positions(
+        [position for numbering in numberings for position, _ in numbering]
+    )
+    residues = [aa for numbering in numberings for _, aa in numbering]
+    offsets = np.cumsum(
+        [0] + [len(numbering) for numbering in numberings], dtype=np.int64
+    )
+    return keys, residues, offsets
+
+
+class SchemeConverter:
+    """
+    Maps positions between schemes with precomputed lookups
+
+    ``mapping`` gives the target position and insertion of source residue
+    numbers; a mapped number replaces the whole position (insertion code
+    included) and other positions are kept as they are. Repertoires are
+    converted as key arrays with ``convert_keys``; single numberings go
+    through a dict, which is faster than numpy for a hundred residues.
+    """
+
+    def __init__(self, mapping: Dict[int, Tuple[int, str]]) -> None:
+        self.mapped = np.zeros(MAX_POSITION, dtype=bool)
+        self.targets = np.zeros(MAX_POSITION, dtype=np.int64)
+        self.positions: Dict[int, Tuple[int, str]] = {}
+        for position, (target, insertion) in mapping.items():
+            self.mapped[position] = True
+            self.targets[position] = encode_position(target, insertion)
+            self.positions[position] = (
+                target,
+                insertion_from_code(insertion_code(insertion)),
+            )
+
+    def convert_keys(self, keys: np.ndarray) -> np.ndarray:
+        positions = keys // INSERTION_SLOTS
+        in_range = positions < MAX_POSITION
+        index = np.where(in_range, positions, 0)
+        mapped = self.mapped[index] & in_range
+        return np.where(mapped, self.targets[index], keys)
+
+    def convert(
+        self, numbering: Sequence[NumberedResidue]
+    ) -> List[NumberedResidue]:
+        positions = self.positions
+        return [
+            (positions.get(position[0], position), aa)
+            for position, aa in numbering
+        ]
+
+
+CONVERTERS = {
+    ("imgt", "kabat", "H"): SchemeConverter(IMGT_TO_KABAT_HEAVY),
+    ("imgt", "kabat", "L"): SchemeConverter(IMGT_TO_KABAT_LIGHT),
+    ("imgt", "chothia", "H"): SchemeConverter(IMGT_TO_CHOTHIA_HEAVY),
+    ("imgt", "chothia", "L"): SchemeConverter(IMGT_TO_CHOTHIA_LIGHT),
+}
+
+
+def get_converter(
+    from_scheme: str, to_scheme: str, chain_type: str = "H"
+) -> SchemeConverter:
+    try:
+        return CONVERTERS[
+            (from_scheme, to_scheme, "L" if chain_type == "L" else "H")
+        ]
+    except KeyError:
+        raise NotImplementedError(
+            f"Conversion from {from_scheme} to {to_scheme} not implemented."
+        )
+
+
 def convert_imgt_to_kabat(
-    imgt_numbering: List[Tuple[Tuple[int, str], str]], chain_type: str = "H"
-) -> List[Tuple[Tuple[int, str], str]]:
-    if chain_type == "L":
-        mapping = IMGT_TO_KABAT_LIGHT
-    else:
-        mapping = IMGT_TO_KABAT_HEAVY
-    kabat_numbering = []
-    for (imgt_pos, imgt_ins), aa in imgt_numbering:
-        if imgt_pos in mapping:
-            kabat_pos, kabat_ins = mapping[imgt_pos]
-            kabat_numbering.append(((kabat_pos, kabat_ins), aa))
-        else:
-            kabat_numbering.append(((imgt_pos, imgt_ins), aa))
-    return kabat_numbering
+    imgt_numbering: List[NumberedResidue], chain_type: str = "H"
+) -> List[NumberedResidue]:
+    return get_converter("imgt", "kabat", chain_type).convert(imgt_numbering)
 
 
 def convert_imgt_to_chothia(
-    imgt_numbering: List[Tuple[Tuple[int, str], str]], chain_type: str = "H"
-) -> List[Tuple[Tuple[int, str], str]]:
-    if chain_type == "L":
-        mapping = IMGT_TO_CHOTHIA_LIGHT
-    else:
-        mapping = IMGT_TO_CHOTHIA_HEAVY
-    chothia_numbering = []
-    for (imgt_pos, imgt_ins), aa in imgt_numbering:
-        if imgt_pos in mapping:
-            chothia_pos, chothia_ins = mapping[imgt_pos]
-            chothia_numbering.append(((chothia_pos, chothia_ins), aa))
-        else:
-            chothia_numbering.append(((imgt_pos, imgt_ins), aa))
-    return chothia_numbering
+    imgt_numbering: List[NumberedResidue], chain_type: str = "H"
+) -> List[NumberedResidue]:
+    return get_converter("imgt", "chothia", chain_type).convert(imgt_numbering)
 
 
 def convert_numbering(
-    numbering: List[Tuple[Tuple[int, str], str]],
+    numbering: List[NumberedResidue],
     from_scheme: str,
     to_scheme: str,
     chain_type: str = "H",
-) -> List[Tuple[Tuple[int, str], str]]:
+) -> List[NumberedResidue]:
     if from_scheme == to_scheme:
         return numbering
-    if from_scheme == "imgt" and to_scheme == "kabat":
-        return convert_imgt_to_kabat(numbering, chain_type)
-    if from_scheme == "imgt" and to_scheme == "chothia":
-        return convert_imgt_to_chothia(numbering, chain_type)
-    raise NotImplementedError(
-        f"Conversion from {from_scheme} to {to_scheme} not implemented."
-    )
+    return get_converter(from_scheme, to_scheme, chain_type).convert(numbering)
+
+
+def convert_repertoire(
+    numberings: Sequence[Sequence[NumberedResidue]],
+    from_scheme: str,
+    to_scheme: str,
+    chain_type: str = "H",
+) -> List[List[NumberedResidue]]:
+    """
+    Renumber many domains at once, without re-running ANARCI
+
+    All positions are encoded into one array and converted with a single
+    lookup, then split back into one numbering per domain.
+    """
+    if from_scheme == to_scheme:
+        return [list(numbering) for numbering in numberings]
+    converter = get_converter(from_scheme, to_scheme, chain_type)
+    keys, residues, offsets = encode_repertoire(numberings)
+    converted = decode_numbering(converter.convert_keys(keys), residues)
+    return [
+        converted[start:stop]
+        for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
@@ -0,0 +1,128 @@
+"""
+Opt-in per-stage timing of annotation and MSA work.
+
+Code marks its stages with ``stage(name)`` or ``@profiled(name)``. Those
+only record anything inside a ``profiling()`` block of the same context
+(request or job thread); otherwise they cost one context variable lookup.
+Stages opened inside another are recorded under the joined path, e.g.
+``annotate_msa/anarci``, so the breakdown reads like a call tree.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_profiler: ContextVar[Optional["StageProfiler"]] = ContextVar(
+    "stage_profiler", default=None
+)
+
+
+class StageProfiler:
+    """
+    Accumulates wall and CPU time per stage path
+
+    CPU time is that of the calling thread, so work done in child
+    processes (ANARCI's hmmscan, MUSCLE, MAFFT, ...) shows up as wall time
+    well above CPU time.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}
+        self._path: List[str] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._path.append(name)
+        totals = self.stages.setdefault("/".join(self._path), [0, 0.0, 0.0])
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            totals[0] += 1
+            totals[1] += time.perf_counter() - wall
+            totals[2] += time.thread_time() - cpu
+            self._path.pop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Breakdown in milliseconds, stages in the order first entered"""
+        return {
+            "total_ms": _ms(time.perf_counter() - self._started),
+            "stages": {
+                path: {
+                    "calls": calls,
+                    "wall_ms": _ms(wall),
+                    "cpu_ms": _ms(cpu),
+                }
+                for path, (calls, wall, cpu) in self.stages.items()
+            },
+        }
+
+    def server_timing(self) -> str:
+        """The breakdown as a ``Server-Timing`` header value"""
+        return ", ".join(
+            f'{path.replace("/", ".")};dur={_ms(wall)}'
+            for path, (_, wall, _) in self.stages.items()
+        )
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+class _NoStage:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def current_profiler() -> Optional[StageProfiler]:
+    """The profiler of the current context, or None if not profiling"""
+    return _profiler.get()
+
+
+def stage(name: str):
+    """Context manager timing ``name`` when the context is being profiled"""
+    profiler = _profiler.get()
+    if profiler is None:
+        return _NO_STAGE
+    return profiler.stage(name)
+
+
+def profiled(name: str) -> Callable:
+    """Decorator timing every call of a function as stage ``name``"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profiling(enabled: bool = True) -> Iterator[Optional[StageProfiler]]:
+    """Profile the stages run inside the block, yielding the profiler"""
+    if not enabled:
+        yield None
+        return
+    profiler = StageProfiler()
+    token = _profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _profiler.reset(token)
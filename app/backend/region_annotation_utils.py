@@ -1,62 +1,73 @@
-from typing import List, Tuple, Dict, Literal
+from bisect import bisect_right
+from typing import List, Tuple, Dict, Literal, Sequence
 
-from backend.numbering_conversion_utils import convert_numbering
+import numpy as np
+
+from backend.numbering_conversion_utils import (
+    INSERTION_SLOTS,
+    convert_numbering,
+    encode_repertoire,
+    position_keys,
+)
 
 # Supported schemes
 NumberingScheme = Literal["imgt", "kabat", "chothia"]
 
-# Kabat boundaries (heavy chain)
+# Region boundaries as inclusive ranges of residue numbers; every insertion
+# of a number belongs to the same region as the number itself
+
+# Kabat boundaries (heavy chain); insertions at 31 stay in FR1
 KABAT_HEAVY = {
-    "FR1": lambda pos, ins: 1 <= pos <= 31,
-    "CDR1": lambda pos, ins: (pos == 31 and ins) or (31 < pos <= 35),
-    "FR2": lambda pos, ins: 36 <= pos <= 49,
-    "CDR2": lambda pos, ins: 50 <= pos <= 65,
-    "FR3": lambda pos, ins: 66 <= pos <= 94,
-    "CDR3": lambda pos, ins: 95 <= pos <= 102,
-    "FR4": lambda pos, ins: 103 <= pos <= 113,
+    "FR1": (1, 31),
+    "CDR1": (32, 35),
+    "FR2": (36, 49),
+    "CDR2": (50, 65),
+    "FR3": (66, 94),
+    "CDR3": (95, 102),
+    "FR4": (103, 113),
 }
 
 # Chothia boundaries (heavy chain)
 CHOTHIA_HEAVY = {
-    "FR1": lambda pos, ins: 1 <= pos <= 26,
-    "CDR1": lambda pos, ins: 27 <= pos <= 32,
-    "FR2": lambda pos, ins: 33 <= pos <= 52,
-    "CDR2": lambda pos, ins: 53 <= pos <= 56,
-    "FR3": lambda pos, ins: 57 <= pos <= 94,
-    "CDR3": lambda pos, ins: 95 <= pos <= 102,
-    "FR4": lambda pos, ins: 103 <= pos <= 113,
+    "FR1": (1, 26),
+    "CDR1": (27, 32),
+    "FR2": (33, 52),
+    "CDR2": (53, 56),
+    "FR3": (57, 94),
+    "CDR3": (95, 102),
+    "FR4": (103, 113),
 }
 
 # IMGT boundaries (heavy chain)
 IMGT_HEAVY = {
-    "FR1": lambda pos, ins: 1 <= pos <= 26,
-    "CDR1": lambda pos, ins: 27 <= pos <= 38,
-    "FR2": lambda pos, ins: 39 <= pos <= 55,
-    "CDR2": lambda pos, ins: 56 <= pos <= 65,
-    "FR3": lambda pos, ins: 66 <= pos <= 104,
-    "CDR3": lambda pos, ins: 105 <= pos <= 117,
-    "FR4": lambda pos, ins: 118 <= pos <= 128,
+    "FR1": (1, 26),
+    "CDR1": (27, 38),
+    "FR2": (39, 55),
+    "CDR2": (56, 65),
+    "FR3": (66, 104),
+    "CDR3": (105, 117),
+    "FR4": (118, 128),
 }
 
 # Add light chain boundaries for Kabat and Chothia
 KABAT_LIGHT = {
-    "FR1": lambda pos, ins: 1 <= pos <= 23,
-    "CDR1": lambda pos, ins: 24 <= pos <= 34,
-    "FR2": lambda pos, ins: 35 <= pos <= 49,
-    "CDR2": lambda pos, ins: 50 <= pos <= 56,
-    "FR3": lambda pos, ins: 57 <= pos <= 88,
-    "CDR3": lambda pos, ins: 89 <= pos <= 97,
-    "FR4": lambda pos, ins: 98 <= pos <= 107,
+    "FR1": (1, 23),
+    "CDR1": (24, 34),
+    "FR2": (35, 49),
+    "CDR2": (50, 56),
+    "FR3": (57, 88),
+    "CDR3": (89, 97),
+    "FR4": (98, 107),
 }
 
 CHOTHIA_LIGHT = {
-    "FR1": lambda pos, ins: 1 <= pos <= 23,
-    "CDR1": lambda pos, ins: 24 <= pos <= 34,
-    "FR2": lambda pos, ins: 35 <= pos <= 49,
-    "CDR2": lambda pos, ins: 50 <= pos <= 56,
-    "FR3": lambda pos, ins: 57 <= pos <= 88,
-    "CDR3": lambda pos, ins: 89 <= pos <= 97,
-    "FR4": lambda pos, ins: 98 <= pos <= 107,
+    "FR1": (1, 23),
+    "CDR1": (24, 34),
+    "FR2": (35, 49),
+    "CDR2": (50, 56),
+    "FR3": (57, 88),
+    "CDR3": (89, 97),
+    "FR4": (98, 107),
 }
 
 # Update SCHEME_MAP to be keyed by (scheme, chain_type)
@@ -73,6 +84,85 @@ SCHEME_MAP = {
 }
 
 
+class RegionLabeller:
+    """
+    Labels encoded positions with their region
+
+    Regions must not overlap. Labels index ``names``; positions outside
+    every region get -1. Key arrays are labelled with ``np.searchsorted``
+    over the region starts; single numberings use ``bisect`` on the same
+    boundaries, which is faster than numpy for a hundred residues.
+    """
+
+    def __init__(self, boundaries: Dict[str, Tuple[int, int]]) -> None:
+        ordered = sorted(boundaries.items(), key=lambda item: item[1][0])
+        self.names = [name for name, _ in ordered]
+        self.starts = np.array(
+            [start * INSERTION_SLOTS for _, (start, _) in ordered],
+            dtype=np.int64,
+        )
+        self.stops = np.array(
+            [(stop + 1) * INSERTION_SLOTS - 1 for _, (_, stop) in ordered],
+            dtype=np.int64,
+        )
+
+        self._starts = self.starts.tolist()
+        self._stops = self.stops.tolist()
+
+    def label(self, keys: np.ndarray) -> np.ndarray:
+        labels = np.searchsorted(self.starts, keys, side="right") - 1
+        inside = (labels >= 0) & (keys <= self.stops[np.maximum(labels, 0)])
+        return np.where(inside, labels, -1)
+
+    def regions(
+        self, numbering: List[Tuple[Tuple[int, str], str]]
+    ) -> Dict[str, str]:
+        """Residues of each non-empty region of one numbering"""
+        starts, stops = self._starts, self._stops
+        regions: Dict[int, List[str]] = {}
+        keys = position_keys(position for position, _ in numbering)
+        for key, (_, aa) in zip(keys, numbering):
+            label = bisect_right(starts, key) - 1
+            if label >= 0 and key <= stops[label]:
+                regions.setdefault(label, []).append(aa)
+        return {
+            self.names[label]: "".join(regions[label])
+            for label in sorted(regions)
+        }
+
+    def repertoire_regions(
+        self, keys: np.ndarray, residues: List[str], offsets: np.ndarray
+    ) -> List[Dict[str, str]]:
+        """
+        Regions of many numberings encoded with ``encode_repertoire``
+
+        Residues are sorted by numbering and region once, joined into one
+        string and sliced per region.
+        """
+        labels = self.label(keys)
+        domains = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        keep = labels >= 0
+        domains, labels = domains[keep], labels[keep]
+        order = np.lexsort((labels, domains))
+        kept = np.flatnonzero(keep)[order]
+        joined = "".join([residues[i] for i in kept.tolist()])
+        groups = domains[order] * len(self.names) + labels[order]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        stops = np.r_[starts[1:], len(groups)]
+        results: List[Dict[str, str]] = [{} for _ in range(len(offsets) - 1)]
+        for group, start, stop in zip(
+            groups[starts].tolist(), starts.tolist(), stops.tolist()
+        ):
+            domain, label = divmod(group, len(self.names))
+            results[domain][self.names[label]] = joined[start:stop]
+        return results
+
+
+LABELLERS = {
+    key: RegionLabeller(boundaries) for key, boundaries in SCHEME_MAP.items()
+}
+
+
 def find_kabat_cdrs(
     numbering: List[Tuple[Tuple[int, str], str]], chain_type: str
 ) -> Dict[str, Tuple[int, int]]:
@@ -121,14 +211,7 @@ def annotate_regions(
     Given a list of ((pos, ins), aa), a numbering scheme, and chain type, return region annotations.
     """
     if scheme == "imgt":
-        boundaries = SCHEME_MAP[(scheme, chain_type)]
-        regions = {k: [] for k in boundaries}
-        for (pos, ins), aa in numbering:
-            for region, rule in boundaries.items():
-                if rule(pos, ins):
-                    regions[region].append(aa)
-                    break
-        return {k: "".join(v) for k, v in regions.items() if v}
+        return LABELLERS[(scheme, chain_type)].regions(numbering)
     elif scheme == "kabat":
         # Use heuristics for Kabat
         cdrs = find_kabat_cdrs(numbering, chain_type)
@@ -182,3 +265,22 @@ def annotate_all_schemes(
         )
         out[sch] = annotate_regions(converted, sch, chain_type)
     return out
+
+
+def annotate_repertoire(
+    numberings: Sequence[List[Tuple[Tuple[int, str], str]]],
+    scheme: NumberingScheme = "imgt",
+    chain_type: str = "H",
+) -> List[Dict[str, str]]:
+    """
+    Region annotations of many numberings in ``scheme`` at once
+
+    Positions are labelled by numbered boundaries, as ``annotate_regions``
+    does for IMGT, so numberings converted with ``convert_repertoire`` can
+    be annotated without re-running ANARCI.
+    """
+    chain_type = "H" if chain_type == "H" else "L"
+    keys, residues, offsets = encode_repertoire(numberings)
+    return LABELLERS[(scheme, chain_type)].repertoire_regions(
+        keys, residues, offsets
+    )
@@ -1,5 +1,11 @@
 from .annotation_service import AnnotationService
+from .annotation_export_service import AnnotationExportService
 from .msa_service import MSAService
 from .job_service import JobService
 
-__all__ = ["AnnotationService", "MSAService", "JobService"]
+__all__ = [
+    "AnnotationService",
+    "AnnotationExportService",
+    "MSAService",
+    "JobService",
+]
@@ -1,8 +1,10 @@
-from typing import Dict, List, Tuple
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 from backend.annotation.anarci_result_processor import AnarciResultProcessor
 from backend.models.models_v2 import (
     AnnotationResult as V2AnnotationResult,
+    AnnotationSummary as V2AnnotationSummary,
     Sequence as V2Sequence,
     Chain as V2Chain,
     Domain as V2Domain,
@@ -11,6 +13,10 @@ from backend.models.models_v2 import (
     DomainType,
 )
 from backend.models.requests_v2 import AnnotationRequestV2
+from backend.logger import get_logger
+from backend.profiling import stage
+
+logger = get_logger(__name__)
 
 
 class AnnotationService:
@@ -54,16 +60,20 @@ class AnnotationService:
             sequence = region.sequence
         return start, stop, sequence
 
-    def _process_regions(self, domain) -> List[V2Region]:
+    def _process_regions(self, domain, regions=None) -> List[V2Region]:
         """Process all regions in a domain."""
-        if not hasattr(domain, "regions") or not domain.regions:
+        if regions is None:
+            regions = getattr(domain, "regions", None)
+        if not regions:
             return []
 
-        regions = []
-        for name, region in domain.regions.items():
+        processed = []
+        for name, region in regions.items():
             start, stop, sequence = self._process_region(region)
-            regions.append(self._create_v2_region(name, start, stop, sequence))
-        return regions
+            processed.append(
+                self._create_v2_region(name, start, stop, sequence)
+            )
+        return processed
 
     @staticmethod
     def _create_v2_region(
@@ -85,6 +95,12 @@ class AnnotationService:
         )
         start, stop = self._get_domain_positions(domain, domain_type)
         regions = self._process_regions(domain)
+        scheme_regions = {
+            scheme: self._process_regions(domain, regions_by_name)
+            for scheme, regions_by_name in getattr(
+                domain, "scheme_regions", {}
+            ).items()
+        }
 
         return V2Domain(
             domain_type=domain_type,
@@ -92,6 +108,7 @@ class AnnotationService:
             stop=stop,
             sequence=domain.sequence,
             regions=regions,
+            scheme_regions=scheme_regions,
             isotype=getattr(domain, "isotype", None),
             species=getattr(domain, "species", None),
             metadata={},
@@ -116,7 +133,36 @@ class AnnotationService:
         )
 
     @staticmethod
+    def _count_result(
+        result,
+        chain_types: Dict[str, int],
+        isotypes: Dict[str, int],
+        species_counts: Dict[str, int],
+    ) -> None:
+        """Add the statistics of one processed sequence to the counters."""
+        for chain in result.chains:
+            # Get the primary domain (first variable domain) for chain metadata
+            primary_domain = next(
+                (d for d in chain.domains if d.domain_type == "V"),
+                chain.domains[0],
+            )
+
+            # Stats - only count primary domain
+            if primary_domain.isotype:
+                chain_types[primary_domain.isotype] = (
+                    chain_types.get(primary_domain.isotype, 0) + 1
+                )
+                isotypes[primary_domain.isotype] = (
+                    isotypes.get(primary_domain.isotype, 0) + 1
+                )
+            if primary_domain.species:
+                species_counts[primary_domain.species] = (
+                    species_counts.get(primary_domain.species, 0) + 1
+                )
+
+    @classmethod
     def _calculate_statistics(
+        cls,
         processor: AnarciResultProcessor,
     ) -> Tuple[Dict, Dict, Dict]:
         """Calculate statistics from processor results."""
@@ -125,25 +171,7 @@ class AnnotationService:
         species_counts = {}
 
         for result in processor.results:
-            for chain in result.chains:
-                # Get the primary domain (first variable domain) for chain metadata
-                primary_domain = next(
-                    (d for d in chain.domains if d.domain_type == "V"),
-                    chain.domains[0],
-                )
-
-                # Stats - only count primary domain
-                if primary_domain.isotype:
-                    chain_types[primary_domain.isotype] = (
-                        chain_types.get(primary_domain.isotype, 0) + 1
-                    )
-                    isotypes[primary_domain.isotype] = (
-                        isotypes.get(primary_domain.isotype, 0) + 1
-                    )
-                if primary_domain.species:
-                    species_counts[primary_domain.species] = (
-                        species_counts.get(primary_domain.species, 0) + 1
-                    )
+            cls._count_result(result, chain_types, isotypes, species_counts)
 
         return chain_types, isotypes, species_counts
 
@@ -158,6 +186,10 @@ class AnnotationService:
                 input_dict[seq.name] = chains
         return input_dict
 
+    @staticmethod
+    def _additional_schemes(request: AnnotationRequestV2) -> List[str]:
+        return [scheme.value for scheme in request.additional_schemes]
+
     def process_annotation_request(
         self, request: AnnotationRequestV2
     ) -> V2AnnotationResult:
@@ -165,18 +197,22 @@ class AnnotationService:
         # Prepare input and create processor
         input_dict = self._prepare_input_dict(request)
         processor = AnarciResultProcessor(
-            input_dict, numbering_scheme=request.numbering_scheme.value
+            input_dict,
+            numbering_scheme=request.numbering_scheme.value,
+            additional_schemes=self._additional_schemes(request),
         )
 
         # Process sequences
-        sequences = [
-            self._process_sequence(result) for result in processor.results
-        ]
+        with stage("convert_results"):
+            sequences = [
+                self._process_sequence(result) for result in processor.results
+            ]
 
         # Calculate statistics
-        chain_types, isotypes, species_counts = self._calculate_statistics(
-            processor
-        )
+        with stage("statistics"):
+            chain_types, isotypes, species_counts = self._calculate_statistics(
+                processor
+            )
 
         # Create and return result
         return V2AnnotationResult(
@@ -187,3 +223,60 @@ class AnnotationService:
             isotypes=isotypes,
             species=species_counts,
         )
+
+    def stream_annotation_request(
+        self, request: AnnotationRequestV2
+    ) -> Iterator[str]:
+        """
+        Process an annotation request as newline-delimited JSON.
+
+        Yields one ``{"type": "sequence", "data": ...}`` line per biologic
+        as soon as it is annotated, followed by a ``{"type": "summary"}``
+        line with the statistics of ``V2AnnotationResult``. A failure part
+        way through ends the stream with a ``{"type": "error"}`` line, since
+        the response status has already been sent.
+        """
+        input_dict = self._prepare_input_dict(request)
+        numbering_scheme = request.numbering_scheme.value
+        processor = AnarciResultProcessor(
+            numbering_scheme=numbering_scheme,
+            additional_schemes=self._additional_schemes(request),
+        )
+        return self._stream_lines(
+            processor.iter_results(input_dict), numbering_scheme
+        )
+
+    def _stream_lines(
+        self, results: Iterable, numbering_scheme: str
+    ) -> Iterator[str]:
+        chain_types = {}
+        isotypes = {}
+        species_counts = {}
+        total = 0
+        try:
+            for result in results:
+                sequence = self._process_sequence(result)
+                self._count_result(
+                    result, chain_types, isotypes, species_counts
+                )
+                total += 1
+                yield _ndjson_line("sequence", sequence.model_dump_json())
+        except Exception as e:
+            logger.error("Streaming annotation failed: %s", e)
+            yield _ndjson_line(
+                "error", json.dumps({"detail": f"Annotation failed: {e}"})
+            )
+            return
+
+        summary = V2AnnotationSummary(
+            numbering_scheme=numbering_scheme,
+            total_sequences=total,
+            chain_types=chain_types,
+            isotypes=isotypes,
+            species=species_counts,
+        )
+        yield _ndjson_line("summary", summary.model_dump_json())
+
+
+def _ndjson_line(line_type: str, data_json: str) -> str:
+    return f'{{"type": "{line_type}", "data": {data_json}}}\n'
@@ -21,6 +21,6 @@ class JobService:
     def list_jobs() -> List[Dict]:
         """List all jobs"""
         jobs = []
-        for job_id, job_status in job_manager.jobs.items():
+        for job_status in job_manager.list_jobs():
             jobs.append(job_status.model_dump())
         return jobs
@@ -2,11 +2,18 @@ from typing import List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
 
 from backend.models.models import SequenceInput, MSACreationRequest
+from backend.annotation.fasta_stream import (
+    UNSUPPORTED_FILE_MESSAGE,
+    UploadTooLargeError,
+    is_supported_upload,
+)
 from backend.annotation.sequence_processor import SequenceProcessor
 from backend.msa.msa_engine import MSAEngine
 from backend.msa.msa_annotation import MSAAnnotationEngine
 from backend.jobs.job_manager import job_manager
-from backend.logger import logger
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class MSAService:
@@ -16,63 +23,73 @@ class MSAService:
         self.annotation_engine = MSAAnnotationEngine()
 
     async def process_upload(
-        self, file: Optional[UploadFile], sequences: Optional[str]
+        self,
+        file: Optional[UploadFile],
+        sequences: Optional[str],
+        translate: bool = False,
     ) -> Tuple[List[SequenceInput], List[str]]:
         """Process uploaded sequences and return sequence inputs and validation errors"""
-        fasta_content = await self._get_fasta_content(file, sequences)
+        self._check_upload_input(file, sequences)
 
+        errors = []
+        sequence_inputs = []
         try:
-            records = self.sequence_processor.parse_fasta(fasta_content)
-            sequences_list = [str(record.seq) for record in records]
+            records = self.sequence_processor.iter_valid_upload_records(
+                file, sequences, errors, translate=translate
+            )
+            async for record, seq in records:
+                sequence_inputs.append(
+                    SequenceInput(
+                        name=record.id
+                        or f"Sequence_{len(sequence_inputs) + 1}",
+                        heavy_chain=seq,  # Assume heavy chain for now
+                    )
+                )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         except ValueError as e:
             raise HTTPException(
                 status_code=400, detail=f"Invalid FASTA format: {e}"
             )
 
-        valid_sequences, errors = self.sequence_processor.validate_sequences(
-            sequences_list
-        )
-        if not valid_sequences:
+        if not sequence_inputs:
             raise HTTPException(
                 status_code=400,
                 detail=f"Sequence validation failed: {'; '.join(errors)}",
             )
 
         if errors:
-            logger.warning(
-                f"Some sequences had validation issues: {'; '.join(errors)}"
-            )
-
-        # Create SequenceInput objects
-        sequence_inputs = []
-        for i, (record, seq) in enumerate(zip(records, valid_sequences)):
-            seq_input = SequenceInput(
-                name=record.id or f"Sequence_{i + 1}",
-                heavy_chain=seq,  # Assume heavy chain for now
-            )
-            sequence_inputs.append(seq_input)
+            logger.warning("%d sequences had validation issues", len(errors))
+            logger.debug("Validation issues: %s", errors)
 
         return sequence_inputs, errors
 
-    async def _get_fasta_content(
-        self, file: Optional[UploadFile], sequences: Optional[str]
-    ) -> str:
-        """Extract FASTA content from either file upload or direct sequence input"""
+    @staticmethod
+    def _check_upload_input(
+        file: Optional[UploadFile], sequences: Optional[str]
+    ) -> None:
+        """Reject uploads that are not FASTA files or carry no input"""
         if file:
-            if not file.filename.endswith((".fasta", ".fa", ".txt")):
+            if not is_supported_upload(file.filename):
                 raise HTTPException(
-                    status_code=400, detail="File must be FASTA format"
+                    status_code=400, detail=UNSUPPORTED_FILE_MESSAGE
                 )
-            content = await file.read()
-            return content.decode("utf-8")
-        elif sequences:
-            return sequences
-        else:
+        elif not sequences:
             raise HTTPException(
                 status_code=400,
                 detail="Either file or sequences must be provided",
             )
 
+    async def _get_fasta_content(
+        self, file: Optional[UploadFile], sequences: Optional[str]
+    ) -> str:
+        """Extract FASTA content from either file upload or direct sequence input"""
+        self._check_upload_input(file, sequences)
+        if file:
+            content = await file.read()
+            return content.decode("utf-8")
+        return sequences
+
     def create_msa(self, request: MSACreationRequest) -> dict:
         """Create multiple sequence alignment"""
         total_sequences = sum(
@@ -116,8 +133,14 @@ class MSAService:
 
         # Create MSA
         msa_result = self.msa_engine.create_msa(
-            sequences=sequences, method=request.alignment_method
+            sequences=sequences,
+            method=request.alignment_method,
+            numbering_scheme=request.numbering_scheme,
+            cluster_identity=request.cluster_identity,
+            consensus_threshold=request.consensus_threshold,
         )
+        # Stored so sequences can be added to it later
+        job_manager.store_msa_result(msa_result)
 
         # Annotate sequences
         annotation_result = self.annotation_engine.annotate_msa(
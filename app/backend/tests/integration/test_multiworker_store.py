@@ -0,0 +1,124 @@
+"""
+Load test for the shared SQLite data store under several uvicorn workers.
+
+Starts the API with ``--workers 4`` and runs upload -> align -> fetch flows
+concurrently. Every request uses a fresh connection so consecutive steps of
+one flow are spread over different worker processes.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+APP_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..")
+)
+WORKERS = 4
+FLOWS = 40
+
+SEQUENCES = (
+    ">heavy\n"
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAR\n"
+    ">light\n"
+    "DIQMTQSPSSLSASVGDRVTITCRASQDISNYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGSG"
+    "SGTDFTLTISSLQPEDFATYYCQQYNSYPLTFGQGTKVEIK\n"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def multiworker_server(tmp_path_factory):
+    port = _free_port()
+    store_dir = tmp_path_factory.mktemp("datastore")
+    env = dict(
+        os.environ,
+        DATA_STORE_BACKEND="sqlite",
+        DATA_STORE_DIR=str(store_dir),
+        DB_ECHO="false",
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(WORKERS),
+            "--log-level",
+            "warning",
+        ],
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                break
+        except httpx.TransportError:
+            pass
+        if process.poll() is not None:
+            pytest.fail("uvicorn exited during startup")
+        time.sleep(0.5)
+    else:
+        process.terminate()
+        pytest.fail("uvicorn did not start within 60s")
+
+    yield base_url
+
+    process.terminate()
+    process.wait(timeout=30)
+
+
+def _upload_align_fetch(base_url: str) -> str:
+    # "Connection: close" stops keep-alive pinning the flow to one worker
+    headers = {"Connection": "close"}
+    with httpx.Client(base_url=base_url, headers=headers, timeout=30) as c:
+        response = c.post("/api/v1/upload", data={"sequences": SEQUENCES})
+        assert response.status_code == 200, response.text
+        dataset_id = response.json()["data"]["dataset_id"]
+
+        response = c.post(
+            "/api/v1/align",
+            json={"dataset_id": dataset_id, "method": "pairwise_global"},
+        )
+        assert response.status_code == 200, response.text
+
+        response = c.get(f"/api/v1/alignment/{dataset_id}")
+        assert response.status_code == 200, response.text
+        assert response.json()["data"]["dataset_id"] == dataset_id
+
+        response = c.get(f"/api/v1/dataset/{dataset_id}")
+        assert response.status_code == 200, response.text
+        assert response.json()["data"]["status"] == "aligned"
+    return dataset_id
+
+
+def test_upload_align_fetch_under_multiple_workers(multiworker_server):
+    with ThreadPoolExecutor(max_workers=WORKERS * 2) as pool:
+        dataset_ids = list(
+            pool.map(_upload_align_fetch, [multiworker_server] * FLOWS)
+        )
+
+    assert len(set(dataset_ids)) == FLOWS
+    response = httpx.get(f"{multiworker_server}/api/v1/datasets")
+    assert response.status_code == 200, response.text
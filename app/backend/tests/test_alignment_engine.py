@@ -338,7 +338,8 @@ class TestAlignmentEngine:
         )
 
         assert result is not None
-        assert result["method"] == "muscle"  # Should fall back to MUSCLE
+        assert result["method"] == "custom_antibody"
+        assert result["unnumbered"] == []
         assert "identity" in result
         assert "length" in result
         assert "sequences" in result
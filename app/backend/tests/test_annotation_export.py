@@ -0,0 +1,143 @@
+# Tests for the columnar (Arrow / Parquet) annotation export
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from backend.main import app  # noqa: E402
+from backend.models.models_v2 import ExportFormat, ExportTable  # noqa: E402
+from backend.services import AnnotationExportService  # noqa: E402
+from backend.utils.types import Chain, Domain  # noqa: E402
+
+client = TestClient(app)
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+LIGHT = (
+    "DIQMTQSPSSLSASVGDRVTITCRASQDISNYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGSG"
+    "SGTDFTLTISSLQPEDFATYYCQQYNSYPLTFGQGTKVEIK"
+)
+REQUEST = {
+    "sequences": [
+        {"name": "ab1", "heavy_chain": HEAVY, "light_chain": LIGHT},
+        {"name": "ab2", "heavy_chain": HEAVY},
+    ],
+    "numbering_scheme": "imgt",
+}
+
+
+def _flatten_regions(annotation):
+    rows = []
+    for sequence in annotation["sequences"]:
+        for chain in sequence["chains"]:
+            for index, domain in enumerate(chain["domains"]):
+                for region in domain["regions"]:
+                    rows.append(
+                        (
+                            sequence["name"],
+                            chain["name"],
+                            index,
+                            region["name"],
+                            region["start"],
+                            region["stop"],
+                            region["features"][0]["value"],
+                        )
+                    )
+    return rows
+
+
+def test_export_regions_arrow_matches_annotate():
+    annotation = client.post("/api/v2/annotate", json=REQUEST).json()
+
+    response = client.post("/api/v2/annotate/export", json=REQUEST)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith(
+        "application/vnd.apache.arrow.stream"
+    )
+    table = pa.ipc.open_stream(response.content).read_all()
+    rows = list(
+        zip(
+            *[
+                table.column(name).to_pylist()
+                for name in (
+                    "biologic_name",
+                    "chain_name",
+                    "domain_index",
+                    "region_name",
+                    "start",
+                    "stop",
+                    "sequence",
+                )
+            ]
+        )
+    )
+    assert rows == _flatten_regions(annotation)
+    assert set(table.column("numbering_scheme").to_pylist()) == {"imgt"}
+
+
+def test_export_domains_parquet():
+    response = client.post(
+        "/api/v2/annotate/export",
+        json=REQUEST,
+        params={"table": "domains", "format": "parquet"},
+    )
+    assert response.status_code == 200, response.text
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("biologic_name").to_pylist()[0] == "ab1"
+    assert "V" in table.column("domain_type").to_pylist()
+    assert table.schema.field("start").type == pa.int32()
+
+
+class _Result:
+    def __init__(self, name, domain_count):
+        domains = []
+        for i in range(domain_count):
+            domain = Domain(
+                sequence="ACDE",
+                numbering=None,
+                alignment_details={"query_start": i, "query_end": i + 4},
+                hit_table=None,
+                isotype="H",
+                germlines=None,
+                species="human",
+            )
+            domain.regions = {
+                "CDR1": {
+                    "name": "CDR1",
+                    "start": i,
+                    "stop": i + 1,
+                    "sequence": "AC",
+                }
+            }
+            domains.append(domain)
+        self.biologic_name = name
+        self.chains = [Chain("heavy_chain", "ACDE", domains)]
+
+
+@pytest.mark.parametrize("export_format", list(ExportFormat))
+def test_export_batches(export_format):
+    service = AnnotationExportService(batch_rows=3)
+    results = [_Result(f"ab{i}", 2) for i in range(5)]
+    batches = list(
+        service.iter_record_batches(results, ExportTable.DOMAINS, "imgt")
+    )
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+
+    chunks = list(
+        service.write_batches(batches, ExportTable.DOMAINS, export_format)
+    )
+    assert len(chunks) == len(batches) + 1
+    data = io.BytesIO(b"".join(chunks))
+    if export_format == ExportFormat.PARQUET:
+        parquet = pq.ParquetFile(data)
+        assert parquet.metadata.num_row_groups == 3
+        table = parquet.read()
+    else:
+        table = pa.ipc.open_stream(data).read_all()
+    assert table.num_rows == 10
+    assert table.column("start").to_pylist()[:2] == [0, 1]
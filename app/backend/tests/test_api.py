@@ -1,3 +1,5 @@
+import json
+
 from backend.logger import logger
 from backend.main import app
 from backend.utils.json_to_fasta import json_seqs_to_fasta
@@ -61,6 +63,17 @@ def test_upload_invalid():
     assert "Invalid FASTA format" in response.json()["detail"]
 
 
+def test_upload_too_large(monkeypatch):
+    monkeypatch.setattr(
+        "backend.annotation.sequence_processor.MAX_UPLOAD_BYTES", 64
+    )
+    fasta = ">seq1\n" + "ACDEFGHIKLMNPQRSTVWY" * 10
+    response = client.post(
+        "/api/v1/upload", files={"file": ("test.fasta", fasta, "text/plain")}
+    )
+    assert response.status_code == 413
+
+
 def test_annotate_invalid():
     # Invalid sequence - should be caught by Pydantic validation
     response = client.post(
@@ -123,3 +136,30 @@ def test_annotate_with_custom_chains():
 
 
 # Additional tests for /align, /dataset, /datasets, /alignment can be added as needed.
+
+
+def test_annotate_stream_matches_annotate():
+    request = {
+        "sequences": [
+            {"name": "scfv", "scfv": SCFV_SEQ},
+            {"name": "tcr", "heavy_chain": TCR_SEQ},
+        ],
+        "numbering_scheme": "imgt",
+    }
+    expected = client.post("/api/v2/annotate", json=request).json()
+
+    response = client.post("/api/v2/annotate/stream", json=request)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == [
+        "sequence",
+        "sequence",
+        "summary",
+    ]
+    assert [line["data"] for line in lines[:-1]] == expected["sequences"]
+    summary = lines[-1]["data"]
+    for key in ("numbering_scheme", "total_sequences", "chain_types"):
+        assert summary[key] == expected[key]
+    assert summary["isotypes"] == expected["isotypes"]
+    assert summary["species"] == expected["species"]
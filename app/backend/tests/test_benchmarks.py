@@ -0,0 +1,56 @@
+# Tests for the benchmark suite and its synthetic datasets
+import json
+
+from backend.benchmarks import suite
+from backend.benchmarks.datasets import (
+    REFERENCE_HEAVY,
+    SyntheticDataset,
+    load_constant_regions,
+)
+
+
+def test_synthetic_dataset_is_deterministic():
+    dataset = SyntheticDataset(seed=1)
+    biologics = dataset.biologics(5)
+    assert biologics == SyntheticDataset(seed=1).biologics(5)
+    heavy = biologics["ab_0"]["heavy_chain"]
+    assert len(heavy) > len(REFERENCE_HEAVY)
+    assert len(set(dataset.variable_domains(5))) == 5
+
+    matrix = dataset.alignment_matrix(5)
+    assert len({len(row) for row in matrix}) == 1
+
+
+def test_constant_regions_exclude_membrane_exons():
+    regions = dict(load_constant_regions())
+    assert "IGHG1*01" in regions
+    assert regions["IGHG1*01"].startswith("ASTKGPSVFPLAP")
+    # CH1, hinge, CH2 and CH3-CHS, without the M1/M2 membrane exons
+    assert regions["IGHG1*01"].endswith("SLSPGK")
+
+
+def test_suite_writes_comparable_json(tmp_path):
+    output = tmp_path / "run.json"
+    argv = [
+        "--cases",
+        "pssm_calculator",
+        "generate_consensus",
+        "--sizes",
+        "10",
+        "--repeat",
+        "2",
+        "--output",
+        str(output),
+    ]
+    report = suite.main(argv)
+    stored = json.loads(output.read_text())
+    assert stored["results"] == report["results"]
+    assert {(r["case"], r["size"]) for r in stored["results"]} == {
+        ("pssm_calculator", 10),
+        ("generate_consensus", 10),
+    }
+    assert stored["metadata"]["repeat"] == 2
+
+    lines = suite.compare(report, stored)
+    assert len(lines) == 2
+    assert lines[0].endswith("x1.00")
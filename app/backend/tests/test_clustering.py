@@ -0,0 +1,112 @@
+# Tests for redundancy reduction and threading of cluster members
+import random
+
+from backend.benchmarks.datasets import SyntheticDataset, mutate
+from backend.models.models import AlignmentMethod, MSACreationRequest
+from backend.msa import clustering
+from backend.msa.clustering import cluster_sequences, thread_members
+from backend.msa.msa_engine import MSAEngine
+
+REPRESENTATIVE = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def test_cluster_sequences_groups_near_duplicates():
+    sequences = [
+        REPRESENTATIVE[:-1],
+        REPRESENTATIVE,
+        "WWWWWWWWWWWWWWWWWWWW",
+        REPRESENTATIVE,
+        REPRESENTATIVE[:10] + "A" + REPRESENTATIVE[11:],
+    ]
+    clusters = cluster_sequences(sequences, identity=0.9)
+    assert [cluster.representative for cluster in clusters] == [1, 2]
+    assert sorted(clusters[0].members) == [0, 3, 4]
+    assert clusters[1].members == {}
+
+
+def test_cluster_sequences_respects_identity():
+    sequences = [REPRESENTATIVE, REPRESENTATIVE[:10] + "AAAAA" + "VWY"]
+    assert len(cluster_sequences(sequences, identity=0.95)) == 2
+    assert len(cluster_sequences(sequences, identity=0.5)) == 1
+
+
+def test_cluster_sequences_handles_odd_input():
+    clusters = cluster_sequences(["", "", "acd", "ACD", "ACDUX"], 0.9)
+    members = sorted(
+        [cluster.representative for cluster in clusters]
+        + [member for cluster in clusters for member in cluster.members]
+    )
+    assert members == [0, 1, 2, 3, 4]
+
+
+def test_cluster_sequences_across_kmer_blocks(monkeypatch):
+    # Representatives span several k-mer blocks, members match any of them
+    monkeypatch.setattr(clustering._RepresentativeKmers, "BLOCK_SIZE", 2)
+    rng = random.Random(3)
+    representatives = [
+        "".join(rng.choice(REPRESENTATIVE) for _ in range(40))
+        for _ in range(5)
+    ]
+    sequences = representatives + [representatives[i][:-1] for i in (4, 0, 3)]
+    clusters = cluster_sequences(sequences, identity=0.9)
+    assert [cluster.representative for cluster in clusters] == list(range(5))
+    members = [sorted(cluster.members) for cluster in clusters]
+    assert members == [[6], [], [], [7], [5]]
+
+
+def test_thread_members_adds_insertion_columns():
+    sequences = [
+        "ACDEFGHIKLMNPQ",
+        "ACDEWFGHIKLNPQ",
+        "ACDEFGHIKLMNPQW",
+        "MKKK",
+    ]
+    clusters = cluster_sequences(sequences, identity=0.8)
+    assert [cluster.representative for cluster in clusters] == [2, 3]
+    aligned = thread_members(
+        sequences, clusters, ["ACDEFGHIKLMNPQW", "-----MKKK------"]
+    )
+    assert aligned == [
+        "ACDE-FGHIKLMNPQ-",
+        "ACDEWFGHIKL-NPQ-",
+        "ACDE-FGHIKLMNPQW",
+        "------MKKK------",
+    ]
+
+
+def test_create_msa_with_clustering():
+    dataset = SyntheticDataset()
+    rng = random.Random(0)
+    seeds = dataset.variable_domains(3, "H")
+    sequences = [
+        (f"clone_{i}", mutate(seeds[i % 3], 0.01, rng)) for i in range(30)
+    ]
+    result = MSAEngine().create_msa(
+        sequences, AlignmentMethod.PAIRWISE_GLOBAL, cluster_identity=0.9
+    )
+
+    clusters = result.metadata["clusters"]
+    assert result.metadata["cluster_identity"] == 0.9
+    assert len(clusters) < 10
+    covered = sorted(
+        [cluster["representative"] for cluster in clusters]
+        + [member for cluster in clusters for member in cluster["members"]]
+    )
+    assert covered == list(range(30))
+    assert len(result.sequences) == 30
+    for row, (_, sequence) in zip(result.sequences, sequences):
+        assert row.aligned_sequence.replace("-", "") == sequence
+    assert len({len(row.aligned_sequence) for row in result.sequences}) == 1
+
+
+def test_create_msa_without_clustering_has_no_cluster_metadata():
+    result = MSAEngine().create_msa(
+        [("a", REPRESENTATIVE), ("b", REPRESENTATIVE[2:])],
+        AlignmentMethod.PAIRWISE_GLOBAL,
+    )
+    assert "clusters" not in result.metadata
+
+
+def test_request_cluster_identity_is_optional():
+    request = MSACreationRequest(sequences=[])
+    assert request.cluster_identity is None
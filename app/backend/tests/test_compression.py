@@ -0,0 +1,153 @@
+# Tests for response compression and compact PSSM negotiation
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from backend.api import compression
+from backend.api.compression import CompressionMiddleware, choose_encoding
+from backend.main import app as main_app
+from backend.msa.pssm_calculator import PSSMCalculator
+
+BODY = "ACDEFGHIKLMNPQRSTVWY-" * 200
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ACDE")
+
+    return TestClient(app)
+
+
+def test_gzip_large_responses(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(BODY) // 10
+    assert response.text == BODY
+
+
+def test_small_and_unaccepted_responses_unchanged(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
+
+
+@pytest.mark.asyncio
+async def test_streaming_chunks_are_flushed():
+    async def app(scope, receive, send):
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        for line in (b"line 1\n", b"line 2\n"):
+            await send(
+                {"type": "http.response.body", "body": line, "more_body": True}
+            )
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    await CompressionMiddleware(app, minimum_size=100)(scope, None, send)
+
+    assert (b"content-encoding", b"gzip") in messages[0]["headers"]
+    chunks = [message["body"] for message in messages[1:]]
+    # Each chunk decompresses on its own as soon as it arrives
+    decompressor = zlib.decompressobj(31)
+    assert decompressor.decompress(chunks[0]) == b"line 1\n"
+    assert decompressor.decompress(chunks[1]) == b"line 2\n"
+    assert decompressor.decompress(chunks[2]) == b""
+    assert decompressor.eof
+
+
+def test_choose_encoding(monkeypatch):
+    assert choose_encoding("") is None
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("deflate, *;q=0.5") in ("br", "gzip")
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip;q=0.5") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def test_brotli(client):
+    brotli = pytest.importorskip("brotli")
+    response = client.get(
+        "/large", headers={"Accept-Encoding": "gzip;q=0.8, br"}
+    )
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(response.content).decode() == BODY
+
+
+def test_pssm_to_compact():
+    pssm = PSSMCalculator().calculate_pssm([list("ACD"), list("ACE")])
+    compact = PSSMCalculator.to_compact(pssm)
+    assert compact["format"] == "compact"
+    assert len(compact["position_frequencies"]) == 3
+    for column, row in zip(
+        pssm["position_scores"], compact["position_scores"]
+    ):
+        assert row == [column[aa] for aa in pssm["amino_acids"]]
+    assert compact["background_frequencies"][0] == (
+        pssm["background_frequencies"]["A"]
+    )
+    assert PSSMCalculator.to_compact(compact) is compact
+
+
+def _create_msa(params=None, headers=None):
+    request = {
+        "sequences": [
+            {"name": "a", "heavy_chain": HEAVY},
+            {"name": "b", "heavy_chain": HEAVY.replace("VQPGG", "VKPGG")},
+        ],
+        "alignment_method": "pairwise_global",
+    }
+    response = TestClient(main_app).post(
+        "/api/v2/msa-viewer/create-msa",
+        json=request,
+        params=params,
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_create_msa_pssm_format_negotiation():
+    default = _create_msa().json()["data"]
+    assert isinstance(default["pssm_data"]["position_scores"][0], dict)
+
+    by_query = _create_msa(params={"pssm_format": "compact"})
+    by_accept = _create_msa(
+        headers={"Accept": "application/json; pssm=compact"}
+    )
+    for response in (by_query, by_accept):
+        assert "Accept" in response.headers["vary"]
+        data = response.json()["data"]
+        for pssm in (
+            data["pssm_data"],
+            data["msa_result"]["metadata"]["pssm_data"],
+        ):
+            assert pssm["format"] == "compact"
+            assert len(pssm["position_scores"][0]) == 20
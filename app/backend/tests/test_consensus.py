@@ -0,0 +1,80 @@
+# Tests for consensus generation from column counts
+import numpy as np
+
+from backend.models.models import AlignmentMethod
+from backend.msa.consensus import (
+    alignment_consensus,
+    count_columns,
+    encode_alignment,
+    residue_counts,
+)
+from backend.msa.msa_engine import MSAEngine
+from backend.msa.pssm_calculator import PSSMCalculator
+
+
+def test_encode_alignment_pads_rows():
+    encoded = encode_alignment([list("ACD"), "AC"])
+    assert encoded.tobytes() == b"ACDAC-"
+    assert encode_alignment([]).shape == (0, 0)
+
+
+def test_consensus_majority_and_fraction():
+    consensus = alignment_consensus(
+        encode_alignment(["ACD-", "ACE-", "AKE-", "-KE-"])
+    )
+    assert consensus.sequence[0] == "A"
+    assert consensus.sequence[2:] == "E-"
+    assert consensus.majority_fraction == [0.75, 0.5, 0.75, 0.0]
+
+
+def test_consensus_ties_go_to_first_residue():
+    # C and K are tied in column 1
+    first_c = encode_alignment(["AC", "AK", "AK", "AC"])
+    first_k = encode_alignment(["AK", "AC", "AC", "AK"])
+    assert alignment_consensus(first_c).sequence == "AC"
+    assert alignment_consensus(first_k).sequence == "AK"
+
+
+def test_consensus_ambiguity_codes():
+    encoded = encode_alignment(["DIA", "NLA", "DKA", "NIC"])
+    assert alignment_consensus(encoded, threshold=0.6).sequence == "BJA"
+    assert alignment_consensus(encoded, threshold=0.8).sequence == "BXX"
+    # Ambiguity codes only replace weak columns
+    assert alignment_consensus(encoded, threshold=0.5).sequence == "DIA"
+
+
+def test_residue_counts_fold_case():
+    counts = count_columns(encode_alignment(["Aa", "aC"]))
+    assert residue_counts(counts, "AC").tolist() == [[2, 0], [1, 1]]
+
+
+def test_pssm_consensus_from_counts():
+    pssm = PSSMCalculator().calculate_pssm([list("AC-"), list("AK-")])
+    # An all-gap column has no amino acid to report, so its consensus is "-"
+    assert pssm["consensus"] == "AC-"
+    assert np.array(pssm["residue_counts"]).sum() == 4
+
+
+def test_create_msa_reports_consensus_fraction():
+    result = MSAEngine().create_msa(
+        [("a", "ACDEFGHIK"), ("b", "ACDEFGHIK"), ("c", "ACNEFGHIK")],
+        AlignmentMethod.PAIRWISE_GLOBAL,
+        consensus_threshold=0.9,
+    )
+    assert result.consensus == "ACBEFGHIK"
+    assert result.metadata["consensus_threshold"] == 0.9
+    fractions = result.metadata["consensus_fraction"]
+    assert fractions[2] == 2 / 3
+    assert fractions[0] == 1.0
+
+
+def test_add_sequences_keeps_consensus_threshold():
+    engine = MSAEngine()
+    msa = engine.create_msa(
+        [("a", "ACDEFGHIK"), ("b", "ACDEFGHIK"), ("c", "ACNEFGHIK")],
+        AlignmentMethod.PAIRWISE_GLOBAL,
+        consensus_threshold=0.9,
+    )
+    result = engine.add_sequences(msa, [("d", "QCDEFGHIK")])
+    assert result.consensus == "XCBEFGHIK"
+    assert result.metadata["consensus_fraction"][0] == 0.75
@@ -1,6 +1,18 @@
 # Tests for DataStore (dataset creation, retrieval, deletion, statistics)
+import multiprocessing
+
 import pytest
-from backend.data_store import DataStore
+from backend.data_store import (
+    DataStore,
+    MmapDataStore,
+    PackedSequences,
+    SQLiteDataStore,
+)
+from backend.models.models import (
+    AlignmentMethod,
+    AlignmentResult,
+    NumberingScheme,
+)
 
 
 @pytest.fixture
@@ -72,3 +84,168 @@ def test_get_dataset_statistics(store):
     stats = store.get_dataset_statistics()
     assert stats["total_datasets"] == 1
     assert stats["total_sequences"] == 1
+
+
+@pytest.fixture
+def mmap_store(tmp_path):
+    return MmapDataStore(str(tmp_path))
+
+
+def test_mmap_store_round_trip(mmap_store):
+    seqs = [
+        "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKGRFTISRDNSKNTLYLQMNSLRAEDTAVYYCAR",
+        "DIQMTQSPSSLSASVGDRVTITCRASQDISNYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGSGSGTDFTLTISSLQPEDFATYYCQQYNSYPLTFGQGTKVEIK",
+    ]
+    dataset_id = mmap_store.create_dataset(seqs, metadata={"source": "test"})
+    sequences = mmap_store.get_sequences(dataset_id)
+    assert isinstance(sequences, PackedSequences)
+    assert len(sequences) == 2
+    assert list(sequences) == seqs
+    assert sequences[-1] == seqs[1]
+    assert sequences[0:1] == seqs[:1]
+    dataset = mmap_store.get_dataset(dataset_id)
+    assert dataset["sequence_count"] == 2
+    assert dataset["metadata"] == {"source": "test"}
+
+
+def test_mmap_store_results_are_persisted(mmap_store):
+    seqs = ["ACDEFGHIKLMNPQRSTVWY", "ACDEFGHIKLMNPQRSTVWW"]
+    dataset_id = mmap_store.create_dataset(seqs)
+    alignment = AlignmentResult(
+        dataset_id=dataset_id,
+        method=AlignmentMethod.PAIRWISE_GLOBAL,
+        alignment=">a\nACDEFGHIKLMNPQRSTVWY\n>b\nACDEFGHIKLMNPQRSTVWW\n",
+        statistics={"identity": 0.95},
+        numbering_scheme=NumberingScheme.IMGT,
+    )
+    assert mmap_store.store_alignment_result(dataset_id, alignment)
+    assert mmap_store.get_alignment_result(dataset_id) == alignment
+    assert mmap_store.get_dataset_info(dataset_id).status == "aligned"
+    assert mmap_store.get_annotation_result(dataset_id) is None
+
+
+def test_mmap_store_is_shared_between_instances(tmp_path):
+    # Two stores on the same directory behave like two uvicorn workers
+    writer = MmapDataStore(str(tmp_path))
+    reader = MmapDataStore(str(tmp_path))
+    dataset_id = writer.create_dataset(["ACDEFGHIKLMNPQRSTVWY"])
+    assert list(reader.get_sequences(dataset_id)) == ["ACDEFGHIKLMNPQRSTVWY"]
+    assert len(reader.list_datasets()) == 1
+    assert writer.delete_dataset(dataset_id)
+    assert reader.get_dataset(dataset_id) is None
+
+
+def test_mmap_store_bounds_open_views(tmp_path, monkeypatch):
+    monkeypatch.setattr(MmapDataStore, "MAX_OPEN_VIEWS", 2)
+    writer = MmapDataStore(str(tmp_path))
+    reader = MmapDataStore(str(tmp_path))
+    ids = [writer.create_dataset(["ACDEFGHIKLMNPQRSTVWY"]) for _ in range(3)]
+    for dataset_id in ids:
+        reader.get_sequences(dataset_id)
+    assert list(reader._views) == ids[1:]
+
+    # Deleted through another worker: the view is still dropped
+    assert writer.delete_dataset(ids[2])
+    assert not reader.delete_dataset(ids[2])
+    assert list(reader._views) == ids[1:2]
+
+
+def test_mmap_store_empty_dataset_and_statistics(mmap_store):
+    empty_id = mmap_store.create_dataset([])
+    assert len(mmap_store.get_sequences(empty_id)) == 0
+    mmap_store.create_dataset(["ACDEFGHIKLMNPQRSTVWY"] * 3)
+    stats = mmap_store.get_dataset_statistics()
+    assert stats["total_datasets"] == 2
+    assert stats["total_sequences"] == 3
+    assert stats["status_counts"] == {"uploaded": 2}
+
+
+def test_mmap_store_rejects_path_like_ids(mmap_store):
+    assert mmap_store.get_dataset("../etc") is None
+    assert mmap_store.get_sequences("") is None
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    return SQLiteDataStore(str(tmp_path / "datastore.db"))
+
+
+def test_sqlite_store_round_trip(sqlite_store):
+    seqs = ["ACDEFGHIKLMNPQRSTVWY", "ACDEFGHIKLMNPQRSTVWW"]
+    dataset_id = sqlite_store.create_dataset(seqs, metadata={"source": "test"})
+    assert sqlite_store.get_sequences(dataset_id) == seqs
+    dataset = sqlite_store.get_dataset(dataset_id)
+    assert dataset["metadata"] == {"source": "test"}
+    assert dataset["status"] == "uploaded"
+    alignment = AlignmentResult(
+        dataset_id=dataset_id,
+        method=AlignmentMethod.PAIRWISE_GLOBAL,
+        alignment=">a\nACDEFGHIKLMNPQRSTVWY\n>b\nACDEFGHIKLMNPQRSTVWW\n",
+        statistics={"identity": 0.95},
+        numbering_scheme=NumberingScheme.IMGT,
+    )
+    assert sqlite_store.store_alignment_result(dataset_id, alignment)
+    assert sqlite_store.get_alignment_result(dataset_id) == alignment
+    assert sqlite_store.get_dataset_info(dataset_id).status == "aligned"
+    assert not sqlite_store.store_alignment_result("missing", alignment)
+    stats = sqlite_store.get_dataset_statistics()
+    assert stats["total_sequences"] == 2
+    assert stats["alignments"] == 1
+    assert stats["annotations"] == 0
+    assert sqlite_store.delete_dataset(dataset_id)
+    assert sqlite_store.get_sequences(dataset_id) is None
+    assert sqlite_store.get_alignment_result(dataset_id) is None
+    assert not sqlite_store.delete_dataset(dataset_id)
+
+
+def _create_dataset_in_subprocess(db_path, queue):
+    queue.put(
+        SQLiteDataStore(db_path).create_dataset(["ACDEFGHIKLMNPQRSTVWY"])
+    )
+
+
+def test_sqlite_store_is_shared_between_processes(tmp_path):
+    db_path = str(tmp_path / "datastore.db")
+    reader = SQLiteDataStore(db_path)
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    workers = [
+        ctx.Process(
+            target=_create_dataset_in_subprocess, args=(db_path, queue)
+        )
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    dataset_ids = [queue.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+    for dataset_id in dataset_ids:
+        assert reader.get_sequences(dataset_id) == ["ACDEFGHIKLMNPQRSTVWY"]
+    assert len(reader.list_datasets()) == 4
+
+
+@pytest.mark.parametrize("backend", ["memory", "mmap", "sqlite"])
+def test_dataset_writer_commit_and_abort(backend, tmp_path):
+    store = {
+        "memory": lambda: DataStore(),
+        "mmap": lambda: MmapDataStore(str(tmp_path)),
+        "sqlite": lambda: SQLiteDataStore(str(tmp_path / "datastore.db")),
+    }[backend]()
+    seqs = ["ACDEFGHIKLMNPQRSTVWY", "ACDEFGHIKLMNPQRSTVWW", ""]
+
+    with store.open_dataset_writer({"source": "stream"}) as writer:
+        for seq in seqs:
+            writer.add(seq)
+        assert store.list_datasets() == []
+        dataset_id = writer.commit()
+    assert list(store.get_sequences(dataset_id)) == seqs
+    assert store.get_dataset(dataset_id)["metadata"] == {"source": "stream"}
+    assert store.get_dataset_info(dataset_id).status == "uploaded"
+
+    with pytest.raises(RuntimeError):
+        with store.open_dataset_writer() as writer:
+            writer.add("ACDEFGHIKLMNPQRSTVWY")
+            raise RuntimeError("upload interrupted")
+    assert [d.dataset_id for d in store.list_datasets()] == [dataset_id]
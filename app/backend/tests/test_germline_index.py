@@ -0,0 +1,65 @@
+# Tests for the in-memory germline index
+from anarci import run_anarci
+from anarci.germlines import all_germlines
+
+from backend.annotation.germline_index import (
+    GermlineIndex,
+    get_germline_index,
+    shm_rate,
+)
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+LIGHT = (
+    "DIQMTQSPSSLSASVGDRVTITCRASQSISSYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGS"
+    "GSGTDFTLTISSLQPEDFATYYCQQSYSTPLTFGQGTKVEIK"
+)
+SPECIES = ["human", "mouse", "rat"]
+
+
+def test_numbered_matches_anarci():
+    _, numbered, details, _ = run_anarci(
+        [("heavy", HEAVY), ("light", LIGHT)],
+        scheme="imgt",
+        allowed_species=SPECIES,
+        assign_germline=True,
+    )
+    domains = [
+        (alignment[0]["chain_type"], numbering[0][0], None)
+        for numbering, alignment in zip(numbered, details)
+    ]
+    assignments = get_germline_index().assign_batch(domains, SPECIES)
+    assert assignments == [alignment[0]["germlines"] for alignment in details]
+
+
+def test_sequence_lookup():
+    index = get_germline_index()
+    germline = all_germlines["V"]["H"]["human"]["IGHV3-23*01"]
+    assignment = index.assign(
+        "H", sequence=germline.replace("-", "") + "AKDRYYGMDVWGQGTTVTVSS"
+    )
+    assert assignment["v_gene"] == [("human", "IGHV3-23*01"), 1.0]
+    assert assignment["j_gene"][0][0] == "human"
+    assert shm_rate(assignment) == 0.0
+
+    assignment = index.assign("H", sequence=HEAVY, allowed_species=["mouse"])
+    assert assignment["v_gene"][0][0] == "mouse"
+    assert 0.0 < shm_rate(assignment) < 1.0
+
+
+def test_unknown_chain_type_and_custom_germlines():
+    germlines = {
+        "V": {"H": {"human": {"V1": "A" * 100 + "-" * 28}}},
+        "J": {"H": {"human": {"J1": "-" * 114 + "W" * 14}}},
+    }
+    index = GermlineIndex(germlines)
+    numbering = [((position, " "), "A") for position in range(1, 51)]
+    assert index.assign_batch(
+        [("H", numbering, None), ("X", None, "AAAA")]
+    ) == [
+        {"v_gene": [("human", "V1"), 0.5], "j_gene": [("human", "J1"), 0.0]},
+        None,
+    ]
+    assert shm_rate(None) is None
@@ -0,0 +1,109 @@
+# Tests for k-mer distances and guide trees
+import numpy as np
+import pytest
+from scipy.cluster.hierarchy import is_valid_linkage
+
+from backend.benchmarks.datasets import SyntheticDataset
+from backend.msa.guide_tree import (
+    NEIGHBOR_JOINING,
+    UPGMA,
+    guide_tree,
+    leaf_order,
+    neighbor_joining,
+    subtrees,
+)
+from backend.msa.kmer_distance import (
+    distances_between,
+    kmer_distances,
+    kmer_matrix,
+)
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+HEAVY_SHORT_CDR3 = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDYWGQGTTVTVSS"
+)
+LIGHT = (
+    "DIQMTQSPSSLSASVGDRVTITCRASQSISSYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGS"
+    "GSGTDFTLTISSLQPEDFATYYCQQSYSTPLTFGQGTKVEIK"
+)
+
+
+def test_kmer_matrix_does_not_cross_sequences():
+    kmers = kmer_matrix(["ACD", "EFG", "AC"])
+    assert kmers.getnnz(axis=1).tolist() == [1, 1, 0]
+    assert kmers.shape[1] == 21**3
+
+
+def test_kmer_distances():
+    distances = kmer_distances([HEAVY, HEAVY_SHORT_CDR3, LIGHT, "AC"])
+    assert np.allclose(distances, distances.T)
+    assert np.all(np.diag(distances) == 0)
+    assert distances[0, 1] < distances[0, 2]
+    # Too short for a single k-mer
+    assert distances[0, 3] == 1
+
+
+def test_distances_between_matches_full_matrix():
+    kmers = kmer_matrix([HEAVY, HEAVY_SHORT_CDR3, LIGHT])
+    block = distances_between(kmers[[2]], kmers)
+    assert np.allclose(block[0], distances_between(kmers)[2])
+
+
+def test_neighbor_joining_joins_neighbours_first():
+    distances = np.array(
+        [
+            [0, 5, 9, 9, 8],
+            [5, 0, 10, 10, 9],
+            [9, 10, 0, 8, 7],
+            [9, 10, 8, 0, 3],
+            [8, 9, 7, 3, 0],
+        ],
+        dtype=float,
+    )
+    tree = neighbor_joining(distances)
+    assert is_valid_linkage(tree)
+    assert tree[0, :2].tolist() == [0, 1]
+    # Branch lengths 2 and 3
+    assert tree[0, 2] == 3
+
+
+def test_guide_tree_joins_closest_first():
+    tree = guide_tree([HEAVY, LIGHT, HEAVY_SHORT_CDR3])
+    assert sorted(tree[0, :2]) == [0, 2]
+
+
+@pytest.mark.parametrize("method", [UPGMA, NEIGHBOR_JOINING])
+def test_divisive_tree_separates_chain_types(method):
+    dataset = SyntheticDataset()
+    sequences = dataset.variable_domains(150, "H") + dataset.variable_domains(
+        150, "L"
+    )
+    tree = guide_tree(sequences, method, leaf_size=50)
+    assert is_valid_linkage(tree)
+    assert sorted(leaf_order(tree, len(sequences))) == list(range(300))
+
+    halves = subtrees(tree, len(sequences), 150)
+    assert sorted(len(half) for half in halves) == [150, 150]
+    assert all(len({i < 150 for i in half}) == 1 for half in halves)
+
+
+def test_subtrees_respect_max_size():
+    dataset = SyntheticDataset()
+    sequences = dataset.variable_domains(200, "H")
+    tree = guide_tree(sequences)
+    chunks = subtrees(tree, len(sequences), 30)
+    assert max(len(chunk) for chunk in chunks) <= 30
+    assert sorted(sum(chunks, [])) == list(range(200))
+    assert sum(chunks, []) == leaf_order(tree, len(sequences))
+
+
+def test_guide_tree_edge_cases():
+    assert guide_tree([]).shape == (0, 4)
+    assert guide_tree([HEAVY]).shape == (0, 4)
+    assert subtrees(guide_tree([HEAVY]), 1, 10) == [[0]]
+    with pytest.raises(ValueError):
+        guide_tree([HEAVY, LIGHT], method="wpgma")
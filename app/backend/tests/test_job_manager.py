@@ -2,6 +2,7 @@ import time
 from unittest.mock import patch, MagicMock
 
 from backend.jobs.job_manager import JobManager
+from backend.jobs.job_store import SQLiteJobStore
 from backend.models.models import (
     MSACreationRequest,
     MSAAnnotationRequest,
@@ -362,3 +363,34 @@ class TestJobManager:
             "failed",
         ]
         assert 0.0 <= job_status.progress <= 1.0
+
+
+def test_job_status_is_shared_through_job_store(tmp_path):
+    """A job created by one worker is visible to another sharing the store"""
+    db_path = str(tmp_path / "datastore.db")
+    owner = JobManager(job_store=SQLiteJobStore(db_path))
+    other = JobManager(job_store=SQLiteJobStore(db_path))
+    request = MSAAnnotationRequest(
+        msa_id="test-msa-123", numbering_scheme=NumberingScheme.IMGT
+    )
+    job_id = owner.create_annotation_job(request)
+
+    assert job_id not in other.jobs
+    assert other.get_job_status(job_id) is not None
+
+    max_wait = 5
+    start_time = time.time()
+    while time.time() - start_time < max_wait:
+        job_status = other.get_job_status(job_id)
+        if job_status.status in ["completed", "failed"]:
+            break
+        time.sleep(0.1)
+    assert job_status.status == "completed"
+    assert job_status.result["msa_id"] == "test-msa-123"
+    assert [job.job_id for job in other.list_jobs()] == [job_id]
+    assert other.count_jobs_by_status() == {"completed": 1}
+
+    other.cleanup_old_jobs(max_age_hours=0)
+    assert other.list_jobs() == []
+    assert other.count_jobs_by_status() == {}
+    assert owner.job_store.get_job(job_id) is None
@@ -0,0 +1,115 @@
+# Tests for large-input alignment strategies and chunk merging
+import pytest
+
+from backend.benchmarks.datasets import SyntheticDataset
+from backend.benchmarks.suite import BiopythonFallbackMSAEngine
+from backend.models.models import AlignmentMethod
+from backend.msa import large_input
+from backend.msa.large_input import (
+    CHUNKED,
+    FAST,
+    STANDARD,
+    align_chunks,
+    chunk_sequences,
+    plan_alignment,
+)
+from backend.msa.msa_engine import MSAEngine
+from backend.msa.progressive_alignment import (
+    merge_alignments,
+    progressive_alignment,
+)
+
+
+@pytest.fixture
+def small_thresholds(monkeypatch):
+    monkeypatch.setattr(large_input, "MSA_FAST_SEQUENCES", 10)
+    monkeypatch.setattr(large_input, "MSA_FAST_RESIDUES", 10_000)
+    monkeypatch.setattr(large_input, "MSA_CHUNKED_SEQUENCES", 20)
+    monkeypatch.setattr(large_input, "MSA_CHUNKED_RESIDUES", 100_000)
+    monkeypatch.setattr(large_input, "MSA_CHUNK_SIZE", 8)
+    monkeypatch.setattr(large_input, "MSA_WORKERS", 1)
+
+
+def test_plan_alignment_by_size(small_thresholds):
+    muscle = AlignmentMethod.MUSCLE
+    assert plan_alignment(["ACDEF"] * 10, muscle).strategy == STANDARD
+
+    fast = plan_alignment(["ACDEF"] * 11, muscle)
+    assert fast.strategy == FAST
+    assert fast.settings == "muscle -super5"
+    assert "fast_sequences" in fast.reason
+
+    long_input = plan_alignment(["A" * 2000] * 6, AlignmentMethod.MAFFT)
+    assert long_input.strategy == FAST
+    assert long_input.settings == "mafft --retree 2 --parttree"
+    assert "fast_residues" in long_input.reason
+
+    chunked = plan_alignment(["ACDEF"] * 21, muscle)
+    assert chunked.strategy == CHUNKED
+    assert (chunked.chunk_size, chunked.workers) == (8, 1)
+    assert chunked.thresholds["chunked_sequences"] == 20
+
+
+def test_plan_alignment_without_chunking(small_thresholds):
+    plan = plan_alignment(["ACDEF"] * 21, AlignmentMethod.MUSCLE, False)
+    assert plan.strategy == FAST
+
+
+def test_numbered_alignment_is_never_chunked(small_thresholds):
+    plan = plan_alignment(["ACDEF"] * 21, AlignmentMethod.CUSTOM_ANTIBODY)
+    assert plan.strategy == STANDARD
+    assert "settings" not in plan.as_metadata()
+
+
+def test_merge_alignments_keeps_columns():
+    merged = merge_alignments(["ACD-EF", "ACDKEF"], ["ACEF"])
+    assert merged == ["ACD-EF", "ACDKEF", "AC--EF"]
+    assert merge_alignments([], ["ACEF"]) == ["ACEF"]
+
+
+def test_align_chunks_in_input_order():
+    sequences = SyntheticDataset().variable_domains(30, "H")
+    chunks = chunk_sequences(sequences, 8)
+    assert max(len(chunk) for chunk in chunks) <= 8
+    aligned = align_chunks(sequences, chunks, progressive_alignment)
+    assert [row.replace("-", "") for row in aligned] == sequences
+    assert len({len(row) for row in aligned}) == 1
+
+
+def test_align_chunks_in_worker_processes():
+    sequences = SyntheticDataset().variable_domains(12, "L")
+    chunks = [list(range(6)), list(range(6, 12))]
+    aligned = align_chunks(sequences, chunks, progressive_alignment, 2)
+    assert [row.replace("-", "") for row in aligned] == sequences
+
+
+def test_create_msa_chunked(small_thresholds):
+    dataset = SyntheticDataset()
+    sequences = dataset.variable_domains(15, "H") + dataset.variable_domains(
+        15, "L"
+    )
+    result = BiopythonFallbackMSAEngine().create_msa(
+        [(f"seq_{i}", sequence) for i, sequence in enumerate(sequences)],
+        AlignmentMethod.PAIRWISE_GLOBAL,
+    )
+    plan = result.metadata["alignment_plan"]
+    assert plan["strategy"] == CHUNKED
+    assert plan["chunks"] >= 4
+    for row, sequence in zip(result.sequences, sequences):
+        assert row.aligned_sequence.replace("-", "") == sequence
+
+
+def test_create_msa_fast_settings(small_thresholds):
+    engine = MSAEngine()
+    calls = []
+
+    def muscle(sequences, fast=False):
+        calls.append(fast)
+        return list(sequences)
+
+    engine.supported_methods[AlignmentMethod.MUSCLE] = muscle
+    result = engine.create_msa(
+        [(f"seq_{i}", "ACDEF") for i in range(12)], AlignmentMethod.MUSCLE
+    )
+    assert calls == [True]
+    assert result.metadata["alignment_plan"]["strategy"] == FAST
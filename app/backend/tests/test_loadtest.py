@@ -0,0 +1,77 @@
+# Tests for the load-test harness and its fake external tools
+import httpx
+import pytest
+
+from backend.annotation import anarci_result_processor
+from backend.annotation.anarci_result_processor import AnarciResultProcessor
+from backend.annotation.isotype_hmmer import detect_isotype_with_hmmer
+from backend.benchmarks.datasets import SyntheticDataset
+from backend.benchmarks.fake_tools import (
+    FAKE_DOMAIN_LENGTH,
+    fake_run_anarci,
+    fake_tools_installed,
+)
+from backend.benchmarks.loadtest import (
+    HEALTH_PROBE,
+    build_scenarios,
+    percentile,
+    run_load,
+)
+from backend.main import app
+from backend.msa.msa_engine import MSAEngine
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+
+
+def test_fake_tools():
+    run_anarci = anarci_result_processor.run_anarci
+    with fake_tools_installed(latency_ms=0):
+        assert anarci_result_processor.run_anarci is fake_run_anarci
+        engine = MSAEngine()
+        assert engine._align_muscle(["ACDEF", "ACD"]) == ["ACDEF", "ACD--"]
+        assert engine._align_mafft(["ACDEF", "ACD"]) == ["ACDEF", "ACD--"]
+
+        constant = "ASTKGPSVFPLAPSSKSTSGGTAALGCLVKDYFPEPVTVSWNSGALTSGVHTFP"
+        heavy_chain = HEAVY + constant
+        remainder = heavy_chain[FAKE_DOMAIN_LENGTH:]
+        isotype = detect_isotype_with_hmmer(remainder)
+        assert isotype and isotype == detect_isotype_with_hmmer(remainder)
+
+        processor = AnarciResultProcessor(
+            {"ab1": {"heavy_chain": heavy_chain}}
+        )
+        domains = processor.results[0].chains[0].domains
+        assert domains[0].species == "human"
+        assert domains[-1].isotype == isotype
+    assert anarci_result_processor.run_anarci is run_anarci
+
+
+def test_percentile():
+    values = [0.1 * i for i in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(5.0)
+    assert percentile(values, 99) == pytest.approx(9.9)
+    assert percentile([], 95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_load_in_process():
+    scenarios = build_scenarios(SyntheticDataset(), msa_size=3)
+    with fake_tools_installed(latency_ms=0):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            report = await run_load(
+                client,
+                [scenarios["annotate"], scenarios["create-msa"]],
+                concurrency=2,
+                duration=0.5,
+                probe_interval=0.1,
+            )
+    rows = report["scenarios"]
+    for name in ("annotate", "create-msa", HEALTH_PROBE):
+        assert rows[name]["requests"] >= 1
+        assert rows[name]["errors"] == 0
+        assert rows[name]["p50_ms"] <= rows[name]["p99_ms"]
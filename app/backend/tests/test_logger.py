@@ -0,0 +1,83 @@
+# Tests for queued, structured logging
+import json
+import logging
+import sys
+
+from backend.logger import (
+    JSONFormatter,
+    configure_logging,
+    get_logger,
+    parse_levels,
+    stop_logging,
+)
+
+
+class _Collector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_parse_levels():
+    assert parse_levels("backend.msa=debug, backend.api=ERROR") == {
+        "backend.msa": logging.DEBUG,
+        "backend.api": logging.ERROR,
+    }
+    assert parse_levels("") == {}
+    assert parse_levels("backend.msa=LOUD,=INFO") == {}
+
+
+def test_get_logger_prefix():
+    assert get_logger("msa.msa_engine").name == "backend.msa.msa_engine"
+    assert get_logger("backend.msa").name == "backend.msa"
+
+
+def test_json_formatter():
+    logger = logging.getLogger("backend.test_json")
+    try:
+        raise ValueError("bad input")
+    except ValueError:
+        record = logger.makeRecord(
+            logger.name,
+            logging.ERROR,
+            __file__,
+            1,
+            "Failed %d of %d",
+            (2, 5),
+            exc_info=sys.exc_info(),
+            extra={"job_id": "abc"},
+        )
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "backend.test_json"
+    assert entry["message"] == "Failed 2 of 5"
+    assert entry["job_id"] == "abc"
+    assert "ValueError: bad input" in entry["exception"]
+
+
+def test_per_module_levels_through_queue():
+    collector = _Collector()
+    listener = configure_logging(
+        level="WARNING",
+        levels={"backend.test_quiet": logging.ERROR},
+        log_file=None,
+    )
+    listener.handlers = listener.handlers + (collector,)
+    try:
+        get_logger("backend.test_loud").warning("kept %s", "warning")
+        get_logger("backend.test_loud").info("dropped info")
+        get_logger("backend.test_quiet").warning("dropped warning")
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            get_logger("backend.test_quiet").exception("kept error")
+        stop_logging()
+        messages = [record.getMessage() for record in collector.records]
+        assert messages == ["kept warning", "kept error"]
+        assert "RuntimeError: boom" in collector.records[1].exc_text
+    finally:
+        configure_logging()
+        assert logging.getLogger("backend.test_quiet").level == logging.NOTSET
@@ -0,0 +1,71 @@
+# Tests for the Prometheus /metrics endpoint and instrumentation
+
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, generate_latest
+
+from backend.main import app
+from backend.metrics import REGISTRY, StateCollector
+from backend.msa.pssm_calculator import PSSMCalculator
+
+client = TestClient(app)
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_request_latency_by_route_template():
+    labels = {
+        "method": "GET",
+        "route": "/api/v1/dataset/{dataset_id}",
+        "status": "404",
+    }
+    before = _sample("http_request_duration_seconds_count", labels)
+    client.get("/api/v1/dataset/missing-1")
+    client.get("/api/v1/dataset/missing-2")
+    after = _sample("http_request_duration_seconds_count", labels)
+    assert after - before == 2
+
+    # v1 and v2 routes with the same path get separate labels
+    v2 = {"method": "GET", "route": "/api/v2/health", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", v2)
+    client.get("/api/v2/health")
+    assert _sample("http_request_duration_seconds_count", v2) == before + 1
+
+    unmatched = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", unmatched)
+    client.get("/no/such/path")
+    assert _sample("http_request_duration_seconds_count", unmatched) == (
+        before + 1
+    )
+
+
+def test_metrics_endpoint():
+    PSSMCalculator().calculate_pssm([list("ACDE"), list("ACDF")])
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    for name in (
+        "http_request_duration_seconds_bucket",
+        "pssm_calculation_seconds_count",
+        "datastore_datasets",
+        "datastore_sequences",
+        'jobs{status="pending"}',
+    ):
+        assert name in body
+
+
+def test_state_collector():
+    registry = CollectorRegistry()
+    registry.register(
+        StateCollector(
+            lambda: {"pending": 1, "completed": 2},
+            lambda: {"total_datasets": 2, "total_sequences": 30},
+        )
+    )
+    assert registry.get_sample_value("jobs", {"status": "pending"}) == 1
+    assert registry.get_sample_value("jobs", {"status": "completed"}) == 2
+    assert registry.get_sample_value("jobs", {"status": "running"}) == 0
+    assert registry.get_sample_value("datastore_sequences") == 30
+    assert b"datastore_datasets 2.0" in generate_latest(registry)
@@ -0,0 +1,179 @@
+# Tests for adding sequences to an existing alignment
+import time
+
+import pytest
+
+from backend.benchmarks.datasets import SyntheticDataset
+from backend.jobs.job_manager import JobManager
+from backend.jobs.job_store import SQLiteJobStore
+from backend.models.models import (
+    AlignmentMethod,
+    MSAAdditionRequest,
+    SequenceInput,
+)
+from backend.msa.msa_engine import MSAEngine
+from backend.msa.progressive_alignment import add_to_alignment
+from backend.msa.pssm_calculator import PSSMCalculator
+
+
+def _without_columns(row, columns):
+    return "".join(row[column] for column in columns)
+
+
+def test_add_to_alignment_shares_insertion_columns():
+    rows, added, columns = add_to_alignment(
+        ["ACD-EF", "ACDKEF"], ["ACDWWEF", "ACDKEFGG"]
+    )
+    assert len({len(row) for row in rows + added}) == 1
+    assert [_without_columns(row, columns) for row in rows] == [
+        "ACD-EF",
+        "ACDKEF",
+    ]
+    assert [row.replace("-", "") for row in added] == ["ACDWWEF", "ACDKEFGG"]
+    assert added[1].endswith("GG")
+
+
+def test_add_to_alignment_keep_length():
+    rows, added, columns = add_to_alignment(
+        ["ACD-EF", "ACDKEF"], ["ACDWWEF"], keep_length=True
+    )
+    assert rows == ["ACD-EF", "ACDKEF"]
+    assert columns.tolist() == list(range(6))
+    assert len(added[0]) == 6
+    assert added[0].count("W") == 1
+
+
+def test_add_to_pssm_matches_full_calculation():
+    calculator = PSSMCalculator()
+    original = [list("ACD-EF"), list("ACDKEF")]
+    added = [list("ACDWWEF"), list("AC--EF-")]
+    columns = [0, 1, 2, 4, 5, 6]
+    expanded = [["-"] * 7 for _ in original]
+    for row, old in zip(expanded, original):
+        for column, residue in zip(columns, old):
+            row[column] = residue
+
+    updated = calculator.add_to_pssm(
+        calculator.calculate_pssm(original), added, columns
+    )
+    assert updated == calculator.calculate_pssm(expanded + added)
+
+
+def test_add_sequences_updates_alignment():
+    dataset = SyntheticDataset()
+    sequences = dataset.variable_domains(12, "H")
+    engine = MSAEngine()
+    msa = engine.create_msa(
+        [(f"ref_{i}", sequence) for i, sequence in enumerate(sequences[:10])],
+        AlignmentMethod.PAIRWISE_GLOBAL,
+    )
+    new = [("new_0", sequences[10]), ("new_1", sequences[11] + "WWW")]
+
+    result = engine.add_sequences(msa, new)
+    assert result.msa_id != msa.msa_id
+    assert result.metadata["parent_msa_id"] == msa.msa_id
+    assert result.metadata["num_sequences"] == 12
+    assert [row.name for row in result.sequences][-2:] == ["new_0", "new_1"]
+    for row in result.sequences:
+        assert row.aligned_sequence.replace("-", "") == row.original_sequence
+    width = result.metadata["alignment_length"]
+    assert all(len(row) == width for row in result.alignment_matrix)
+    assert len(result.consensus) == width
+    pssm_calculator = engine.pssm_calculator
+    assert result.metadata["pssm_data"] == pssm_calculator.calculate_pssm(
+        result.alignment_matrix
+    )
+
+
+def test_add_sequences_rejects_empty_input():
+    engine = MSAEngine()
+    msa = engine.create_msa(
+        [("a", "ACDEF"), ("b", "ACEF")], AlignmentMethod.PAIRWISE_GLOBAL
+    )
+    with pytest.raises(ValueError):
+        engine.add_sequences(msa, [])
+
+
+def _wait(job_manager, job_id):
+    for _ in range(100):
+        job = job_manager.get_job_status(job_id)
+        if job.status in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_msa_addition_job():
+    job_manager = JobManager()
+    msa = MSAEngine().create_msa(
+        [("a", "ACDEFGHIKLMNPQRST"), ("b", "ACDEGHIKLMNPQRST")],
+        AlignmentMethod.PAIRWISE_GLOBAL,
+    )
+    job_manager.store_msa_result(msa)
+
+    job_id = job_manager.create_msa_addition_job(
+        MSAAdditionRequest(
+            msa_id=msa.msa_id,
+            sequences=[
+                SequenceInput(name="c", heavy_chain="ACDEFGHIKLMNPQRSTV")
+            ],
+        )
+    )
+    job = _wait(job_manager, job_id)
+    assert job.status == "completed", job.message
+    added = job.result["msa_result"]
+    names = [row["name"] for row in added["sequences"]]
+    assert names == ["a", "b", "c_heavy_chain"]
+    stored = job_manager.get_msa_result(added["msa_id"])
+    assert stored.metadata["parent_msa_id"] == msa.msa_id
+
+    with pytest.raises(KeyError):
+        job_manager.create_msa_addition_job(
+            MSAAdditionRequest(msa_id="missing", sequences=[])
+        )
+
+
+def _msa(name="a"):
+    return MSAEngine().create_msa(
+        [(name, "ACDEFGHIKLMNPQRST"), ("b", "ACDEGHIKLMNPQRST")],
+        AlignmentMethod.PAIRWISE_GLOBAL,
+    )
+
+
+def test_msa_is_found_through_job_store(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    owner = JobManager(job_store=SQLiteJobStore(db_path))
+    other = JobManager(job_store=SQLiteJobStore(db_path))
+    msa = _msa()
+    owner.store_msa_result(msa)
+
+    # Written to the shared store in the background
+    deadline = time.time() + 5
+    while not other.job_store.has_msa(msa.msa_id) and time.time() < deadline:
+        time.sleep(0.05)
+    assert other.get_msa_result(msa.msa_id) == msa
+    assert other.get_msa_result("missing") is None
+    # Stored MSAs are not jobs
+    assert owner.list_jobs() == []
+    assert other.list_jobs() == []
+
+
+def test_stored_msas_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.jobs.job_manager.MAX_STORED_MSAS", 2)
+    job_manager = JobManager()
+    msas = [_msa(name) for name in ("a", "c", "d")]
+    for msa in msas:
+        job_manager.store_msa_result(msa)
+    assert list(job_manager.msas) == [msas[1].msa_id, msas[2].msa_id]
+    assert job_manager.get_msa_result(msas[0].msa_id) is None
+
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), max_msas=2)
+    for msa in msas:
+        store.save_msa(msa)
+    assert not store.has_msa(msas[0].msa_id)
+    assert store.get_msa(msas[2].msa_id) == msas[2]
+
+    expired = SQLiteJobStore(str(tmp_path / "jobs.db"), msa_ttl=-1)
+    assert expired.get_msa(msas[2].msa_id) is None
+    expired.save_msa(msas[0])
+    assert store.get_msa(msas[2].msa_id) is None
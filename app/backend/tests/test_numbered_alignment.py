@@ -0,0 +1,87 @@
+# Tests for the numbered-position (antibody-aware) MSA
+from backend.models.models import AlignmentMethod
+from backend.msa.msa_engine import MSAEngine
+from backend.msa.numbered_alignment import (
+    align_numbered,
+    column_order,
+    numbered_alignment,
+)
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+HEAVY_SHORT_CDR3 = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDYWGQGTTVTVSS"
+)
+
+
+def _domain(numbering):
+    residues = "".join(residue for _, residue in numbering if residue != "-")
+    return residues, (numbering, 0, len(residues) - 1)
+
+
+def test_column_order_keeps_imgt_insertion_order():
+    first = [(111, " "), (111, "A"), (112, "A"), (112, " ")]
+    second = [(111, " "), (112, "B"), (112, "A"), (112, " ")]
+    assert column_order([first, second]) == [
+        (111, " "),
+        (111, "A"),
+        (112, "B"),
+        (112, "A"),
+        (112, " "),
+    ]
+
+
+def test_residues_go_into_their_position_columns():
+    first, first_domain = _domain(
+        [((1, " "), "E"), ((2, " "), "V"), ((3, " "), "Q")]
+    )
+    second, second_domain = _domain(
+        [((1, " "), "Q"), ((2, " "), "-"), ((2, "A"), "K"), ((3, " "), "L")]
+    )
+    result = numbered_alignment([first, second], [first_domain, second_domain])
+    assert result.aligned == ["EV-Q", "Q-KL"]
+    assert result.columns == [(1, " "), (2, " "), (2, "A"), (3, " ")]
+    assert result.unnumbered == []
+
+
+def test_flanks_and_unnumbered_sequences():
+    numbering = [((1, " "), "E"), ((2, " "), "V")]
+    domain = (numbering, 2, 3)
+    result = numbered_alignment(
+        ["MKEVAST", "EV", "XYZ"],
+        [domain, (numbering, 0, 1), None],
+    )
+    assert result.aligned == [
+        "MKEVAST",
+        "--EV---",
+        "----XYZ",
+    ]
+    assert result.columns[:2] == [None, None]
+    assert result.columns[2:4] == [(1, " "), (2, " ")]
+    assert result.unnumbered == [2]
+
+
+def test_align_numbered_lines_up_cdr3():
+    result = align_numbered([HEAVY, HEAVY_SHORT_CDR3], "imgt")
+    assert result.unnumbered == []
+    first, second = result.aligned
+    assert len(first) == len(second)
+    assert first.replace("-", "") == HEAVY
+    assert second.replace("-", "") == HEAVY_SHORT_CDR3
+    assert first.endswith("WGQGTTVTVSS")
+    assert second.endswith("WGQGTTVTVSS")
+
+
+def test_msa_engine_custom_antibody_method():
+    result = MSAEngine().create_msa(
+        [("long", HEAVY), ("short", HEAVY_SHORT_CDR3)],
+        AlignmentMethod.CUSTOM_ANTIBODY,
+    )
+    assert result.alignment_method == AlignmentMethod.CUSTOM_ANTIBODY
+    assert [s.aligned_sequence.replace("-", "") for s in result.sequences] == [
+        HEAVY,
+        HEAVY_SHORT_CDR3,
+    ]
@@ -0,0 +1,84 @@
+# Tests for array-based numbering conversion and region labelling
+import numpy as np
+import pytest
+
+from backend.benchmarks.datasets import SyntheticDataset
+from backend.numbering_conversion_utils import (
+    convert_numbering,
+    convert_repertoire,
+    decode_numbering,
+    encode_numbering,
+    encode_repertoire,
+    get_converter,
+)
+from backend.region_annotation_utils import (
+    LABELLERS,
+    annotate_regions,
+    annotate_repertoire,
+)
+
+
+def test_encode_round_trip():
+    numbering = [
+        ((111, " "), "A"),
+        ((111, "A"), "C"),
+        ((112, "AA"), "D"),
+        ((112, "A"), "E"),
+        ((112, " "), "F"),
+    ]
+    keys, residues = encode_numbering(numbering)
+    assert keys[0] < keys[1] and keys[2] > keys[3] > keys[4]
+    assert decode_numbering(keys, residues) == numbering
+
+
+def test_convert_numbering():
+    numbering = [((31, " "), "S"), ((32, " "), "Y"), ((129, "A"), "K")]
+    assert convert_numbering(numbering, "imgt", "kabat") == [
+        ((31, " "), "S"),
+        ((31, "A"), "Y"),
+        ((129, "A"), "K"),
+    ]
+    assert convert_numbering(numbering, "imgt", "imgt") is numbering
+    with pytest.raises(NotImplementedError):
+        convert_numbering(numbering, "kabat", "imgt")
+
+
+def test_repertoire_matches_single_domains():
+    numberings = SyntheticDataset().numbered_domains(20) + [[]]
+    for scheme in ("kabat", "chothia"):
+        converted = convert_repertoire(numberings, "imgt", scheme)
+        assert converted == [
+            convert_numbering(numbering, "imgt", scheme)
+            for numbering in numberings
+        ]
+        labeller = LABELLERS[(scheme, "H")]
+        assert annotate_repertoire(converted, scheme) == [
+            labeller.regions(numbering) for numbering in converted
+        ]
+    assert annotate_repertoire(numberings) == [
+        annotate_regions(numbering) for numbering in numberings
+    ]
+
+
+def test_region_labels_with_insertions():
+    labeller = LABELLERS[("kabat", "H")]
+    keys, _ = encode_numbering(
+        [
+            ((31, " "), "A"),
+            ((31, "A"), "A"),
+            ((35, "B"), "A"),
+            ((36, " "), "A"),
+            ((200, " "), "A"),
+        ]
+    )
+    names = [
+        labeller.names[label] if label >= 0 else None
+        for label in labeller.label(keys)
+    ]
+    assert names == ["FR1", "FR1", "CDR1", "FR2", None]
+
+    keys, residues, offsets = encode_repertoire([[((1, " "), "E")], []])
+    assert offsets.tolist() == [0, 1, 1]
+    assert np.array_equal(
+        get_converter("imgt", "kabat").convert_keys(keys), keys
+    )
@@ -0,0 +1,89 @@
+# Tests for opt-in per-stage profiling
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.profiling import current_profiler, profiled, profiling, stage
+
+client = TestClient(app)
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+
+
+@profiled("outer")
+def _outer(count):
+    for _ in range(count):
+        with stage("inner"):
+            pass
+
+
+def test_stages_nest_and_accumulate():
+    with profiling() as profiler:
+        _outer(3)
+        _outer(1)
+    profile = profiler.to_dict()
+    assert list(profile["stages"]) == ["outer", "outer/inner"]
+    assert profile["stages"]["outer"]["calls"] == 2
+    assert profile["stages"]["outer/inner"]["calls"] == 4
+    assert profile["total_ms"] >= profile["stages"]["outer"]["wall_ms"]
+    assert "outer.inner;dur=" in profiler.server_timing()
+    assert current_profiler() is None
+
+
+def test_disabled_records_nothing():
+    with profiling(False) as profiler:
+        assert profiler is None
+        assert current_profiler() is None
+        _outer(2)
+
+
+def test_annotate_profile():
+    request = {
+        "sequences": [{"name": "ab1", "heavy_chain": HEAVY}],
+        "numbering_scheme": "imgt",
+    }
+    plain = client.post("/api/v2/annotate", json=request)
+    assert "profile" not in plain.json()
+    assert "server-timing" not in plain.headers
+
+    response = client.post(
+        "/api/v2/annotate", json=request, params={"profile": "true"}
+    )
+    assert response.status_code == 200, response.text
+    stages = response.json()["profile"]["stages"]
+    for path in (
+        "anarci_processing",
+        "anarci_processing/anarci",
+        "anarci_processing/region_annotation",
+        "convert_results",
+        "statistics",
+    ):
+        assert stages[path]["calls"] >= 1
+    assert "serialise;dur=" in response.headers["server-timing"]
+
+
+def test_create_msa_profile_header():
+    request = {
+        "sequences": [
+            {"name": "a", "heavy_chain": HEAVY},
+            {"name": "b", "heavy_chain": HEAVY.replace("VQPGG", "VKPGG")},
+        ],
+        "alignment_method": "pairwise_global",
+    }
+    response = client.post(
+        "/api/v2/msa-viewer/create-msa",
+        json=request,
+        headers={"X-Profile": "1"},
+    )
+    assert response.status_code == 200, response.text
+    stages = response.json()["data"]["profile"]["stages"]
+    for path in (
+        "create_msa/align",
+        "create_msa/consensus",
+        "create_msa/pssm",
+        "annotate_msa/anarci_processing/anarci",
+        "annotate_msa/region_mapping",
+    ):
+        assert path in stages
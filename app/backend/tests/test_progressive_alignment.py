@@ -0,0 +1,83 @@
+# Tests for the in-process progressive aligner
+import numpy as np
+
+from backend.msa.kmer_distance import encode
+from backend.msa.msa_engine import MSAEngine
+from backend.msa.progressive_alignment import (
+    SUBSTITUTION_MATRIX,
+    align_profiles,
+    progressive_alignment,
+)
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+HEAVY_SHORT_CDR3 = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDYWGQGTTVTVSS"
+)
+HEAVY_VH1 = (
+    "QVQLVQSGAEVKKPGASVKVSCKASGYTFTSYGISWVRQAPGQGLEWMGWISAYNGNTNYAQKLQG"
+    "RVTMTTDTSTSTAYMELRSLRSDDTAVYYCARDGYSSGWYFDYWGQGTLVTVSS"
+)
+LIGHT = (
+    "DIQMTQSPSSLSASVGDRVTITCRASQSISSYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGS"
+    "GSGTDFTLTISSLQPEDFATYYCQQSYSTPLTFGQGTKVEIK"
+)
+
+
+def _one_hot(sequence):
+    return np.eye(len(SUBSTITUTION_MATRIX))[encode(sequence)]
+
+
+def test_align_profiles_gap_in_shorter():
+    first, second = align_profiles(_one_hot("ACDEFGHIK"), _one_hot("ACDGHIK"))
+    assert first.tolist() == list(range(9))
+    assert second.tolist() == [0, 1, 2, -1, -1, 3, 4, 5, 6]
+
+
+def test_align_profiles_free_end_gaps():
+    first, second = align_profiles(
+        _one_hot("MKWACDEFGH"), _one_hot("ACDEFGHIKL"), free_end_gaps=True
+    )
+    assert first.tolist() == list(range(10)) + [-1] * 3
+    assert second.tolist() == [-1] * 3 + list(range(10))
+
+
+def test_progressive_alignment_keeps_residues_and_order():
+    sequences = [HEAVY, LIGHT, HEAVY_SHORT_CDR3, HEAVY_VH1, "ACDxB"]
+    aligned = progressive_alignment(sequences)
+    assert len({len(row) for row in aligned}) == 1
+    assert [row.replace("-", "") for row in aligned] == sequences
+    assert all(
+        any(row[column] != "-" for row in aligned)
+        for column in range(len(aligned[0]))
+    )
+
+
+def test_progressive_alignment_places_cdr3_gap():
+    aligned = progressive_alignment([HEAVY, HEAVY_SHORT_CDR3])
+    assert aligned[0] == HEAVY
+    assert aligned[1].startswith(HEAVY_SHORT_CDR3[:98])
+    assert aligned[1].endswith("WGQGTTVTVSS")
+
+
+def test_progressive_alignment_edge_cases():
+    assert progressive_alignment([]) == []
+    assert progressive_alignment([HEAVY]) == [HEAVY]
+    assert progressive_alignment(["ACDEF", ""]) == ["ACDEF", "-----"]
+
+
+def test_small_pairwise_jobs_skip_muscle(monkeypatch):
+    engine = MSAEngine()
+
+    def muscle(sequences):
+        raise AssertionError("MUSCLE should not run for small jobs")
+
+    monkeypatch.setattr(engine, "_align_muscle", muscle)
+    aligned = engine._align_pairwise_global([HEAVY, HEAVY_SHORT_CDR3])
+    assert [row.replace("-", "") for row in aligned] == [
+        HEAVY,
+        HEAVY_SHORT_CDR3,
+    ]
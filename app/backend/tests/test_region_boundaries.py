@@ -0,0 +1,73 @@
+# Tests for compiled region boundary lookups
+import random
+
+import pytest
+
+from backend.annotation.antibody_region_annotator import (
+    SCHEME_MAP,
+    compiled_regions,
+)
+from backend.annotation.region_utils import CompiledRegions, RegionIndexHelper
+from backend.benchmarks.datasets import SyntheticDataset
+
+
+def scan_regions(region_map, numbering):
+    pos_to_idx = RegionIndexHelper.build_pos_to_idx(numbering)
+    regions = []
+    for name, (start, stop) in region_map.items():
+        start_idx, stop_idx = RegionIndexHelper.find_region_indices(
+            pos_to_idx, start, stop
+        )
+        regions.append(
+            (
+                name,
+                start_idx,
+                stop_idx,
+                RegionIndexHelper.extract_region_sequence(
+                    numbering, start_idx, stop_idx
+                ),
+            )
+        )
+    return regions
+
+
+@pytest.mark.parametrize(
+    "scheme,chain_type",
+    [
+        (scheme, chain_type)
+        for scheme, maps in SCHEME_MAP.items()
+        for chain_type in maps
+    ],
+)
+def test_matches_linear_scan(scheme, chain_type):
+    numberings = SyntheticDataset().numbered_domains(50)
+    rng = random.Random(0)
+    # Domains missing positions exercise the nearest-position fallbacks
+    numberings += [
+        [entry for entry in numbering if rng.random() > 0.15]
+        for numbering in numberings
+    ]
+    numberings += [[], [((1, " "), "A")], [((50, " "), "A")]]
+    region_map = SCHEME_MAP[scheme][chain_type]
+    regions = CompiledRegions(region_map)
+    for numbering in numberings:
+        assert regions.find_regions(numbering) == scan_regions(
+            region_map, numbering
+        )
+
+
+def test_imgt_cdr3_insertions():
+    numbering = [((position, " "), "A") for position in range(100, 111)]
+    numbering += [((111, " "), "B"), ((111, "A"), "C")]
+    numbering += [((112, "A"), "D"), ((112, " "), "E")]
+    numbering += [((position, " "), "F") for position in range(113, 129)]
+    regions = {
+        name: (start, stop, sequence)
+        for name, start, stop, sequence in compiled_regions(
+            "imgt", "H"
+        ).find_regions(numbering)
+    }
+    assert regions["CDR3"] == (5, 19, "AAAAAABCDEFFFFF")
+    assert regions["FR4"][2] == "F" * 11
+    # No position at or before the FR1 stop
+    assert regions["FR1"] == (0, None, "")
@@ -0,0 +1,75 @@
+# Tests for the orjson-based FastJSONResponse
+import json
+
+import numpy as np
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from backend.api.responses import FastJSONResponse
+from backend.models.models import (
+    AlignmentMethod,
+    APIResponse,
+    MSAResult,
+    MSASequence,
+)
+
+
+def _msa_response() -> APIResponse:
+    sequence = MSASequence(
+        name="seq_1",
+        original_sequence="ACDE",
+        aligned_sequence="AC-DE",
+        start_position=0,
+        end_position=5,
+        gaps=[2],
+    )
+    msa_result = MSAResult(
+        msa_id="msa",
+        sequences=[sequence],
+        alignment_matrix=[list("AC-DE")],
+        consensus="ACDE",
+        alignment_method=AlignmentMethod.PAIRWISE_GLOBAL,
+        created_at="2024-01-01T00:00:00",
+        metadata={"pssm_data": {"position_scores": [{"A": np.log2(4.0)}]}},
+    )
+    return APIResponse(
+        success=True, message="ok", data={"msa_result": msa_result}
+    )
+
+
+def test_matches_default_encoding():
+    content = _msa_response()
+    body = FastJSONResponse(content).body
+    assert json.loads(body) == jsonable_encoder(content)
+    assert FastJSONResponse(content).media_type == "application/json"
+
+
+def test_numpy_values():
+    matrix = np.arange(6, dtype=np.int32).reshape(2, 3)
+    content = {
+        "matrix": matrix,
+        "column": matrix[:, 1],  # non-contiguous view
+        "objects": np.array(["A", "C"], dtype=object),
+        "score": np.float32(0.5),
+        "count": np.int64(3),
+        "flag": np.bool_(True),
+        "residues": {"A"},
+        "missing": float("nan"),
+        1: "non-string key",
+    }
+    assert json.loads(FastJSONResponse(content).body) == {
+        "matrix": [[0, 1, 2], [3, 4, 5]],
+        "column": [1, 4],
+        "objects": ["A", "C"],
+        "score": 0.5,
+        "count": 3,
+        "flag": True,
+        "residues": ["A"],
+        "missing": None,
+        "1": "non-string key",
+    }
+
+
+def test_unsupported_type():
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
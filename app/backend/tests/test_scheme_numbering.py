@@ -0,0 +1,97 @@
+# Tests for numbering several schemes from one ANARCI alignment
+import pytest
+from anarci import run_anarci
+
+from backend.annotation.anarci_result_processor import AnarciResultProcessor
+from backend.annotation.scheme_numbering import (
+    anarci_scheme,
+    run_anarci_schemes,
+)
+from backend.models.requests_v2 import AnnotationRequestV2
+
+HEAVY = (
+    "EVQLVESGGGLVQPGGSLRLSCAASGFTFSSYAMSWVRQAPGKGLEWVSAISGSGGSTYYADSVKG"
+    "RFTISRDNSKNTLYLQMNSLRAEDTAVYYCAKDRLSITIRPRYYGMDVWGQGTTVTVSS"
+)
+LIGHT = (
+    "DIQMTQSPSSLSASVGDRVTITCRASQSISSYLNWYQQKPGKAPKLLIYAASSLQSGVPSRFSGS"
+    "GSGTDFTLTISSLQPEDFATYYCQQSYSTPLTFGQGTKVEIK"
+)
+SPECIES = ["human", "mouse", "rat"]
+
+
+def test_matches_run_anarci():
+    sequences = [("heavy", HEAVY), ("light", LIGHT)]
+    outputs = run_anarci_schemes(
+        sequences, ["imgt", "kabat", "imgt"], allowed_species=SPECIES
+    )
+    assert list(outputs) == ["imgt", "kabat"]
+    for scheme, output in outputs.items():
+        expected = run_anarci(
+            sequences, scheme=scheme, allowed_species=SPECIES
+        )
+        assert output[1] == expected[1]
+
+
+def test_germlines_in_every_scheme(monkeypatch):
+    def number(sequences, alignments, scheme, assign_germline, **kwargs):
+        if scheme == "kabat":
+            raise ValueError("cannot number")
+        details = {"scheme": scheme}
+        if assign_germline:
+            details["germlines"] = {"v_gene": [("human", "IGHV3-23*01"), 1.0]}
+        return [[(["numbering"], 0, 10)]], [[details]], [[]]
+
+    module = "backend.annotation.scheme_numbering"
+    monkeypatch.setattr(f"{module}.run_hmmer", lambda *a, **k: [None])
+    monkeypatch.setattr(f"{module}.check_for_j", lambda *a: None)
+    monkeypatch.setattr(f"{module}.number_sequences_from_alignment", number)
+
+    # The primary scheme fails, so germlines come from the first extra
+    outputs = run_anarci_schemes(
+        [("heavy", HEAVY)],
+        ["kabat", "chothia", "imgt"],
+        assign_germline=True,
+    )
+    assert list(outputs) == ["chothia", "imgt"]
+    for output in outputs.values():
+        assert output[2][0][0]["germlines"]["v_gene"][1] == 1.0
+
+
+def test_anarci_scheme():
+    assert anarci_scheme("cgg") == "kabat"
+    assert anarci_scheme("chothia") == "chothia"
+
+
+def _variable_domains(processor):
+    return [
+        domain
+        for chain in processor.results[0].chains
+        for domain in chain.domains
+        if domain.domain_type == "V"
+    ]
+
+
+def test_additional_scheme_regions():
+    biologics = {"ab1": {"heavy_chain": HEAVY, "light_chain": LIGHT}}
+    processor = AnarciResultProcessor(
+        biologics, numbering_scheme="imgt", additional_schemes=["kabat", "cgg"]
+    )
+    domains = _variable_domains(processor)
+    assert domains and all(
+        set(domain.scheme_regions) == {"kabat", "cgg"} for domain in domains
+    )
+    for scheme in ("kabat", "cgg"):
+        expected = _variable_domains(
+            AnarciResultProcessor(biologics, numbering_scheme=scheme)
+        )
+        for domain, other in zip(domains, expected):
+            assert domain.scheme_regions[scheme] == other.regions
+
+
+def test_request_rejects_aho():
+    with pytest.raises(ValueError):
+        AnnotationRequestV2(
+            sequences=[{"name": "ab1", "heavy_chain": HEAVY}],
+            additional_schemes=["aho"],
+        )
@@ -1,8 +1,24 @@
 # Tests for sequence processing (FASTA parsing, validation, statistics)
+import gzip
+from io import BytesIO, StringIO
+
 import pytest
+from Bio import SeqIO
 from Bio.SeqRecord import SeqRecord
+from fastapi import UploadFile
 
-from backend.annotation.sequence_processor import SequenceProcessor
+from backend.annotation.fasta_stream import (
+    UploadTooLargeError,
+    ZstdStreamDecompressor,
+    is_supported_upload,
+    iter_fasta_records,
+    iter_sequence_records,
+    iter_upload_text,
+)
+from backend.annotation.sequence_processor import (
+    SequenceProcessor,
+    SequenceStatistics,
+)
 
 
 @pytest.fixture
@@ -61,3 +77,231 @@ def test_get_sequence_statistics(processor):
     assert stats["min_length"] == 120
     assert stats["max_length"] == 140
     assert stats["total_length"] == 260
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 10_000])
+def test_fasta_stream_matches_seqio(chunk_size):
+    fasta = (
+        "leading comment\n"
+        ">seq1 first record\r\nACDEFGHIKL\r\nMNPQRSTVWY\r\n"
+        ">seq2\nACDE FGHI\n\n"
+        ">\n"
+        ">seq3 no trailing newline\nKLMNPQ"
+    )
+    chunks = [
+        fasta[i : i + chunk_size] for i in range(0, len(fasta), chunk_size)
+    ]
+    streamed = list(iter_fasta_records(chunks))
+    expected = list(SeqIO.parse(StringIO(fasta), "fasta"))
+    assert [(r.id, r.description, str(r.seq)) for r in streamed] == [
+        (r.id, r.description, str(r.seq)) for r in expected
+    ]
+
+
+def _upload(content: str) -> UploadFile:
+    return UploadFile(filename="test.fasta", file=BytesIO(content.encode()))
+
+
+def _binary_upload(data: bytes, filename: str) -> UploadFile:
+    return UploadFile(filename=filename, file=BytesIO(data))
+
+
+async def _collect(processor, upload, errors, **kwargs):
+    return [
+        seq
+        async for _, seq in processor.iter_valid_upload_records(
+            upload, None, errors, **kwargs
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_valid_upload_records(processor):
+    valid = "ACDEFGHIKLMNPQRSTVWY"
+    fasta = f">a\n{valid}\n>b\n{valid}X\n>c\nACD\n>d\n{valid}\n"
+    errors = []
+    sequences = await _collect(processor, _upload(fasta), errors)
+    assert sequences == [valid, valid]
+    assert errors[0].startswith("Sequence 2: Invalid amino acids")
+    assert errors[1].startswith("Sequence 3: Sequence too short")
+
+
+@pytest.mark.asyncio
+async def test_iter_valid_upload_records_caps_errors(processor, monkeypatch):
+    monkeypatch.setattr(
+        "backend.annotation.sequence_processor."
+        "MAX_REPORTED_VALIDATION_ERRORS",
+        2,
+    )
+    errors = []
+    await _collect(processor, _upload(">a\nX\n" * 5), errors)
+    assert errors[-1] == "... and 3 more invalid sequences"
+    assert len(errors) == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_valid_upload_records_limits(processor):
+    with pytest.raises(UploadTooLargeError):
+        await _collect(
+            processor, _upload(">a\n" + "A" * 100), [], max_bytes=50
+        )
+    # Pasted sequences are limited by their encoded size
+    with pytest.raises(UploadTooLargeError):
+        async for _ in processor.iter_upload_records(
+            None, ">a\n" + "É" * 40, max_bytes=50
+        ):
+            pass
+    with pytest.raises(ValueError, match="No sequences found"):
+        await _collect(processor, _upload("not_a_fasta_sequence"), [])
+
+
+def test_sequence_statistics_matches_batch(processor):
+    seqs = ["ACDEFGHIKLMNPQRSTVWY" * 6, "ACDEFGHIKLMNPQRSTVWY" * 7]
+    stats = SequenceStatistics()
+    for seq in seqs:
+        stats.add(seq)
+    assert stats.to_dict() == processor.get_sequence_statistics(seqs)
+    assert SequenceStatistics().to_dict() == {}
+
+
+FASTQ = (
+    "@read1 first\nACDEFGHIKL\n+\nIIIIIIIIII\n"
+    "\n"
+    "@read2\nMNPQRSTVWY\n+read2\nIIIIIIIIII\n"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1000])
+def test_fastq_stream(chunk_size):
+    chunks = [
+        FASTQ[i : i + chunk_size] for i in range(0, len(FASTQ), chunk_size)
+    ]
+    records = list(iter_sequence_records(chunks))
+    assert [(r.id, r.description, str(r.seq)) for r in records] == [
+        ("read1", "read1 first", "ACDEFGHIKL"),
+        ("read2", "read2", "MNPQRSTVWY"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "fastq, message",
+    [
+        ("@r\nACGT\n+\nIII\n", "lengths differ"),
+        ("@r\nACGT\n-\nIIII\n", "separator"),
+        ("@r\nACGT\n+\nIIII\nr\nACGT\n+\nIIII\n", "header"),
+        ("@r\nACGT\n+\n", "Truncated"),
+    ],
+)
+def test_fastq_stream_malformed(fastq, message):
+    with pytest.raises(ValueError, match=message):
+        list(iter_sequence_records([fastq]))
+
+
+def test_is_supported_upload():
+    for name in ("a.fasta", "a.FA", "a.fq.gz", "a.fastq.bgz", "a.faa.zst"):
+        assert is_supported_upload(name)
+    for name in ("a.gz", "a.fasta.bz2", "a.csv", "a.fasta.gz.gz"):
+        assert not is_supported_upload(name)
+
+
+async def _read_text(upload, **kwargs):
+    return "".join([text async for text in iter_upload_text(upload, **kwargs)])
+
+
+@pytest.mark.asyncio
+async def test_upload_text_gzip_and_bgzip():
+    fasta = ">a\nACDEFGHIKL\n>b\nMNPQRSTVWY\n"
+    compressed = gzip.compress(fasta.encode())
+    assert await _read_text(_binary_upload(compressed, "a.fa.gz")) == fasta
+
+    # bgzip output is a series of independent gzip members
+    half = len(fasta) // 2
+    members = gzip.compress(fasta[:half].encode()) + gzip.compress(
+        fasta[half:].encode()
+    )
+    upload = _binary_upload(members, "a.fa.bgz")
+    assert await _read_text(upload, chunk_size=7) == fasta
+
+
+@pytest.mark.asyncio
+async def test_upload_text_zstd():
+    zstandard = pytest.importorskip("zstandard")
+    fasta = ">a\nACDEFGHIKL\n" * 1000
+    compressed = zstandard.ZstdCompressor().compress(fasta.encode())
+    upload = _binary_upload(compressed, "a.fa.zst")
+    assert await _read_text(upload, chunk_size=100) == fasta
+
+
+def test_zstd_output_is_bounded_per_step():
+    zstandard = pytest.importorskip("zstandard")
+    # Highly compressible: a few KB expand to 64 MB
+    compressed = zstandard.ZstdCompressor().compress(b"A" * 64 * 1024**2)
+    decompressor = ZstdStreamDecompressor()
+    pieces = [len(piece) for piece in decompressor.feed(compressed)]
+    assert sum(pieces) == 64 * 1024**2
+    assert max(pieces) <= ZstdStreamDecompressor.MAX_OUTPUT
+
+
+@pytest.mark.asyncio
+async def test_upload_text_zstd_frames_and_truncation():
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor(write_checksum=True)
+    first, second = b">a\nACD\n", b">b\nEF\n"
+    frames = compressor.compress(first) + compressor.compress(second)
+    upload = _binary_upload(frames, "a.fa.zst")
+    assert await _read_text(upload, chunk_size=5) == ">a\nACD\n>b\nEF\n"
+    with pytest.raises(ValueError, match="truncated"):
+        await _read_text(_binary_upload(frames[:-3], "a.fa.zst"))
+
+
+@pytest.mark.asyncio
+async def test_upload_text_compressed_limits():
+    data = gzip.compress(b">a\n" + b"A" * 10_000)
+    with pytest.raises(ValueError, match="truncated"):
+        await _read_text(_binary_upload(data[:-10], "a.fa.gz"))
+    with pytest.raises(UploadTooLargeError, match="Decompressed upload"):
+        await _read_text(
+            _binary_upload(data, "a.fa.gz"), max_decompressed_bytes=1000
+        )
+
+
+@pytest.mark.asyncio
+async def test_iter_valid_upload_records_gzip_fastq(processor):
+    valid = "ACDEFGHIKLMNPQRSTVWY"
+    fastq = f"@a\n{valid}\n+\n{'I' * 20}\n@b\nACD\n+\nIII\n"
+    upload = _binary_upload(gzip.compress(fastq.encode()), "reads.fq.gz")
+    errors = []
+    sequences = await _collect(processor, upload, errors)
+    assert sequences == [valid]
+    assert errors[0].startswith("Sequence 2: Sequence too short")
+
+
+@pytest.mark.asyncio
+async def test_iter_valid_upload_records_translate(processor):
+    protein = "EVQLVESGGGLVQPGG"
+    # Trailing stop codon and partial codon are dropped
+    dna = "GAAGTGCAGCTGGTGGAAAGCGGCGGCGGCCTGGTGCAGCCGGGCGGC" + "TAAGC"
+    errors = []
+    sequences = await _collect(
+        processor, _upload(f">nt\n{dna}\n"), errors, translate=True
+    )
+    assert sequences == [protein]
+    assert SequenceProcessor.translate_nucleotides("ATGTGATGG") == "M*W"
+
+
+@pytest.mark.asyncio
+async def test_iter_valid_upload_records_translate_invalid_codon(processor):
+    dna = "GAAGTGCAGCTGGTGGAAAGCGGCGGCGGCCTGGTGCAGCCGGGCGGC"
+    errors = []
+    sequences = await _collect(
+        processor,
+        _upload(f">gap\nATG-TTAAA\n>nt\n{dna}\n"),
+        errors,
+        translate=True,
+    )
+    assert sequences == ["EVQLVESGGGLVQPGG"]
+    assert errors == [
+        "Sequence 1: Cannot translate sequence: Codon '-TT' is invalid"
+    ]
+    with pytest.raises(ValueError, match="Codon '-TT' is invalid"):
+        SequenceProcessor.translate_nucleotides("ATG-TTAAA")
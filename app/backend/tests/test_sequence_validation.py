@@ -0,0 +1,55 @@
+# Tests for the lookup-table sequence validator
+import random
+
+import pytest
+
+from backend.utils.sequence_validation import AMINO_ACIDS, SequenceValidator
+
+
+def _reference_first_invalid(sequence, alphabet, ignore):
+    clean = "".join(c for c in sequence.upper() if c not in ignore)
+    for i, c in enumerate(clean):
+        if c not in alphabet:
+            return clean, i
+    return clean, -1
+
+
+@pytest.fixture
+def validator():
+    return SequenceValidator(AMINO_ACIDS, ignore=" \n")
+
+
+def test_check_valid_sequence_is_normalised(validator):
+    assert validator.check("acd EF\nghi") == ("ACDEFGHI", -1)
+
+
+def test_check_reports_first_invalid_position(validator):
+    assert validator.check("ACDXEFZ") == ("ACDXEFZ", 3)
+    assert validator.first_invalid_position("AC DE1") == 4
+    assert validator.invalid_characters("acx1 ") == {"X", "1"}
+
+
+def test_non_ascii_characters_are_invalid(validator):
+    assert validator.first_invalid_position("ACDÉF") == 3
+
+
+def test_validate_batch_matches_reference(validator):
+    rng = random.Random(0)
+    alphabet = AMINO_ACIDS + AMINO_ACIDS.lower() + " \nXBZ*-1"
+    sequences = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        for _ in range(500)
+    ] + ["", "ACDEF", ""]
+    normalised, positions = validator.validate_batch(sequences)
+    expected = [
+        _reference_first_invalid(seq, AMINO_ACIDS, " \n") for seq in sequences
+    ]
+    assert normalised == [clean for clean, _ in expected]
+    assert positions.tolist() == [pos for _, pos in expected]
+
+
+def test_validate_batch_all_valid(validator):
+    normalised, positions = validator.validate_batch(["acdef", "GHIKL"])
+    assert normalised == ["ACDEF", "GHIKL"]
+    assert positions.tolist() == [-1, -1]
+    assert validator.validate_batch([])[1].tolist() == []
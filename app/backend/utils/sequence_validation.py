@@ -0,0 +1,108 @@
+import string
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Sequence, Set, Tuple
+
+import numpy as np
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+_TO_UPPER = bytes.maketrans(
+    string.ascii_lowercase.encode("ascii"),
+    string.ascii_uppercase.encode("ascii"),
+)
+
+
+class SequenceValidator:
+    """
+    Validates sequences against an alphabet using byte lookup tables.
+
+    Sequences are encoded to bytes once and normalised with a single
+    ``bytes.translate`` call (uppercase, ``ignore`` characters removed).
+    A second ``translate`` through a 256-entry table maps alphabet bytes to
+    0 and everything else to 1, so the first invalid position is a
+    ``find(1)`` on the result and the all-valid case never leaves C code.
+
+    Characters outside ASCII are encoded as ``?`` and are always invalid.
+    """
+
+    def __init__(self, alphabet: str = AMINO_ACIDS, ignore: str = ""):
+        self.alphabet = alphabet.upper()
+        self.ignore = ignore
+        self._ignore_bytes = ignore.encode("ascii")
+        flags = bytearray(b"\x01" * 256)
+        for code in self.alphabet.encode("ascii"):
+            flags[code] = 0
+        self._invalid_flags = bytes(flags)
+
+    def _encode(self, sequence: str) -> bytes:
+        return sequence.encode("ascii", "replace").translate(
+            _TO_UPPER, self._ignore_bytes
+        )
+
+    def _first_invalid(self, encoded: bytes) -> int:
+        return encoded.translate(self._invalid_flags).find(1)
+
+    def normalize(self, sequence: str) -> str:
+        """Uppercase the sequence and drop ignored characters"""
+        return self._encode(sequence).decode("ascii")
+
+    def first_invalid_position(self, sequence: str) -> int:
+        """0-based position of the first invalid residue after
+        normalisation, or -1 if the sequence is valid"""
+        return self._first_invalid(self._encode(sequence))
+
+    def check(self, sequence: str) -> Tuple[str, int]:
+        """Return the normalised sequence and its first invalid position"""
+        encoded = self._encode(sequence)
+        return encoded.decode("ascii"), self._first_invalid(encoded)
+
+    def invalid_characters(self, sequence: str) -> Set[str]:
+        """Uppercased characters of a sequence that are not in the alphabet"""
+        return set(sequence.upper()) - set(self.alphabet) - set(self.ignore)
+
+    def validate_batch(
+        self, sequences: Sequence[str]
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Validate many sequences at once
+
+        All sequences are concatenated and normalised and flagged with one
+        ``translate`` call each over the whole buffer. Invalid positions are
+        then found with ``find``, jumping to the next sequence after each
+        hit, so the cost of locating errors scales with the number of
+        invalid sequences rather than with the number of residues.
+
+        Args:
+            sequences: Sequences to validate
+
+        Returns:
+            Tuple of (normalised sequences, int64 array holding the first
+            invalid position of each sequence or -1 if it is valid)
+        """
+        # Characters map 1:1 to bytes ("?" replaces non-ASCII), so one
+        # encode of the concatenation keeps sequence offsets intact
+        raw = "".join(sequences).encode("ascii", "replace")
+        if any(code in raw for code in self._ignore_bytes):
+            # Ignored characters shift offsets; normalise one by one
+            encoded = [self._encode(seq) for seq in sequences]
+            joined = b"".join(encoded)
+            lengths = map(len, encoded)
+        else:
+            joined = raw.upper()
+            lengths = map(len, sequences)
+        bounds = [0, *accumulate(lengths)]
+
+        positions = np.full(len(sequences), -1, dtype=np.int64)
+        flags = joined.translate(self._invalid_flags)
+        pos = flags.find(1)
+        while pos >= 0:
+            owner = bisect_right(bounds, pos) - 1
+            positions[owner] = pos - bounds[owner]
+            pos = flags.find(1, bounds[owner + 1])
+
+        text = joined.decode("ascii")
+        normalised = [
+            text[start:end] for start, end in zip(bounds, bounds[1:])
+        ]
+        return normalised, positions